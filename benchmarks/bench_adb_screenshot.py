@@ -0,0 +1,105 @@
+"""Benchmark: in-memory ``exec-out`` screenshots vs the capture-and-pull path.
+
+Captures a 1080x2400 PNG from a local fake ``adb`` executable with both
+implementations and reports per-step latency, peak Python heap usage
+(``tracemalloc``) and peak RSS. Each path runs in its own forked process so
+the RSS high-water marks, which include Pillow's pixel buffers, are separate.
+
+Usage:
+    python benchmarks/bench_adb_screenshot.py [--steps 20] [--latency 0.02]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+from phone_agent.adb import screenshot  # noqa: E402
+from tests.factories.fake_adb import make_fake_adb  # noqa: E402
+
+
+def _make_screen(width: int = 1080, height: int = 2400) -> bytes:
+    """Render a UI-like screen: flat bars, cards and some noisy icons."""
+    rng = random.Random(0)
+    img = Image.new("RGB", (width, height), color=(245, 245, 245))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, width, 160), fill=(7, 193, 96))
+    for row in range(12):
+        top = 200 + row * 180
+        draw.rectangle((30, top, width - 30, top + 150), fill=(255, 255, 255))
+        for _ in range(400):
+            x = rng.randrange(50, 170)
+            y = rng.randrange(top + 20, top + 130)
+            draw.point((x, y), fill=(rng.randrange(256), 120, 200))
+        draw.text((200, top + 50), f"Conversation {row}", fill=(0, 0, 0))
+    buffered = BytesIO()
+    img.save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+def _measure(stream: bool, steps: int) -> tuple[float, float, int, int]:
+    """Return (mean s, p95 s, peak traced bytes, peak RSS KiB) per capture."""
+    screenshot.set_stream_capture(stream)
+    latencies = []
+    tracemalloc.start()
+    for _ in range(steps):
+        start = time.perf_counter()
+        shot = screenshot.get_screenshot("bench-device")
+        latencies.append(time.perf_counter() - start)
+        assert not shot.is_sensitive and shot.width == 1080
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return statistics.mean(latencies), p95, peak, max_rss
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.02,
+        help="Simulated adb client/server handshake per process (seconds)",
+    )
+    args = parser.parse_args()
+
+    png = _make_screen()
+    with tempfile.TemporaryDirectory() as root:
+        bin_dir = make_fake_adb(Path(root), latency=args.latency, screen_png=png)
+        os.environ["PATH"] = str(bin_dir) + os.pathsep + os.environ.get("PATH", "")
+
+        results = {}
+        context = multiprocessing.get_context("fork")
+        for name, stream in (("pull", False), ("exec-out", True)):
+            with context.Pool(1) as pool:
+                results[name] = pool.apply(_measure, (stream, args.steps))
+
+    print(f"screen: 1080x2400 PNG, {len(png) / 1024:.0f} KiB")
+    print(
+        f"{'path':<10}{'mean ms':>10}{'p95 ms':>10}"
+        f"{'heap KiB':>12}{'rss MiB':>10}"
+    )
+    for name, (mean, p95, peak, max_rss) in results.items():
+        print(
+            f"{name:<10}{mean * 1000:>10.1f}{p95 * 1000:>10.1f}"
+            f"{peak / 1024:>12.0f}{max_rss / 1024:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
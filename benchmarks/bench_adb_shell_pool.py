@@ -0,0 +1,70 @@
+"""Benchmark: one-shot ``adb shell`` processes vs the persistent shell pool.
+
+Runs a mix of tap/swipe/back/home/type actions against a local fake ``adb``
+executable and reports actions per second for both paths.
+
+Usage:
+    python benchmarks/bench_adb_shell_pool.py [--actions 200] [--latency 0.02]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from phone_agent.adb import device, input as adb_input, shell  # noqa: E402
+from tests.factories.fake_adb import make_fake_adb  # noqa: E402
+
+
+def _run_actions(count: int, device_id: str) -> float:
+    """Run ``count`` actions and return the elapsed wall-clock seconds."""
+    actions = [
+        lambda: device.tap(540, 1200, device_id, delay=0),
+        lambda: device.swipe(540, 1800, 540, 600, 300, device_id, delay=0),
+        lambda: device.back(device_id, delay=0),
+        lambda: device.home(device_id, delay=0),
+        lambda: adb_input.type_text("hello", device_id),
+    ]
+    start = time.perf_counter()
+    for i in range(count):
+        actions[i % len(actions)]()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--actions", type=int, default=200)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.02,
+        help="Simulated adb client/server handshake per process (seconds)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        bin_dir = make_fake_adb(Path(root), latency=args.latency)
+        os.environ["PATH"] = str(bin_dir) + os.pathsep + os.environ.get("PATH", "")
+
+        shell.set_shell_pool_enabled(False)
+        subprocess_time = _run_actions(args.actions, "bench-device")
+
+        shell.set_shell_pool_enabled(True)
+        pooled_time = _run_actions(args.actions, "bench-device")
+        shell.get_shell_pool().close_all()
+
+    print(f"{'path':<12}{'actions':>10}{'seconds':>12}{'actions/s':>12}")
+    for name, elapsed in (("subprocess", subprocess_time), ("pooled", pooled_time)):
+        print(
+            f"{name:<12}{args.actions:>10}{elapsed:>12.3f}"
+            f"{args.actions / elapsed:>12.1f}"
+        )
+    print(f"speedup: {subprocess_time / pooled_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
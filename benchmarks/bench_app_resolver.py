@@ -0,0 +1,76 @@
+"""Benchmark: indexed foreground-app resolution vs the nested table scan.
+
+Parses the captured ``dumpsys window`` fixtures with the scan that
+``get_current_app`` used before (every line against every package) and with
+the reverse index, checks that both agree, and reports the time per call.
+Also reports how many bytes the device query returns with and without the
+on-device ``grep`` for the focus lines.
+
+Usage:
+    python benchmarks/bench_app_resolver.py [--repeat 2000]
+"""
+
+import argparse
+import re
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from phone_agent.adb.device import _FOCUS_PATTERN  # noqa: E402
+from phone_agent.app_resolver import get_app_index  # noqa: E402
+from phone_agent.config.apps import APP_PACKAGES  # noqa: E402
+
+FIXTURES = ROOT / "tests" / "fixtures" / "dumpsys"
+
+
+def legacy(output: str) -> str:
+    for line in output.split("\n"):
+        if "mCurrentFocus" in line or "mFocusedApp" in line:
+            for app_name, package in APP_PACKAGES.items():
+                if package in line:
+                    return app_name
+    return "System Home"
+
+
+def indexed(output: str) -> str:
+    index = get_app_index(APP_PACKAGES)
+    for line in output.split("\n"):
+        if "mCurrentFocus" in line or "mFocusedApp" in line:
+            app_name = index.find_in(line)
+            if app_name is not None:
+                return app_name
+    return "System Home"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    focus = re.compile(_FOCUS_PATTERN)
+    print(
+        f"{'fixture':<22}{'app':>10}{'scan us':>10}{'index us':>10}"
+        f"{'full B':>9}{'grep B':>9}"
+    )
+    for path in sorted(FIXTURES.glob("window_*.txt")):
+        full = path.read_text(encoding="utf-8")
+        filtered = "".join(
+            line for line in full.splitlines(keepends=True) if focus.search(line)
+        )
+        app = indexed(filtered)
+        assert app == legacy(full) == indexed(full)
+
+        scan = timeit.timeit(lambda: legacy(full), number=args.repeat)
+        index = timeit.timeit(lambda: indexed(filtered), number=args.repeat)
+        print(
+            f"{path.name:<22}{app:>10}"
+            f"{scan / args.repeat * 1e6:>10.1f}{index / args.repeat * 1e6:>10.1f}"
+            f"{len(full.encode()):>9}{len(filtered.encode()):>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Benchmark: one thread per PhoneAgent vs AsyncPhoneAgents on one event loop.
+
+Every agent runs ``--steps`` steps against a fake device whose calls each
+take ``--device-latency`` seconds, and streams its replies from a local fake
+OpenAI-compatible endpoint (``--ttft`` to the first token, ``--token-delay``
+between tokens). The threaded mode starts one thread per PhoneAgent with the
+synchronous ModelClient; the async mode gathers AsyncPhoneAgent runs on a
+single event loop. The endpoint runs in a separate process so it does not
+compete with the agents for the GIL. "threads" is the peak number of threads
+added while the agents ran.
+
+Usage:
+    python benchmarks/bench_async_agent.py [--agents 1 8 32 64] [--steps 4]
+"""
+
+import argparse
+import asyncio
+import gc
+import multiprocessing
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from phone_agent.agent import AgentConfig, PhoneAgent  # noqa: E402
+from phone_agent.agent_async import AsyncPhoneAgent  # noqa: E402
+from phone_agent.model import ModelConfig  # noqa: E402
+from tests.factories.fake_device import (  # noqa: E402
+    FakeAsyncDeviceFactory,
+    FakeDeviceFactory,
+    make_png,
+)
+from tests.factories.fake_openai import FakeOpenAIServer  # noqa: E402
+
+THINKING = "The target is visible on the current screen, so I go back. "
+
+
+class ThreadSampler:
+    """Samples the number of threads added since entering, in the background."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.baseline = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, threading.active_count() - self.baseline)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "ThreadSampler":
+        # Let idle worker pools of earlier agents exit first
+        gc.collect()
+        self.baseline = threading.active_count() + 1
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class _Reply:
+    """Back until the run has taken ``steps`` steps, then finish."""
+
+    def __init__(self, steps: int):
+        self.steps = steps
+
+    def __call__(self, messages: list[dict]) -> str:
+        done = sum(1 for message in messages if message["role"] == "assistant")
+        if done + 1 >= self.steps:
+            return THINKING + 'finish(message="done")'
+        return THINKING + 'do(action="Back")'
+
+
+def _serve(connection, steps: int, ttft: float, token_delay: float) -> None:
+    server = FakeOpenAIServer(
+        respond=_Reply(steps), first_token_delay=ttft, token_delay=token_delay
+    ).start()
+    connection.send(server.base_url)
+    connection.recv()
+    server.close()
+
+
+def _run_threads(count: int, args, model_config: ModelConfig, screen: bytes) -> float:
+    agents = [
+        PhoneAgent(
+            model_config,
+            AgentConfig(verbose=False, device_id=f"dev-{i}"),
+            device_factory=FakeDeviceFactory(
+                screens=[screen], latency=args.device_latency
+            ),
+        )
+        for i in range(count)
+    ]
+    threads = [
+        threading.Thread(target=agent.run, args=(f"task {i}",))
+        for i, agent in enumerate(agents)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def _run_loop(count: int, args, model_config: ModelConfig, screen: bytes) -> float:
+    async def run_all() -> float:
+        agents = [
+            AsyncPhoneAgent(
+                model_config,
+                AgentConfig(verbose=False, device_id=f"dev-{i}"),
+                device_factory=FakeAsyncDeviceFactory(
+                    screens=[screen], latency=args.device_latency
+                ),
+            )
+            for i in range(count)
+        ]
+        start = time.perf_counter()
+        await asyncio.gather(*(agent.run(f"task {i}") for i, agent in enumerate(agents)))
+        return time.perf_counter() - start
+
+    return asyncio.run(run_all())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--steps", type=int, default=4)
+    parser.add_argument("--device-latency", type=float, default=0.05)
+    parser.add_argument("--ttft", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    connection, child_connection = multiprocessing.Pipe()
+    server = multiprocessing.Process(
+        target=_serve,
+        args=(child_connection, args.steps, args.ttft, args.token_delay),
+        daemon=True,
+    )
+    server.start()
+    model_config = ModelConfig(base_url=connection.recv(), api_key="fake", lang="en")
+    screen = make_png(1080, 2400)
+
+    print(f"{'agents':<8}{'mode':<8}{'seconds':>9}{'steps/s':>9}{'threads':>9}")
+    try:
+        for count in args.agents:
+            for mode, run in (("thread", _run_threads), ("async", _run_loop)):
+                with ThreadSampler() as sampler:
+                    elapsed = run(count, args, model_config, screen)
+                steps = count * args.steps
+                print(
+                    f"{count:<8}{mode:<8}{elapsed:>9.3f}{steps / elapsed:>9.1f}"
+                    f"{sampler.peak:>9}"
+                )
+    finally:
+        connection.send("stop")
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
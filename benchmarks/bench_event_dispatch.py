@@ -0,0 +1,110 @@
+"""Benchmark: producer-side cost of AgentEventEmitter.emit per delivery mode.
+
+One producer emits ``--events`` thinking_chunk events as fast as it can to
+three listeners: a fast one, one that spends ``--listener-cost`` seconds per
+call (like a busy Qt or websocket bridge) and one that raises. The
+synchronous mode runs all of them on the producer thread; the dispatch
+modes only enqueue, with the given overflow policy. Reports the producer's
+time per emit and, after a flush, what the slow listener received.
+
+Usage:
+    python benchmarks/bench_event_dispatch.py [--events 20000] [--max-queue 256]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from phone_agent.events import (  # noqa: E402
+    OVERFLOW_BLOCK,
+    OVERFLOW_COALESCE,
+    OVERFLOW_DROP_OLDEST,
+    AgentEvent,
+    AgentEventEmitter,
+    DispatchConfig,
+)
+
+
+def _run(args, config: DispatchConfig | None) -> dict:
+    emitter = AgentEventEmitter()
+    received: list[str] = []
+
+    def fast(payload):
+        pass
+
+    def slow(payloads):
+        time.sleep(args.listener_cost)
+        received.extend(payload["payload"]["text"] for payload in payloads)
+
+    def failing(payload):
+        raise RuntimeError("listener bug")
+
+    emitter.on(fast)
+    emitter.on(slow, batched=True)
+    emitter.on(failing)
+    if config is not None:
+        emitter.start_dispatch(config)
+
+    events = [
+        AgentEvent(type="thinking_chunk", payload={"text": f"{i % 10}"}, step=1)
+        for i in range(args.events)
+    ]
+    start = time.perf_counter()
+    for event in events:
+        emitter.emit(event)
+    produce = time.perf_counter() - start
+    emitter.flush()
+    stats = {s["listener"].rsplit(".", 1)[-1]: s for s in emitter.dispatch_stats()}
+    emitter.stop_dispatch()
+
+    expected = "".join(event.payload["text"] for event in events)
+    slow_stats = stats.get("slow", {})
+    return {
+        "us_per_emit": produce / args.events * 1e6,
+        "calls": len(received) if config is None else slow_stats["batches"],
+        "dropped": slow_stats.get("dropped", 0),
+        "coalesced": slow_stats.get("coalesced", 0),
+        "max_lag_ms": slow_stats.get("max_lag_ms", 0.0),
+        "text_intact": "".join(received) == expected,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--listener-cost", type=float, default=0.0002)
+    parser.add_argument("--max-queue", type=int, default=256)
+    parser.add_argument("--max-batch", type=int, default=64)
+    args = parser.parse_args()
+    # Keep the failing listener's warnings out of the table
+    logging.getLogger("phone_agent.events").setLevel(logging.ERROR)
+
+    modes = [("sync", None)]
+    for policy in (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE):
+        modes.append(
+            (
+                policy,
+                DispatchConfig(
+                    max_queue=args.max_queue, overflow=policy, max_batch=args.max_batch
+                ),
+            )
+        )
+
+    print(
+        f"{'mode':<13}{'us/emit':>9}{'slow calls':>12}{'dropped':>9}"
+        f"{'coalesced':>11}{'max lag ms':>12}{'text intact':>13}"
+    )
+    for name, config in modes:
+        r = _run(args, config)
+        print(
+            f"{name:<13}{r['us_per_emit']:>9.1f}{r['calls']:>12}{r['dropped']:>9}"
+            f"{r['coalesced']:>11}{r['max_lag_ms']:>12.1f}{str(r['text_intact']):>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
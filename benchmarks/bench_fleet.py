@@ -0,0 +1,77 @@
+"""Benchmark: one device at a time vs the fleet scheduler over several devices.
+
+Each simulated task takes ``--steps`` agent steps of ``--step-time`` seconds
+(model latency plus device I/O). The same queue is drained by a one-device
+fleet and by an N-device fleet; throughput and queue-wait metrics come from
+``FleetScheduler.metrics()``.
+
+Usage:
+    python benchmarks/bench_fleet.py [--devices 4] [--tasks 40]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from phone_agent.device_factory import DeviceType  # noqa: E402
+from phone_agent.fleet import FleetDevice, FleetScheduler  # noqa: E402
+from tests.factories.fake_device import FakeDeviceFactory  # noqa: E402
+
+
+class SimulatedAgent:
+    def __init__(self, steps: int, step_time: float):
+        self.steps = steps
+        self.step_time = step_time
+
+    def run(self, task: str) -> str:
+        for _ in range(self.steps):
+            time.sleep(self.step_time)
+        return "done"
+
+    def request_stop(self) -> None:
+        pass
+
+
+def _drain(device_count: int, args) -> tuple[float, object]:
+    types = [DeviceType.ADB, DeviceType.HDC]
+    devices = [
+        FleetDevice(f"dev-{i}", types[i % 2], factory=FakeDeviceFactory())
+        for i in range(device_count)
+    ]
+    scheduler = FleetScheduler(
+        devices, agent_factory=lambda d: SimulatedAgent(args.steps, args.step_time)
+    ).start()
+    start = time.perf_counter()
+    for i in range(args.tasks):
+        scheduler.submit(f"task {i}")
+    scheduler.shutdown()
+    return time.perf_counter() - start, scheduler.metrics()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=40)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--step-time", type=float, default=0.01)
+    args = parser.parse_args()
+
+    print(
+        f"{'devices':<9}{'seconds':>9}{'tasks/s':>9}{'wait mean':>11}"
+        f"{'wait p95':>10}{'util':>7}"
+    )
+    for count in (1, args.devices):
+        elapsed, metrics = _drain(count, args)
+        utilization = sum(metrics.utilization.values()) / len(metrics.utilization)
+        print(
+            f"{count:<9}{elapsed:>9.3f}{metrics.throughput:>9.1f}"
+            f"{metrics.queue_wait_mean * 1000:>9.0f}ms"
+            f"{metrics.queue_wait_p95 * 1000:>8.0f}ms{utilization:>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
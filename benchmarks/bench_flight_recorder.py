@@ -0,0 +1,107 @@
+"""Benchmark: hot-path and memory overhead of the flight recorder.
+
+Emits a mix of typical agent events (mostly thinking chunks, plus actions,
+metrics and results) through an AgentEventEmitter with one cheap listener,
+once without and once with a FlightRecorder attached, and reports the
+extra time per emit. Also measures the cost of recording a step
+screenshot, the memory held by a full ring buffer and the time and size of
+a gzip JSONL dump.
+
+Usage:
+    python benchmarks/bench_flight_recorder.py [--events 50000] [--capacity 5000]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from phone_agent.events import AgentEvent, AgentEventEmitter  # noqa: E402
+from phone_agent.flight_recorder import FlightRecorder  # noqa: E402
+
+SCREENS = Path(__file__).resolve().parents[1] / "tests" / "fixtures" / "screens"
+
+
+def _events(count: int) -> list[AgentEvent]:
+    events = []
+    for i in range(count):
+        step = i // 50 + 1
+        if i % 50 == 48:
+            action = {"_metadata": "do", "action": "Tap", "element": [500, 500]}
+            events.append(AgentEvent("action_decoded", {"action": action}, step=step))
+        elif i % 50 == 49:
+            payload = {"name": "total_inference_time", "value": 1.2, "unit": "s"}
+            events.append(AgentEvent("performance_metric", payload, step=step))
+        else:
+            payload = {"text": "点击搜索框输入"}
+            events.append(AgentEvent("thinking_chunk", payload, step=step))
+    return events
+
+
+def _emit_time(events: list[AgentEvent], recorder: FlightRecorder | None) -> float:
+    emitter = AgentEventEmitter()
+    emitter.on(lambda event: None)
+    if recorder is not None:
+        recorder.attach(emitter)
+    start = time.perf_counter()
+    for event in events:
+        emitter.emit(event)
+    elapsed = time.perf_counter() - start
+    if recorder is not None:
+        recorder.detach()
+    return elapsed / len(events) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--capacity", type=int, default=5000)
+    parser.add_argument("--screenshots", type=int, default=16)
+    args = parser.parse_args()
+
+    events = _events(args.events)
+    baseline = min(_emit_time(events, None) for _ in range(3))
+    recorded = min(
+        _emit_time(events, FlightRecorder(capacity=args.capacity)) for _ in range(3)
+    )
+    print(f"{'emit, no recorder':<30}{baseline:>10.2f} us")
+    print(f"{'emit, recorder attached':<30}{recorded:>10.2f} us")
+    print(f"{'recorder overhead':<30}{recorded - baseline:>10.2f} us")
+
+    screens = [p.read_bytes() for p in sorted(SCREENS.glob("*.png"))]
+    recorder = FlightRecorder(
+        capacity=args.capacity, max_screenshots=args.screenshots
+    )
+    start = time.perf_counter()
+    rounds = 200
+    for i in range(rounds):
+        recorder.record_screenshot(screens[i % len(screens)], step=i)
+    per_shot = (time.perf_counter() - start) / rounds * 1e6
+    print(f"{'record_screenshot':<30}{per_shot:>10.2f} us")
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    recorder = FlightRecorder(capacity=args.capacity)
+    emitter = AgentEventEmitter()
+    recorder.attach(emitter)
+    for event in events:
+        emitter.emit(event)
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    kib = held / 1024
+    print(f"{'ring buffer memory':<30}{kib:>10.1f} KiB ({len(recorder)} events)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        path = recorder.dump(Path(directory) / "dump.jsonl.gz")
+        dump_ms = (time.perf_counter() - start) * 1000
+        size = path.stat().st_size
+    print(f"{'dump (gzip JSONL)':<30}{dump_ms:>10.1f} ms, {size / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
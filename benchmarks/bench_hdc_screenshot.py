@@ -0,0 +1,88 @@
+"""Benchmark: JPEG passthrough screenshots vs PNG transcoding on HarmonyOS.
+
+Captures a 1080x2400 JPEG from a local fake ``hdc`` executable with and
+without passthrough and reports per-step latency, payload size, peak Python
+heap usage (``tracemalloc``) and peak RSS. Each path runs in its own forked
+process so the RSS high-water marks are separate.
+
+Usage:
+    python benchmarks/bench_hdc_screenshot.py [--steps 20] [--latency 0.02]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from PIL import Image  # noqa: E402
+
+from bench_adb_screenshot import _make_screen  # noqa: E402
+from phone_agent.hdc import screenshot  # noqa: E402
+from tests.factories.fake_hdc import make_fake_hdc  # noqa: E402
+
+
+def _measure(passthrough: bool, steps: int) -> tuple[float, float, int, int, int]:
+    """Return (mean s, p95 s, payload bytes, peak traced bytes, peak RSS KiB)."""
+    screenshot.set_jpeg_passthrough(passthrough)
+    latencies = []
+    tracemalloc.start()
+    for _ in range(steps):
+        start = time.perf_counter()
+        shot = screenshot.get_screenshot("bench-device")
+        latencies.append(time.perf_counter() - start)
+        assert not shot.is_sensitive and shot.width == 1080
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return statistics.mean(latencies), p95, shot.byte_size, peak, max_rss
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.02,
+        help="Simulated hdc client/server handshake per process (seconds)",
+    )
+    args = parser.parse_args()
+
+    buffered = BytesIO()
+    Image.open(BytesIO(_make_screen())).save(buffered, format="JPEG", quality=90)
+    jpeg = buffered.getvalue()
+    with tempfile.TemporaryDirectory() as root:
+        bin_dir = make_fake_hdc(Path(root), latency=args.latency, screen_jpeg=jpeg)
+        os.environ["PATH"] = str(bin_dir) + os.pathsep + os.environ.get("PATH", "")
+
+        results = {}
+        context = multiprocessing.get_context("fork")
+        for name, passthrough in (("png", False), ("jpeg", True)):
+            with context.Pool(1) as pool:
+                results[name] = pool.apply(_measure, (passthrough, args.steps))
+
+    print(f"screen: 1080x2400 JPEG, {len(jpeg) / 1024:.0f} KiB")
+    print(
+        f"{'path':<8}{'mean ms':>10}{'p95 ms':>10}{'payload KiB':>13}"
+        f"{'heap KiB':>12}{'rss MiB':>10}"
+    )
+    for name, (mean, p95, size, peak, max_rss) in results.items():
+        print(
+            f"{name:<8}{mean * 1000:>10.1f}{p95 * 1000:>10.1f}{size / 1024:>13.0f}"
+            f"{peak / 1024:>12.0f}{max_rss / 1024:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
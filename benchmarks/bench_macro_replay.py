@@ -0,0 +1,106 @@
+"""Benchmark: live PhoneAgent run vs macro replay of the same operation.
+
+A short operation (launch an app, tap a chat, finish) runs against a fake
+device serving the recorded fixture screens, where every device call takes
+``--device-latency`` seconds. The live path asks a scripted model that
+takes ``--model-latency`` seconds per step; its first run is recorded into
+a MacroLibrary. The replay path runs that macro with MacroPlayer, checking
+a screen checkpoint after every action and making no model calls.
+
+Usage:
+    python benchmarks/bench_macro_replay.py [--runs 5] [--model-latency 1.5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from phone_agent.agent import AgentConfig, PhoneAgent  # noqa: E402
+from phone_agent.macro import MacroLibrary, MacroPlayer  # noqa: E402
+from tests.factories.fake_device import (  # noqa: E402
+    FakeDeviceFactory,
+    FakeModelClient,
+)
+
+SCREENS = Path(__file__).resolve().parents[1] / "tests" / "fixtures" / "screens"
+TASK = "打开微信和张伟聊天"
+ANSWERS = [
+    'do(action="Launch", app="微信")',
+    'do(action="Tap", element=[150, 160])',
+    'finish(message="Opened the chat")',
+]
+
+
+class SlowModelClient(FakeModelClient):
+    """FakeModelClient taking ``latency`` seconds per request."""
+
+    def __init__(self, answers, latency: float):
+        super().__init__(answers)
+        self.latency = latency
+
+    def request(self, messages):
+        time.sleep(self.latency)
+        return super().request(messages)
+
+
+def _device(latency: float) -> FakeDeviceFactory:
+    names = ["home", "wechat_chats", "wechat_chat"]
+    return FakeDeviceFactory(
+        screens=[(SCREENS / f"{name}.png").read_bytes() for name in names],
+        apps=["System Home", "微信", "微信"],
+        width=270,
+        height=600,
+        latency=latency,
+    )
+
+
+def _live(args, library: MacroLibrary | None) -> tuple[float, int]:
+    agent = PhoneAgent(
+        agent_config=AgentConfig(verbose=False, macro_library=library),
+        device_factory=_device(args.device_latency),
+    )
+    agent.model_client = SlowModelClient(ANSWERS, args.model_latency)
+    start = time.perf_counter()
+    agent.run(TASK)
+    return time.perf_counter() - start, len(agent.model_client.requests)
+
+
+def _replay(args, library: MacroLibrary) -> tuple[float, int]:
+    player = MacroPlayer(device_factory=_device(args.device_latency))
+    start = time.perf_counter()
+    replay = player.play(library.get(TASK))
+    elapsed = time.perf_counter() - start
+    assert replay.success
+    return elapsed, 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--device-latency", type=float, default=0.05)
+    parser.add_argument("--model-latency", type=float, default=1.5)
+    args = parser.parse_args()
+
+    library = MacroLibrary()
+    _live(args, library)
+    assert TASK in library
+
+    print(f"{'path':<8}{'s/run':>9}{'model calls':>13}{'speedup':>9}")
+    baseline = None
+    paths = (
+        ("live", lambda: _live(args, None)),
+        ("replay", lambda: _replay(args, library)),
+    )
+    for name, run in paths:
+        results = [run() for _ in range(args.runs)]
+        elapsed = sum(seconds for seconds, _ in results) / args.runs
+        calls = results[0][1]
+        baseline = baseline or elapsed
+        print(f"{name:<8}{elapsed:>9.3f}{calls:>13}{baseline / elapsed:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark: WebSocket frames for a streamed thinking text.
+
+Streams thinking_chunk events from a producer thread at a model-like token
+rate into a StreamCoalescer whose sink hops to an asyncio loop, as the web
+command handler does. It reports frames per second, event-loop hops and
+bytes saved for several flush intervals. An interval of 0 is the previous
+behavior: one frame per chunk.
+
+Usage:
+    python benchmarks/bench_stream_coalescing.py [--chunks 2000] [--rate 500]
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from web.core.stream_coalescer import StreamCoalescer  # noqa: E402
+
+
+def _chunk(index: int, step: int) -> dict:
+    return {
+        "type": "thinking_chunk",
+        "payload": {"text": "点击" if index % 2 else "搜索框，"},
+        "source": "phone_agent",
+        "level": "info",
+        "run_id": "3f2a9c1e",
+        "step": step,
+        "timestamp": "2026-01-01T00:00:00.000000",
+    }
+
+
+async def run(interval: float, args) -> tuple[int, float, int, int]:
+    loop = asyncio.get_running_loop()
+    received = []
+    coalescer = StreamCoalescer(
+        lambda event: loop.call_soon_threadsafe(received.append, event),
+        loop=loop,
+        interval=interval,
+    )
+
+    def produce():
+        gap = 1 / args.rate
+        next_at = time.perf_counter()
+        for index in range(args.chunks):
+            step = index * args.steps // args.chunks + 1
+            coalescer.push(_chunk(index, step))
+            next_at += gap
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+        coalescer.close()
+
+    await asyncio.to_thread(produce)
+    await asyncio.sleep(0.05)
+    stats = coalescer.stats
+    return len(received), stats.frames_per_second, stats.bytes_out, stats.bytes_saved
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=500, help="Chunks per second")
+    parser.add_argument("--steps", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{args.chunks} chunks at {args.rate:.0f}/s over {args.steps} steps")
+    print(
+        f"{'interval ms':<14}{'frames':>8}{'frames/s':>10}"
+        f"{'KiB sent':>10}{'KiB saved':>11}"
+    )
+    for interval in (0.0, 0.03, 0.04, 0.05):
+        frames, fps, sent, saved = asyncio.run(run(interval, args))
+        print(
+            f"{interval * 1000:<14.0f}{frames:>8}{fps:>10.1f}"
+            f"{sent / 1024:>10.1f}{saved / 1024:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark: automaton stream parser vs the per-chunk marker prefix scan.
+
+Feeds synthetic replies of growing length, split into chunks of ``--chunk``
+characters, through the loop ``ModelClient`` used before (string
+concatenation plus a check of the buffer against every prefix of every
+marker on each chunk) and through ``ActionStreamParser``. Checks that both
+emit the same thinking text and reports the time per reply and the number
+of ``thinking_chunk`` callbacks.
+
+Usage:
+    python benchmarks/bench_stream_parser.py [--lengths 1000 10000 100000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from phone_agent.model.stream_parser import (  # noqa: E402
+    ACTION_MARKERS,
+    ActionStreamParser,
+)
+
+# Ends with marker prefixes often, which made the old loop hold its buffer
+FILLER = "Tap the icon to open the settings and then do the search. "
+
+
+def legacy(chunks: list[str], emit) -> str:
+    raw_content = ""
+    buffer = ""
+    in_action_phase = False
+    for content in chunks:
+        raw_content += content
+        if in_action_phase:
+            continue
+        buffer += content
+        for marker in ACTION_MARKERS:
+            if marker in buffer:
+                thinking_part = buffer.split(marker, 1)[0]
+                if thinking_part:
+                    emit(thinking_part)
+                in_action_phase = True
+                break
+        if in_action_phase:
+            continue
+        if any(
+            buffer.endswith(marker[:i])
+            for marker in ACTION_MARKERS
+            for i in range(1, len(marker))
+        ):
+            continue
+        emit(buffer)
+        buffer = ""
+    return raw_content
+
+
+def automaton(chunks: list[str], emit) -> str:
+    parser = ActionStreamParser(on_thinking=emit)
+    for content in chunks:
+        parser.feed(content)
+    parser.close()
+    return parser.text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--chunk", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'chars':>9}{'impl':>11}{'ms/reply':>11}{'callbacks':>11}")
+    for length in args.lengths:
+        text = (FILLER * (length // len(FILLER) + 1))[:length]
+        text += 'do(action="Back")'
+        chunks = [text[i : i + args.chunk] for i in range(0, len(text), args.chunk)]
+        outputs = {}
+        for name, run in (("legacy", legacy), ("automaton", automaton)):
+            best = float("inf")
+            for _ in range(args.repeat):
+                emitted: list[str] = []
+                start = time.perf_counter()
+                raw = run(chunks, emitted.append)
+                best = min(best, time.perf_counter() - start)
+            assert raw == text
+            outputs[name] = "".join(emitted)
+            print(f"{length:>9}{name:>11}{best * 1000:>11.3f}{len(emitted):>11}")
+        assert outputs["legacy"] == outputs["automaton"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark: bare WDA requests vs the pooled client, and WDA vs MJPEG screenshots.
+
+Runs against a local fake WebDriverAgent server. ``--connect-latency`` is
+charged per new TCP connection (a usbmux/iproxy tunnel or TLS handshake),
+``--latency`` per request.
+
+Usage:
+    python benchmarks/bench_wda_client.py [--actions 200] [--steps 30]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from PIL import Image  # noqa: E402
+
+from bench_adb_screenshot import _make_screen  # noqa: E402
+from phone_agent.xctest import device, input as ios_input, screenshot, wda  # noqa: E402
+from tests.factories.fake_wda import start_fake_wda_server  # noqa: E402
+
+
+def _run_actions(count: int, url: str) -> float:
+    """Run ``count`` actions and return the elapsed wall-clock seconds."""
+    actions = [
+        lambda: device.tap(540, 1200, url, delay=0),
+        lambda: device.swipe(540, 1800, 540, 600, 0.3, url, delay=0),
+        lambda: device.back(url, delay=0),
+        lambda: device.home(url, delay=0),
+        lambda: ios_input.type_text("hello", url),
+    ]
+    start = time.perf_counter()
+    for i in range(count):
+        actions[i % len(actions)]()
+    return time.perf_counter() - start
+
+
+def _screenshot_latencies(steps: int, url: str) -> list[float]:
+    latencies = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        screenshot.get_screenshot(url)
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.05)  # Model turn between observations
+    return sorted(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--actions", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=30)
+    parser.add_argument("--connect-latency", type=float, default=0.005)
+    parser.add_argument("--latency", type=float, default=0.002)
+    args = parser.parse_args()
+
+    png = _make_screen()
+    buffered = BytesIO()
+    Image.open(BytesIO(png)).save(buffered, format="JPEG", quality=80)
+    server = start_fake_wda_server(
+        screen_png=png,
+        frames=(buffered.getvalue(),),
+        fps=30,
+        connect_latency=args.connect_latency,
+        latency=args.latency,
+    )
+    url = server.url
+
+    try:
+        wda.set_http_pool_enabled(False)
+        bare_time = _run_actions(args.actions, url)
+        bare_connections = server.connections
+
+        wda.set_http_pool_enabled(True)
+        pooled_time = _run_actions(args.actions, url)
+        pooled_connections = server.connections - bare_connections
+
+        print(f"{'http':<10}{'actions':>10}{'seconds':>10}{'actions/s':>12}{'conns':>8}")
+        for name, elapsed, conns in (
+            ("bare", bare_time, bare_connections),
+            ("pooled", pooled_time, pooled_connections),
+        ):
+            print(
+                f"{name:<10}{args.actions:>10}{elapsed:>10.3f}"
+                f"{args.actions / elapsed:>12.1f}{conns:>8}"
+            )
+        print(f"speedup: {bare_time / pooled_time:.1f}x\n")
+
+        results = {"wda": _screenshot_latencies(args.steps, url)}
+        screenshot.enable_mjpeg(url, url + "/mjpeg")
+        results["mjpeg"] = _screenshot_latencies(args.steps, url)
+        screenshot.disable_mjpeg(url)
+
+        print(f"{'screenshot':<12}{'mean ms':>10}{'p95 ms':>10}")
+        for name, latencies in results.items():
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            print(
+                f"{name:<12}{statistics.mean(latencies) * 1000:>10.2f}"
+                f"{p95 * 1000:>10.2f}"
+            )
+    finally:
+        wda.close_all()
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Benchmark: WebSocket broadcast fan-out with slow clients.
+
+Connects simulated websocket clients to a ConnectionManager, a few of them
+slow (every send sleeps), and streams "output" frames the way the web
+controller does during a task. Compares the previous serial broadcast,
+which awaited each client's send in turn under one lock, with the
+per-client send queues: time spent in broadcast, how long fast clients
+wait for a frame, and how many frames slow clients receive after
+coalescing.
+
+Usage:
+    python benchmarks/bench_ws_fanout.py [--clients 200] [--slow 10] [--frames 300]
+"""
+
+import argparse
+import asyncio
+import gc
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from web.core.ws_manager import ConnectionManager  # noqa: E402
+
+
+class SimulatedClient:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.frames = 0
+        self.lags: list[float] = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        await self._send()
+
+    async def send_json(self, message: dict) -> None:
+        await self._send()
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+    async def _send(self) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames += 1
+        self.lags.append(time.perf_counter() - SENT_AT[0])
+
+
+SENT_AT = [0.0]
+
+
+class SerialConnectionManager:
+    """The previous broadcast: one send after another under a lock."""
+
+    def __init__(self) -> None:
+        self.active_connections: list = []
+        self._lock = asyncio.Lock()
+
+    async def connect(self, websocket) -> None:
+        await websocket.accept()
+        self.active_connections.append(websocket)
+
+    async def broadcast(self, message: dict) -> None:
+        async with self._lock:
+            for connection in self.active_connections:
+                await connection.send_json(message)
+
+
+async def run(manager, args) -> tuple[float, float, float, int]:
+    fast = [SimulatedClient(0.0) for _ in range(args.clients - args.slow)]
+    slow = [SimulatedClient(args.slow_delay) for _ in range(args.slow)]
+    for client in fast + slow:
+        await manager.connect(client)
+
+    durations = []
+    for index in range(args.frames):
+        SENT_AT[0] = time.perf_counter()
+        message = {"type": "output", "data": f"{index},", "timestamp": ""}
+        start = time.perf_counter()
+        await manager.broadcast(message)
+        durations.append(time.perf_counter() - start)
+        await asyncio.sleep(args.interval)
+    await asyncio.sleep(args.slow_delay * 4)
+
+    lags = [lag for client in fast for lag in client.lags]
+    slow_frames = min((client.frames for client in slow), default=0)
+    return (
+        statistics.mean(durations) * 1000,
+        max(durations) * 1000,
+        statistics.quantiles(lags, n=100)[98] * 1000,
+        slow_frames,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--slow", type=int, default=10)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--slow-delay", type=float, default=0.02)
+    parser.add_argument("--interval", type=float, default=0.002)
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} clients, {args.slow} slow ({args.slow_delay * 1000:.0f} ms "
+        f"per send), {args.frames} frames every {args.interval * 1000:.0f} ms"
+    )
+    print(
+        f"{'manager':<14}{'mean bcast ms':>15}{'max bcast ms':>14}"
+        f"{'fast p99 lag ms':>17}{'slow frames':>13}"
+    )
+    # Keep the objects created by importing the web app out of the collector,
+    # so full collections do not show up as broadcast stalls
+    gc.collect()
+    gc.freeze()
+    managers = [
+        ("serial", SerialConnectionManager),
+        ("queued", lambda: ConnectionManager(max_queue=64)),
+    ]
+    for name, factory in managers:
+        mean, longest, lag, slow_frames = asyncio.run(run(factory(), args))
+        print(
+            f"{name:<14}{mean:>15.3f}{longest:>14.3f}{lag:>17.2f}{slow_frames:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -47,7 +47,10 @@ except Exception as e:
     logger.warning("onnxruntime 预加载失败: %s", str(e))
 
 # 切换到 GPT-SoVITS 目录
-from yuntai.core.config import GPT_SOVITS_ROOT, PROJECT_ROOT, SCRCPY_PATH, APP_VERSION
+from yuntai.core.config import (
+    GPT_SOVITS_ROOT, PROJECT_ROOT, SCRCPY_PATH, APP_VERSION,
+    WEB_WS_SEND_QUEUE_SIZE, WEB_WS_SLOW_CLIENT_POLICY, WEB_WS_SEND_TIMEOUT
+)
 if GPT_SOVITS_ROOT and Path(GPT_SOVITS_ROOT).exists():
     os.chdir(str(GPT_SOVITS_ROOT))
     logger.debug("切换到 GPT-SoVITS 目录: %s", GPT_SOVITS_ROOT)
@@ -95,7 +98,11 @@ app.add_middleware(
 logger.debug("CORS 中间件已配置，允许的来源: %s", ALLOWED_ORIGINS)
 
 # 创建WebSocket管理器
-ws_manager = ConnectionManager()
+ws_manager = ConnectionManager(
+    max_queue=WEB_WS_SEND_QUEUE_SIZE,
+    slow_client_policy=WEB_WS_SLOW_CLIENT_POLICY,
+    send_timeout=WEB_WS_SEND_TIMEOUT
+)
 
 # 创建Web控制器
 controller = WebController(ws_manager)
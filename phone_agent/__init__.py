@@ -6,8 +6,9 @@ using AI models for visual understanding and decision making.
 """
 
 from phone_agent.agent import PhoneAgent
+from phone_agent.agent_async import AsyncPhoneAgent
 from phone_agent.agent_ios import IOSPhoneAgent
 from phone_agent.events import get_global_event_emitter
 
 __version__ = "0.1.0"
-__all__ = ["PhoneAgent", "IOSPhoneAgent", "get_global_event_emitter"]
+__all__ = ["PhoneAgent", "AsyncPhoneAgent", "IOSPhoneAgent", "get_global_event_emitter"]
@@ -9,7 +9,8 @@ from dataclasses import dataclass
 from typing import Any, Callable
 
 from phone_agent.config.timing import TIMING_CONFIG
-from phone_agent.device_factory import get_device_factory
+from phone_agent.device_factory import DeviceFactory, DeviceType, get_device_factory
+from phone_agent.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,11 @@ class ActionResult:
     requires_confirmation: bool = False
 
 
+def confirms_text_input(device_factory: Any) -> bool:
+    """Whether the backend confirms keyboard switches and text broadcasts."""
+    return getattr(device_factory, "device_type", None) == DeviceType.ADB
+
+
 class ActionHandler:
     """
     Handles execution of actions from AI model output.
@@ -33,6 +39,8 @@ class ActionHandler:
         confirmation_callback: Optional callback for sensitive action confirmation.
             Should return True to proceed, False to cancel.
         takeover_callback: Optional callback for takeover requests (login, captcha).
+        device_factory: Device factory to act through. Defaults to the global
+            factory from get_device_factory().
     """
 
     def __init__(
@@ -40,10 +48,20 @@ class ActionHandler:
         device_id: str | None = None,
         confirmation_callback: Callable[[str], bool] | None = None,
         takeover_callback: Callable[[str], None] | None = None,
+        device_factory: DeviceFactory | None = None,
     ):
         self.device_id = device_id
+        self._device_factory = device_factory
         self.confirmation_callback = confirmation_callback or self._default_confirmation
         self.takeover_callback = takeover_callback or self._default_takeover
+        self._original_ime: str | None = None
+
+    @property
+    def device_factory(self) -> DeviceFactory:
+        """The device factory actions are executed through."""
+        if self._device_factory is not None:
+            return self._device_factory
+        return get_device_factory()
 
     def execute(
         self, action: dict[str, Any], screen_width: int, screen_height: int
@@ -84,7 +102,8 @@ class ActionHandler:
             )
 
         try:
-            return handler_method(action, screen_width, screen_height)
+            with span("action", action=action_name):
+                return handler_method(action, screen_width, screen_height)
         except Exception as e:
             return ActionResult(
                 success=False, should_finish=False, message=f"Action failed: {e}"
@@ -124,7 +143,7 @@ class ActionHandler:
         if not app_name:
             return ActionResult(False, False, "No app name specified")
 
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         success = device_factory.launch_app(app_name, self.device_id)
         if success:
             return ActionResult(True, False)
@@ -147,7 +166,7 @@ class ActionHandler:
                     message="User cancelled sensitive operation",
                 )
 
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.tap(x, y, self.device_id)
         return ActionResult(True, False)
 
@@ -155,26 +174,36 @@ class ActionHandler:
         """Handle text input action."""
         text = action.get("text", "")
 
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
+
+        # ADB confirms the keyboard switch and each broadcast; other backends
+        # wait the fixed delays instead
+        confirmed = confirms_text_input(device_factory)
 
-        # Switch to ADB keyboard
+        # Switch to ADB keyboard; it stays selected until release_keyboard()
         original_ime = device_factory.detect_and_set_adb_keyboard(self.device_id)
-        time.sleep(TIMING_CONFIG.action.keyboard_switch_delay)
+        if self._original_ime is None:
+            self._original_ime = original_ime
+        if not confirmed:
+            time.sleep(TIMING_CONFIG.action.keyboard_switch_delay)
 
         # Clear existing text and type new text
         device_factory.clear_text(self.device_id)
-        time.sleep(TIMING_CONFIG.action.text_clear_delay)
-
-        # Handle multiline text by splitting on newlines
+        if not confirmed:
+            time.sleep(TIMING_CONFIG.action.text_clear_delay)
         device_factory.type_text(text, self.device_id)
         time.sleep(TIMING_CONFIG.action.text_input_delay)
 
-        # Restore original keyboard
-        device_factory.restore_keyboard(original_ime, self.device_id)
-        time.sleep(TIMING_CONFIG.action.keyboard_restore_delay)
-
         return ActionResult(True, False)
 
+    def release_keyboard(self) -> None:
+        """Restore the keyboard that was active before the first Type action."""
+        if self._original_ime is None:
+            return
+
+        original_ime, self._original_ime = self._original_ime, None
+        self.device_factory.restore_keyboard(original_ime, self.device_id)
+
     def _handle_swipe(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle swipe action."""
         start = action.get("start")
@@ -186,19 +215,19 @@ class ActionHandler:
         start_x, start_y = self._convert_relative_to_absolute(start, width, height)
         end_x, end_y = self._convert_relative_to_absolute(end, width, height)
 
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.swipe(start_x, start_y, end_x, end_y, device_id=self.device_id)
         return ActionResult(True, False)
 
     def _handle_back(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle back button action."""
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.back(self.device_id)
         return ActionResult(True, False)
 
     def _handle_home(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle home button action."""
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.home(self.device_id)
         return ActionResult(True, False)
 
@@ -209,7 +238,7 @@ class ActionHandler:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.double_tap(x, y, self.device_id)
         return ActionResult(True, False)
 
@@ -220,7 +249,7 @@ class ActionHandler:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.long_press(x, y, device_id=self.device_id)
         return ActionResult(True, False)
 
@@ -260,10 +289,10 @@ class ActionHandler:
 
     def _send_keyevent(self, keycode: str) -> None:
         """Send a keyevent to the device."""
-        from phone_agent.device_factory import DeviceType, get_device_factory
+        from phone_agent.device_factory import DeviceType
         from phone_agent.hdc.connection import _run_hdc_command
 
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
 
         # Handle HDC devices with HarmonyOS-specific keyEvent command
         if device_factory.device_type == DeviceType.HDC:
@@ -0,0 +1,240 @@
+"""Asyncio action handler used by AsyncPhoneAgent."""
+
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable
+
+from phone_agent.actions.handler import (
+    ActionHandler,
+    ActionResult,
+    confirms_text_input,
+)
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.device_factory import AsyncDeviceFactory
+
+
+class AsyncActionHandler(ActionHandler):
+    """
+    ActionHandler whose ``execute`` is a coroutine.
+
+    Action parsing, coordinate conversion and results are inherited; device
+    calls go through an AsyncDeviceFactory. Confirmation and takeover
+    callbacks may be coroutine functions; plain callbacks (such as the
+    console prompts) run in a worker thread so they do not block the loop.
+
+    Args:
+        device_id: Optional device ID for multi-device setups.
+        confirmation_callback: Optional callback for sensitive action confirmation.
+        takeover_callback: Optional callback for takeover requests.
+        device_factory: Async device factory to act through. Defaults to an
+            ADB AsyncDeviceFactory.
+    """
+
+    def __init__(
+        self,
+        device_id: str | None = None,
+        confirmation_callback: Callable[[str], bool | Awaitable[bool]] | None = None,
+        takeover_callback: Callable[[str], None | Awaitable[None]] | None = None,
+        device_factory: AsyncDeviceFactory | None = None,
+    ):
+        super().__init__(
+            device_id=device_id,
+            confirmation_callback=confirmation_callback,
+            takeover_callback=takeover_callback,
+            device_factory=device_factory or AsyncDeviceFactory(),
+        )
+
+    async def execute(
+        self, action: dict[str, Any], screen_width: int, screen_height: int
+    ) -> ActionResult:
+        """
+        Execute an action from the AI model.
+
+        Args:
+            action: The action dictionary from the model.
+            screen_width: Current screen width in pixels.
+            screen_height: Current screen height in pixels.
+
+        Returns:
+            ActionResult indicating success and whether to finish.
+        """
+        action_type = action.get("_metadata")
+
+        if action_type == "finish":
+            return ActionResult(
+                success=True, should_finish=True, message=action.get("message")
+            )
+
+        if action_type != "do":
+            return ActionResult(
+                success=False,
+                should_finish=True,
+                message=f"Unknown action type: {action_type}",
+            )
+
+        action_name = action.get("action")
+        handler_method = self._get_handler(action_name)
+
+        if handler_method is None:
+            return ActionResult(
+                success=False,
+                should_finish=False,
+                message=f"Unknown action: {action_name}",
+            )
+
+        try:
+            result = handler_method(action, screen_width, screen_height)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        except Exception as e:
+            return ActionResult(
+                success=False, should_finish=False, message=f"Action failed: {e}"
+            )
+
+    async def _call(self, callback: Callable, message: str):
+        """Run a user callback, awaiting it or moving it off the loop."""
+        if inspect.iscoroutinefunction(callback):
+            return await callback(message)
+        result = await asyncio.to_thread(callback, message)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def _handle_launch(
+        self, action: dict, width: int, height: int
+    ) -> ActionResult:
+        """Handle app launch action."""
+        app_name = action.get("app")
+        if not app_name:
+            return ActionResult(False, False, "No app name specified")
+
+        success = await self.device_factory.launch_app(app_name, self.device_id)
+        if success:
+            return ActionResult(True, False)
+        return ActionResult(False, False, f"App not found: {app_name}")
+
+    async def _handle_tap(self, action: dict, width: int, height: int) -> ActionResult:
+        """Handle tap action."""
+        element = action.get("element")
+        if not element:
+            return ActionResult(False, False, "No element coordinates")
+
+        x, y = self._convert_relative_to_absolute(element, width, height)
+
+        # Check for sensitive operation
+        if "message" in action:
+            if not await self._call(self.confirmation_callback, action["message"]):
+                return ActionResult(
+                    success=False,
+                    should_finish=True,
+                    message="User cancelled sensitive operation",
+                )
+
+        await self.device_factory.tap(x, y, self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_type(self, action: dict, width: int, height: int) -> ActionResult:
+        """Handle text input action."""
+        text = action.get("text", "")
+
+        device_factory = self.device_factory
+
+        # ADB confirms the keyboard switch and each broadcast; other backends
+        # wait the fixed delays instead
+        confirmed = confirms_text_input(device_factory)
+
+        # Switch to ADB keyboard; it stays selected until release_keyboard()
+        original_ime = await device_factory.detect_and_set_adb_keyboard(self.device_id)
+        if self._original_ime is None:
+            self._original_ime = original_ime
+        if not confirmed:
+            await asyncio.sleep(TIMING_CONFIG.action.keyboard_switch_delay)
+
+        # Clear existing text and type new text
+        await device_factory.clear_text(self.device_id)
+        if not confirmed:
+            await asyncio.sleep(TIMING_CONFIG.action.text_clear_delay)
+        await device_factory.type_text(text, self.device_id)
+        await asyncio.sleep(TIMING_CONFIG.action.text_input_delay)
+
+        return ActionResult(True, False)
+
+    async def release_keyboard(self) -> None:
+        """Restore the keyboard that was active before the first Type action."""
+        if self._original_ime is None:
+            return
+
+        original_ime, self._original_ime = self._original_ime, None
+        await self.device_factory.restore_keyboard(original_ime, self.device_id)
+
+    async def _handle_swipe(
+        self, action: dict, width: int, height: int
+    ) -> ActionResult:
+        """Handle swipe action."""
+        start = action.get("start")
+        end = action.get("end")
+
+        if not start or not end:
+            return ActionResult(False, False, "Missing swipe coordinates")
+
+        start_x, start_y = self._convert_relative_to_absolute(start, width, height)
+        end_x, end_y = self._convert_relative_to_absolute(end, width, height)
+
+        await self.device_factory.swipe(
+            start_x, start_y, end_x, end_y, device_id=self.device_id
+        )
+        return ActionResult(True, False)
+
+    async def _handle_back(self, action: dict, width: int, height: int) -> ActionResult:
+        """Handle back button action."""
+        await self.device_factory.back(self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_home(self, action: dict, width: int, height: int) -> ActionResult:
+        """Handle home button action."""
+        await self.device_factory.home(self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_double_tap(
+        self, action: dict, width: int, height: int
+    ) -> ActionResult:
+        """Handle double tap action."""
+        element = action.get("element")
+        if not element:
+            return ActionResult(False, False, "No element coordinates")
+
+        x, y = self._convert_relative_to_absolute(element, width, height)
+        await self.device_factory.double_tap(x, y, self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_long_press(
+        self, action: dict, width: int, height: int
+    ) -> ActionResult:
+        """Handle long press action."""
+        element = action.get("element")
+        if not element:
+            return ActionResult(False, False, "No element coordinates")
+
+        x, y = self._convert_relative_to_absolute(element, width, height)
+        await self.device_factory.long_press(x, y, device_id=self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_wait(self, action: dict, width: int, height: int) -> ActionResult:
+        """Handle wait action."""
+        duration_str = action.get("duration", "1 seconds")
+        try:
+            duration = float(duration_str.replace("seconds", "").strip())
+        except ValueError:
+            duration = 1.0
+
+        await asyncio.sleep(duration)
+        return ActionResult(True, False)
+
+    async def _handle_takeover(
+        self, action: dict, width: int, height: int
+    ) -> ActionResult:
+        """Handle takeover request (login, captcha, etc.)."""
+        message = action.get("message", "User intervention required")
+        await self._call(self.takeover_callback, message)
+        return ActionResult(True, False)
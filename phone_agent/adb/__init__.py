@@ -23,11 +23,29 @@ from phone_agent.adb.input import (
     restore_keyboard,
     type_text,
 )
-from phone_agent.adb.screenshot import get_screenshot
+from phone_agent.adb.launcher import (
+    LaunchRecord,
+    get_launch_history,
+    resolve_launcher_activity,
+)
+from phone_agent.adb.screenshot import get_screenshot, set_stream_capture
+from phone_agent.adb.shell import (
+    ADBShellPool,
+    ADBShellSession,
+    claim_transport,
+    get_shell_pool,
+    get_transport,
+    get_wire_client,
+    run_shell_command,
+    set_shell_pool_enabled,
+    set_transport,
+)
+from phone_agent.adb.wire import ADBWireClient, ADBWireError
 
 __all__ = [
     # Screenshot
     "get_screenshot",
+    "set_stream_capture",
     # Input
     "type_text",
     "clear_text",
@@ -42,10 +60,27 @@ __all__ = [
     "double_tap",
     "long_press",
     "launch_app",
+    # App launching
+    "LaunchRecord",
+    "get_launch_history",
+    "resolve_launcher_activity",
     # Connection management
     "ADBConnection",
     "DeviceInfo",
     "ConnectionType",
     "quick_connect",
     "list_devices",
+    # Shell sessions
+    "ADBShellSession",
+    "ADBShellPool",
+    "get_shell_pool",
+    "run_shell_command",
+    "set_shell_pool_enabled",
+    # Transport
+    "ADBWireClient",
+    "ADBWireError",
+    "claim_transport",
+    "get_transport",
+    "get_wire_client",
+    "set_transport",
 ]
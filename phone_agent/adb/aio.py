@@ -0,0 +1,307 @@
+"""Asyncio versions of the ADB device operations.
+
+The per-step operations (screenshot, current app, taps, swipes and keys) run
+``adb`` through ``asyncio.create_subprocess_exec``, so one event loop can
+drive many devices without a thread per device. Multi-command operations
+(app launch, text input, keyboard switching) reuse the synchronous
+implementations in a worker thread. With the "wire" transport every command
+goes through the synchronous adb server client in a worker thread.
+"""
+
+import asyncio
+import subprocess
+
+from PIL import Image
+
+from phone_agent.adb import device, input as adb_input, screenshot, shell
+from phone_agent.adb.connection import list_devices as _list_devices
+from phone_agent.adb.device import _parse_current_app, _swipe_duration
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.imaging import Screenshot, is_complete_png, png_size
+from phone_agent.settle import wait_after_action_async
+
+
+async def run_subprocess(
+    cmd: list[str], timeout: float | None = None
+) -> subprocess.CompletedProcess:
+    """
+    Run a host command without blocking the event loop.
+
+    Args:
+        cmd: Command and arguments.
+        timeout: Timeout in seconds.
+
+    Returns:
+        CompletedProcess with bytes ``stdout`` and ``stderr``.
+
+    Raises:
+        subprocess.TimeoutExpired: If the command did not finish in time; the
+            process is killed.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+
+def _adb_command(device_id: str | None) -> list[str]:
+    cmd = ["adb"]
+    if device_id:
+        cmd += ["-s", device_id]
+    return cmd
+
+
+async def run_shell_command(
+    args: list[str], device_id: str | None = None, timeout: float | None = None
+) -> subprocess.CompletedProcess:
+    """
+    Run a command in the device shell.
+
+    Returns:
+        CompletedProcess with text output.
+    """
+    if shell.get_transport() == "wire":
+        return await asyncio.to_thread(shell.run_shell_command, args, device_id, timeout)
+    result = await run_subprocess(
+        _adb_command(device_id) + ["shell"] + list(args), timeout
+    )
+    return subprocess.CompletedProcess(
+        result.args,
+        result.returncode,
+        result.stdout.decode("utf-8", errors="replace"),
+        result.stderr.decode("utf-8", errors="replace"),
+    )
+
+
+async def run_exec_out(
+    args: list[str], device_id: str | None = None, timeout: float | None = None
+) -> subprocess.CompletedProcess:
+    """
+    Run a command with binary-safe output, like ``adb exec-out``.
+
+    Returns:
+        CompletedProcess with bytes ``stdout`` and ``stderr``.
+    """
+    if shell.get_transport() == "wire":
+        return await asyncio.to_thread(shell.run_exec_out, args, device_id, timeout)
+    return await run_subprocess(
+        _adb_command(device_id) + ["exec-out"] + list(args), timeout
+    )
+
+
+async def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
+    """
+    Capture a screenshot from the connected Android device.
+
+    Streams ``screencap -p`` into memory; when that does not yield a PNG the
+    synchronous capture-to-file path runs in a worker thread.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+        timeout: Timeout in seconds for screenshot operations.
+
+    Returns:
+        Screenshot object, or a black fallback image on failure.
+    """
+    if not screenshot._STREAM_CAPTURE:
+        return await asyncio.to_thread(screenshot.get_screenshot, device_id, timeout)
+    try:
+        result = await run_exec_out(["screencap", "-p"], device_id, timeout)
+        data = result.stdout
+        if is_complete_png(data):
+            width, height = png_size(data)
+            return Screenshot(
+                image_data=data, width=width, height=height, is_sensitive=False
+            )
+
+        output = (data + result.stderr).decode("utf-8", errors="replace")
+        if "Status: -1" in output or "Failed" in output:
+            return screenshot._create_fallback_screenshot(is_sensitive=True)
+
+        return await asyncio.to_thread(
+            screenshot._get_screenshot_pull, device_id, timeout
+        )
+    except Exception as e:
+        print(f"Screenshot error: {e}")
+        return screenshot._create_fallback_screenshot(is_sensitive=False)
+
+
+async def capture_frame(
+    device_id: str | None = None, timeout: int = 5
+) -> bytes | Image.Image:
+    """
+    Capture the current screen for settle detection.
+
+    Like ``screenshot.capture_frame``: a raw frame when possible, otherwise
+    the PNG bytes of ``screencap -p``.
+
+    Raises:
+        ValueError: If the device did not return a complete PNG.
+    """
+    if screenshot._RAW_FRAMES:
+        result = await run_exec_out(["screencap"], device_id, timeout)
+        try:
+            return screenshot._decode_raw_frame(result.stdout)
+        except ValueError:
+            pass
+
+    result = await run_exec_out(["screencap", "-p"], device_id, timeout)
+    if not is_complete_png(result.stdout):
+        raise ValueError("Screen capture did not return a complete PNG")
+    return result.stdout
+
+
+async def get_current_app(device_id: str | None = None) -> str:
+    """
+    Get the currently focused app name.
+
+    Shares the cache of ``phone_agent.adb.device.get_current_app``.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+
+    Returns:
+        The app name if recognized, otherwise "System Home".
+    """
+    cached = device._CURRENT_APP_CACHE.get(device_id)
+    if cached is not None:
+        return cached
+
+    generation = device._CURRENT_APP_CACHE.generation
+    result = await run_shell_command(
+        ["dumpsys", "window", "|", "grep", "-E", f"'{device._FOCUS_PATTERN}'"],
+        device_id,
+    )
+    output = result.stdout
+    if result.returncode != 0 or not output:
+        result = await run_shell_command(["dumpsys", "window"], device_id)
+        output = result.stdout
+        if not output:
+            raise ValueError("No output from dumpsys window")
+
+    app_name = _parse_current_app(output)
+    device._CURRENT_APP_CACHE.put(device_id, app_name, generation)
+    return app_name
+
+
+async def _settle(
+    device_id: str | None, delay: float | None, default_delay: float
+) -> None:
+    await wait_after_action_async(
+        delay, default_delay, lambda: capture_frame(device_id)
+    )
+    device.invalidate_current_app(device_id)
+
+
+async def tap(
+    x: int, y: int, device_id: str | None = None, delay: float | None = None
+) -> None:
+    """Tap at the specified coordinates."""
+    await run_shell_command(["input", "tap", str(x), str(y)], device_id)
+    await _settle(device_id, delay, TIMING_CONFIG.device.default_tap_delay)
+
+
+async def double_tap(
+    x: int, y: int, device_id: str | None = None, delay: float | None = None
+) -> None:
+    """Double tap at the specified coordinates."""
+    await run_shell_command(["input", "tap", str(x), str(y)], device_id)
+    await asyncio.sleep(TIMING_CONFIG.device.double_tap_interval)
+    await run_shell_command(["input", "tap", str(x), str(y)], device_id)
+    await _settle(device_id, delay, TIMING_CONFIG.device.default_double_tap_delay)
+
+
+async def long_press(
+    x: int,
+    y: int,
+    duration_ms: int = 3000,
+    device_id: str | None = None,
+    delay: float | None = None,
+) -> None:
+    """Long press at the specified coordinates."""
+    await run_shell_command(
+        ["input", "swipe", str(x), str(y), str(x), str(y), str(duration_ms)],
+        device_id,
+    )
+    await _settle(device_id, delay, TIMING_CONFIG.device.default_long_press_delay)
+
+
+async def swipe(
+    start_x: int,
+    start_y: int,
+    end_x: int,
+    end_y: int,
+    duration_ms: int | None = None,
+    device_id: str | None = None,
+    delay: float | None = None,
+) -> None:
+    """Swipe from start to end coordinates."""
+    if duration_ms is None:
+        duration_ms = _swipe_duration(start_x, start_y, end_x, end_y)
+
+    await run_shell_command(
+        [
+            "input",
+            "swipe",
+            str(start_x),
+            str(start_y),
+            str(end_x),
+            str(end_y),
+            str(duration_ms),
+        ],
+        device_id,
+    )
+    await _settle(device_id, delay, TIMING_CONFIG.device.default_swipe_delay)
+
+
+async def back(device_id: str | None = None, delay: float | None = None) -> None:
+    """Press the back button."""
+    await run_shell_command(["input", "keyevent", "4"], device_id)
+    await _settle(device_id, delay, TIMING_CONFIG.device.default_back_delay)
+
+
+async def home(device_id: str | None = None, delay: float | None = None) -> None:
+    """Press the home button."""
+    await run_shell_command(["input", "keyevent", "KEYCODE_HOME"], device_id)
+    await _settle(device_id, delay, TIMING_CONFIG.device.default_home_delay)
+
+
+async def launch_app(
+    app_name: str, device_id: str | None = None, delay: float | None = None
+) -> bool:
+    """Launch an app by name (synchronous launcher in a worker thread)."""
+    return await asyncio.to_thread(device.launch_app, app_name, device_id, delay)
+
+
+async def type_text(text: str, device_id: str | None = None) -> None:
+    """Type text into the focused input field."""
+    await asyncio.to_thread(adb_input.type_text, text, device_id)
+
+
+async def clear_text(device_id: str | None = None) -> None:
+    """Clear text in the focused input field."""
+    await asyncio.to_thread(adb_input.clear_text, device_id)
+
+
+async def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
+    """Switch to ADB Keyboard and return the previous IME."""
+    return await asyncio.to_thread(adb_input.detect_and_set_adb_keyboard, device_id)
+
+
+async def restore_keyboard(ime: str, device_id: str | None = None) -> None:
+    """Restore the given IME."""
+    await asyncio.to_thread(adb_input.restore_keyboard, ime, device_id)
+
+
+async def list_devices():
+    """List connected devices."""
+    return await asyncio.to_thread(_list_devices)
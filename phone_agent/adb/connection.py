@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 
+from phone_agent.adb.shell import get_transport, get_wire_client
 from phone_agent.config.timing import TIMING_CONFIG
 
 
@@ -73,14 +74,16 @@ class ADBConnection:
             address = f"{address}:5555"  # Default ADB port
 
         try:
-            result = subprocess.run(
-                [self.adb_path, "connect", address],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-            )
-
-            output = result.stdout + result.stderr
+            if get_transport() == "wire":
+                output = get_wire_client().connect(address)
+            else:
+                result = subprocess.run(
+                    [self.adb_path, "connect", address],
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout,
+                )
+                output = result.stdout + result.stderr
 
             if "connected" in output.lower():
                 return True, f"Connected to {address}"
@@ -125,15 +128,19 @@ class ADBConnection:
             List of DeviceInfo objects.
         """
         try:
-            result = subprocess.run(
-                [self.adb_path, "devices", "-l"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
+            if get_transport() == "wire":
+                lines = get_wire_client().devices(long=True).splitlines()
+            else:
+                result = subprocess.run(
+                    [self.adb_path, "devices", "-l"],
+                    capture_output=True,
+                    text=True,
+                    timeout=5,
+                )
+                lines = result.stdout.strip().split("\n")[1:]  # Skip header
 
             devices = []
-            for line in result.stdout.strip().split("\n")[1:]:  # Skip header
+            for line in lines:
                 if not line.strip():
                     continue
 
@@ -1,39 +1,88 @@
 """Device control utilities for Android automation."""
 
 import os
-import subprocess
+import re
 import time
 from typing import List, Optional, Tuple
 
+from phone_agent.adb.launcher import (
+    LaunchRecord,
+    get_launch_history,
+    get_launcher_cache,
+    resolve_launcher_activity,
+    start_activity,
+)
+from phone_agent.adb.screenshot import capture_frame
+from phone_agent.adb.shell import run_shell_command
+from phone_agent.app_resolver import CurrentAppCache, get_app_index
 from phone_agent.config.apps import APP_PACKAGES
 from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.settle import wait_after_action
+from phone_agent.tracing import traced
 
+_APP_INDEX = get_app_index(APP_PACKAGES)
+_CURRENT_APP_CACHE = CurrentAppCache(lambda: TIMING_CONFIG.device.current_app_ttl)
 
+# dumpsys window lines that name the focused window or activity
+_FOCUS_PATTERN = "mCurrentFocus|mFocusedApp"
+
+# Interval between foreground checks while waiting for a launch
+LAUNCH_POLL_INTERVAL = 0.2
+
+
+@traced("adb.current_app")
 def get_current_app(device_id: str | None = None) -> str:
     """
     Get the currently focused app name.
 
+    The result is reused for TIMING_CONFIG.device.current_app_ttl seconds
+    unless a device action runs in between.
+
     Args:
         device_id: Optional ADB device ID for multi-device setups.
 
     Returns:
         The app name if recognized, otherwise "System Home".
     """
-    adb_prefix = _get_adb_prefix(device_id)
+    cached = _CURRENT_APP_CACHE.get(device_id)
+    if cached is not None:
+        return cached
+
+    generation = _CURRENT_APP_CACHE.generation
+    app_name = _query_current_app(device_id)
+    _CURRENT_APP_CACHE.put(device_id, app_name, generation)
+    return app_name
 
-    result = subprocess.run(
-        adb_prefix + ["shell", "dumpsys", "window"], capture_output=True, text=True, encoding="utf-8"
+
+def invalidate_current_app(device_id: str | None = None) -> None:
+    """Forget the cached foreground app after an action on the device."""
+    _CURRENT_APP_CACHE.invalidate(device_id)
+
+
+def _query_current_app(device_id: str | None) -> str:
+    """Read the focused window from the device and map it to an app name."""
+    # Only the focus lines are needed, so filter on the device
+    result = run_shell_command(
+        ["dumpsys", "window", "|", "grep", "-E", f"'{_FOCUS_PATTERN}'"], device_id
     )
     output = result.stdout
-    if not output:
-        raise ValueError("No output from dumpsys window")
+    if result.returncode != 0 or not output:
+        # No focus line or no grep: fall back to the full dump
+        result = run_shell_command(["dumpsys", "window"], device_id)
+        output = result.stdout
+        if not output:
+            raise ValueError("No output from dumpsys window")
+
+    return _parse_current_app(output)
 
-    # Parse window focus info
+
+def _parse_current_app(output: str) -> str:
+    """Map the focus lines of ``dumpsys window`` output to an app name."""
     for line in output.split("\n"):
         if "mCurrentFocus" in line or "mFocusedApp" in line:
-            for app_name, package in APP_PACKAGES.items():
-                if package in line:
-                    return app_name
+            app_name = _APP_INDEX.find_in(line)
+            if app_name is not None:
+                return app_name
 
     return "System Home"
 
@@ -48,17 +97,14 @@ def tap(
         x: X coordinate.
         y: Y coordinate.
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after tap. If None, uses configured default.
+        delay: Delay in seconds after tap. If None, waits per the
+            configured settle mode.
     """
-    if delay is None:
-        delay = TIMING_CONFIG.device.default_tap_delay
-
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "tap", str(x), str(y)], capture_output=True
+    run_shell_command(["input", "tap", str(x), str(y)], device_id)
+    wait_after_action(
+        delay, TIMING_CONFIG.device.default_tap_delay, lambda: capture_frame(device_id)
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
 
 
 def double_tap(
@@ -71,21 +117,18 @@ def double_tap(
         x: X coordinate.
         y: Y coordinate.
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after double tap. If None, uses configured default.
+        delay: Delay in seconds after double tap. If None, waits per the
+            configured settle mode.
     """
-    if delay is None:
-        delay = TIMING_CONFIG.device.default_double_tap_delay
-
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "tap", str(x), str(y)], capture_output=True
-    )
+    run_shell_command(["input", "tap", str(x), str(y)], device_id)
     time.sleep(TIMING_CONFIG.device.double_tap_interval)
-    subprocess.run(
-        adb_prefix + ["shell", "input", "tap", str(x), str(y)], capture_output=True
+    run_shell_command(["input", "tap", str(x), str(y)], device_id)
+    wait_after_action(
+        delay,
+        TIMING_CONFIG.device.default_double_tap_delay,
+        lambda: capture_frame(device_id),
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
 
 
 def long_press(
@@ -103,19 +146,19 @@ def long_press(
         y: Y coordinate.
         duration_ms: Duration of press in milliseconds.
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after long press. If None, uses configured default.
+        delay: Delay in seconds after long press. If None, waits per the
+            configured settle mode.
     """
-    if delay is None:
-        delay = TIMING_CONFIG.device.default_long_press_delay
-
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix
-        + ["shell", "input", "swipe", str(x), str(y), str(x), str(y), str(duration_ms)],
-        capture_output=True,
+    run_shell_command(
+        ["input", "swipe", str(x), str(y), str(x), str(y), str(duration_ms)],
+        device_id,
+    )
+    wait_after_action(
+        delay,
+        TIMING_CONFIG.device.default_long_press_delay,
+        lambda: capture_frame(device_id),
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
 
 
 def swipe(
@@ -137,23 +180,14 @@ def swipe(
         end_y: Ending Y coordinate.
         duration_ms: Duration of swipe in milliseconds (auto-calculated if None).
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after swipe. If None, uses configured default.
+        delay: Delay in seconds after swipe. If None, waits per the
+            configured settle mode.
     """
-    if delay is None:
-        delay = TIMING_CONFIG.device.default_swipe_delay
-
-    adb_prefix = _get_adb_prefix(device_id)
-
     if duration_ms is None:
-        # Calculate duration based on distance
-        dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
-        duration_ms = int(dist_sq / 1000)
-        duration_ms = max(1000, min(duration_ms, 2000))  # Clamp between 1000-2000ms
-
-    subprocess.run(
-        adb_prefix
-        + [
-            "shell",
+        duration_ms = _swipe_duration(start_x, start_y, end_x, end_y)
+
+    run_shell_command(
+        [
             "input",
             "swipe",
             str(start_x),
@@ -162,9 +196,21 @@ def swipe(
             str(end_y),
             str(duration_ms),
         ],
-        capture_output=True,
+        device_id,
     )
-    time.sleep(delay)
+    wait_after_action(
+        delay,
+        TIMING_CONFIG.device.default_swipe_delay,
+        lambda: capture_frame(device_id),
+    )
+    invalidate_current_app(device_id)
+
+
+def _swipe_duration(start_x: int, start_y: int, end_x: int, end_y: int) -> int:
+    """Calculate a swipe duration in milliseconds based on distance."""
+    dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
+    duration_ms = int(dist_sq / 1000)
+    return max(1000, min(duration_ms, 2000))  # Clamp between 1000-2000ms
 
 
 def back(device_id: str | None = None, delay: float | None = None) -> None:
@@ -173,17 +219,14 @@ def back(device_id: str | None = None, delay: float | None = None) -> None:
 
     Args:
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after pressing back. If None, uses configured default.
+        delay: Delay in seconds after pressing back. If None, waits per the
+            configured settle mode.
     """
-    if delay is None:
-        delay = TIMING_CONFIG.device.default_back_delay
-
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "keyevent", "4"], capture_output=True
+    run_shell_command(["input", "keyevent", "4"], device_id)
+    wait_after_action(
+        delay, TIMING_CONFIG.device.default_back_delay, lambda: capture_frame(device_id)
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
 
 
 def home(device_id: str | None = None, delay: float | None = None) -> None:
@@ -192,17 +235,14 @@ def home(device_id: str | None = None, delay: float | None = None) -> None:
 
     Args:
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after pressing home. If None, uses configured default.
+        delay: Delay in seconds after pressing home. If None, waits per the
+            configured settle mode.
     """
-    if delay is None:
-        delay = TIMING_CONFIG.device.default_home_delay
-
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "keyevent", "KEYCODE_HOME"], capture_output=True
+    run_shell_command(["input", "keyevent", "KEYCODE_HOME"], device_id)
+    wait_after_action(
+        delay, TIMING_CONFIG.device.default_home_delay, lambda: capture_frame(device_id)
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
 
 
 def launch_app(
@@ -211,40 +251,84 @@ def launch_app(
     """
     Launch an app by name.
 
+    The package's launcher activity is resolved once per device and started
+    with ``am start -W``; ``monkey`` is only used when that fails. The call
+    returns once the package has focus, or after ``launch_timeout`` if it
+    does not get it (a splash screen or permission dialog may belong to
+    another package), and the timings are added to the device's launch
+    history.
+
     Args:
         app_name: The app name (must be in APP_PACKAGES).
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after launching. If None, uses configured default.
+        delay: Delay in seconds after launching. If None, returns as soon as
+            the app is in the foreground or the focus wait times out.
 
     Returns:
         True if app was launched, False if app not found.
     """
-    if delay is None:
-        delay = TIMING_CONFIG.device.default_launch_delay
-
     if app_name not in APP_PACKAGES:
         return False
 
-    adb_prefix = _get_adb_prefix(device_id)
     package = APP_PACKAGES[app_name]
-
-    subprocess.run(
-        adb_prefix
-        + [
-            "shell",
-            "monkey",
-            "-p",
-            package,
-            "-c",
-            "android.intent.category.LAUNCHER",
-            "1",
-        ],
-        capture_output=True,
-    )
-    time.sleep(delay)
+    started = time.monotonic()
+
+    record = None
+    component = resolve_launcher_activity(package, device_id)
+    if component is not None:
+        record = start_activity(component, device_id)
+        if record is None:
+            # The cached component may be stale after an app update
+            get_launcher_cache().forget(device_id, package)
+    launched = record is not None
+    if record is None:
+        result = run_shell_command(
+            [
+                "monkey",
+                "-p",
+                package,
+                "-c",
+                "android.intent.category.LAUNCHER",
+                "1",
+            ],
+            device_id,
+        )
+        record = LaunchRecord(package=package, method="monkey")
+        launched = "No activities found" not in result.stdout
+
+    invalidate_current_app(device_id)
+    if launched and _wait_for_foreground(package, device_id):
+        record.foreground_s = time.monotonic() - started
+    record.timestamp = time.time()
+    get_launch_history().record(device_id, record)
+
+    # The focus wait already bounds a launch, even one that timed out
+    if delay is not None or not launched:
+        wait_after_action(
+            delay,
+            TIMING_CONFIG.device.default_launch_delay,
+            lambda: capture_frame(device_id),
+        )
+        invalidate_current_app(device_id)
     return True
 
 
+@traced("settle.launch")
+def _wait_for_foreground(package: str, device_id: str | None) -> bool:
+    """Poll the focused window until it belongs to ``package`` or time runs out."""
+    focus = re.compile(rf"[\s{{]{re.escape(package)}/")
+    deadline = time.monotonic() + TIMING_CONFIG.device.launch_timeout
+    while True:
+        result = run_shell_command(
+            ["dumpsys", "window", "|", "grep", "-E", f"'{_FOCUS_PATTERN}'"], device_id
+        )
+        if focus.search(result.stdout):
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(LAUNCH_POLL_INTERVAL)
+
+
 def _get_adb_prefix(device_id: str | None) -> list:
     """Get ADB command prefix with optional device specifier."""
     if device_id:
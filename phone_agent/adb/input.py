@@ -1,14 +1,119 @@
 """Input utilities for Android device text input."""
 
 import base64
-import subprocess
+import logging
+import threading
+import time
 from typing import Optional
 
+from phone_agent.adb.device import invalidate_current_app
+from phone_agent.adb.shell import run_shell_command
+from phone_agent.config.timing import TIMING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+ADB_KEYBOARD_IME = "com.android.adbkeyboard/.AdbIME"
+
+# UTF-8 bytes of text per ADB_INPUT_B64 broadcast. Keeps the base64 argument
+# well under the shell command and intent extra size limits.
+MAX_CHUNK_BYTES = 600
+
+# Interval between checks that the IME switch has taken effect
+IME_POLL_INTERVAL = 0.1
+
+
+class IMEManager:
+    """
+    Tracks the input method of one device across Type actions.
+
+    The first ``activate`` remembers the active IME and selects ADB Keyboard;
+    later calls are no-ops until ``restore`` puts the original IME back.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+    """
+
+    def __init__(self, device_id: str | None = None):
+        self.device_id = device_id
+        self.original_ime: str | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        """Whether ADB Keyboard is selected and the original IME is known."""
+        return self.original_ime is not None
+
+    def activate(self) -> str:
+        """
+        Select ADB Keyboard unless this manager already did.
+
+        Returns:
+            The IME that was active before ADB Keyboard was selected.
+        """
+        with self._lock:
+            if self.original_ime is not None:
+                return self.original_ime
+
+            result = run_shell_command(
+                ["settings", "get", "secure", "default_input_method"], self.device_id
+            )
+            current_ime = (result.stdout + result.stderr).strip()
+
+            if ADB_KEYBOARD_IME not in current_ime:
+                run_shell_command(["ime", "set", ADB_KEYBOARD_IME], self.device_id)
+                self._wait_for_ime(ADB_KEYBOARD_IME)
+
+            # Warm up the keyboard
+            _send_text("", self.device_id)
+
+            self.original_ime = current_ime
+            return current_ime
+
+    def restore(self, ime: str | None = None) -> None:
+        """
+        Select the original IME again.
+
+        Args:
+            ime: IME to select. Defaults to the one remembered by ``activate``.
+        """
+        with self._lock:
+            ime = ime or self.original_ime
+            self.original_ime = None
+            if ime and ADB_KEYBOARD_IME not in ime:
+                run_shell_command(["ime", "set", ime], self.device_id)
+
+    def _wait_for_ime(self, ime: str) -> None:
+        """Poll the input method service until ``ime`` is the selected method."""
+        deadline = time.monotonic() + TIMING_CONFIG.action.keyboard_switch_delay
+        while True:
+            result = run_shell_command(
+                ["dumpsys", "input_method", "|", "grep", "mCurMethodId"],
+                self.device_id,
+            )
+            if ime in result.stdout or time.monotonic() >= deadline:
+                return
+            time.sleep(IME_POLL_INTERVAL)
+
+
+_IME_MANAGERS: dict[str | None, IMEManager] = {}
+_IME_MANAGERS_LOCK = threading.Lock()
+
+
+def get_ime_manager(device_id: str | None = None) -> IMEManager:
+    """Get the IME manager for a device, creating it on first use."""
+    with _IME_MANAGERS_LOCK:
+        manager = _IME_MANAGERS.get(device_id)
+        if manager is None:
+            manager = _IME_MANAGERS[device_id] = IMEManager(device_id)
+        return manager
+
 
 def type_text(text: str, device_id: str | None = None) -> None:
     """
     Type text into the currently focused input field using ADB Keyboard.
 
+    Long texts are sent in several broadcasts of at most MAX_CHUNK_BYTES.
+
     Args:
         text: The text to type.
         device_id: Optional ADB device ID for multi-device setups.
@@ -17,24 +122,9 @@ def type_text(text: str, device_id: str | None = None) -> None:
         Requires ADB Keyboard to be installed on the device.
         See: https://github.com/nicnocquee/AdbKeyboard
     """
-    adb_prefix = _get_adb_prefix(device_id)
-    encoded_text = base64.b64encode(text.encode("utf-8")).decode("utf-8")
-
-    subprocess.run(
-        adb_prefix
-        + [
-            "shell",
-            "am",
-            "broadcast",
-            "-a",
-            "ADB_INPUT_B64",
-            "--es",
-            "msg",
-            encoded_text,
-        ],
-        capture_output=True,
-        text=True,
-    )
+    for chunk in _chunk_text(text, MAX_CHUNK_BYTES):
+        _send_text(chunk, device_id)
+    invalidate_current_app(device_id)
 
 
 def clear_text(device_id: str | None = None) -> None:
@@ -44,47 +134,26 @@ def clear_text(device_id: str | None = None) -> None:
     Args:
         device_id: Optional ADB device ID for multi-device setups.
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "am", "broadcast", "-a", "ADB_CLEAR_TEXT"],
-        capture_output=True,
-        text=True,
-    )
+    if not _broadcast(["-a", "ADB_CLEAR_TEXT"], device_id):
+        # Unconfirmed; give the keyboard the fixed delay to clear the field
+        time.sleep(TIMING_CONFIG.action.text_clear_delay)
+    invalidate_current_app(device_id)
 
 
 def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
     """
     Detect current keyboard and switch to ADB Keyboard if needed.
 
+    Only the first call after a restore touches the device; later calls
+    return the remembered IME.
+
     Args:
         device_id: Optional ADB device ID for multi-device setups.
 
     Returns:
         The original keyboard IME identifier for later restoration.
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
-    # Get current IME
-    result = subprocess.run(
-        adb_prefix + ["shell", "settings", "get", "secure", "default_input_method"],
-        capture_output=True,
-        text=True,
-    )
-    current_ime = (result.stdout + result.stderr).strip()
-
-    # Switch to ADB Keyboard if not already set
-    if "com.android.adbkeyboard/.AdbIME" not in current_ime:
-        subprocess.run(
-            adb_prefix + ["shell", "ime", "set", "com.android.adbkeyboard/.AdbIME"],
-            capture_output=True,
-            text=True,
-        )
-
-    # Warm up the keyboard
-    type_text("", device_id)
-
-    return current_ime
+    return get_ime_manager(device_id).activate()
 
 
 def restore_keyboard(ime: str, device_id: str | None = None) -> None:
@@ -95,11 +164,57 @@ def restore_keyboard(ime: str, device_id: str | None = None) -> None:
         ime: The IME identifier to restore.
         device_id: Optional ADB device ID for multi-device setups.
     """
-    adb_prefix = _get_adb_prefix(device_id)
+    get_ime_manager(device_id).restore(ime)
+
 
-    subprocess.run(
-        adb_prefix + ["shell", "ime", "set", ime], capture_output=True, text=True
+def _send_text(text: str, device_id: str | None) -> None:
+    """Send one ADB_INPUT_B64 broadcast."""
+    encoded_text = base64.b64encode(text.encode("utf-8")).decode("utf-8")
+    # An empty extra must still be passed as an argument
+    _broadcast(
+        ["-a", "ADB_INPUT_B64", "--es", "msg", encoded_text or "''"], device_id
+    )
+
+
+def _broadcast(args: list[str], device_id: str | None) -> bool:
+    """
+    Send an ADB Keyboard broadcast.
+
+    Returns:
+        Whether ``am`` confirmed it. Some ROMs print nothing, so a missing
+        confirmation is logged rather than treated as a failure.
+    """
+    result = run_shell_command(["am", "broadcast", *args], device_id)
+    if "Broadcast completed" in result.stdout:
+        return True
+    logger.warning(
+        "ADB Keyboard broadcast %s not confirmed on %s: %r",
+        args[1],
+        device_id or "default device",
+        result.stdout.strip(),
     )
+    return False
+
+
+def _chunk_text(text: str, max_bytes: int) -> list[str]:
+    """Split text into pieces of at most ``max_bytes`` UTF-8 bytes."""
+    if len(text.encode("utf-8")) <= max_bytes:
+        return [text]
+
+    chunks = []
+    current = []
+    size = 0
+    for char in text:
+        char_size = len(char.encode("utf-8"))
+        if size + char_size > max_bytes:
+            chunks.append("".join(current))
+            current = []
+            size = 0
+        current.append(char)
+        size += char_size
+    if current:
+        chunks.append("".join(current))
+    return chunks
 
 
 def _get_adb_prefix(device_id: str | None) -> list:
@@ -0,0 +1,262 @@
+"""Launcher-activity resolution and launch timing for Android apps.
+
+``monkey -p <pkg> -c android.intent.category.LAUNCHER 1`` starts a Java
+process on the device for every launch. Instead, the launcher component of a
+package is resolved once with ``cmd package resolve-activity``, persisted per
+device, and started directly with ``am start -W``, which also reports how
+long the launch took.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+from phone_agent.adb.shell import run_shell_command
+
+# Where resolved launcher components are persisted; empty disables persistence
+LAUNCHER_CACHE_PATH = os.getenv(
+    "PHONE_AGENT_LAUNCHER_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "phone_agent", "launchers.json"),
+)
+
+# Launches remembered per device
+HISTORY_SIZE = 100
+
+_AM_START_FIELD = re.compile(
+    r"^(LaunchState|ThisTime|TotalTime|WaitTime|Status):\s*(\S+)"
+)
+
+
+@dataclass
+class LaunchRecord:
+    """Timings of one app launch."""
+
+    package: str
+    method: str  # "am_start" or "monkey"
+    component: str | None = None
+    launch_state: str | None = None  # COLD, WARM or HOT as reported by am
+    this_time_ms: int | None = None
+    total_time_ms: int | None = None
+    wait_time_ms: int | None = None
+    foreground_s: float | None = None  # None if the package never got focus
+    timestamp: float = 0.0
+
+
+class LauncherCache:
+    """
+    Launcher components per device and package, persisted as JSON.
+
+    Args:
+        path: JSON file to load from and save to. None or empty keeps the
+            cache in memory only.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self._data: dict[str, dict[str, str]] | None = None
+        self._lock = threading.Lock()
+
+    def get(self, device_id: str | None, package: str) -> str | None:
+        with self._lock:
+            return self._load().get(_device_key(device_id), {}).get(package)
+
+    def put(self, device_id: str | None, package: str, component: str) -> None:
+        with self._lock:
+            self._load().setdefault(_device_key(device_id), {})[package] = component
+            self._save()
+
+    def forget(self, device_id: str | None, package: str) -> None:
+        with self._lock:
+            components = self._load().get(_device_key(device_id), {})
+            if components.pop(package, None) is not None:
+                self._save()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data = {}
+            self._save()
+
+    def _load(self) -> dict[str, dict[str, str]]:
+        if self._data is None:
+            self._data = {}
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path, encoding="utf-8") as f:
+                        self._data = json.load(f)
+                except (OSError, ValueError):
+                    self._data = {}
+        return self._data
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass
+
+
+class LaunchHistory:
+    """Recent launch records per device."""
+
+    def __init__(self, size: int = HISTORY_SIZE):
+        self.size = size
+        self._records: dict[str, deque[LaunchRecord]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, device_id: str | None, record: LaunchRecord) -> None:
+        with self._lock:
+            key = _device_key(device_id)
+            if key not in self._records:
+                self._records[key] = deque(maxlen=self.size)
+            self._records[key].append(record)
+
+    def get(self, device_id: str | None = None) -> list[LaunchRecord]:
+        with self._lock:
+            return list(self._records.get(_device_key(device_id), ()))
+
+    def summary(self, device_id: str | None = None) -> dict[str, dict[str, float]]:
+        """
+        Average launch cost per launch state (COLD, WARM, HOT, UNKNOWN).
+
+        Returns:
+            Mapping of launch state to count, mean TotalTime in milliseconds
+            and mean seconds until the package had focus.
+        """
+        groups: dict[str, list[LaunchRecord]] = {}
+        for record in self.get(device_id):
+            groups.setdefault(record.launch_state or "UNKNOWN", []).append(record)
+
+        summary = {}
+        for state, records in groups.items():
+            totals = [r.total_time_ms for r in records if r.total_time_ms is not None]
+            foreground = [r.foreground_s for r in records if r.foreground_s is not None]
+            summary[state] = {
+                "count": len(records),
+                "mean_total_time_ms": sum(totals) / len(totals) if totals else 0.0,
+                "mean_foreground_s": (
+                    sum(foreground) / len(foreground) if foreground else 0.0
+                ),
+            }
+        return summary
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+
+_LAUNCHER_CACHE = LauncherCache(LAUNCHER_CACHE_PATH)
+_LAUNCH_HISTORY = LaunchHistory()
+
+
+def get_launcher_cache() -> LauncherCache:
+    """Return the global launcher component cache."""
+    return _LAUNCHER_CACHE
+
+
+def get_launch_history() -> LaunchHistory:
+    """Return the global per-device launch history."""
+    return _LAUNCH_HISTORY
+
+
+def resolve_launcher_activity(package: str, device_id: str | None = None) -> str | None:
+    """
+    Resolve the launcher component of a package.
+
+    The component looks like ``com.tencent.mm/.ui.LauncherUI``.
+
+    Results are cached per device; only a miss queries the device.
+
+    Returns:
+        The component name, or None if the package has no launcher activity.
+    """
+    component = _LAUNCHER_CACHE.get(device_id, package)
+    if component is not None:
+        return component
+
+    result = run_shell_command(
+        [
+            "cmd",
+            "package",
+            "resolve-activity",
+            "--brief",
+            "-c",
+            "android.intent.category.LAUNCHER",
+            package,
+        ],
+        device_id,
+    )
+    lines = result.stdout.strip().splitlines()
+    # --brief prints the priority line, then the component
+    component = lines[-1].strip() if lines else ""
+    if result.returncode != 0 or not component.startswith(f"{package}/"):
+        return None
+
+    _LAUNCHER_CACHE.put(device_id, package, component)
+    return component
+
+
+def start_activity(component: str, device_id: str | None = None) -> LaunchRecord | None:
+    """
+    Start a launcher component with ``am start -W`` and parse its timings.
+
+    Returns:
+        A LaunchRecord without foreground time, or None if am reported an
+        error (e.g. the cached component no longer exists).
+    """
+    result = run_shell_command(
+        [
+            "am",
+            "start",
+            "-W",
+            "-a",
+            "android.intent.action.MAIN",
+            "-c",
+            "android.intent.category.LAUNCHER",
+            "-n",
+            component,
+        ],
+        device_id,
+    )
+    fields = parse_am_start(result.stdout)
+    failed = "Error" in result.stdout or fields.get("Status", "ok") != "ok"
+    if result.returncode != 0 or failed:
+        return None
+
+    return LaunchRecord(
+        package=component.split("/", 1)[0],
+        method="am_start",
+        component=component,
+        launch_state=fields.get("LaunchState"),
+        this_time_ms=_to_int(fields.get("ThisTime")),
+        total_time_ms=_to_int(fields.get("TotalTime")),
+        wait_time_ms=_to_int(fields.get("WaitTime")),
+    )
+
+
+def parse_am_start(output: str) -> dict[str, str]:
+    """Extract the Status/LaunchState/*Time fields printed by ``am start -W``."""
+    fields = {}
+    for line in output.splitlines():
+        match = _AM_START_FIELD.match(line.strip())
+        if match:
+            fields[match.group(1)] = match.group(2)
+    return fields
+
+
+def _to_int(value: str | None) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _device_key(device_id: str | None) -> str:
+    return device_id or "default"
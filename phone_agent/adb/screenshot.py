@@ -1,27 +1,48 @@
 """Screenshot utilities for capturing Android device screen."""
 
-import base64
+import logging
 import os
-import subprocess
+import struct
 import tempfile
 import uuid
-from dataclasses import dataclass
 from io import BytesIO
 from typing import Tuple
 
 from PIL import Image
 
-
-@dataclass
-class Screenshot:
-    """Represents a captured screenshot."""
-
-    base64_data: str
-    width: int
-    height: int
-    is_sensitive: bool = False
-
-
+from phone_agent.adb.shell import (
+    get_transport,
+    pull_file,
+    run_exec_out,
+    run_shell_command,
+    run_shell_subprocess,
+)
+from phone_agent.imaging import Screenshot, is_complete_png, png_size
+from phone_agent.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+# Global flag to control in-memory exec-out capture
+_STREAM_CAPTURE = os.getenv("PHONE_AGENT_SCREENSHOT_STREAM", "true").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+
+# Global flag to control raw (unencoded) frames for settle detection. Raw
+# frames skip the on-device PNG encoder, most of a capture's cost over USB,
+# but are several times larger; turn it off for slow wireless connections.
+_RAW_FRAMES = os.getenv("PHONE_AGENT_SETTLE_RAW_FRAMES", "true").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+
+# Raw screencap pixel formats: PIL raw mode and bytes per pixel
+_RAW_FORMATS = {1: ("RGBA", 4), 2: ("RGBX", 4), 3: ("RGB", 3)}
+
+
+@traced("adb.screenshot")
 def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
     """
     Capture a screenshot from the connected Android device.
@@ -34,62 +55,154 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
         Screenshot object containing base64 data and dimensions.
 
     Note:
+        By default the PNG is streamed through ``adb exec-out`` into memory and
+        passed through untouched. If the device does not return a complete PNG,
+        the legacy capture-to-file and pull path is used instead.
         If the screenshot fails (e.g., on sensitive screens like payment pages),
         a black fallback image is returned with is_sensitive=True.
     """
-    temp_path = os.path.join(tempfile.gettempdir(), f"screenshot_{uuid.uuid4()}.png")
-    adb_prefix = _get_adb_prefix(device_id)
-
     try:
-        # Execute screenshot command
-        result = subprocess.run(
-            adb_prefix + ["shell", "screencap", "-p", "/sdcard/tmp.png"],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
+        if _STREAM_CAPTURE:
+            screenshot = _get_screenshot_stream(device_id, timeout)
+            if screenshot is not None:
+                return screenshot
+        return _get_screenshot_pull(device_id, timeout)
 
-        # Check for screenshot failure (sensitive screen)
-        output = result.stdout + result.stderr
-        if "Status: -1" in output or "Failed" in output:
-            return _create_fallback_screenshot(is_sensitive=True)
-
-        # Pull screenshot to local temp path
-        subprocess.run(
-            adb_prefix + ["pull", "/sdcard/tmp.png", temp_path],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
+    except Exception as e:
+        print(f"Screenshot error: {e}")
+        return _create_fallback_screenshot(is_sensitive=False)
+
+
+def set_stream_capture(enabled: bool) -> None:
+    """Enable or disable in-memory ``exec-out`` screenshot capture globally."""
+    global _STREAM_CAPTURE
+    _STREAM_CAPTURE = enabled
+
+
+def set_raw_frames(enabled: bool) -> None:
+    """Enable or disable raw ``screencap`` frames for settle detection globally."""
+    global _RAW_FRAMES
+    _RAW_FRAMES = enabled
+
+
+def capture_frame(
+    device_id: str | None = None, timeout: int = 5
+) -> bytes | Image.Image:
+    """
+    Capture the current screen for settle detection.
+
+    Uses raw ``screencap`` output, decoded without a PNG round trip, and
+    falls back to ``screencap -p`` when the raw frame cannot be decoded.
+    Unlike get_screenshot, this never falls back to a placeholder image.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+        timeout: Timeout in seconds for the capture.
+
+    Returns:
+        The frame as a PIL image, or encoded PNG bytes from the fallback.
+
+    Raises:
+        ValueError: If the device did not return a complete PNG.
+    """
+    if _RAW_FRAMES:
+        result = run_exec_out(["screencap"], device_id, timeout)
+        try:
+            return _decode_raw_frame(result.stdout)
+        except ValueError as e:
+            logger.debug("Raw screen capture unusable, using PNG: %s", e)
+
+    result = run_exec_out(["screencap", "-p"], device_id, timeout)
+    if not is_complete_png(result.stdout):
+        raise ValueError("Screen capture did not return a complete PNG")
+    return result.stdout
 
-        if not os.path.exists(temp_path):
-            return _create_fallback_screenshot(is_sensitive=False)
 
-        # Read and encode image
-        img = Image.open(temp_path)
-        width, height = img.size
+def _decode_raw_frame(data: bytes) -> Image.Image:
+    """
+    Decode the output of ``screencap`` without ``-p``.
+
+    The pixels follow a header of width, height and pixel format, plus a
+    colour space word on Android 12 and later.
 
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+    Raises:
+        ValueError: If the data is not a raw frame in a supported format.
+    """
+    if len(data) < 12:
+        raise ValueError("Raw screen capture is too short")
+    width, height, pixel_format = struct.unpack_from("<III", data)
+    if pixel_format not in _RAW_FORMATS:
+        raise ValueError(f"Unsupported raw pixel format {pixel_format}")
+    raw_mode, bytes_per_pixel = _RAW_FORMATS[pixel_format]
+    header = len(data) - width * height * bytes_per_pixel
+    if header not in (12, 16):
+        raise ValueError("Raw screen capture has an unexpected size")
+    pixels = memoryview(data)[header:]
+    return Image.frombuffer(raw_mode, (width, height), pixels, "raw", raw_mode, 0, 1)
+
+
+def _get_screenshot_stream(device_id: str | None, timeout: int) -> Screenshot | None:
+    """
+    Capture a screenshot by streaming ``screencap -p`` output into memory.
 
-        # Cleanup
-        os.remove(temp_path)
+    Returns:
+        Screenshot object, or None if the output was not a complete PNG.
+    """
+    result = run_exec_out(["screencap", "-p"], device_id, timeout)
+    data = result.stdout
 
+    if is_complete_png(data):
+        width, height = png_size(data)
         return Screenshot(
-            base64_data=base64_data, width=width, height=height, is_sensitive=False
+            image_data=data,
+            width=width,
+            height=height,
+            is_sensitive=False,
         )
 
-    except Exception as e:
-        print(f"Screenshot error: {e}")
+    # exec-out has no separate stderr, so failures arrive as text on stdout
+    output = (data + result.stderr).decode("utf-8", errors="replace")
+    if "Status: -1" in output or "Failed" in output:
+        return _create_fallback_screenshot(is_sensitive=True)
+
+    return None
+
+
+def _get_screenshot_pull(device_id: str | None, timeout: int) -> Screenshot:
+    """Capture a screenshot to a device file and pull it to the host."""
+    temp_path = os.path.join(tempfile.gettempdir(), f"screenshot_{uuid.uuid4()}.png")
+    screencap = ["screencap", "-p", "/sdcard/tmp.png"]
+
+    # Execute screenshot command
+    if get_transport() == "wire":
+        result = run_shell_command(screencap, device_id, timeout)
+    else:
+        result = run_shell_subprocess(screencap, device_id, timeout)
+
+    # Check for screenshot failure (sensitive screen)
+    output = result.stdout + result.stderr
+    if "Status: -1" in output or "Failed" in output:
+        return _create_fallback_screenshot(is_sensitive=True)
+
+    # Pull screenshot to local temp path
+    pull_file("/sdcard/tmp.png", temp_path, device_id, timeout=5)
+
+    if not os.path.exists(temp_path):
         return _create_fallback_screenshot(is_sensitive=False)
 
+    # Read and encode image
+    img = Image.open(temp_path)
+    width, height = img.size
+
+    buffered = BytesIO()
+    img.save(buffered, format="PNG")
+
+    # Cleanup
+    os.remove(temp_path)
 
-def _get_adb_prefix(device_id: str | None) -> list:
-    """Get ADB command prefix with optional device specifier."""
-    if device_id:
-        return ["adb", "-s", device_id]
-    return ["adb"]
+    return Screenshot(
+        image_data=buffered.getvalue(), width=width, height=height, is_sensitive=False
+    )
 
 
 def _create_fallback_screenshot(is_sensitive: bool) -> Screenshot:
@@ -99,10 +212,9 @@ def _create_fallback_screenshot(is_sensitive: bool) -> Screenshot:
     black_img = Image.new("RGB", (default_width, default_height), color="black")
     buffered = BytesIO()
     black_img.save(buffered, format="PNG")
-    base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
 
     return Screenshot(
-        base64_data=base64_data,
+        image_data=buffered.getvalue(),
         width=default_width,
         height=default_height,
         is_sensitive=is_sensitive,
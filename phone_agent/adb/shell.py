@@ -0,0 +1,455 @@
+"""Persistent ADB shell sessions shared by device operations.
+
+Spawning ``adb shell <cmd>`` for every tap or key event pays for process
+creation and an ADB client/server handshake each time. This module keeps one
+long-lived ``adb shell`` process per device serial and multiplexes commands
+over its stdin, falling back to a one-shot subprocess when the session cannot
+be used.
+"""
+
+import atexit
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+import uuid
+
+from phone_agent.adb.wire import ADBWireClient, ADBWireError
+from phone_agent.tracing import traced
+
+# Global flag to control whether shell commands reuse a persistent session
+_SHELL_POOL_ENABLED = os.getenv("PHONE_AGENT_ADB_SHELL_POOL", "true").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+
+# How device I/O reaches the adb server: "cli" spawns the adb executable,
+# "wire" speaks the server's socket protocol directly
+TRANSPORTS = ("cli", "wire")
+_TRANSPORT = os.getenv("PHONE_AGENT_ADB_TRANSPORT", "cli").lower()
+# Transport requested by a device factory; the setting is process-wide, so
+# factories asking for another one are refused rather than switching it
+_CLAIMED_TRANSPORT: str | None = None
+
+# Upper bound for a single command sent over a persistent session (seconds)
+DEFAULT_COMMAND_TIMEOUT = float(os.getenv("PHONE_AGENT_ADB_SHELL_TIMEOUT", "30"))
+
+
+class ShellSessionError(RuntimeError):
+    """Raised when a persistent shell session is broken and must be recreated."""
+
+
+class ADBShellSession:
+    """
+    A long-lived ``adb shell`` process that runs one command at a time.
+
+    Every command is followed by a ``printf`` of a unique marker carrying the
+    exit status, which tells the session where the command's output ends.
+    stderr is merged into stdout.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+        adb_path: Path to ADB executable.
+    """
+
+    def __init__(self, device_id: str | None = None, adb_path: str = "adb"):
+        self.device_id = device_id
+        self.adb_path = adb_path
+        self._process: subprocess.Popen | None = None
+        self._lines: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        """Whether the underlying ``adb shell`` process is running."""
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> None:
+        """Start the ``adb shell`` process and its output reader thread."""
+        self._process = subprocess.Popen(
+            self._command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0,
+        )
+        self._lines = queue.Queue()
+        reader = threading.Thread(
+            target=self._read_output,
+            args=(self._process.stdout, self._lines),
+            daemon=True,
+        )
+        reader.start()
+
+    def _command(self) -> list[str]:
+        """Command line that opens the interactive shell."""
+        cmd = [self.adb_path]
+        if self.device_id:
+            cmd += ["-s", self.device_id]
+        return cmd + ["shell"]
+
+    def close(self) -> None:
+        """Terminate the shell process if it is running."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            if process.stdin:
+                process.stdin.close()
+        except OSError:
+            pass
+        if process.poll() is None:
+            process.kill()
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+
+    def run(
+        self, args: list[str], timeout: float | None = None
+    ) -> subprocess.CompletedProcess:
+        """
+        Run a shell command over the persistent session.
+
+        Args:
+            args: Command arguments, joined with spaces like ``adb shell`` does.
+            timeout: Timeout in seconds. Defaults to DEFAULT_COMMAND_TIMEOUT.
+
+        Returns:
+            CompletedProcess with the merged output as ``stdout``.
+
+        Raises:
+            ShellSessionError: If the session died or produced garbled framing.
+            subprocess.TimeoutExpired: If the command did not finish in time.
+                The session is closed so the next call starts a fresh one.
+        """
+        if timeout is None:
+            timeout = DEFAULT_COMMAND_TIMEOUT
+
+        with self._lock:
+            if not self.alive:
+                self.start()
+
+            # The marker is assembled by printf, so a shell that echoes its
+            # input never shows it and only the real end line matches
+            token = uuid.uuid4().hex
+            end_pattern = re.compile(rf"^__PHONE_AGENT_END_{token}__:(-?\d+)$".encode())
+            script = (
+                f"( {' '.join(args)} ) </dev/null 2>&1; "
+                f"printf '\\n__PHONE_AGENT_END_%s__:%d\\n' {token} $?"
+            ).encode("utf-8")
+
+            try:
+                self._process.stdin.write(script + b"\n")
+                self._process.stdin.flush()
+            except (OSError, ValueError) as e:
+                self.close()
+                raise ShellSessionError(f"Failed to write to shell session: {e}")
+
+            deadline = time.monotonic() + timeout
+            chunks = []
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        raise queue.Empty
+                    line = self._lines.get(timeout=remaining)
+                except queue.Empty:
+                    self.close()
+                    raise subprocess.TimeoutExpired(args, timeout)
+
+                if line is None:
+                    self.close()
+                    raise ShellSessionError("Shell session closed unexpectedly")
+
+                content = line.rstrip(b"\r\n")
+                match = end_pattern.match(content)
+                if match:
+                    returncode = int(match.group(1))
+                    break
+                if not chunks and content.endswith(script):
+                    # Echo of the command line itself, possibly after a prompt
+                    continue
+                chunks.append(line)
+
+        output = b"".join(chunks).decode("utf-8", errors="replace")
+        output = output.replace("\r\n", "\n")
+        # Drop the newline printed in front of the marker
+        if output.endswith("\n"):
+            output = output[:-1]
+        return subprocess.CompletedProcess(args, returncode, stdout=output, stderr="")
+
+    @staticmethod
+    def _read_output(stream, lines: queue.Queue) -> None:
+        """Forward shell output lines to the queue until EOF."""
+        try:
+            for line in iter(stream.readline, b""):
+                lines.put(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            lines.put(None)
+
+
+class ADBShellPool:
+    """
+    Keeps one persistent shell session per device serial.
+
+    Broken sessions are recreated once per command; if that also fails, or
+    the session cannot be started at all, the command falls back to a
+    one-shot ``adb shell`` subprocess.
+
+    Args:
+        adb_path: Path to ADB executable.
+    """
+
+    session_class = ADBShellSession
+
+    def __init__(self, adb_path: str = "adb"):
+        self.adb_path = adb_path
+        self._sessions: dict[str | None, ADBShellSession] = {}
+        self._lock = threading.Lock()
+
+    def get_session(self, device_id: str | None = None) -> ADBShellSession:
+        """Get or create the session for a device."""
+        with self._lock:
+            session = self._sessions.get(device_id)
+            if session is None:
+                session = self.session_class(device_id, self.adb_path)
+                self._sessions[device_id] = session
+            return session
+
+    def run(
+        self,
+        args: list[str],
+        device_id: str | None = None,
+        timeout: float | None = None,
+    ) -> subprocess.CompletedProcess:
+        """
+        Run a shell command on a device through its pooled session.
+
+        Args:
+            args: Command arguments to run in the device shell.
+            device_id: Optional ADB device ID.
+            timeout: Timeout in seconds.
+
+        Returns:
+            CompletedProcess with the command output and exit code.
+        """
+        for _ in range(2):
+            session = self.get_session(device_id)
+            try:
+                return session.run(args, timeout)
+            except ShellSessionError:
+                continue
+            except OSError:
+                break
+        return self._run_subprocess(args, device_id, timeout)
+
+    def _run_subprocess(
+        self, args: list[str], device_id: str | None, timeout: float | None
+    ) -> subprocess.CompletedProcess:
+        """Run a command with a one-shot process when no session is usable."""
+        return run_shell_subprocess(args, device_id, timeout, self.adb_path)
+
+    def close(self, device_id: str | None = None) -> None:
+        """Close the session for a single device."""
+        with self._lock:
+            session = self._sessions.pop(device_id, None)
+        if session is not None:
+            session.close()
+
+    def close_all(self) -> None:
+        """Close every pooled session."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+def run_shell_subprocess(
+    args: list[str],
+    device_id: str | None = None,
+    timeout: float | None = None,
+    adb_path: str = "adb",
+) -> subprocess.CompletedProcess:
+    """Run a shell command with a one-shot ``adb shell`` process."""
+    cmd = [adb_path]
+    if device_id:
+        cmd += ["-s", device_id]
+    return subprocess.run(
+        cmd + ["shell"] + list(args),
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        timeout=timeout,
+    )
+
+
+_SHELL_POOL = ADBShellPool()
+atexit.register(_SHELL_POOL.close_all)
+
+
+def get_shell_pool() -> ADBShellPool:
+    """Return the global shell session pool."""
+    return _SHELL_POOL
+
+
+def set_shell_pool_enabled(enabled: bool) -> None:
+    """Enable or disable persistent shell sessions globally."""
+    global _SHELL_POOL_ENABLED
+    _SHELL_POOL_ENABLED = enabled
+    if not enabled:
+        _SHELL_POOL.close_all()
+
+
+@traced("adb.shell")
+def run_shell_command(
+    args: list[str], device_id: str | None = None, timeout: float | None = None
+) -> subprocess.CompletedProcess:
+    """
+    Run a command in the device shell.
+
+    With the "wire" transport the command goes straight to the adb server
+    socket. Otherwise the persistent session pool is used when enabled, or a
+    one-shot ``adb shell`` subprocess.
+
+    Args:
+        args: Command arguments to run in the device shell.
+        device_id: Optional ADB device ID for multi-device setups.
+        timeout: Timeout in seconds.
+
+    Returns:
+        CompletedProcess with text output.
+    """
+    if _TRANSPORT == "wire":
+        return get_wire_client().shell(args, device_id, timeout)
+    if not _SHELL_POOL_ENABLED:
+        return run_shell_subprocess(args, device_id, timeout)
+    return _SHELL_POOL.run(args, device_id, timeout)
+
+
+_WIRE_CLIENT: ADBWireClient | None = None
+
+
+def get_wire_client() -> ADBWireClient:
+    """Return the global adb server client, creating it on first use."""
+    global _WIRE_CLIENT
+    if _WIRE_CLIENT is None:
+        _WIRE_CLIENT = ADBWireClient()
+    return _WIRE_CLIENT
+
+
+def get_transport() -> str:
+    """Return the active ADB transport ("cli" or "wire")."""
+    return _TRANSPORT
+
+
+def set_transport(transport: str) -> None:
+    """
+    Select how device I/O reaches the adb server.
+
+    Args:
+        transport: "cli" to run the adb executable, "wire" to talk to the
+            adb server socket directly.
+    """
+    global _TRANSPORT
+    transport = transport.lower()
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown ADB transport: {transport}")
+    _TRANSPORT = transport
+    if transport == "wire":
+        _SHELL_POOL.close_all()
+
+
+def claim_transport(transport: str) -> None:
+    """
+    Select the transport on behalf of a device factory.
+
+    The transport applies to every ADB device in the process, so the first
+    claim wins and later claims must ask for the same one.
+
+    Raises:
+        ValueError: If another factory already claimed a different transport.
+    """
+    global _CLAIMED_TRANSPORT
+    transport = transport.lower()
+    if _CLAIMED_TRANSPORT is not None and transport != _CLAIMED_TRANSPORT:
+        raise ValueError(
+            f"ADB transport {transport!r} conflicts with {_CLAIMED_TRANSPORT!r} "
+            "requested by another device factory; the transport is process-wide"
+        )
+    set_transport(transport)
+    _CLAIMED_TRANSPORT = transport
+
+
+def run_exec_out(
+    args: list[str], device_id: str | None = None, timeout: float | None = None
+) -> subprocess.CompletedProcess:
+    """
+    Run a command with binary-safe output, like ``adb exec-out``.
+
+    Returns:
+        CompletedProcess with bytes ``stdout`` and ``stderr``.
+    """
+    if _TRANSPORT == "wire":
+        data = get_wire_client().exec_out(args, device_id, timeout)
+        return subprocess.CompletedProcess(args, 0, stdout=data, stderr=b"")
+    cmd = ["adb"]
+    if device_id:
+        cmd += ["-s", device_id]
+    return subprocess.run(
+        cmd + ["exec-out"] + list(args), capture_output=True, timeout=timeout
+    )
+
+
+def pull_file(
+    remote: str,
+    local: str,
+    device_id: str | None = None,
+    timeout: float | None = None,
+) -> bool:
+    """
+    Copy a file from the device to the host.
+
+    Returns:
+        True if the transfer succeeded.
+    """
+    if _TRANSPORT == "wire":
+        try:
+            get_wire_client().pull(remote, local, device_id, timeout)
+        except ADBWireError:
+            return False
+        return True
+    cmd = ["adb"]
+    if device_id:
+        cmd += ["-s", device_id]
+    result = subprocess.run(
+        cmd + ["pull", remote, local], capture_output=True, text=True, timeout=timeout
+    )
+    return result.returncode == 0
+
+
+def list_device_serials() -> list[tuple[str, str]]:
+    """
+    Return (serial, state) pairs for every device the adb server knows.
+
+    Uses the adb server socket with the "wire" transport, otherwise parses
+    ``adb devices``.
+    """
+    if _TRANSPORT == "wire":
+        return get_wire_client().list_devices()
+    result = subprocess.run(
+        ["adb", "devices"], capture_output=True, text=True, timeout=5
+    )
+    devices = []
+    for line in result.stdout.strip().split("\n")[1:]:
+        parts = line.split()
+        if len(parts) >= 2:
+            devices.append((parts[0], parts[1]))
+    return devices
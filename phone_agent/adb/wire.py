@@ -0,0 +1,322 @@
+"""Client for the ADB server's smart-socket protocol.
+
+Talks directly to the local adb server (``127.0.0.1:5037`` by default)
+instead of spawning the ``adb`` executable for every command. Supports the
+host services ``host:devices``/``host:devices-l``/``host:connect``, device
+selection with ``host:transport``, ``shell`` (v2 with exit codes, falling
+back to v1) and ``exec`` streams, and ``sync`` pull/push.
+
+Requests are a 4-digit hex length followed by the service name; the server
+answers ``OKAY`` or ``FAIL`` plus a hex-length message.
+"""
+
+import os
+import socket
+import stat
+import struct
+import subprocess
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.getenv("ANDROID_ADB_SERVER_PORT", "5037"))
+
+# Shell protocol v2 packet ids
+_SHELL_STDOUT = 1
+_SHELL_STDERR = 2
+_SHELL_EXIT = 3
+_SHELL_CLOSE_STDIN = 4
+
+# Largest DATA packet the sync protocol accepts
+_SYNC_DATA_MAX = 64 * 1024
+
+
+class ADBWireError(RuntimeError):
+    """Raised when the adb server rejects a request or breaks the protocol."""
+
+
+class ADBWireClient:
+    """
+    Minimal ADB server client speaking the smart-socket protocol.
+
+    Every call opens its own connection to the server, so one client can be
+    shared between threads.
+
+    Args:
+        host: adb server host.
+        port: adb server port. Defaults to ANDROID_ADB_SERVER_PORT or 5037.
+        timeout: Default socket timeout in seconds.
+
+    Example:
+        >>> client = ADBWireClient()
+        >>> client.list_devices()
+        [('emulator-5554', 'device')]
+        >>> client.shell(["input", "keyevent", "4"], "emulator-5554")
+    """
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        timeout: float = 10.0,
+    ):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def devices(self, long: bool = False) -> str:
+        """
+        Return the raw device listing, as printed by ``adb devices [-l]``
+        without the header line.
+        """
+        return self._host_query("host:devices-l" if long else "host:devices")
+
+    def list_devices(self) -> list[tuple[str, str]]:
+        """Return (serial, state) pairs for every device the server knows."""
+        devices = []
+        for line in self.devices().splitlines():
+            parts = line.split()
+            if len(parts) >= 2:
+                devices.append((parts[0], parts[1]))
+        return devices
+
+    def connect(self, address: str) -> str:
+        """Ask the server to connect to a device over TCP/IP."""
+        return self._host_query(f"host:connect:{address}")
+
+    def shell(
+        self,
+        args: list[str],
+        device_id: str | None = None,
+        timeout: float | None = None,
+    ) -> subprocess.CompletedProcess:
+        """
+        Run a command in the device shell.
+
+        Args:
+            args: Command arguments, joined with spaces like ``adb shell``.
+            device_id: Optional device serial.
+            timeout: Timeout in seconds.
+
+        Returns:
+            CompletedProcess with text stdout/stderr and the exit code. Devices
+            without shell protocol v2 report merged output and exit code 0.
+        """
+        command = " ".join(args)
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            try:
+                sock = self._open_service(
+                    f"shell,v2,raw:{command}", device_id, timeout
+                )
+            except ADBWireError:
+                sock = None
+
+            if sock is None:
+                with self._open_service(f"shell:{command}", device_id, timeout) as sock:
+                    output = _recv_all(sock)
+                return subprocess.CompletedProcess(
+                    args, 0, stdout=_decode(output), stderr=""
+                )
+
+            with sock:
+                sock.sendall(struct.pack("<BI", _SHELL_CLOSE_STDIN, 0))
+                stdout, stderr, returncode = _read_shell_v2(sock)
+            return subprocess.CompletedProcess(
+                args, returncode, stdout=_decode(stdout), stderr=_decode(stderr)
+            )
+        except socket.timeout:
+            raise subprocess.TimeoutExpired(args, timeout)
+
+    def exec_out(
+        self,
+        args: list[str],
+        device_id: str | None = None,
+        timeout: float | None = None,
+    ) -> bytes:
+        """
+        Run a command with ``exec:`` and return its raw stdout.
+
+        Unlike ``shell:``, the stream is binary-safe, which suits
+        ``screencap -p``.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            with self._open_service(
+                f"exec:{' '.join(args)}", device_id, timeout
+            ) as sock:
+                return _recv_all(sock)
+        except socket.timeout:
+            raise subprocess.TimeoutExpired(args, timeout)
+
+    def pull(
+        self,
+        remote: str,
+        local: str,
+        device_id: str | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        Copy a file from the device with the sync protocol.
+
+        Raises:
+            ADBWireError: If the device refused the transfer. No partial file
+                is left behind.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        path = remote.encode("utf-8")
+        try:
+            with self._open_service("sync:", device_id, timeout) as sock:
+                sock.sendall(b"RECV" + struct.pack("<I", len(path)) + path)
+                try:
+                    with open(local, "wb") as f:
+                        while True:
+                            packet_id, length = _read_sync_header(sock)
+                            if packet_id == b"DATA":
+                                f.write(_recv_exact(sock, length))
+                            elif packet_id == b"DONE":
+                                break
+                            elif packet_id == b"FAIL":
+                                message = _recv_exact(sock, length)
+                                raise ADBWireError(_decode(message))
+                            else:
+                                raise ADBWireError(
+                                    f"Unexpected sync packet {packet_id!r}"
+                                )
+                except Exception:
+                    if os.path.exists(local):
+                        os.remove(local)
+                    raise
+                sock.sendall(b"QUIT" + struct.pack("<I", 0))
+        except socket.timeout:
+            raise subprocess.TimeoutExpired(["pull", remote, local], timeout)
+
+    def push(
+        self,
+        local: str,
+        remote: str,
+        device_id: str | None = None,
+        mode: int = 0o644,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        Copy a file to the device with the sync protocol.
+
+        Raises:
+            ADBWireError: If the device refused the transfer.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        spec = f"{remote},{stat.S_IFREG | mode}".encode("utf-8")
+        try:
+            with self._open_service("sync:", device_id, timeout) as sock:
+                sock.sendall(b"SEND" + struct.pack("<I", len(spec)) + spec)
+                with open(local, "rb") as f:
+                    while chunk := f.read(_SYNC_DATA_MAX):
+                        sock.sendall(b"DATA" + struct.pack("<I", len(chunk)) + chunk)
+                mtime = int(os.path.getmtime(local))
+                sock.sendall(b"DONE" + struct.pack("<I", mtime))
+
+                packet_id, length = _read_sync_header(sock)
+                if packet_id == b"FAIL":
+                    raise ADBWireError(_decode(_recv_exact(sock, length)))
+                if packet_id != b"OKAY":
+                    raise ADBWireError(f"Unexpected sync packet {packet_id!r}")
+                sock.sendall(b"QUIT" + struct.pack("<I", 0))
+        except socket.timeout:
+            raise subprocess.TimeoutExpired(["push", local, remote], timeout)
+
+    def _connect(self, timeout: float) -> socket.socket:
+        try:
+            return socket.create_connection((self.host, self.port), timeout=timeout)
+        except ConnectionRefusedError as e:
+            raise ADBWireError(
+                f"adb server not reachable at {self.host}:{self.port}: {e}"
+            )
+
+    def _host_query(self, service: str) -> str:
+        with self._connect(self.timeout) as sock:
+            _send_request(sock, service)
+            return _decode(_read_hex_payload(sock))
+
+    def _open_service(
+        self, service: str, device_id: str | None, timeout: float
+    ) -> socket.socket:
+        """Connect, select the device and start a device service."""
+        sock = self._connect(timeout)
+        try:
+            if device_id:
+                _send_request(sock, f"host:transport:{device_id}")
+            else:
+                _send_request(sock, "host:transport-any")
+            _send_request(sock, service)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+
+def _send_request(sock: socket.socket, service: str) -> None:
+    """Send one smart-socket request and wait for OKAY."""
+    data = service.encode("utf-8")
+    sock.sendall(b"%04x" % len(data) + data)
+    status = _recv_exact(sock, 4)
+    if status == b"OKAY":
+        return
+    if status == b"FAIL":
+        raise ADBWireError(_decode(_read_hex_payload(sock)))
+    raise ADBWireError(f"Unexpected response {status!r} to {service}")
+
+
+def _read_hex_payload(sock: socket.socket) -> bytes:
+    length = int(_recv_exact(sock, 4), 16)
+    return _recv_exact(sock, length)
+
+
+def _read_sync_header(sock: socket.socket) -> tuple[bytes, int]:
+    header = _recv_exact(sock, 8)
+    return header[:4], struct.unpack("<I", header[4:])[0]
+
+
+def _read_shell_v2(sock: socket.socket) -> tuple[bytes, bytes, int]:
+    """Collect stdout, stderr and the exit code of a shell v2 stream."""
+    stdout = bytearray()
+    stderr = bytearray()
+    returncode = 0
+    while True:
+        header = _recv_exact(sock, 5, allow_eof=True)
+        if not header:
+            break
+        packet_id, length = struct.unpack("<BI", header)
+        payload = _recv_exact(sock, length)
+        if packet_id == _SHELL_STDOUT:
+            stdout += payload
+        elif packet_id == _SHELL_STDERR:
+            stderr += payload
+        elif packet_id == _SHELL_EXIT:
+            returncode = payload[0] if payload else 0
+            break
+    return bytes(stdout), bytes(stderr), returncode
+
+
+def _recv_exact(sock: socket.socket, size: int, allow_eof: bool = False) -> bytes:
+    """Read exactly ``size`` bytes; with ``allow_eof`` a clean EOF returns b""."""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(remaining)
+        if not chunk:
+            if allow_eof and remaining == size:
+                return b""
+            raise ADBWireError("Connection closed by adb server")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_all(sock: socket.socket) -> bytes:
+    chunks = []
+    while chunk := sock.recv(65536):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _decode(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace")
@@ -2,17 +2,33 @@
 
 import json
 import logging
+import threading
+import time
 import traceback
-from dataclasses import dataclass
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from typing import Any, Callable
 
 from phone_agent.actions import ActionHandler
 from phone_agent.actions.handler import do, finish, parse_action
-from phone_agent.config import get_messages, get_system_prompt
-from phone_agent.device_factory import get_device_factory
+from phone_agent.config import get_message, get_messages, get_system_prompt
+from phone_agent.context_window import ContextWindow, ContextWindowConfig
+from phone_agent.decision_cache import (
+    CachedDecision,
+    DecisionCache,
+    DecisionCacheSession,
+    perceptual_hash,
+)
+from phone_agent.device_factory import DeviceFactory
 from phone_agent.events import emit_agent_event, new_run_id
+from phone_agent.flight_recorder import get_flight_recorder
+from phone_agent.imaging import ImageEncodingConfig, Screenshot, encode_screenshot
+from phone_agent.macro import MacroLibrary, MacroRecorder
 from phone_agent.model import ModelClient, ModelConfig
-from phone_agent.model.client import MessageBuilder
+from phone_agent.model.client import MessageBuilder, ModelResponse
+from phone_agent.observation import ObservationStage
+from phone_agent.stall_detector import ABORT, StallDetector, StallDetectorConfig
+from phone_agent.tracing import Tracer, activate, span
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +42,14 @@ class AgentConfig:
     lang: str = "cn"
     system_prompt: str | None = None
     verbose: bool = True
+    image_encoding: ImageEncodingConfig = field(default_factory=ImageEncodingConfig)
+    parallel_observation: bool = True  # Capture screenshot and app concurrently
+    prefetch_observation: bool = False  # Start the next capture once the screen settles
+    decision_cache: DecisionCache | None = None  # Reuse decisions for known screens
+    macro_library: MacroLibrary | None = None  # Record successful runs as macros
+    stall_detection: StallDetectorConfig | None = None  # Hint or abort on loops
+    tracer: Tracer | None = None  # Record per-phase latency spans of each run
+    context_window: ContextWindowConfig = field(default_factory=ContextWindowConfig)
 
     def __post_init__(self):
         if self.system_prompt is None:
@@ -41,6 +65,8 @@ class StepResult:
     action: dict[str, Any] | None
     thinking: str
     message: str | None = None
+    timings: dict[str, float] = field(default_factory=dict)
+    reason: str | None = None  # "stalled" when the stall detector ended the run
 
 
 class PhoneAgent:
@@ -55,6 +81,8 @@ class PhoneAgent:
         agent_config: Configuration for the agent behavior.
         confirmation_callback: Optional callback for sensitive action confirmation.
         takeover_callback: Optional callback for takeover requests.
+        device_factory: Device factory for this agent's device. Defaults to
+            the global factory from get_device_factory().
 
     Example:
         >>> from phone_agent import PhoneAgent
@@ -71,6 +99,7 @@ class PhoneAgent:
         agent_config: AgentConfig | None = None,
         confirmation_callback: Callable[[str], bool] | None = None,
         takeover_callback: Callable[[str], None] | None = None,
+        device_factory: DeviceFactory | None = None,
     ):
         self.model_config = model_config or ModelConfig()
         self.agent_config = agent_config or AgentConfig()
@@ -80,23 +109,52 @@ class PhoneAgent:
             device_id=self.agent_config.device_id,
             confirmation_callback=confirmation_callback,
             takeover_callback=takeover_callback,
+            device_factory=device_factory,
+        )
+
+        self._observer = ObservationStage(
+            lambda: self.action_handler.device_factory.get_screenshot(
+                self.agent_config.device_id
+            ),
+            lambda: self.action_handler.device_factory.get_current_app(
+                self.agent_config.device_id
+            ),
+            parallel=self.agent_config.parallel_observation,
         )
 
         self._context: list[dict[str, Any]] = []
+        self._context_window = ContextWindow(self.agent_config.context_window)
+        self._decisions: DecisionCacheSession | None = None
+        self._macro: MacroRecorder | None = None
+        self.stall_detector: StallDetector | None = None
+        if self.agent_config.stall_detection is not None:
+            self.stall_detector = StallDetector(self.agent_config.stall_detection)
+        self._stall_hint: str | None = None
         self._step_count = 0
+        self._stop_requested = threading.Event()
 
-    def run(self, task: str) -> str:
+    def run(self, task: str, macro_intent: str | None = None) -> str:
         """
         Run the agent to complete a task.
 
         Args:
             task: Natural language description of the task.
+            macro_intent: Key the run is recorded under when
+                ``macro_library`` is set. Defaults to the task.
 
         Returns:
             Final message from the agent.
         """
         self._context = []
         self._step_count = 0
+        self._observer.discard()
+        library = self.agent_config.macro_library
+        self._macro = None
+        if library is not None:
+            self._macro = library.recorder(macro_intent or task)
+        self._stall_hint = None
+        if self.stall_detector is not None:
+            self.stall_detector.start(self.agent_config.max_steps)
         run_id = new_run_id()
         emit_agent_event(
             "run_started",
@@ -105,31 +163,53 @@ class PhoneAgent:
             run_id=run_id,
         )
 
+        tracer = self.agent_config.tracer
+        # Only this run's context sees the tracer, not other agents' threads
+        tracing = activate(tracer, run_id) if tracer is not None else nullcontext()
+        try:
+            with tracing:
+                try:
+                    with span("run", task=task):
+                        return self._run_steps(task, run_id)
+                finally:
+                    self._stop_requested.clear()
+                    # Also stops the probe workers so idle agents hold no threads
+                    self._observer.close()
+                    self.action_handler.release_keyboard()
+        finally:
+            if tracer is not None:
+                emit_agent_event(
+                    "trace_summary",
+                    {"spans": [s.to_dict() for s in tracer.summary(run_id)]},
+                    source="phone_agent.agent",
+                    run_id=run_id,
+                )
+
+    def _run_steps(self, task: str, run_id: str) -> str:
+        """Step until the task finishes or max_steps is reached."""
         # First step with user prompt
         result = self._execute_step(task, is_first=True, run_id=run_id)
 
         if result.finished:
-            emit_agent_event(
-                "run_finished",
-                {"message": result.message or "Task completed", "success": result.success},
-                source="phone_agent.agent",
-                run_id=run_id,
-                step=self._step_count,
-            )
+            self._emit_run_finished(result, run_id)
             return result.message or "Task completed"
 
-        # Continue until finished or max steps reached
+        # Continue until finished, stopped or max steps reached
         while self._step_count < self.agent_config.max_steps:
-            result = self._execute_step(is_first=False, run_id=run_id)
-
-            if result.finished:
+            if self._stop_requested.is_set():
                 emit_agent_event(
                     "run_finished",
-                    {"message": result.message or "Task completed", "success": result.success},
+                    {"message": "Task stopped", "success": False},
                     source="phone_agent.agent",
                     run_id=run_id,
                     step=self._step_count,
                 )
+                return "Task stopped"
+
+            result = self._execute_step(is_first=False, run_id=run_id)
+
+            if result.finished:
+                self._emit_run_finished(result, run_id)
                 return result.message or "Task completed"
 
         emit_agent_event(
@@ -160,10 +240,26 @@ class PhoneAgent:
 
         return self._execute_step(task, is_first)
 
+    def request_stop(self) -> None:
+        """
+        Ask the current or next ``run`` to stop before its next step.
+
+        Safe to call from another thread; the step in progress completes.
+        The request is dropped when the run ends or the agent is reset.
+        """
+        self._stop_requested.set()
+
     def reset(self) -> None:
         """Reset the agent state for a new task."""
         self._context = []
+        self._context_window.reset()
+        self._decisions = None
+        self._macro = None
+        self._stall_hint = None
         self._step_count = 0
+        self._stop_requested.clear()
+        self._observer.close()
+        self.action_handler.release_keyboard()
 
     def _execute_step(
         self,
@@ -172,6 +268,12 @@ class PhoneAgent:
         run_id: str | None = None,
     ) -> StepResult:
         """Execute a single step of the agent loop."""
+        with span("step", step=self._step_count + 1):
+            return self._execute_step_phases(user_prompt, is_first, run_id)
+
+    def _execute_step_phases(
+        self, user_prompt: str | None, is_first: bool, run_id: str | None
+    ) -> StepResult:
         self._step_count += 1
         emit_agent_event(
             "step_started",
@@ -182,61 +284,95 @@ class PhoneAgent:
         )
 
         # Capture current screen state
-        device_factory = get_device_factory()
-        screenshot = device_factory.get_screenshot(self.agent_config.device_id)
-        current_app = device_factory.get_current_app(self.agent_config.device_id)
+        with span("observe"):
+            observation = self._observer.observe()
+        screenshot = observation.screenshot
+        current_app = observation.current_app
+        if self._macro is not None:
+            self._macro.observe(screenshot, current_app)
+        recorder = get_flight_recorder()
+        if recorder is not None and recorder.records_screenshots:
+            if not screenshot.is_sensitive:
+                recorder.record_screenshot(
+                    screenshot.image_data, run_id, self._step_count
+                )
 
-        # Build messages
+        # Serve a known screen from the decision cache
         if is_first:
-            self._context.append(
-                MessageBuilder.create_system_message(self.agent_config.system_prompt)
+            cache = self.agent_config.decision_cache
+            self._decisions = cache.session(user_prompt) if cache is not None else None
+        with span("decision_cache"):
+            screen_hash, cached = self._lookup_decision(
+                screenshot, current_app, run_id
             )
 
-            screen_info = MessageBuilder.build_screen_info(current_app)
-            text_content = f"{user_prompt}\n\n{screen_info}"
+        # Encode the image payload sent to the model
+        image_url = None
+        if cached is None:
+            with span("encode_screenshot"):
+                image_url = self._encode_screenshot(screenshot, run_id).data_url
 
-            self._context.append(
-                MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
-                )
-            )
-        else:
-            screen_info = MessageBuilder.build_screen_info(current_app)
-            text_content = f"** Screen Info **\n\n{screen_info}"
+        # Build messages
+        with span("build_messages"):
+            self._append_user_message(user_prompt, is_first, current_app, image_url)
 
-            self._context.append(
-                MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
-                )
+        prompt_tokens = None
+        if cached is not None:
+            response = ModelResponse(
+                thinking=cached.thinking, action=cached.action, raw_content=cached.action
             )
-
-        # Get model response
-        try:
-            self.model_client.set_event_context(run_id=run_id, step=self._step_count)
-            response = self.model_client.request(self._context)
-        except Exception as e:
-            if self.agent_config.verbose:
-                traceback.print_exc()
-            logger.exception("Model error")
+        else:
+            # Keep the prompt within the context window
+            with span("context_fit"):
+                prompt_stats = self._context_window.fit(self._context)
+            prompt_tokens = prompt_stats.estimated_tokens
             emit_agent_event(
-                "error",
-                {"stage": "model_request", "message": str(e)},
+                "prompt_stats",
+                prompt_stats.to_dict(),
                 source="phone_agent.agent",
-                level="error",
                 run_id=run_id,
                 step=self._step_count,
             )
-            return StepResult(
-                success=False,
-                finished=True,
-                action=None,
-                thinking="",
-                message=f"Model error: {e}",
-            )
+
+            # Get model response
+            try:
+                self.model_client.set_event_context(run_id=run_id, step=self._step_count)
+                request_start = time.perf_counter()
+                with span("model_request"):
+                    response = self.model_client.request(self._context)
+            except Exception as e:
+                if self.agent_config.verbose:
+                    traceback.print_exc()
+                logger.exception("Model error")
+                emit_agent_event(
+                    "error",
+                    {"stage": "model_request", "message": str(e)},
+                    source="phone_agent.agent",
+                    level="error",
+                    run_id=run_id,
+                    step=self._step_count,
+                )
+                return StepResult(
+                    success=False,
+                    finished=True,
+                    action=None,
+                    thinking="",
+                    message=f"Model error: {e}",
+                    timings=observation.timings,
+                )
+            if self._decisions is not None and screen_hash is not None:
+                self._decisions.record(
+                    current_app,
+                    screen_hash,
+                    response.thinking,
+                    response.action,
+                    time.perf_counter() - request_start,
+                )
 
         # Parse action from response
         try:
-            action = parse_action(response.action)
+            with span("parse_action"):
+                action = parse_action(response.action)
         except ValueError:
             if self.agent_config.verbose:
                 traceback.print_exc()
@@ -253,11 +389,20 @@ class PhoneAgent:
         # Remove image from context to save space
         self._context[-1] = MessageBuilder.remove_images_from_message(self._context[-1])
 
-        # Execute action
+        # Stop paying for a model that keeps repeating itself
+        if self._check_stall(
+            screenshot, current_app, screen_hash, action, prompt_tokens, run_id
+        ):
+            return self._abort_stalled(action, response, observation.timings, run_id)
+
+        # Execute action; the next capture starts once its screen settles
+        prefetch = self.agent_config.prefetch_observation
+        settled = self._observer.prefetch_when_settled() if prefetch else nullcontext()
         try:
-            result = self.action_handler.execute(
-                action, screenshot.width, screenshot.height
-            )
+            with span("execute_action"), settled:
+                result = self.action_handler.execute(
+                    action, screenshot.width, screenshot.height
+                )
         except Exception as e:
             if self.agent_config.verbose:
                 traceback.print_exc()
@@ -274,6 +419,25 @@ class PhoneAgent:
                 finish(message=str(e)), screenshot.width, screenshot.height
             )
 
+        self._context_window.record(
+            self._step_count, current_app, action, result.success, result.message
+        )
+        if self._macro is not None:
+            self._macro.record(action, result.success)
+
+        # Check if finished
+        finished = action.get("_metadata") == "finish" or result.should_finish
+        completed = action.get("_metadata") == "finish" and result.success
+        if finished and self._decisions is not None:
+            self._decisions.finish(completed)
+        if finished and self._macro is not None:
+            self._macro.finish(completed, result.message or action.get("message"))
+            self._macro = None
+
+        # Actions without a settled wait capture the next screen from here
+        if not finished and prefetch:
+            self._observer.prefetch()
+
         emit_agent_event(
             "action_executed",
             {
@@ -293,9 +457,6 @@ class PhoneAgent:
             )
         )
 
-        # Check if finished
-        finished = action.get("_metadata") == "finish" or result.should_finish
-
         emit_agent_event(
             "result",
             {
@@ -315,7 +476,162 @@ class PhoneAgent:
             action=action,
             thinking=response.thinking,
             message=result.message or action.get("message"),
+            timings=observation.timings,
+        )
+
+    def _append_user_message(
+        self,
+        user_prompt: str | None,
+        is_first: bool,
+        current_app: str,
+        image_url: str | None,
+    ) -> None:
+        """Add the step's user message, after the system prompt on the first step."""
+        if is_first:
+            self._context_window.start(user_prompt)
+            self._context.append(
+                MessageBuilder.create_system_message(self.agent_config.system_prompt)
+            )
+
+            screen_info = MessageBuilder.build_screen_info(current_app)
+            text_content = f"{user_prompt}\n\n{screen_info}"
+        else:
+            screen_info = MessageBuilder.build_screen_info(current_app)
+            text_content = f"** Screen Info **\n\n{screen_info}"
+            if self._stall_hint is not None:
+                text_content = f"{text_content}\n\n{self._stall_hint}"
+                self._stall_hint = None
+
+        self._context.append(
+            MessageBuilder.create_user_message(text=text_content, image_url=image_url)
+        )
+
+    def _emit_run_finished(self, result: StepResult, run_id: str) -> None:
+        payload = {
+            "message": result.message or "Task completed",
+            "success": result.success,
+        }
+        if result.reason is not None:
+            payload["reason"] = result.reason
+        emit_agent_event(
+            "run_finished",
+            payload,
+            source="phone_agent.agent",
+            run_id=run_id,
+            step=self._step_count,
+        )
+
+    def _check_stall(
+        self,
+        screenshot: Screenshot,
+        current_app: str,
+        screen_hash: int | None,
+        action: dict[str, Any],
+        prompt_tokens: int | None,
+        run_id: str | None,
+    ) -> bool:
+        """Feed the step to the stall detector; True when the run must abort."""
+        if self.stall_detector is None or action.get("_metadata") == "finish":
+            return False
+        if screen_hash is None and not screenshot.is_sensitive:
+            screen_hash = perceptual_hash(screenshot.image_data)
+        stall = self.stall_detector.observe(
+            screen_hash, current_app, action, prompt_tokens
+        )
+        if stall is None:
+            return False
+        emit_agent_event(
+            "stall_detected",
+            {
+                "kind": stall.kind,
+                "period": stall.period,
+                "repeats": stall.repeats,
+                "decision": stall.decision,
+                **self.stall_detector.stats.to_dict(),
+            },
+            source="phone_agent.agent",
+            level="warning",
+            run_id=run_id,
+            step=self._step_count,
+        )
+        if stall.decision == ABORT:
+            return True
+        self._stall_hint = get_message("stall_hint", self.agent_config.lang)
+        return False
+
+    def _abort_stalled(
+        self,
+        action: dict[str, Any],
+        response: ModelResponse,
+        timings: dict[str, float],
+        run_id: str | None,
+    ) -> StepResult:
+        """End the run without executing the repeated action."""
+        message = get_message("stall_aborted", self.agent_config.lang)
+        if self._decisions is not None:
+            self._decisions.finish(False)
+        self._macro = None
+        emit_agent_event(
+            "result",
+            {
+                "finished": True,
+                "success": False,
+                "message": message,
+                "action": json.dumps(action, ensure_ascii=False),
+            },
+            source="phone_agent.agent",
+            run_id=run_id,
+            step=self._step_count,
+        )
+        return StepResult(
+            success=False,
+            finished=True,
+            action=action,
+            thinking=response.thinking,
+            message=message,
+            timings=timings,
+            reason="stalled",
+        )
+
+    def _lookup_decision(
+        self, screenshot: Screenshot, current_app: str, run_id: str | None
+    ) -> tuple[int | None, CachedDecision | None]:
+        """Check the previous cached step's progress and look up this screen."""
+        if self._decisions is None or screenshot.is_sensitive:
+            return None, None
+        screen_hash, cached = self._decisions.observe(screenshot.image_data, current_app)
+        emit_agent_event(
+            "decision_cache",
+            {"hit": cached is not None, **self._decisions.cache.stats.to_dict()},
+            source="phone_agent.agent",
+            run_id=run_id,
+            step=self._step_count,
+        )
+        return screen_hash, cached
+
+    def _encode_screenshot(
+        self, screenshot: Screenshot, run_id: str | None
+    ) -> Screenshot:
+        """Encode the screenshot for the model and emit size/latency metrics."""
+        start_time = time.perf_counter()
+        payload = encode_screenshot(screenshot, self.agent_config.image_encoding)
+        encode_time = time.perf_counter() - start_time
+
+        emit_agent_event(
+            "screenshot_encoded",
+            {
+                "mime_type": payload.mime_type,
+                "width": payload.width,
+                "height": payload.height,
+                "original_bytes": screenshot.byte_size,
+                "encoded_bytes": payload.byte_size,
+                "encode_time": round(encode_time, 4),
+            },
+            source="phone_agent.agent",
+            run_id=run_id,
+            step=self._step_count,
         )
+        return payload
 
     @property
     def context(self) -> list[dict[str, Any]]:
@@ -0,0 +1,375 @@
+"""AsyncPhoneAgent: PhoneAgent on asyncio device, model and event I/O."""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import traceback
+from contextlib import nullcontext
+from typing import Any, Awaitable, Callable
+
+from phone_agent.actions import AsyncActionHandler
+from phone_agent.actions.handler import finish, parse_action
+from phone_agent.agent import AgentConfig, StepResult
+from phone_agent.context_window import ContextWindow
+from phone_agent.device_factory import AsyncDeviceFactory
+from phone_agent.events import emit_agent_event_async, new_run_id
+from phone_agent.imaging import Screenshot, encode_screenshot
+from phone_agent.model import AsyncModelClient, ModelConfig
+from phone_agent.model.client import MessageBuilder
+from phone_agent.observation import AsyncObservationStage
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPhoneAgent:
+    """
+    Coroutine-based agent that behaves like PhoneAgent.
+
+    Device calls run as asyncio subprocesses, the model is streamed through
+    AsyncOpenAI and events are emitted with ``emit_agent_event_async``, so a
+    single event loop can drive many runs concurrently. Steps, context and
+    events are the same as PhoneAgent's.
+
+    Args:
+        model_config: Configuration for the AI model.
+        agent_config: Configuration for the agent behavior.
+        confirmation_callback: Optional callback (plain or coroutine) for
+            sensitive action confirmation.
+        takeover_callback: Optional callback (plain or coroutine) for
+            takeover requests.
+        device_factory: Async device factory for this agent's device.
+            Defaults to an ADB AsyncDeviceFactory.
+
+    Example:
+        >>> agent = AsyncPhoneAgent(ModelConfig(base_url="http://localhost:8000/v1"))
+        >>> await asyncio.gather(agent.run("Open WeChat"), other.run("Open Maps"))
+    """
+
+    def __init__(
+        self,
+        model_config: ModelConfig | None = None,
+        agent_config: AgentConfig | None = None,
+        confirmation_callback: Callable[[str], bool | Awaitable[bool]] | None = None,
+        takeover_callback: Callable[[str], None | Awaitable[None]] | None = None,
+        device_factory: AsyncDeviceFactory | None = None,
+    ):
+        self.model_config = model_config or ModelConfig()
+        self.agent_config = agent_config or AgentConfig()
+
+        self.model_client = AsyncModelClient(self.model_config)
+        self.action_handler = AsyncActionHandler(
+            device_id=self.agent_config.device_id,
+            confirmation_callback=confirmation_callback,
+            takeover_callback=takeover_callback,
+            device_factory=device_factory,
+        )
+
+        self._observer = AsyncObservationStage(
+            lambda: self.action_handler.device_factory.get_screenshot(
+                self.agent_config.device_id
+            ),
+            lambda: self.action_handler.device_factory.get_current_app(
+                self.agent_config.device_id
+            ),
+            parallel=self.agent_config.parallel_observation,
+        )
+
+        self._context: list[dict[str, Any]] = []
+        self._context_window = ContextWindow(self.agent_config.context_window)
+        self._step_count = 0
+        self._stop_requested = threading.Event()
+
+    async def run(self, task: str) -> str:
+        """
+        Run the agent to complete a task.
+
+        Args:
+            task: Natural language description of the task.
+
+        Returns:
+            Final message from the agent.
+        """
+        self._context = []
+        self._step_count = 0
+        self._observer.discard()
+        run_id = new_run_id()
+        await self._emit("run_started", {"task": task}, run_id, None)
+
+        try:
+            return await self._run_steps(task, run_id)
+        finally:
+            self._stop_requested.clear()
+            self._observer.discard()
+            await self.action_handler.release_keyboard()
+
+    async def _run_steps(self, task: str, run_id: str) -> str:
+        """Step until the task finishes or max_steps is reached."""
+        result = await self._execute_step(task, is_first=True, run_id=run_id)
+
+        while not result.finished:
+            if self._step_count >= self.agent_config.max_steps:
+                return await self._finish_run(run_id, "Max steps reached", False)
+            if self._stop_requested.is_set():
+                return await self._finish_run(run_id, "Task stopped", False)
+            result = await self._execute_step(is_first=False, run_id=run_id)
+
+        return await self._finish_run(
+            run_id, result.message or "Task completed", result.success
+        )
+
+    async def _finish_run(self, run_id: str, message: str, success: bool) -> str:
+        await self._emit(
+            "run_finished",
+            {"message": message, "success": success},
+            run_id,
+            self._step_count,
+        )
+        return message
+
+    async def step(self, task: str | None = None) -> StepResult:
+        """
+        Execute a single step of the agent.
+
+        Args:
+            task: Task description (only needed for first step).
+
+        Returns:
+            StepResult with step details.
+        """
+        is_first = len(self._context) == 0
+
+        if is_first and not task:
+            raise ValueError("Task is required for the first step")
+
+        return await self._execute_step(task, is_first)
+
+    def request_stop(self) -> None:
+        """
+        Ask the current or next ``run`` to stop before its next step.
+
+        Safe to call from any thread; the step in progress completes.
+        The request is dropped when the run ends or the agent is reset.
+        """
+        self._stop_requested.set()
+
+    async def reset(self) -> None:
+        """Reset the agent state for a new task."""
+        self._context = []
+        self._context_window.reset()
+        self._step_count = 0
+        self._stop_requested.clear()
+        self._observer.discard()
+        await self.action_handler.release_keyboard()
+
+    async def _emit(
+        self,
+        event_type: str,
+        payload: dict[str, Any],
+        run_id: str | None,
+        step: int | None,
+        level: str = "info",
+    ) -> None:
+        await emit_agent_event_async(
+            event_type,
+            payload,
+            source="phone_agent.agent",
+            level=level,
+            run_id=run_id,
+            step=step,
+        )
+
+    async def _execute_step(
+        self,
+        user_prompt: str | None = None,
+        is_first: bool = False,
+        run_id: str | None = None,
+    ) -> StepResult:
+        """Execute a single step of the agent loop."""
+        self._step_count += 1
+        step = self._step_count
+        await self._emit(
+            "step_started",
+            {"is_first": is_first, "prompt": user_prompt if is_first else ""},
+            run_id,
+            step,
+        )
+
+        # Capture current screen state
+        observation = await self._observer.observe()
+        screenshot = observation.screenshot
+        current_app = observation.current_app
+
+        # Encode the image payload sent to the model
+        payload = await self._encode_screenshot(screenshot, run_id)
+
+        # Build messages
+        screen_info = MessageBuilder.build_screen_info(current_app)
+        if is_first:
+            self._context_window.start(user_prompt)
+            self._context.append(
+                MessageBuilder.create_system_message(self.agent_config.system_prompt)
+            )
+            text_content = f"{user_prompt}\n\n{screen_info}"
+        else:
+            text_content = f"** Screen Info **\n\n{screen_info}"
+        self._context.append(
+            MessageBuilder.create_user_message(
+                text=text_content, image_url=payload.data_url
+            )
+        )
+
+        # Keep the prompt within the context window
+        prompt_stats = self._context_window.fit(self._context)
+        await self._emit("prompt_stats", prompt_stats.to_dict(), run_id, step)
+
+        # Get model response
+        try:
+            self.model_client.set_event_context(run_id=run_id, step=step)
+            response = await self.model_client.request(self._context)
+        except Exception as e:
+            if self.agent_config.verbose:
+                traceback.print_exc()
+            logger.exception("Model error")
+            await self._emit(
+                "error",
+                {"stage": "model_request", "message": str(e)},
+                run_id,
+                step,
+                level="error",
+            )
+            return StepResult(
+                success=False,
+                finished=True,
+                action=None,
+                thinking="",
+                message=f"Model error: {e}",
+                timings=observation.timings,
+            )
+
+        # Parse action from response
+        try:
+            action = parse_action(response.action)
+        except ValueError:
+            if self.agent_config.verbose:
+                traceback.print_exc()
+            action = finish(message=response.action)
+
+        await self._emit(
+            "action_decoded",
+            {"action": action, "thinking": response.thinking},
+            run_id,
+            step,
+        )
+
+        # Remove image from context to save space
+        self._context[-1] = MessageBuilder.remove_images_from_message(self._context[-1])
+
+        # Execute action; the next capture starts once its screen settles
+        prefetch = self.agent_config.prefetch_observation
+        settled = self._observer.prefetch_when_settled() if prefetch else nullcontext()
+        try:
+            with settled:
+                result = await self.action_handler.execute(
+                    action, screenshot.width, screenshot.height
+                )
+        except Exception as e:
+            if self.agent_config.verbose:
+                traceback.print_exc()
+            logger.exception("Action execute error")
+            await self._emit(
+                "error",
+                {"stage": "action_execute", "message": str(e)},
+                run_id,
+                step,
+                level="error",
+            )
+            result = await self.action_handler.execute(
+                finish(message=str(e)), screenshot.width, screenshot.height
+            )
+
+        self._context_window.record(
+            step, current_app, action, result.success, result.message
+        )
+
+        # Check if finished
+        finished = action.get("_metadata") == "finish" or result.should_finish
+
+        # Actions without a settled wait capture the next screen from here
+        if not finished and prefetch:
+            self._observer.prefetch()
+
+        await self._emit(
+            "action_executed",
+            {
+                "success": result.success,
+                "message": result.message,
+                "should_finish": result.should_finish,
+            },
+            run_id,
+            step,
+        )
+
+        # Add assistant response to context
+        self._context.append(
+            MessageBuilder.create_assistant_message(
+                f"<think>{response.thinking}</think><answer>{response.action}</answer>"
+            )
+        )
+
+        await self._emit(
+            "result",
+            {
+                "finished": finished,
+                "success": result.success,
+                "message": result.message or action.get("message"),
+                "action": json.dumps(action, ensure_ascii=False),
+            },
+            run_id,
+            step,
+        )
+
+        return StepResult(
+            success=result.success,
+            finished=finished,
+            action=action,
+            thinking=response.thinking,
+            message=result.message or action.get("message"),
+            timings=observation.timings,
+        )
+
+    async def _encode_screenshot(
+        self, screenshot: Screenshot, run_id: str | None
+    ) -> Screenshot:
+        """Encode the screenshot off the loop and emit size/latency metrics."""
+        start_time = time.perf_counter()
+        payload = await asyncio.to_thread(
+            encode_screenshot, screenshot, self.agent_config.image_encoding
+        )
+        encode_time = time.perf_counter() - start_time
+
+        await self._emit(
+            "screenshot_encoded",
+            {
+                "mime_type": payload.mime_type,
+                "width": payload.width,
+                "height": payload.height,
+                "original_bytes": screenshot.byte_size,
+                "encoded_bytes": payload.byte_size,
+                "encode_time": round(encode_time, 4),
+            },
+            run_id,
+            self._step_count,
+        )
+        return payload
+
+    @property
+    def context(self) -> list[dict[str, Any]]:
+        """Get the current conversation context."""
+        return self._context.copy()
+
+    @property
+    def step_count(self) -> int:
+        """Get the current step count."""
+        return self._step_count
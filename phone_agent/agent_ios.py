@@ -2,17 +2,28 @@
 
 import json
 import logging
+import threading
+import time
 import traceback
-from dataclasses import dataclass
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from typing import Any, Callable
 
 from phone_agent.actions.handler import do, finish, parse_action
 from phone_agent.actions.handler_ios import IOSActionHandler
 from phone_agent.config import get_system_prompt
+from phone_agent.context_window import ContextWindow, ContextWindowConfig
 from phone_agent.events import emit_agent_event, new_run_id
+from phone_agent.imaging import ImageEncodingConfig, Screenshot, encode_screenshot
 from phone_agent.model import ModelClient, ModelConfig
 from phone_agent.model.client import MessageBuilder
-from phone_agent.xctest import XCTestConnection, get_current_app, get_screenshot
+from phone_agent.observation import ObservationStage
+from phone_agent.xctest import (
+    XCTestConnection,
+    enable_mjpeg,
+    get_current_app,
+    get_screenshot,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +39,11 @@ class IOSAgentConfig:
     lang: str = "cn"
     system_prompt: str | None = None
     verbose: bool = True
+    image_encoding: ImageEncodingConfig = field(default_factory=ImageEncodingConfig)
+    parallel_observation: bool = True  # Capture screenshot and app concurrently
+    prefetch_observation: bool = False  # Start the next capture once the screen settles
+    context_window: ContextWindowConfig = field(default_factory=ContextWindowConfig)
+    mjpeg_url: str | None = None  # Take screenshots from this WDA MJPEG stream
 
     def __post_init__(self):
         if self.system_prompt is None:
@@ -43,6 +59,7 @@ class StepResult:
     action: dict[str, Any] | None
     thinking: str
     message: str | None = None
+    timings: dict[str, float] = field(default_factory=dict)
 
 
 class IOSPhoneAgent:
@@ -101,6 +118,9 @@ class IOSPhoneAgent:
                     level="warning",
                 )
 
+        if self.agent_config.mjpeg_url:
+            enable_mjpeg(self.agent_config.wda_url, self.agent_config.mjpeg_url)
+
         self.action_handler = IOSActionHandler(
             wda_url=self.agent_config.wda_url,
             session_id=self.agent_config.session_id,
@@ -108,8 +128,23 @@ class IOSPhoneAgent:
             takeover_callback=takeover_callback,
         )
 
+        self._observer = ObservationStage(
+            lambda: get_screenshot(
+                wda_url=self.agent_config.wda_url,
+                session_id=self.agent_config.session_id,
+                device_id=self.agent_config.device_id,
+            ),
+            lambda: get_current_app(
+                wda_url=self.agent_config.wda_url,
+                session_id=self.agent_config.session_id,
+            ),
+            parallel=self.agent_config.parallel_observation,
+        )
+
         self._context: list[dict[str, Any]] = []
+        self._context_window = ContextWindow(self.agent_config.context_window)
         self._step_count = 0
+        self._stop_requested = threading.Event()
 
     def run(self, task: str) -> str:
         """
@@ -123,6 +158,7 @@ class IOSPhoneAgent:
         """
         self._context = []
         self._step_count = 0
+        self._observer.discard()
         run_id = new_run_id()
         emit_agent_event(
             "run_started",
@@ -131,6 +167,15 @@ class IOSPhoneAgent:
             run_id=run_id,
         )
 
+        try:
+            return self._run_steps(task, run_id)
+        finally:
+            self._stop_requested.clear()
+            # Also stops the probe workers so idle agents hold no threads
+            self._observer.close()
+
+    def _run_steps(self, task: str, run_id: str) -> str:
+        """Step until the task finishes or max_steps is reached."""
         # First step with user prompt
         result = self._execute_step(task, is_first=True, run_id=run_id)
 
@@ -144,8 +189,18 @@ class IOSPhoneAgent:
             )
             return result.message or "Task completed"
 
-        # Continue until finished or max steps reached
+        # Continue until finished, stopped or max steps reached
         while self._step_count < self.agent_config.max_steps:
+            if self._stop_requested.is_set():
+                emit_agent_event(
+                    "run_finished",
+                    {"message": "Task stopped", "success": False},
+                    source="phone_agent.agent_ios",
+                    run_id=run_id,
+                    step=self._step_count,
+                )
+                return "Task stopped"
+
             result = self._execute_step(is_first=False, run_id=run_id)
 
             if result.finished:
@@ -186,10 +241,22 @@ class IOSPhoneAgent:
 
         return self._execute_step(task, is_first)
 
+    def request_stop(self) -> None:
+        """
+        Ask the current or next ``run`` to stop before its next step.
+
+        Safe to call from another thread; the step in progress completes.
+        The request is dropped when the run ends or the agent is reset.
+        """
+        self._stop_requested.set()
+
     def reset(self) -> None:
         """Reset the agent state for a new task."""
         self._context = []
+        self._context_window.reset()
         self._step_count = 0
+        self._stop_requested.clear()
+        self._observer.close()
 
     def _execute_step(
         self,
@@ -208,17 +275,16 @@ class IOSPhoneAgent:
         )
 
         # Capture current screen state
-        screenshot = get_screenshot(
-            wda_url=self.agent_config.wda_url,
-            session_id=self.agent_config.session_id,
-            device_id=self.agent_config.device_id,
-        )
-        current_app = get_current_app(
-            wda_url=self.agent_config.wda_url, session_id=self.agent_config.session_id
-        )
+        observation = self._observer.observe()
+        screenshot = observation.screenshot
+        current_app = observation.current_app
+
+        # Encode the image payload sent to the model
+        payload = self._encode_screenshot(screenshot, run_id)
 
         # Build messages
         if is_first:
+            self._context_window.start(user_prompt)
             self._context.append(
                 MessageBuilder.create_system_message(self.agent_config.system_prompt)
             )
@@ -228,7 +294,7 @@ class IOSPhoneAgent:
 
             self._context.append(
                 MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
+                    text=text_content, image_url=payload.data_url
                 )
             )
         else:
@@ -237,10 +303,20 @@ class IOSPhoneAgent:
 
             self._context.append(
                 MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
+                    text=text_content, image_url=payload.data_url
                 )
             )
 
+        # Keep the prompt within the context window
+        prompt_stats = self._context_window.fit(self._context)
+        emit_agent_event(
+            "prompt_stats",
+            prompt_stats.to_dict(),
+            source="phone_agent.agent_ios",
+            run_id=run_id,
+            step=self._step_count,
+        )
+
         # Get model response
         try:
             self.model_client.set_event_context(run_id=run_id, step=self._step_count)
@@ -263,6 +339,7 @@ class IOSPhoneAgent:
                 action=None,
                 thinking="",
                 message=f"Model error: {e}",
+                timings=observation.timings,
             )
 
         # Parse action from response
@@ -284,11 +361,14 @@ class IOSPhoneAgent:
         # Remove image from context to save space
         self._context[-1] = MessageBuilder.remove_images_from_message(self._context[-1])
 
-        # Execute action
+        # Execute action; the next capture starts once its screen settles
+        prefetch = self.agent_config.prefetch_observation
+        settled = self._observer.prefetch_when_settled() if prefetch else nullcontext()
         try:
-            result = self.action_handler.execute(
-                action, screenshot.width, screenshot.height
-            )
+            with settled:
+                result = self.action_handler.execute(
+                    action, screenshot.width, screenshot.height
+                )
         except Exception as e:
             if self.agent_config.verbose:
                 traceback.print_exc()
@@ -305,6 +385,17 @@ class IOSPhoneAgent:
                 finish(message=str(e)), screenshot.width, screenshot.height
             )
 
+        self._context_window.record(
+            self._step_count, current_app, action, result.success, result.message
+        )
+
+        # Check if finished
+        finished = action.get("_metadata") == "finish" or result.should_finish
+
+        # Actions without a settled wait capture the next screen from here
+        if not finished and prefetch:
+            self._observer.prefetch()
+
         emit_agent_event(
             "action_executed",
             {
@@ -324,9 +415,6 @@ class IOSPhoneAgent:
             )
         )
 
-        # Check if finished
-        finished = action.get("_metadata") == "finish" or result.should_finish
-
         emit_agent_event(
             "result",
             {
@@ -346,7 +434,32 @@ class IOSPhoneAgent:
             action=action,
             thinking=response.thinking,
             message=result.message or action.get("message"),
+            timings=observation.timings,
+        )
+
+    def _encode_screenshot(
+        self, screenshot: Screenshot, run_id: str | None
+    ) -> Screenshot:
+        """Encode the screenshot for the model and emit size/latency metrics."""
+        start_time = time.perf_counter()
+        payload = encode_screenshot(screenshot, self.agent_config.image_encoding)
+        encode_time = time.perf_counter() - start_time
+
+        emit_agent_event(
+            "screenshot_encoded",
+            {
+                "mime_type": payload.mime_type,
+                "width": payload.width,
+                "height": payload.height,
+                "original_bytes": screenshot.byte_size,
+                "encoded_bytes": payload.byte_size,
+                "encode_time": round(encode_time, 4),
+            },
+            source="phone_agent.agent_ios",
+            run_id=run_id,
+            step=self._step_count,
         )
+        return payload
 
     @property
     def context(self) -> list[dict[str, Any]]:
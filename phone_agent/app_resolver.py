@@ -0,0 +1,174 @@
+"""Package-to-app-name resolution shared by the device backends."""
+
+import re
+import threading
+import time
+from typing import Callable, Hashable
+
+# Characters that can appear in a package or bundle name. Any package found
+# in a line of device output lies inside one run of these characters.
+_TOKEN_RE = re.compile(r"[A-Za-z0-9_.\-]+")
+
+# Upper bound on memoised tokens per index
+_MAX_MEMO_TOKENS = 4096
+
+
+class AppIndex:
+    """
+    Reverse index from package/bundle name to app name for one app table.
+
+    Where the table maps several app names to the same package, the first
+    name in table order wins, like the linear scans this replaces.
+
+    Args:
+        packages: App table mapping app names to package names.
+    """
+
+    def __init__(self, packages: dict[str, str]):
+        self._names: dict[str, str] = {}
+        self._ranks: dict[str, int] = {}
+        for app_name, package in packages.items():
+            if package not in self._names:
+                self._ranks[package] = len(self._names)
+                self._names[package] = app_name
+
+        ordered = list(self._names)
+        # For each known package, the first-ranked package it contains
+        self._contained = {
+            package: next(p for p in ordered if p in package) for package in ordered
+        }
+        self._ordered = ordered
+        self._memo: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+
+    def name_for(self, package: str) -> str | None:
+        """Return the app name for an exact package name, if known."""
+        return self._names.get(package)
+
+    def find_in(self, text: str) -> str | None:
+        """
+        Return the app whose package occurs in ``text``.
+
+        Matches by substring: when several packages occur, the one listed
+        first in the app table wins.
+
+        Args:
+            text: A line of device output.
+
+        Returns:
+            The app name, or None if no known package occurs in the text.
+        """
+        best = None
+        for token in _TOKEN_RE.findall(text):
+            package = self._match_token(token)
+            if package is not None and (
+                best is None or self._ranks[package] < self._ranks[best]
+            ):
+                best = package
+        return None if best is None else self._names[best]
+
+    def _match_token(self, token: str) -> str | None:
+        """Return the first-ranked package contained in a token."""
+        package = self._contained.get(token)
+        if package is not None:
+            return package
+
+        with self._lock:
+            if token in self._memo:
+                return self._memo[token]
+            package = next((p for p in self._ordered if p in token), None)
+            if len(self._memo) >= _MAX_MEMO_TOKENS:
+                self._memo.clear()
+            self._memo[token] = package
+        return package
+
+
+_INDEXES: dict[int, AppIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_app_index(packages: dict[str, str]) -> AppIndex:
+    """
+    Return the shared AppIndex for an app table, building it on first use.
+
+    Args:
+        packages: App table mapping app names to package names.
+    """
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(id(packages))
+        if index is None:
+            index = _INDEXES[id(packages)] = AppIndex(packages)
+        return index
+
+
+class CurrentAppCache:
+    """
+    Short-lived cache of the foreground app per device.
+
+    Device actions call ``invalidate`` so a cached name never outlives the
+    screen it was read from. A lookup that started before an invalidation
+    is not stored; pass the ``generation`` read before querying to ``put``.
+
+    Args:
+        ttl: Returns the time-to-live in seconds; 0 disables caching.
+        clock: Monotonic clock. Defaults to time.monotonic.
+    """
+
+    def __init__(
+        self,
+        ttl: Callable[[], float],
+        clock: Callable[[], float] | None = None,
+    ):
+        self._ttl = ttl
+        self._clock = clock or time.monotonic
+        self._entries: dict[Hashable, tuple[str, float]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped by every invalidation."""
+        return self._generation
+
+    def get(self, key: Hashable) -> str | None:
+        """Return the cached app for a device, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            app_name, stored_at = entry
+            if self._clock() - stored_at >= self._ttl():
+                del self._entries[key]
+                return None
+            return app_name
+
+    def put(self, key: Hashable, app_name: str, generation: int | None = None) -> None:
+        """Cache the foreground app for a device unless invalidated since."""
+        if self._ttl() <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (app_name, self._clock())
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """
+        Drop cached entries after a device action.
+
+        The entry for ``key`` and the one for the default device (None) are
+        removed, since both may refer to the same physical device. Passing
+        None drops every entry.
+        """
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+                self._entries.pop(None, None)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
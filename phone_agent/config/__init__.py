@@ -10,6 +10,7 @@ from phone_agent.config.timing import (
     ActionTimingConfig,
     ConnectionTimingConfig,
     DeviceTimingConfig,
+    SettleTimingConfig,
     TimingConfig,
     get_timing_config,
     update_timing_config,
@@ -48,6 +49,7 @@ __all__ = [
     "ActionTimingConfig",
     "DeviceTimingConfig",
     "ConnectionTimingConfig",
+    "SettleTimingConfig",
     "get_timing_config",
     "update_timing_config",
 ]
@@ -23,6 +23,12 @@ MESSAGES_ZH = {
     "time_to_first_token": "首 Token 延迟 (TTFT)",
     "time_to_thinking_end": "思考完成延迟",
     "total_inference_time": "总推理时间",
+    "time_to_action_end": "动作完成延迟",
+    "early_dispatch_time_saved": "提前执行节省时间（估计）",
+    "stall_hint": "注意：最近几步的操作没有带来进展，屏幕没有变化或在几个页面之间来回切换。"
+    "请不要重复相同的操作，换一种方式，例如滑动查找、返回上一页或点击其他元素；"
+    "如果任务无法完成，请直接 finish 并说明原因。",
+    "stall_aborted": "任务已中止：重复操作没有带来进展",
 }
 
 # English messages
@@ -48,6 +54,13 @@ MESSAGES_EN = {
     "time_to_first_token": "Time to First Token (TTFT)",
     "time_to_thinking_end": "Time to Thinking End",
     "total_inference_time": "Total Inference Time",
+    "time_to_action_end": "Time to Action End",
+    "early_dispatch_time_saved": "Time Saved by Early Dispatch (est.)",
+    "stall_hint": "Note: the last steps made no progress; the screen did not change or "
+    "kept switching between the same pages. Do not repeat the same action. Try "
+    "something else, such as scrolling, going back or tapping another element. If "
+    "the task cannot be completed, finish and explain why.",
+    "stall_aborted": "Task aborted: repeated actions made no progress",
 }
 
 
@@ -13,10 +13,11 @@ class ActionTimingConfig:
     """Configuration for action handler timing delays."""
 
     # Text input related delays (in seconds)
-    keyboard_switch_delay: float = 1.0  # Delay after switching to ADB keyboard
-    text_clear_delay: float = 1.0  # Delay after clearing text
+    # Delay after switching keyboards; ADB polls for the switch for up to this
+    keyboard_switch_delay: float = 1.0
+    # Delay after clearing text where the device does not confirm it
+    text_clear_delay: float = 1.0
     text_input_delay: float = 1.0  # Delay after typing text
-    keyboard_restore_delay: float = 1.0  # Delay after restoring original keyboard
 
     def __post_init__(self):
         """Load values from environment variables if present."""
@@ -29,9 +30,6 @@ class ActionTimingConfig:
         self.text_input_delay = float(
             os.getenv("PHONE_AGENT_TEXT_INPUT_DELAY", self.text_input_delay)
         )
-        self.keyboard_restore_delay = float(
-            os.getenv("PHONE_AGENT_KEYBOARD_RESTORE_DELAY", self.keyboard_restore_delay)
-        )
 
 
 @dataclass
@@ -47,6 +45,10 @@ class DeviceTimingConfig:
     default_back_delay: float = 1.0  # Default delay after back button
     default_home_delay: float = 1.0  # Default delay after home button
     default_launch_delay: float = 1.0  # Default delay after launching app
+    # Max wait for a launched app to get focus after the start command
+    # returns; a splash or permission dialog of another package never does
+    launch_timeout: float = 1.0
+    current_app_ttl: float = 0.5  # How long a foreground-app lookup is reused
 
     def __post_init__(self):
         """Load values from environment variables if present."""
@@ -74,6 +76,12 @@ class DeviceTimingConfig:
         self.default_launch_delay = float(
             os.getenv("PHONE_AGENT_LAUNCH_DELAY", self.default_launch_delay)
         )
+        self.launch_timeout = float(
+            os.getenv("PHONE_AGENT_LAUNCH_TIMEOUT", self.launch_timeout)
+        )
+        self.current_app_ttl = float(
+            os.getenv("PHONE_AGENT_CURRENT_APP_TTL", self.current_app_ttl)
+        )
 
 
 @dataclass
@@ -96,6 +104,36 @@ class ConnectionTimingConfig:
         )
 
 
+@dataclass
+class SettleTimingConfig:
+    """Configuration for waiting until the screen is stable after an action."""
+
+    # "fixed" sleeps the device delays above, "adaptive" polls the screen
+    mode: str = "fixed"
+    poll_interval: float = 0.15  # Delay between frame captures
+    stable_frames: int = 2  # Consecutive matching frames that count as settled
+    diff_threshold: float = 0.01  # Max fraction of changed thumbnail pixels
+    min_delay: float = 0.1  # Delay before the first frame is captured
+    max_wait: float = 3.0  # Ceiling for one adaptive wait
+
+    def __post_init__(self):
+        """Load values from environment variables if present."""
+        self.mode = os.getenv("PHONE_AGENT_SETTLE_MODE", self.mode).lower()
+        self.poll_interval = float(
+            os.getenv("PHONE_AGENT_SETTLE_POLL_INTERVAL", self.poll_interval)
+        )
+        self.stable_frames = int(
+            os.getenv("PHONE_AGENT_SETTLE_STABLE_FRAMES", self.stable_frames)
+        )
+        self.diff_threshold = float(
+            os.getenv("PHONE_AGENT_SETTLE_DIFF_THRESHOLD", self.diff_threshold)
+        )
+        self.min_delay = float(
+            os.getenv("PHONE_AGENT_SETTLE_MIN_DELAY", self.min_delay)
+        )
+        self.max_wait = float(os.getenv("PHONE_AGENT_SETTLE_MAX_WAIT", self.max_wait))
+
+
 @dataclass
 class TimingConfig:
     """Master timing configuration combining all timing settings."""
@@ -103,12 +141,14 @@ class TimingConfig:
     action: ActionTimingConfig
     device: DeviceTimingConfig
     connection: ConnectionTimingConfig
+    settle: SettleTimingConfig
 
     def __init__(self):
         """Initialize all timing configurations."""
         self.action = ActionTimingConfig()
         self.device = DeviceTimingConfig()
         self.connection = ConnectionTimingConfig()
+        self.settle = SettleTimingConfig()
 
 
 # Global timing configuration instance
@@ -130,6 +170,7 @@ def update_timing_config(
     action: ActionTimingConfig | None = None,
     device: DeviceTimingConfig | None = None,
     connection: ConnectionTimingConfig | None = None,
+    settle: SettleTimingConfig | None = None,
 ) -> None:
     """
     Update the global timing configuration.
@@ -138,6 +179,7 @@ def update_timing_config(
         action: New action timing configuration.
         device: New device timing configuration.
         connection: New connection timing configuration.
+        settle: New screen-settle configuration.
 
     Example:
         >>> from phone_agent.config.timing import update_timing_config, ActionTimingConfig
@@ -154,12 +196,15 @@ def update_timing_config(
         TIMING_CONFIG.device = device
     if connection is not None:
         TIMING_CONFIG.connection = connection
+    if settle is not None:
+        TIMING_CONFIG.settle = settle
 
 
 __all__ = [
     "ActionTimingConfig",
     "DeviceTimingConfig",
     "ConnectionTimingConfig",
+    "SettleTimingConfig",
     "TimingConfig",
     "TIMING_CONFIG",
     "get_timing_config",
@@ -0,0 +1,239 @@
+"""Bounded conversation context for the agents.
+
+The agents append a user message (screen info) and an assistant message
+(thinking and action) per step. ``ContextWindow`` keeps the newest
+``keep_steps`` steps verbatim and folds older ones into one-line summaries
+built from the recorded app, action and outcome, so the prompt stops
+growing with the run. Screenshots are not counted against the budget; the
+agents already strip them from every step but the current one.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+HISTORY_HEADER = "** History **"
+
+# Longest argument value kept in a step summary
+MAX_SUMMARY_VALUE = 60
+
+
+@dataclass
+class ContextWindowConfig:
+    """
+    Limits for the prompt sent to the model.
+
+    Attributes:
+        keep_steps: Newest steps kept verbatim, including the current one.
+        max_tokens: Budget for the estimated text tokens, or None.
+        max_bytes: Budget for the UTF-8 text bytes, or None.
+        enabled: Send the full history when False.
+    """
+
+    keep_steps: int = 10
+    max_tokens: int | None = 24000
+    max_bytes: int | None = None
+    enabled: bool = True
+
+
+@dataclass
+class PromptStats:
+    """Size of the prompt for one step."""
+
+    messages: int
+    text_bytes: int
+    estimated_tokens: int
+    image_bytes: int
+    summarized_steps: int
+
+    def to_dict(self) -> dict[str, int]:
+        return dict(self.__dict__)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of text without a tokenizer.
+
+    ASCII text averages about four characters per token; other characters
+    (mostly CJK here) are counted as one token each.
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return (ascii_chars + 3) // 4 + len(text) - ascii_chars
+
+
+def summarize_step(
+    step: int, app: str, action: dict[str, Any] | None, outcome: str
+) -> str:
+    """One-line summary of a finished step."""
+    action = action or {}
+    name = action.get("action") or action.get("_metadata", "unknown")
+    args = ", ".join(
+        f"{key}={_shorten(repr(value))}"
+        for key, value in action.items()
+        if key not in ("_metadata", "action")
+    )
+    return f"Step {step} [{app}] {name}({args}) -> {_shorten(outcome)}"
+
+
+def _shorten(text: str) -> str:
+    if len(text) <= MAX_SUMMARY_VALUE:
+        return text
+    return text[: MAX_SUMMARY_VALUE - 3] + "..."
+
+
+def _message_text(message: dict[str, Any]) -> str:
+    content = message.get("content")
+    if isinstance(content, str):
+        return content
+    return "".join(item.get("text", "") for item in content if item.get("type") == "text")
+
+
+def _image_bytes(message: dict[str, Any]) -> int:
+    content = message.get("content")
+    if isinstance(content, str):
+        return 0
+    return sum(
+        len(item["image_url"]["url"]) for item in content if item.get("type") == "image_url"
+    )
+
+
+def _set_message_text(message: dict[str, Any], text: str) -> None:
+    # Replace rather than mutate, so earlier copies of the message keep their text
+    content = message.get("content")
+    if isinstance(content, str):
+        message["content"] = text
+        return
+    items = list(content)
+    for i, item in enumerate(items):
+        if item.get("type") == "text":
+            items[i] = {**item, "text": text}
+            break
+    message["content"] = items
+
+
+class ContextWindow:
+    """
+    Keeps an agent's context list within ``ContextWindowConfig`` limits.
+
+    The context is ``[system, user, assistant, ..., user]`` with one user
+    message per step. Folded steps are removed and their summaries, with the
+    task, are prepended to the oldest kept user message, so roles still
+    alternate. While a run fits the limits the context is left untouched.
+
+    Args:
+        config: Window limits.
+    """
+
+    def __init__(self, config: ContextWindowConfig | None = None):
+        self.config = config or ContextWindowConfig()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the previous run."""
+        self._task = ""
+        self._summaries: list[str] = []
+        self._pending: deque[str] = deque()  # Summaries of steps still in full
+        self._head_text: str | None = None  # Oldest kept user text before merging
+        self._dropped = 0
+
+    def start(self, task: str) -> None:
+        """Begin a run for ``task``."""
+        self.reset()
+        self._task = task
+
+    def record(
+        self,
+        step: int,
+        app: str,
+        action: dict[str, Any] | None,
+        success: bool,
+        message: str | None = None,
+    ) -> None:
+        """Record the outcome of a finished step for its later summary."""
+        outcome = "ok" if success else "failed"
+        if message:
+            outcome = f"{outcome}: {message}"
+        self._pending.append(summarize_step(step, app, action, outcome))
+
+    def fit(self, context: list[dict[str, Any]]) -> PromptStats:
+        """
+        Compact ``context`` in place to the configured limits.
+
+        Returns:
+            Size of the resulting prompt.
+        """
+        stats = self.measure(context)
+        if not self.config.enabled or (
+            self._steps(context) <= self.config.keep_steps and self._within_budget(stats)
+        ):
+            return stats
+
+        self._unmerge(context)
+        while self._steps(context) > max(self.config.keep_steps, 1):
+            self._fold(context)
+        stats = self._merge(context)
+
+        # Over budget: fold more steps, then drop the oldest summaries
+        while not self._within_budget(stats) and self._steps(context) > 1:
+            self._unmerge(context)
+            self._fold(context)
+            stats = self._merge(context)
+        while not self._within_budget(stats) and self._summaries:
+            self._unmerge(context)
+            self._summaries.pop(0)
+            self._dropped += 1
+            stats = self._merge(context)
+        return stats
+
+    def measure(self, context: list[dict[str, Any]]) -> PromptStats:
+        """Size of ``context`` as it would be sent."""
+        text = "".join(_message_text(message) for message in context)
+        return PromptStats(
+            messages=len(context),
+            text_bytes=len(text.encode("utf-8")),
+            estimated_tokens=estimate_tokens(text),
+            image_bytes=sum(_image_bytes(message) for message in context),
+            summarized_steps=len(self._summaries) + self._dropped,
+        )
+
+    def _within_budget(self, stats: PromptStats) -> bool:
+        config = self.config
+        if config.max_tokens is not None and stats.estimated_tokens > config.max_tokens:
+            return False
+        if config.max_bytes is not None and stats.text_bytes > config.max_bytes:
+            return False
+        return True
+
+    @staticmethod
+    def _steps(context: list[dict[str, Any]]) -> int:
+        return sum(1 for message in context if message["role"] == "user")
+
+    def _fold(self, context: list[dict[str, Any]]) -> None:
+        """Replace the oldest full step with its summary."""
+        del context[1]
+        if context[1]["role"] == "assistant":
+            del context[1]
+        if self._pending:
+            self._summaries.append(self._pending.popleft())
+        else:
+            # The step ended before its outcome was recorded
+            self._dropped += 1
+
+    def _merge(self, context: list[dict[str, Any]]) -> PromptStats:
+        """Prepend the task and step summaries to the oldest kept user message."""
+        if self._summaries or self._dropped:
+            head = context[1]
+            self._head_text = _message_text(head)
+            lines = [HISTORY_HEADER]
+            if self._dropped:
+                lines.append(f"({self._dropped} earlier steps omitted)")
+            lines.extend(self._summaries)
+            history = "\n".join(lines)
+            _set_message_text(head, f"{self._task}\n\n{history}\n\n{self._head_text}")
+        return self.measure(context)
+
+    def _unmerge(self, context: list[dict[str, Any]]) -> None:
+        """Restore the oldest kept user message to its own text."""
+        if self._head_text is not None:
+            _set_message_text(context[1], self._head_text)
+            self._head_text = None
@@ -0,0 +1,264 @@
+"""Screen-keyed cache of model decisions for repeated tasks.
+
+When the same task is run again on the same device, most steps see a screen
+that already appeared in an earlier successful run. ``DecisionCache`` maps
+(normalized task, current app, perceptual screen hash) to the action the
+model chose there, so those steps can skip the model round trip.
+
+Each cached decision also remembers the screen that followed it. When a
+served decision does not lead to that screen, the entry is evicted and the
+agent falls back to the model. Decisions of a run are only committed when
+the run finishes successfully.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any
+
+from PIL import Image
+
+# Punctuation and whitespace ignored when comparing tasks
+_TASK_NOISE = re.compile(r"[\s\.,!?;:'\"，。！？；：、“”‘’（）()]+")
+
+
+def normalize_task(task: str) -> str:
+    """Lower-case a task and drop whitespace and punctuation."""
+    return _TASK_NOISE.sub("", task.lower())
+
+
+def perceptual_hash(image_data: bytes, hash_size: int = 16) -> int:
+    """
+    Difference hash of an encoded screenshot.
+
+    The image is reduced to a ``(hash_size + 1) x hash_size`` grayscale
+    thumbnail; each bit says whether a pixel is brighter than its right
+    neighbour. Similar screens differ in few bits.
+
+    Args:
+        image_data: Encoded image bytes (PNG, JPEG, ...).
+        hash_size: Bits per row and number of rows.
+
+    Returns:
+        Hash with ``hash_size ** 2`` bits.
+    """
+    img = Image.open(BytesIO(image_data))
+    img.draft("L", (hash_size + 1, hash_size))
+    pixels = img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BOX)
+    data = pixels.tobytes()
+    value = 0
+    width = hash_size + 1
+    for row in range(hash_size):
+        offset = row * width
+        for col in range(hash_size):
+            value = (value << 1) | (data[offset + col] > data[offset + col + 1])
+    return value
+
+
+def hash_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+@dataclass
+class CachedDecision:
+    """A model decision for one screen."""
+
+    thinking: str
+    action: str
+    screen_hash: int
+    next_hash: int | None = None  # Screen observed after the action, if any
+    model_time: float = 0.0  # Model latency the decision cost when recorded
+    hits: int = 0
+
+
+@dataclass
+class DecisionCacheStats:
+    """Counters of one DecisionCache."""
+
+    lookups: int = 0
+    hits: int = 0
+    evictions: int = 0
+    commits: int = 0
+    time_saved: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        # Steps sent to the model after an eviction skip the lookup and show
+        # up in evictions instead
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "evictions": self.evictions,
+            "commits": self.commits,
+            "hit_rate": round(self.hit_rate, 3),
+            "time_saved": round(self.time_saved, 3),
+        }
+
+
+class DecisionCache:
+    """
+    Thread-safe cache of model decisions, shared by the agents given it.
+
+    Args:
+        max_distance: Largest hash distance that still counts as the same
+            screen, for both lookups and progress checks.
+        hash_size: See ``perceptual_hash``.
+        max_entries: Least recently used entries beyond this are dropped.
+    """
+
+    def __init__(
+        self, max_distance: int = 10, hash_size: int = 16, max_entries: int = 1024
+    ):
+        self.max_distance = max_distance
+        self.hash_size = hash_size
+        self.max_entries = max_entries
+        self.stats = DecisionCacheStats()
+        # (task, app, screen_hash) -> decision, in least recently used order
+        self._entries: OrderedDict[tuple[str, str, int], CachedDecision] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def session(self, task: str) -> "DecisionCacheSession":
+        """Start recording and serving decisions for one run of ``task``."""
+        return DecisionCacheSession(self, normalize_task(task))
+
+    def hash(self, image_data: bytes) -> int:
+        return perceptual_hash(image_data, self.hash_size)
+
+    def lookup(self, task: str, app: str, screen_hash: int) -> CachedDecision | None:
+        """Return the closest decision within ``max_distance``, if any."""
+        with self._lock:
+            self.stats.lookups += 1
+            best = None
+            best_distance = self.max_distance + 1
+            for key, decision in self._entries.items():
+                if key[0] != task or key[1] != app:
+                    continue
+                distance = hash_distance(key[2], screen_hash)
+                if distance < best_distance:
+                    best, best_distance = key, distance
+            if best is None:
+                return None
+            self._entries.move_to_end(best)
+            decision = self._entries[best]
+            decision.hits += 1
+            self.stats.hits += 1
+            self.stats.time_saved += decision.model_time
+            return decision
+
+    def evict(self, task: str, app: str, decision: CachedDecision) -> None:
+        """Drop a decision that did not lead to the expected screen."""
+        with self._lock:
+            if self._entries.pop((task, app, decision.screen_hash), None) is not None:
+                self.stats.evictions += 1
+
+    def commit(self, task: str, decisions: list[tuple[str, CachedDecision]]) -> None:
+        """Store the decisions of a successful run as (app, decision) pairs."""
+        with self._lock:
+            for app, decision in decisions:
+                # A newer decision replaces any for the same screen
+                for key in [
+                    key
+                    for key in self._entries
+                    if key[:2] == (task, app)
+                    and hash_distance(key[2], decision.screen_hash) <= self.max_distance
+                ]:
+                    del self._entries[key]
+                self._entries[(task, app, decision.screen_hash)] = decision
+                self.stats.commits += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+@dataclass
+class _Step:
+    app: str
+    decision: CachedDecision
+    served: bool
+
+
+class DecisionCacheSession:
+    """
+    Decisions of one agent run.
+
+    Call ``observe`` with every new screen, ``record`` the model's decision
+    when it was not served from the cache, and ``finish`` when the run ends.
+
+    Args:
+        cache: Cache to serve from and commit to.
+        task: Normalized task.
+    """
+
+    def __init__(self, cache: DecisionCache, task: str):
+        self.cache = cache
+        self.task = task
+        self._steps: list[_Step] = []
+
+    def observe(self, image_data: bytes, app: str) -> tuple[int, CachedDecision | None]:
+        """
+        Check progress of the previous step and look up the new screen.
+
+        Returns:
+            The screen hash and the cached decision to use, or None when the
+            model has to decide.
+        """
+        screen_hash = self.cache.hash(image_data)
+        previous = self._steps[-1] if self._steps else None
+        if previous is not None and previous.served:
+            expected = previous.decision.next_hash
+            max_distance = self.cache.max_distance
+            if expected is None or hash_distance(expected, screen_hash) > max_distance:
+                # The cached action did not lead where it did before
+                self.cache.evict(self.task, previous.app, previous.decision)
+                self._steps.pop()
+                return screen_hash, None
+        elif previous is not None:
+            previous.decision.next_hash = screen_hash
+
+        decision = self.cache.lookup(self.task, app, screen_hash)
+        if decision is not None:
+            self._steps.append(_Step(app, decision, served=True))
+        return screen_hash, decision
+
+    def record(
+        self, app: str, screen_hash: int, thinking: str, action: str, model_time: float
+    ) -> None:
+        """Remember the model's decision for the current screen."""
+        self._steps.append(
+            _Step(
+                app,
+                CachedDecision(thinking, action, screen_hash, model_time=model_time),
+                served=False,
+            )
+        )
+
+    def finish(self, success: bool) -> None:
+        """Commit the run's new decisions if it succeeded."""
+        if not success:
+            self._steps.clear()
+            return
+        recorded = [step for step in self._steps if not step.served]
+        # A screen that got different actions in one run is ambiguous
+        ambiguous = {
+            id(a)
+            for a in recorded
+            for b in recorded
+            if a is not b
+            and a.app == b.app
+            and a.decision.action != b.decision.action
+            and hash_distance(a.decision.screen_hash, b.decision.screen_hash)
+            <= self.cache.max_distance
+        }
+        self.cache.commit(
+            self.task,
+            [(step.app, step.decision) for step in recorded if id(step) not in ambiguous],
+        )
+        self._steps.clear()
@@ -19,14 +19,22 @@ class DeviceFactory:
     This allows the system to work with both Android (ADB) and HarmonyOS (HDC) devices.
     """
 
-    def __init__(self, device_type: DeviceType = DeviceType.ADB):
+    def __init__(
+        self, device_type: DeviceType = DeviceType.ADB, adb_transport: str | None = None
+    ):
         """
         Initialize the device factory.
 
         Args:
             device_type: The type of device to use (ADB or HDC).
+            adb_transport: ADB transport to select when the ADB module loads:
+                "cli" runs the adb executable, "wire" talks to the adb server
+                socket directly. None keeps the current setting. The
+                transport is process-wide, so loading a factory that asks for
+                a different one than an earlier factory raises ValueError.
         """
         self.device_type = device_type
+        self.adb_transport = adb_transport
         self._module = None
 
     @property
@@ -36,6 +44,8 @@ class DeviceFactory:
             if self.device_type == DeviceType.ADB:
                 from phone_agent import adb
 
+                if self.adb_transport is not None:
+                    adb.claim_transport(self.adb_transport)
                 self._module = adb
             elif self.device_type == DeviceType.HDC:
                 from phone_agent import hdc
@@ -139,19 +149,142 @@ class DeviceFactory:
             raise ValueError(f"Unknown device type: {self.device_type}")
 
 
+class AsyncDeviceFactory:
+    """
+    Asyncio counterpart of DeviceFactory for ADB and HDC devices.
+
+    Every method is a coroutine backed by ``phone_agent.adb.aio`` or
+    ``phone_agent.hdc.aio``.
+    """
+
+    def __init__(
+        self, device_type: DeviceType = DeviceType.ADB, adb_transport: str | None = None
+    ):
+        """
+        Initialize the async device factory.
+
+        Args:
+            device_type: The type of device to use (ADB or HDC).
+            adb_transport: ADB transport to select when the ADB module loads;
+                see ``DeviceFactory``.
+        """
+        self.device_type = device_type
+        self.adb_transport = adb_transport
+        self._module = None
+
+    @property
+    def module(self):
+        """Get the appropriate async device module (adb.aio or hdc.aio)."""
+        if self._module is None:
+            if self.device_type == DeviceType.ADB:
+                from phone_agent.adb import aio, claim_transport
+
+                if self.adb_transport is not None:
+                    claim_transport(self.adb_transport)
+                self._module = aio
+            elif self.device_type == DeviceType.HDC:
+                from phone_agent.hdc import aio
+
+                self._module = aio
+            else:
+                raise ValueError(f"Unknown device type: {self.device_type}")
+        return self._module
+
+    async def get_screenshot(self, device_id: str | None = None, timeout: int = 10):
+        """Get screenshot from device."""
+        return await self.module.get_screenshot(device_id, timeout)
+
+    async def get_current_app(self, device_id: str | None = None) -> str:
+        """Get current app name."""
+        return await self.module.get_current_app(device_id)
+
+    async def tap(
+        self, x: int, y: int, device_id: str | None = None, delay: float | None = None
+    ):
+        """Tap at coordinates."""
+        return await self.module.tap(x, y, device_id, delay)
+
+    async def double_tap(
+        self, x: int, y: int, device_id: str | None = None, delay: float | None = None
+    ):
+        """Double tap at coordinates."""
+        return await self.module.double_tap(x, y, device_id, delay)
+
+    async def long_press(
+        self,
+        x: int,
+        y: int,
+        duration_ms: int = 3000,
+        device_id: str | None = None,
+        delay: float | None = None,
+    ):
+        """Long press at coordinates."""
+        return await self.module.long_press(x, y, duration_ms, device_id, delay)
+
+    async def swipe(
+        self,
+        start_x: int,
+        start_y: int,
+        end_x: int,
+        end_y: int,
+        duration_ms: int | None = None,
+        device_id: str | None = None,
+        delay: float | None = None,
+    ):
+        """Swipe from start to end."""
+        return await self.module.swipe(
+            start_x, start_y, end_x, end_y, duration_ms, device_id, delay
+        )
+
+    async def back(self, device_id: str | None = None, delay: float | None = None):
+        """Press back button."""
+        return await self.module.back(device_id, delay)
+
+    async def home(self, device_id: str | None = None, delay: float | None = None):
+        """Press home button."""
+        return await self.module.home(device_id, delay)
+
+    async def launch_app(
+        self, app_name: str, device_id: str | None = None, delay: float | None = None
+    ) -> bool:
+        """Launch an app."""
+        return await self.module.launch_app(app_name, device_id, delay)
+
+    async def type_text(self, text: str, device_id: str | None = None):
+        """Type text."""
+        return await self.module.type_text(text, device_id)
+
+    async def clear_text(self, device_id: str | None = None):
+        """Clear text."""
+        return await self.module.clear_text(device_id)
+
+    async def detect_and_set_adb_keyboard(self, device_id: str | None = None) -> str:
+        """Detect and set keyboard."""
+        return await self.module.detect_and_set_adb_keyboard(device_id)
+
+    async def restore_keyboard(self, ime: str, device_id: str | None = None):
+        """Restore keyboard."""
+        return await self.module.restore_keyboard(ime, device_id)
+
+    async def list_devices(self):
+        """List connected devices."""
+        return await self.module.list_devices()
+
+
 # Global device factory instance
 _device_factory: DeviceFactory | None = None
 
 
-def set_device_type(device_type: DeviceType):
+def set_device_type(device_type: DeviceType, adb_transport: str | None = None):
     """
     Set the global device type.
 
     Args:
         device_type: The device type to use (ADB or HDC).
+        adb_transport: Optional ADB transport ("cli" or "wire").
     """
     global _device_factory
-    _device_factory = DeviceFactory(device_type)
+    _device_factory = DeviceFactory(device_type, adb_transport)
 
 
 def get_device_factory() -> DeviceFactory:
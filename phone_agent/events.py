@@ -2,15 +2,30 @@
 
 from __future__ import annotations
 
+import asyncio
 import datetime
+import inspect
 import logging
 import threading
+import time
 import uuid
+from collections import deque
 from dataclasses import dataclass, asdict
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable
 
 logger = logging.getLogger(__name__)
 
+# A listener may be a plain function or a coroutine function
+EventListener = Callable[[dict[str, Any]], Awaitable[None] | None]
+
+# What a full listener queue does with a new event
+OVERFLOW_BLOCK = "block"  # Wait for the listener to catch up
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # Drop the oldest queued event
+OVERFLOW_COALESCE = "coalesce"  # Merge into the newest queued event if possible
+
+# Events whose payload text can be concatenated without losing anything
+TEXT_EVENT_TYPES = frozenset({"thinking_chunk"})
+
 
 @dataclass
 class AgentEvent:
@@ -24,39 +39,369 @@ class AgentEvent:
     step: int | None = None
     timestamp: str | None = None
 
+    def to_dict(self) -> dict[str, Any]:
+        # Built by hand: asdict deep-copies and dominated the cost of emit
+        return {
+            "type": self.type,
+            "payload": dict(self.payload),
+            "source": self.source,
+            "level": self.level,
+            "run_id": self.run_id,
+            "step": self.step,
+            "timestamp": self.timestamp or datetime.datetime.now().isoformat(),
+        }
+
+
+def coalesce_text_events(
+    older: dict[str, Any], newer: dict[str, Any]
+) -> dict[str, Any] | None:
+    """
+    Merge two text events of the same run and step into one.
+
+    Returns:
+        The older event with both texts, or None when the events cannot be
+        merged.
+    """
+    if newer.get("type") not in TEXT_EVENT_TYPES:
+        return None
+    keys = ("type", "run_id", "step")
+    if any(older.get(key) != newer.get(key) for key in keys):
+        return None
+    older_payload = older.get("payload") or {}
+    text = older_payload.get("text", "") + (newer.get("payload") or {}).get("text", "")
+    return {**older, "payload": {**older_payload, "text": text}}
+
+
+@dataclass
+class DispatchConfig:
+    """
+    Settings of the emitter's background dispatch mode.
+
+    Attributes:
+        max_queue: Events each listener may have queued.
+        overflow: What a full queue does with a new event: OVERFLOW_BLOCK,
+            OVERFLOW_DROP_OLDEST or OVERFLOW_COALESCE. Coalescing falls back
+            to dropping the oldest event when ``coalesce`` cannot merge.
+        max_batch: Most events handed to a listener at once.
+        batch_window: Seconds a listener waits for a batch to fill up.
+        block_timeout: Seconds OVERFLOW_BLOCK waits before dropping the
+            oldest event anyway. Waits indefinitely when None.
+        coalesce: Merges the newest queued event with a new one, returning
+            None when they cannot be merged.
+    """
+
+    max_queue: int = 1024
+    overflow: str = OVERFLOW_BLOCK
+    max_batch: int = 64
+    batch_window: float = 0.0
+    block_timeout: float | None = None
+    coalesce: Callable[[dict[str, Any], dict[str, Any]], dict[str, Any] | None] = (
+        coalesce_text_events
+    )
+
+
+@dataclass
+class ListenerStats:
+    """Delivery counters of one listener in dispatch mode."""
+
+    listener: str
+    depth: int = 0
+    max_depth: int = 0
+    delivered: int = 0
+    batches: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    lag_ms: float = 0.0  # Queueing delay of the latest delivery
+    max_lag_ms: float = 0.0
+
     def to_dict(self) -> dict[str, Any]:
         data = asdict(self)
-        data["timestamp"] = self.timestamp or datetime.datetime.now().isoformat()
+        data["lag_ms"] = round(self.lag_ms, 3)
+        data["max_lag_ms"] = round(self.max_lag_ms, 3)
         return data
 
 
+class _ListenerQueue:
+    """Bounded queue and worker thread delivering events to one listener."""
+
+    def __init__(self, listener: EventListener, batched: bool, config: DispatchConfig):
+        self.listener = listener
+        self.batched = batched
+        self.config = config
+        name = getattr(listener, "__qualname__", None) or repr(listener)
+        self.stats = ListenerStats(listener=name)
+        self._items: deque[tuple[float, dict[str, Any]]] = deque()
+        self._cond = threading.Condition(threading.Lock())
+        self._busy = False
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"agent-events:{name}", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, payload: dict[str, Any]) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._items) >= self.config.max_queue and not self._make_room(
+                payload
+            ):
+                return
+            self._items.append((time.monotonic(), payload))
+            depth = len(self._items)
+            self.stats.max_depth = max(self.stats.max_depth, depth)
+            # The worker only waits for a first event or a full batch
+            if depth == 1 or depth == self.config.max_batch:
+                self._cond.notify_all()
+
+    def _make_room(self, payload: dict[str, Any]) -> bool:
+        """Apply the overflow policy; False when ``payload`` needs no slot."""
+        policy = self.config.overflow
+        if policy == OVERFLOW_BLOCK:
+            # A listener emitting from its own worker would wait on itself
+            if threading.current_thread() is self._thread:
+                return True
+            if self._cond.wait_for(
+                lambda: len(self._items) < self.config.max_queue or self._closed,
+                timeout=self.config.block_timeout,
+            ):
+                return not self._closed
+        elif policy == OVERFLOW_COALESCE:
+            enqueued_at, newest = self._items[-1]
+            merged = self.config.coalesce(newest, payload)
+            if merged is not None:
+                self._items[-1] = (enqueued_at, merged)
+                self.stats.coalesced += 1
+                return False
+        self._items.popleft()
+        self.stats.dropped += 1
+        return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every queued event has been delivered."""
+        if threading.current_thread() is self._thread:
+            return False
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._items and not self._busy, timeout=timeout
+            )
+
+    def close(self, timeout: float | None = None) -> None:
+        """Deliver what is queued, then stop the worker."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._cond:
+            self.stats.depth = len(self._items)
+            return self.stats.to_dict()
+
+    def _run(self) -> None:
+        config = self.config
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._items or self._closed)
+                if not self._items:
+                    return
+                if config.batch_window > 0 and not self._closed:
+                    self._cond.wait_for(
+                        lambda: len(self._items) >= config.max_batch or self._closed,
+                        timeout=config.batch_window,
+                    )
+                count = min(len(self._items), config.max_batch)
+                batch = [self._items.popleft() for _ in range(count)]
+                self._busy = True
+                # Producers blocked on a full queue can continue
+                self._cond.notify_all()
+            try:
+                self._deliver(batch)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _deliver(self, batch: list[tuple[float, dict[str, Any]]]) -> None:
+        stats = self.stats
+        stats.batches += 1
+        if self.batched:
+            calls = [(batch[0][0], [payload for _, payload in batch])]
+        else:
+            calls = batch
+        for enqueued_at, argument in calls:
+            # Time the event spent queued before the listener got it
+            stats.lag_ms = (time.monotonic() - enqueued_at) * 1000
+            stats.max_lag_ms = max(stats.max_lag_ms, stats.lag_ms)
+            try:
+                result = self.listener(argument)
+                if inspect.isawaitable(result):
+                    asyncio.run(_guarded(result))
+            except Exception as exc:
+                stats.errors += 1
+                logger.warning("Agent event listener failed: %s", str(exc))
+        stats.delivered += len(batch)
+
+
 class AgentEventEmitter:
-    """Thread-safe event emitter."""
+    """
+    Thread-safe event emitter.
+
+    Listeners may be coroutine functions. ``emit_async`` awaits them in
+    registration order; the synchronous ``emit`` schedules them on the
+    running event loop, or runs them to completion when there is none.
+
+    ``start_dispatch`` switches to background delivery: every listener gets
+    a bounded queue and a worker thread, so ``emit`` only enqueues. Each
+    listener still sees its events in emission order, and a slow or failing
+    listener does not hold up the others.
+    """
 
     def __init__(self) -> None:
-        self._listeners: list[Callable[[dict[str, Any]], None]] = []
+        self._listeners: list[EventListener] = []
+        self._batched: set[EventListener] = set()
         self._lock = threading.Lock()
+        self._tasks: set[asyncio.Task] = set()
+        self._dispatch: DispatchConfig | None = None
+        self._queues: dict[EventListener, _ListenerQueue] = {}
 
-    def on(self, listener: Callable[[dict[str, Any]], None]) -> None:
+    def on(self, listener: EventListener, batched: bool = False) -> None:
+        """
+        Register a listener.
+
+        Args:
+            listener: Called with each event dict.
+            batched: Call the listener with a list of event dicts instead.
+                In dispatch mode the list holds up to ``max_batch`` events,
+                otherwise a single one.
+        """
         with self._lock:
-            if listener not in self._listeners:
-                self._listeners.append(listener)
+            if listener in self._listeners:
+                return
+            self._listeners.append(listener)
+            if batched:
+                self._batched.add(listener)
+            if self._dispatch is not None:
+                self._queues[listener] = _ListenerQueue(
+                    listener, batched, self._dispatch
+                )
 
-    def off(self, listener: Callable[[dict[str, Any]], None]) -> None:
+    def off(self, listener: EventListener) -> None:
+        """Unregister a listener after delivering its queued events."""
         with self._lock:
             if listener in self._listeners:
                 self._listeners.remove(listener)
+            self._batched.discard(listener)
+            queue = self._queues.pop(listener, None)
+        if queue is not None:
+            queue.close()
+
+    def start_dispatch(self, config: DispatchConfig | None = None) -> None:
+        """Deliver events from background threads; no-op when already on."""
+        with self._lock:
+            if self._dispatch is not None:
+                return
+            self._dispatch = config or DispatchConfig()
+            for listener in self._listeners:
+                self._queues[listener] = _ListenerQueue(
+                    listener, listener in self._batched, self._dispatch
+                )
+
+    def stop_dispatch(self, timeout: float | None = 5.0) -> None:
+        """Deliver queued events and return to synchronous delivery."""
+        with self._lock:
+            queues = list(self._queues.values())
+            self._queues.clear()
+            self._dispatch = None
+        for queue in queues:
+            queue.close(timeout)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Wait until dispatch mode has delivered every queued event.
+
+        Returns:
+            False when ``timeout`` expired first.
+        """
+        with self._lock:
+            queues = list(self._queues.values())
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for queue in queues:
+            remaining = None
+            if deadline is not None:
+                remaining = max(deadline - time.monotonic(), 0)
+            if not queue.flush(remaining):
+                return False
+        return True
+
+    def dispatch_stats(self) -> list[dict[str, Any]]:
+        """Queue depth, lag and delivery counters of every listener."""
+        with self._lock:
+            queues = list(self._queues.values())
+        return [queue.snapshot() for queue in queues]
 
     def emit(self, event: AgentEvent | dict[str, Any]) -> None:
         payload = event.to_dict() if isinstance(event, AgentEvent) else event
+        if self._enqueue(payload):
+            return
+        with self._lock:
+            listeners = list(self._listeners)
+            batched = set(self._batched)
+        for listener in listeners:
+            try:
+                result = listener([payload] if listener in batched else payload)
+                if inspect.isawaitable(result):
+                    self._schedule(result)
+            except Exception as exc:
+                logger.warning("Agent event listener failed: %s", str(exc))
+
+    async def emit_async(self, event: AgentEvent | dict[str, Any]) -> None:
+        """Emit an event, awaiting coroutine listeners one after another."""
+        payload = event.to_dict() if isinstance(event, AgentEvent) else event
+        if self._enqueue(payload):
+            return
         with self._lock:
             listeners = list(self._listeners)
+            batched = set(self._batched)
         for listener in listeners:
             try:
-                listener(payload)
+                result = listener([payload] if listener in batched else payload)
+                if inspect.isawaitable(result):
+                    await result
             except Exception as exc:
                 logger.warning("Agent event listener failed: %s", str(exc))
 
+    def _enqueue(self, payload: dict[str, Any]) -> bool:
+        """Queue the event for every listener; False outside dispatch mode."""
+        with self._lock:
+            if self._dispatch is None:
+                return False
+            queues = list(self._queues.values())
+        for queue in queues:
+            queue.put(payload)
+        return True
+
+    def _schedule(self, awaitable: Awaitable[None]) -> None:
+        """Run a coroutine listener's result from synchronous ``emit``."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(_guarded(awaitable))
+            return
+        task = loop.create_task(_guarded(awaitable))
+        # The loop only keeps weak references to tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+async def _guarded(awaitable: Awaitable[None]) -> None:
+    try:
+        await awaitable
+    except Exception as exc:
+        logger.warning("Agent event listener failed: %s", str(exc))
+
 
 _GLOBAL_EMITTER = AgentEventEmitter()
 
@@ -91,3 +436,25 @@ def emit_agent_event(
             step=step,
         )
     )
+
+
+async def emit_agent_event_async(
+    event_type: str,
+    payload: dict[str, Any] | None = None,
+    *,
+    source: str = "phone_agent",
+    level: str = "info",
+    run_id: str | None = None,
+    step: int | None = None,
+) -> None:
+    """Emit one structured event through the global emitter from a coroutine."""
+    await _GLOBAL_EMITTER.emit_async(
+        AgentEvent(
+            type=event_type,
+            payload=payload or {},
+            source=source,
+            level=level,
+            run_id=run_id,
+            step=step,
+        )
+    )
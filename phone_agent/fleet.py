@@ -0,0 +1,485 @@
+"""Multi-device fleet scheduler for phone agents.
+
+A ``FleetScheduler`` owns a set of devices, each with its own
+``DeviceFactory`` and agent, and a FIFO queue of tasks. Every queued task is
+bound to the first idle device of the requested platform, so one process can
+drive several ADB, HDC and iOS devices at once while never running two tasks
+on the same device.
+
+Agents are synchronous, so timeouts and cancellation are cooperative: the
+scheduler asks the agent to stop and the task ends after the step in progress.
+The device stays reserved until then.
+"""
+
+import statistics
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field, replace
+from enum import Enum
+from typing import Any, Callable, Iterable
+
+from phone_agent.device_factory import DeviceFactory, DeviceType
+from phone_agent.events import emit_agent_event
+
+
+class TaskStatus(Enum):
+    """Lifecycle state of a fleet task."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
+
+
+@dataclass
+class FleetDevice:
+    """
+    A device managed by the fleet.
+
+    Android and HarmonyOS devices get their own ``DeviceFactory`` unless one
+    is supplied. iOS devices are driven through their WebDriverAgent URL.
+    """
+
+    device_id: str
+    device_type: DeviceType = DeviceType.ADB
+    wda_url: str | None = None  # iOS only
+    adb_transport: str | None = None  # ADB only, the same for the whole fleet
+    factory: Any = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if self.factory is None and self.device_type != DeviceType.IOS:
+            self.factory = DeviceFactory(self.device_type, self.adb_transport)
+
+
+@dataclass(eq=False)
+class FleetTask:
+    """A queued task and its outcome."""
+
+    task: str
+    device_type: DeviceType | None = None  # None runs on any platform
+    device_id: str | None = None  # Pin the task to one device
+    timeout: float | None = None  # Seconds of run time before stopping
+    task_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status: TaskStatus = TaskStatus.PENDING
+    result: str | None = None
+    error: str | None = None
+    assigned_device: str | None = None
+    submitted_at: float = 0.0
+    started_at: float | None = None
+    finished_at: float | None = None
+    _done: threading.Event = field(
+        default_factory=threading.Event, init=False, repr=False
+    )
+    _stop_reason: TaskStatus | None = field(default=None, init=False, repr=False)
+
+    @property
+    def done(self) -> bool:
+        """Whether the task reached a final state."""
+        return self._done.is_set()
+
+    @property
+    def queue_wait(self) -> float | None:
+        """Seconds between submission and start."""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.submitted_at
+
+    @property
+    def run_time(self) -> float | None:
+        """Seconds between start and finish."""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the task is done. Returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def matches(self, device: FleetDevice) -> bool:
+        """Whether the task may run on ``device``."""
+        if self.device_id is not None and self.device_id != device.device_id:
+            return False
+        return self.device_type is None or self.device_type == device.device_type
+
+
+@dataclass
+class FleetMetrics:
+    """Aggregate scheduler metrics."""
+
+    submitted: int
+    pending: int
+    running: int
+    completed: int
+    failed: int
+    cancelled: int
+    timed_out: int
+    elapsed: float  # Seconds since the scheduler started
+    throughput: float  # Finished tasks per second
+    queue_wait_mean: float
+    queue_wait_p95: float
+    queue_wait_max: float
+    run_time_mean: float
+    utilization: dict[str, float]  # Busy fraction per device
+
+
+class FleetScheduler:
+    """
+    Runs queued agent tasks across a fleet of devices.
+
+    Args:
+        devices: Devices available to the fleet.
+        agent_factory: Builds the agent for a device. The agent needs
+            ``run(task) -> str`` and ``request_stop()``, and may have a
+            ``reset()`` that drops a stop request left over from a stopped
+            task. Defaults to a ``PhoneAgent`` (ADB/HDC) or
+            ``IOSPhoneAgent`` (iOS) per device.
+        model_config: Model configuration for default agents.
+        agent_config: Template ``AgentConfig`` for default Android/HarmonyOS
+            agents; ``device_id`` is filled in per device.
+        ios_agent_config: Template ``IOSAgentConfig`` for default iOS agents;
+            ``device_id`` and ``wda_url`` are filled in per device.
+        clock: Monotonic clock, replaceable in tests.
+
+    Example:
+        >>> fleet = FleetScheduler([
+        ...     FleetDevice("emulator-5554"),
+        ...     FleetDevice("hdc-1", DeviceType.HDC),
+        ... ])
+        >>> fleet.start()
+        >>> task = fleet.submit("Open Settings", timeout=300)
+        >>> task.wait()
+        >>> fleet.shutdown()
+    """
+
+    def __init__(
+        self,
+        devices: Iterable[FleetDevice],
+        agent_factory: Callable[[FleetDevice], Any] | None = None,
+        model_config=None,
+        agent_config=None,
+        ios_agent_config=None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.devices = {device.device_id: device for device in devices}
+        if not self.devices:
+            raise ValueError("FleetScheduler needs at least one device")
+        self.model_config = model_config
+        self.agent_config = agent_config
+        self.ios_agent_config = ios_agent_config
+        self._agent_factory = agent_factory or self._default_agent
+        self._clock = clock
+
+        self._condition = threading.Condition()
+        self._pending: deque[FleetTask] = deque()
+        # device_id -> (running task, its agent once built)
+        self._running: dict[str, tuple[FleetTask, Any]] = {}
+        self._tasks: list[FleetTask] = []
+        self._agents: dict[str, Any] = {}
+        self._busy_time = {device_id: 0.0 for device_id in self.devices}
+        self._workers: list[threading.Thread] = []
+        self._dispatcher: threading.Thread | None = None
+        self._closing = False
+        self._started_at: float | None = None
+
+    def start(self) -> "FleetScheduler":
+        """Start dispatching queued tasks."""
+        with self._condition:
+            if self._dispatcher is None:
+                self._closing = False
+                self._started_at = self._clock()
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch_loop, name="fleet-dispatcher", daemon=True
+                )
+                self._dispatcher.start()
+        return self
+
+    def submit(
+        self,
+        task: str,
+        device_type: DeviceType | None = None,
+        device_id: str | None = None,
+        timeout: float | None = None,
+    ) -> FleetTask:
+        """
+        Queue a task.
+
+        Args:
+            task: Natural language task for the agent.
+            device_type: Platform the task needs. None accepts any device.
+            device_id: Run only on this device.
+            timeout: Stop the task after this many seconds of run time.
+
+        Returns:
+            The queued FleetTask.
+
+        Raises:
+            ValueError: If no device in the fleet can ever run the task.
+        """
+        fleet_task = FleetTask(task, device_type, device_id, timeout)
+        if not any(fleet_task.matches(d) for d in self.devices.values()):
+            raise ValueError(
+                f"No device in the fleet matches device_type={device_type} "
+                f"device_id={device_id}"
+            )
+        with self._condition:
+            if self._closing:
+                raise RuntimeError("FleetScheduler is shut down")
+            fleet_task.submitted_at = self._clock()
+            self._pending.append(fleet_task)
+            self._tasks.append(fleet_task)
+            self._condition.notify_all()
+        return fleet_task
+
+    def cancel(self, task: FleetTask | str) -> bool:
+        """
+        Cancel a task.
+
+        A pending task is removed from the queue at once. A running task is
+        asked to stop and finishes as cancelled after its current step.
+
+        Returns:
+            False if the task is unknown or already finished.
+        """
+        with self._condition:
+            fleet_task = self._find(task)
+            if fleet_task is None or fleet_task.done:
+                return False
+            if fleet_task.status != TaskStatus.PENDING:
+                self._request_stop(fleet_task, TaskStatus.CANCELLED)
+                return True
+            self._pending.remove(fleet_task)
+            self._finish(fleet_task, TaskStatus.CANCELLED)
+        self._emit_finished(fleet_task)
+        return True
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait until every submitted task is done. Returns False on timeout."""
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._condition:
+            while any(not task.done for task in self._tasks):
+                remaining = None if deadline is None else deadline - self._clock()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        """
+        Stop accepting tasks and stop the dispatcher.
+
+        Args:
+            wait: Wait for queued and running tasks to finish first.
+            cancel_pending: Cancel queued tasks and stop running ones instead
+                of letting them finish.
+        """
+        if cancel_pending:
+            with self._condition:
+                unfinished = [task for task in self._tasks if not task.done]
+            for task in unfinished:
+                self.cancel(task)
+        if wait:
+            self.join()
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+            self._dispatcher = None
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    @property
+    def tasks(self) -> list[FleetTask]:
+        """All submitted tasks in submission order."""
+        with self._condition:
+            return list(self._tasks)
+
+    def metrics(self) -> FleetMetrics:
+        """Snapshot of queue, throughput and utilization metrics."""
+        with self._condition:
+            now = self._clock()
+            tasks = list(self._tasks)
+            busy = dict(self._busy_time)
+            for device_id, (task, _) in self._running.items():
+                busy[device_id] += now - task.started_at
+            elapsed = now - self._started_at if self._started_at is not None else 0.0
+
+        counts = {status: 0 for status in TaskStatus}
+        for task in tasks:
+            counts[task.status] += 1
+        finished = [task for task in tasks if task.done and task.started_at is not None]
+        waits = sorted(task.queue_wait for task in tasks if task.queue_wait is not None)
+        run_times = [task.run_time for task in finished]
+
+        return FleetMetrics(
+            submitted=len(tasks),
+            pending=counts[TaskStatus.PENDING],
+            running=counts[TaskStatus.RUNNING],
+            completed=counts[TaskStatus.COMPLETED],
+            failed=counts[TaskStatus.FAILED],
+            cancelled=counts[TaskStatus.CANCELLED],
+            timed_out=counts[TaskStatus.TIMED_OUT],
+            elapsed=elapsed,
+            throughput=len(finished) / elapsed if elapsed > 0 else 0.0,
+            queue_wait_mean=statistics.mean(waits) if waits else 0.0,
+            queue_wait_p95=waits[min(len(waits) - 1, int(len(waits) * 0.95))]
+            if waits
+            else 0.0,
+            queue_wait_max=waits[-1] if waits else 0.0,
+            run_time_mean=statistics.mean(run_times) if run_times else 0.0,
+            utilization={
+                device_id: (seconds / elapsed if elapsed > 0 else 0.0)
+                for device_id, seconds in busy.items()
+            },
+        )
+
+    def _find(self, task: FleetTask | str) -> FleetTask | None:
+        if isinstance(task, FleetTask):
+            return task if task in self._tasks else None
+        return next((t for t in self._tasks if t.task_id == task), None)
+
+    def _default_agent(self, device: FleetDevice):
+        if device.device_type == DeviceType.IOS:
+            from phone_agent.agent_ios import IOSAgentConfig, IOSPhoneAgent
+
+            template = self.ios_agent_config or IOSAgentConfig(verbose=False)
+            config = replace(
+                template,
+                device_id=device.device_id,
+                wda_url=device.wda_url or template.wda_url,
+            )
+            return IOSPhoneAgent(self.model_config, config)
+
+        from phone_agent.agent import AgentConfig, PhoneAgent
+
+        template = self.agent_config or AgentConfig(verbose=False)
+        config = replace(template, device_id=device.device_id)
+        return PhoneAgent(self.model_config, config, device_factory=device.factory)
+
+    def _agent_for(self, device: FleetDevice):
+        agent = self._agents.get(device.device_id)
+        if agent is None:
+            agent = self._agents[device.device_id] = self._agent_factory(device)
+        return agent
+
+    def _dispatch_loop(self) -> None:
+        with self._condition:
+            while not self._closing:
+                self._assign_tasks()
+                self._condition.wait(self._enforce_timeouts())
+
+    def _assign_tasks(self) -> None:
+        """Start every pending task that has an idle matching device."""
+        for task in list(self._pending):
+            device = next(
+                (
+                    d
+                    for d in self.devices.values()
+                    if d.device_id not in self._running and task.matches(d)
+                ),
+                None,
+            )
+            if device is None:
+                continue
+            self._pending.remove(task)
+            task.status = TaskStatus.RUNNING
+            task.assigned_device = device.device_id
+            task.started_at = self._clock()
+            self._running[device.device_id] = (task, None)
+            worker = threading.Thread(
+                target=self._run_task,
+                args=(task, device),
+                name=f"fleet-{device.device_id}",
+                daemon=True,
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def _enforce_timeouts(self) -> float | None:
+        """Stop overdue tasks; return seconds until the next deadline."""
+        now = self._clock()
+        next_deadline = None
+        for task, _ in list(self._running.values()):
+            if task.timeout is None or task._stop_reason is not None:
+                continue
+            remaining = task.started_at + task.timeout - now
+            if remaining <= 0:
+                self._request_stop(task, TaskStatus.TIMED_OUT)
+            elif next_deadline is None or remaining < next_deadline:
+                next_deadline = remaining
+        return next_deadline
+
+    def _request_stop(self, task: FleetTask, reason: TaskStatus) -> None:
+        """Ask a running task to stop; called with the condition held."""
+        if task._stop_reason is None:
+            task._stop_reason = reason
+        _, agent = self._running.get(task.assigned_device, (None, None))
+        if agent is not None:
+            agent.request_stop()
+
+    def _run_task(self, task: FleetTask, device: FleetDevice) -> None:
+        emit_agent_event(
+            "fleet_task_started",
+            {
+                "task_id": task.task_id,
+                "device_id": device.device_id,
+                "queue_wait": round(task.queue_wait, 4),
+            },
+            source="phone_agent.fleet",
+        )
+        status, result, error = TaskStatus.COMPLETED, None, None
+        try:
+            agent = self._agent_for(device)
+            with self._condition:
+                self._running[device.device_id] = (task, agent)
+                stop_early = task._stop_reason is not None
+            try:
+                if not stop_early:
+                    result = agent.run(task.task)
+            finally:
+                self._detach_agent(task, device, agent)
+        except Exception as e:
+            status, error = TaskStatus.FAILED, str(e)
+
+        with self._condition:
+            task.result = result
+            task.error = error
+            self._running.pop(device.device_id, None)
+            task.finished_at = self._clock()
+            self._busy_time[device.device_id] += task.run_time
+            self._finish(task, task._stop_reason or status)
+        self._emit_finished(task)
+
+    def _detach_agent(self, task: FleetTask, device: FleetDevice, agent) -> None:
+        """Stop forwarding stop requests to an agent whose run has ended."""
+        with self._condition:
+            self._running[device.device_id] = (task, None)
+            stopped = task._stop_reason is not None
+        # A stop that arrived after run() returned would end the next task
+        reset = getattr(agent, "reset", None)
+        if stopped and reset is not None:
+            reset()
+
+    def _finish(self, task: FleetTask, status: TaskStatus) -> None:
+        """Record a final state; called with the condition held."""
+        task.status = status
+        task._done.set()
+        self._condition.notify_all()
+
+    def _emit_finished(self, task: FleetTask) -> None:
+        emit_agent_event(
+            "fleet_task_finished",
+            {
+                "task_id": task.task_id,
+                "device_id": task.assigned_device,
+                "status": task.status.value,
+                "run_time": round(task.run_time or 0.0, 4),
+            },
+            source="phone_agent.fleet",
+            level="warning" if task.status == TaskStatus.FAILED else "info",
+        )
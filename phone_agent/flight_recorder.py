@@ -0,0 +1,364 @@
+"""Flight recorder for agent events.
+
+``FlightRecorder`` listens to the event emitter and keeps the most recent
+events in a fixed-size ring buffer, plus, optionally, the most recent step
+screenshots stored once per content hash. The buffer can be dumped to a
+JSONL file (gzip-compressed when the name ends in ".gz") on demand, and is
+dumped automatically when an error event arrives.
+
+A dump can be replayed through any event formatter at its original pace or
+faster::
+
+    python -m phone_agent.flight_recorder dump.jsonl.gz --formatter gui --speed 10
+"""
+
+import argparse
+import base64
+import datetime
+import gzip
+import hashlib
+import importlib
+import json
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from phone_agent.events import AgentEventEmitter, get_global_event_emitter
+
+logger = logging.getLogger(__name__)
+
+DUMP_FORMAT = "phone-agent-flight-recorder"
+DUMP_VERSION = 1
+
+# Android screenshots are PNG, HarmonyOS ones JPEG
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Event formatters the replay command can load, as "module:attribute"
+FORMATTERS = {
+    "web": "web.core.handlers.command_handler:format_agent_event_text",
+    "gui": "yuntai.gui.controller.core:format_agent_event_text",
+}
+
+_RECORDER: "FlightRecorder | None" = None
+
+
+@dataclass
+class FlightDump:
+    """Contents of a dump file."""
+
+    header: dict[str, Any]
+    events: list[dict[str, Any]] = field(default_factory=list)
+    screenshots: dict[str, bytes] = field(default_factory=dict)
+
+
+class FlightRecorder:
+    """
+    Ring buffer of recent agent events and step screenshots.
+
+    Args:
+        capacity: Events kept; older ones are overwritten.
+        max_screenshots: Distinct screenshots kept. 0 disables screenshots.
+        dump_dir: Directory for automatic dumps. No automatic dumps when None.
+        dump_interval: Minimum seconds between automatic dumps.
+        max_dumps: Timestamped dumps kept in ``dump_dir``; older ones are
+            deleted after each new one. 0 keeps them all.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 5000,
+        max_screenshots: int = 0,
+        dump_dir: str | Path | None = None,
+        dump_interval: float = 60.0,
+        max_dumps: int = 20,
+    ):
+        self.capacity = capacity
+        self.max_screenshots = max_screenshots
+        self.dump_dir = Path(dump_dir) if dump_dir is not None else None
+        self.dump_interval = dump_interval
+        self.max_dumps = max_dumps
+        self.recorded = 0  # Events seen, including overwritten ones
+        self._events: deque[dict[str, Any]] = deque(maxlen=capacity)
+        self._screenshots: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_dump = float("-inf")
+        self._emitter: AgentEventEmitter | None = None
+
+    def __call__(self, event: dict[str, Any]) -> None:
+        with self._lock:
+            self._events.append(event)
+            self.recorded += 1
+        if event.get("level") == "error" and self.dump_dir is not None:
+            self._dump_on_error()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def attach(self, emitter: AgentEventEmitter | None = None) -> None:
+        """Start recording the events of ``emitter`` (the global one by default)."""
+        self.detach()
+        self._emitter = emitter or get_global_event_emitter()
+        self._emitter.on(self)
+
+    def detach(self) -> None:
+        if self._emitter is not None:
+            self._emitter.off(self)
+            self._emitter = None
+
+    @property
+    def records_screenshots(self) -> bool:
+        return self.max_screenshots > 0
+
+    def record_screenshot(
+        self, image_data: bytes, run_id: str | None = None, step: int | None = None
+    ) -> str | None:
+        """
+        Keep a step screenshot and record a "screenshot" event referencing it.
+
+        Returns:
+            The screenshot's content hash, or None when screenshots are off.
+        """
+        if not self.records_screenshots:
+            return None
+        digest = hashlib.blake2b(image_data, digest_size=16).hexdigest()
+        event = {
+            "type": "screenshot",
+            "payload": {"hash": digest, "bytes": len(image_data)},
+            "source": "phone_agent.flight_recorder",
+            "level": "debug",
+            "run_id": run_id,
+            "step": step,
+            "timestamp": datetime.datetime.now().isoformat(),
+        }
+        with self._lock:
+            if digest in self._screenshots:
+                self._screenshots.move_to_end(digest)
+            else:
+                self._screenshots[digest] = image_data
+                while len(self._screenshots) > self.max_screenshots:
+                    self._screenshots.popitem(last=False)
+            self._events.append(event)
+            self.recorded += 1
+        return digest
+
+    def snapshot(self) -> FlightDump:
+        """Copy of the buffer; screenshots no event refers to are left out."""
+        with self._lock:
+            events = list(self._events)
+            screenshots = dict(self._screenshots)
+        referenced = {
+            e["payload"]["hash"] for e in events if e.get("type") == "screenshot"
+        }
+        header = {
+            "format": DUMP_FORMAT,
+            "version": DUMP_VERSION,
+            "created": datetime.datetime.now().isoformat(),
+            "capacity": self.capacity,
+            "recorded": self.recorded,
+            "events": len(events),
+        }
+        return FlightDump(
+            header=header,
+            events=events,
+            screenshots={h: d for h, d in screenshots.items() if h in referenced},
+        )
+
+    def dump(self, path: str | Path | None = None) -> Path:
+        """
+        Write the buffer to ``path``, or to a timestamped file in ``dump_dir``.
+
+        Timestamped dumps beyond ``max_dumps`` are deleted, oldest first.
+
+        Returns:
+            The written file.
+        """
+        timestamped = path is None
+        if timestamped:
+            if self.dump_dir is None:
+                raise ValueError("No dump path given and no dump_dir set")
+            stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            path = self.dump_dir / f"flight-{stamp}.jsonl.gz"
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_dump(self.snapshot(), path)
+        if timestamped:
+            self._prune_dumps()
+        return path
+
+    def _prune_dumps(self) -> None:
+        if self.max_dumps <= 0:
+            return
+        # The timestamp in the name sorts in creation order
+        dumps = sorted(self.dump_dir.glob("flight-*.jsonl.gz"))
+        for old in dumps[: -self.max_dumps]:
+            try:
+                old.unlink()
+            except OSError as e:
+                logger.warning("Could not delete old flight dump %s: %s", old, e)
+
+    def _dump_on_error(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_dump < self.dump_interval:
+                return
+            self._last_dump = now
+        # Writing the file must not hold up the thread that reported the error
+        threading.Thread(target=self._safe_dump, daemon=True).start()
+
+    def _safe_dump(self) -> None:
+        try:
+            path = self.dump()
+            logger.info("Flight recorder dumped to %s", path)
+        except Exception as e:
+            logger.warning("Flight recorder dump failed: %s", e)
+
+
+def write_dump(dump: FlightDump, path: str | Path) -> None:
+    """Write a dump as JSONL: header, events, then screenshots in base64."""
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    header = dict(dump.header, screenshots=len(dump.screenshots))
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps(header, ensure_ascii=False) + "\n")
+        for event in dump.events:
+            line = json.dumps({"event": event}, ensure_ascii=False, default=str)
+            f.write(line + "\n")
+        for digest, data in dump.screenshots.items():
+            encoded = base64.b64encode(data).decode("ascii")
+            f.write(json.dumps({"screenshot": digest, "data": encoded}) + "\n")
+
+
+def load_dump(path: str | Path) -> FlightDump:
+    """Read a file written by ``write_dump``."""
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != DUMP_FORMAT:
+            raise ValueError(f"Not a flight recorder dump: {path}")
+        dump = FlightDump(header=header)
+        for line in f:
+            record = json.loads(line)
+            if "event" in record:
+                dump.events.append(record["event"])
+            else:
+                dump.screenshots[record["screenshot"]] = base64.b64decode(
+                    record["data"]
+                )
+    return dump
+
+
+def replay(
+    events: Iterable[dict[str, Any]],
+    sinks: Iterable[Callable[[dict[str, Any]], Any]],
+    speed: float = 1.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> int:
+    """
+    Feed recorded events to sinks, keeping their original spacing.
+
+    Args:
+        events: Recorded event dicts in order.
+        sinks: Called with every event, e.g. a formatter or an emitter's emit.
+        speed: Playback speed factor; 0 replays without waiting.
+        sleep: Sleep function. Defaults to time.sleep.
+
+    Returns:
+        The number of events replayed.
+    """
+    sinks = list(sinks)
+    previous = None
+    count = 0
+    for event in events:
+        current = _event_time(event)
+        if speed > 0 and previous is not None and current is not None:
+            delay = (current - previous).total_seconds() / speed
+            if delay > 0:
+                sleep(delay)
+        if current is not None:
+            previous = current
+        for sink in sinks:
+            sink(event)
+        count += 1
+    return count
+
+
+def _event_time(event: dict[str, Any]) -> datetime.datetime | None:
+    try:
+        return datetime.datetime.fromisoformat(event["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def get_flight_recorder() -> FlightRecorder | None:
+    """Return the installed recorder, if any."""
+    return _RECORDER
+
+
+def install_flight_recorder(recorder: FlightRecorder | None) -> FlightRecorder | None:
+    """
+    Attach ``recorder`` to the global emitter in place of the installed one.
+
+    Returns:
+        The previously installed recorder.
+    """
+    global _RECORDER
+    previous, _RECORDER = _RECORDER, recorder
+    if previous is not None:
+        previous.detach()
+    if recorder is not None:
+        recorder.attach()
+    return previous
+
+
+def load_formatter(name: str) -> Callable[[dict[str, Any]], str]:
+    """Import a formatter by FORMATTERS key or "module:attribute" path."""
+    module_name, _, attribute = FORMATTERS.get(name, name).partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay a flight recorder dump.")
+    parser.add_argument("dump", help="File written by FlightRecorder.dump")
+    parser.add_argument(
+        "--formatter",
+        default="web",
+        help="web, gui, json or a module:attribute formatter path",
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="Playback speed; 0 for no waiting"
+    )
+    parser.add_argument(
+        "--screenshots", help="Directory to write the dump's screenshots to"
+    )
+    args = parser.parse_args(argv)
+
+    dump = load_dump(args.dump)
+    if args.formatter == "json":
+
+        def sink(event):
+            print(json.dumps(event, ensure_ascii=False, default=str), flush=True)
+
+    else:
+        formatter = load_formatter(args.formatter)
+
+        def sink(event):
+            sys.stdout.write(formatter(event))
+            sys.stdout.flush()
+
+    replay(dump.events, [sink], speed=args.speed)
+    if args.screenshots:
+        directory = Path(args.screenshots)
+        directory.mkdir(parents=True, exist_ok=True)
+        for digest, data in dump.screenshots.items():
+            suffix = ".png" if data.startswith(PNG_SIGNATURE) else ".jpg"
+            (directory / f"{digest}{suffix}").write_bytes(data)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,11 +24,19 @@ from phone_agent.hdc.input import (
     restore_keyboard,
     type_text,
 )
-from phone_agent.hdc.screenshot import get_screenshot
+from phone_agent.hdc.screenshot import get_screenshot, set_jpeg_passthrough
+from phone_agent.hdc.shell import (
+    HDCShellPool,
+    HDCShellSession,
+    get_shell_pool,
+    run_shell_command,
+    set_shell_pool_enabled,
+)
 
 __all__ = [
     # Screenshot
     "get_screenshot",
+    "set_jpeg_passthrough",
     # Input
     "type_text",
     "clear_text",
@@ -50,4 +58,10 @@ __all__ = [
     "quick_connect",
     "list_devices",
     "set_hdc_verbose",
+    # Shell sessions
+    "HDCShellSession",
+    "HDCShellPool",
+    "get_shell_pool",
+    "run_shell_command",
+    "set_shell_pool_enabled",
 ]
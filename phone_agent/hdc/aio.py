@@ -0,0 +1,288 @@
+"""Asyncio versions of the HDC device operations.
+
+Mirrors ``phone_agent.adb.aio``: screenshots, the current-app probe, taps,
+swipes and keys run ``hdc`` through asyncio subprocesses, while app launch,
+text input and keyboard switching reuse the synchronous implementations in a
+worker thread.
+"""
+
+import asyncio
+import os
+import subprocess
+import tempfile
+import uuid
+from io import BytesIO
+
+from PIL import Image
+
+from phone_agent.adb.aio import run_subprocess
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.hdc import device, input as hdc_input, screenshot
+from phone_agent.hdc.connection import list_devices as _list_devices
+from phone_agent.hdc.device import _parse_current_app, _swipe_duration
+from phone_agent.imaging import Screenshot, jpeg_size
+from phone_agent.settle import wait_after_action_async
+
+
+def _hdc_command(device_id: str | None) -> list[str]:
+    cmd = ["hdc"]
+    if device_id:
+        cmd += ["-t", device_id]
+    return cmd
+
+
+async def run_shell_command(
+    args: list[str], device_id: str | None = None, timeout: float | None = None
+) -> subprocess.CompletedProcess:
+    """
+    Run a command in the device shell.
+
+    Returns:
+        CompletedProcess with text output.
+    """
+    result = await run_subprocess(
+        _hdc_command(device_id) + ["shell"] + list(args), timeout
+    )
+    return subprocess.CompletedProcess(
+        result.args,
+        result.returncode,
+        result.stdout.decode("utf-8", errors="replace"),
+        result.stderr.decode("utf-8", errors="replace"),
+    )
+
+
+async def _receive_file(
+    remote_path: str, device_id: str | None, timeout: float
+) -> bytes | None:
+    """Fetch a device file with ``hdc file recv`` and return its bytes."""
+    temp_path = os.path.join(tempfile.gettempdir(), f"screenshot_{uuid.uuid4()}.jpeg")
+    await run_subprocess(
+        _hdc_command(device_id) + ["file", "recv", remote_path, temp_path], timeout
+    )
+    if not os.path.exists(temp_path):
+        return None
+    try:
+        with open(temp_path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(temp_path)
+
+
+def _failed(result: subprocess.CompletedProcess) -> bool:
+    output = (result.stdout + result.stderr).lower()
+    return "fail" in output or "error" in output or "not found" in output
+
+
+async def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
+    """
+    Capture a screenshot from the connected HarmonyOS device.
+
+    Args:
+        device_id: Optional HDC device ID for multi-device setups.
+        timeout: Timeout in seconds for screenshot operations.
+
+    Returns:
+        Screenshot object, or a black fallback image on failure.
+    """
+    remote_path = screenshot._REMOTE_PATH
+    try:
+        result = await run_shell_command(["screenshot", remote_path], device_id, timeout)
+        if _failed(result):
+            result = await run_shell_command(
+                ["snapshot_display", "-f", remote_path], device_id, timeout
+            )
+            output = (result.stdout + result.stderr).lower()
+            if "fail" in output or "error" in output:
+                return screenshot._create_fallback_screenshot(is_sensitive=True)
+
+        data = await _receive_file(remote_path, device_id, timeout=5)
+        if data is None:
+            return screenshot._create_fallback_screenshot(is_sensitive=False)
+
+        if screenshot._JPEG_PASSTHROUGH:
+            size = jpeg_size(data)
+            if size is not None:
+                return Screenshot(
+                    image_data=data,
+                    width=size[0],
+                    height=size[1],
+                    is_sensitive=False,
+                    mime_type="image/jpeg",
+                )
+
+        return await asyncio.to_thread(_transcode_png, data)
+
+    except Exception as e:
+        print(f"Screenshot error: {e}")
+        return screenshot._create_fallback_screenshot(is_sensitive=False)
+
+
+def _transcode_png(data: bytes) -> Screenshot:
+    img = Image.open(BytesIO(data))
+    buffered = BytesIO()
+    img.save(buffered, format="PNG")
+    return Screenshot(
+        image_data=buffered.getvalue(),
+        width=img.width,
+        height=img.height,
+        is_sensitive=False,
+    )
+
+
+async def capture_frame(device_id: str | None = None, timeout: int = 5) -> bytes:
+    """
+    Capture the raw JPEG bytes of the current screen for settle detection.
+
+    Raises:
+        ValueError: If the capture failed.
+    """
+    remote_path = "/data/local/tmp/tmp_settle_frame.jpeg"
+    result = await run_shell_command(["screenshot", remote_path], device_id, timeout)
+    output = (result.stdout + result.stderr).lower()
+    if "fail" in output or "error" in output:
+        raise ValueError(f"Screen capture failed: {output.strip()}")
+
+    data = await _receive_file(remote_path, device_id, timeout)
+    if data is None:
+        raise ValueError("Screen capture was not received")
+    return data
+
+
+async def get_current_app(device_id: str | None = None) -> str:
+    """
+    Get the currently focused app name.
+
+    Shares the cache of ``phone_agent.hdc.device.get_current_app``.
+
+    Args:
+        device_id: Optional HDC device ID for multi-device setups.
+
+    Returns:
+        The app name if recognized, otherwise "System Home".
+    """
+    cached = device._CURRENT_APP_CACHE.get(device_id)
+    if cached is not None:
+        return cached
+
+    generation = device._CURRENT_APP_CACHE.generation
+    result = await run_shell_command(["aa", "dump", "-l"], device_id)
+    if not result.stdout:
+        raise ValueError("No output from aa dump")
+
+    app_name = _parse_current_app(result.stdout)
+    device._CURRENT_APP_CACHE.put(device_id, app_name, generation)
+    return app_name
+
+
+async def _settle(
+    device_id: str | None, delay: float | None, default_delay: float
+) -> None:
+    await wait_after_action_async(
+        delay, default_delay, lambda: capture_frame(device_id)
+    )
+    device.invalidate_current_app(device_id)
+
+
+async def tap(
+    x: int, y: int, device_id: str | None = None, delay: float | None = None
+) -> None:
+    """Tap at the specified coordinates."""
+    await run_shell_command(["uitest", "uiInput", "click", str(x), str(y)], device_id)
+    await _settle(device_id, delay, TIMING_CONFIG.device.default_tap_delay)
+
+
+async def double_tap(
+    x: int, y: int, device_id: str | None = None, delay: float | None = None
+) -> None:
+    """Double tap at the specified coordinates."""
+    await run_shell_command(
+        ["uitest", "uiInput", "doubleClick", str(x), str(y)], device_id
+    )
+    await _settle(device_id, delay, TIMING_CONFIG.device.default_double_tap_delay)
+
+
+async def long_press(
+    x: int,
+    y: int,
+    duration_ms: int = 3000,
+    device_id: str | None = None,
+    delay: float | None = None,
+) -> None:
+    """Long press at the specified coordinates."""
+    await run_shell_command(
+        ["uitest", "uiInput", "longClick", str(x), str(y)], device_id
+    )
+    await _settle(device_id, delay, TIMING_CONFIG.device.default_long_press_delay)
+
+
+async def swipe(
+    start_x: int,
+    start_y: int,
+    end_x: int,
+    end_y: int,
+    duration_ms: int | None = None,
+    device_id: str | None = None,
+    delay: float | None = None,
+) -> None:
+    """Swipe from start to end coordinates."""
+    if duration_ms is None:
+        duration_ms = _swipe_duration(start_x, start_y, end_x, end_y)
+
+    await run_shell_command(
+        [
+            "uitest",
+            "uiInput",
+            "swipe",
+            str(start_x),
+            str(start_y),
+            str(end_x),
+            str(end_y),
+            str(duration_ms),
+        ],
+        device_id,
+    )
+    await _settle(device_id, delay, TIMING_CONFIG.device.default_swipe_delay)
+
+
+async def back(device_id: str | None = None, delay: float | None = None) -> None:
+    """Press the back button."""
+    await run_shell_command(["uitest", "uiInput", "keyEvent", "Back"], device_id)
+    await _settle(device_id, delay, TIMING_CONFIG.device.default_back_delay)
+
+
+async def home(device_id: str | None = None, delay: float | None = None) -> None:
+    """Press the home button."""
+    await run_shell_command(["uitest", "uiInput", "keyEvent", "Home"], device_id)
+    await _settle(device_id, delay, TIMING_CONFIG.device.default_home_delay)
+
+
+async def launch_app(
+    app_name: str, device_id: str | None = None, delay: float | None = None
+) -> bool:
+    """Launch an app by name (synchronous implementation in a worker thread)."""
+    return await asyncio.to_thread(device.launch_app, app_name, device_id, delay)
+
+
+async def type_text(text: str, device_id: str | None = None) -> None:
+    """Type text into the focused input field."""
+    await asyncio.to_thread(hdc_input.type_text, text, device_id)
+
+
+async def clear_text(device_id: str | None = None) -> None:
+    """Clear text in the focused input field."""
+    await asyncio.to_thread(hdc_input.clear_text, device_id)
+
+
+async def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
+    """Prepare the keyboard for text input and return the previous IME."""
+    return await asyncio.to_thread(hdc_input.detect_and_set_adb_keyboard, device_id)
+
+
+async def restore_keyboard(ime: str, device_id: str | None = None) -> None:
+    """Restore the given IME."""
+    await asyncio.to_thread(hdc_input.restore_keyboard, ime, device_id)
+
+
+async def list_devices():
+    """List connected devices."""
+    return await asyncio.to_thread(_list_devices)
@@ -1,39 +1,63 @@
 """Device control utilities for HarmonyOS automation."""
 
 import os
-import subprocess
-import time
 from typing import List, Optional, Tuple
 
+from phone_agent.app_resolver import CurrentAppCache, get_app_index
 from phone_agent.config.apps_harmonyos import APP_ABILITIES, APP_PACKAGES
 from phone_agent.config.timing import TIMING_CONFIG
-from phone_agent.hdc.connection import _run_hdc_command
+from phone_agent.hdc.screenshot import capture_frame
+from phone_agent.hdc.shell import run_shell_command
+from phone_agent.settle import wait_after_action
+from phone_agent.tracing import traced
 import re
 
+_APP_INDEX = get_app_index(APP_PACKAGES)
+_CURRENT_APP_CACHE = CurrentAppCache(lambda: TIMING_CONFIG.device.current_app_ttl)
+
+@traced("hdc.current_app")
 def get_current_app(device_id: str | None = None) -> str:
     """
     Get the currently focused app name.
 
+    The result is reused for TIMING_CONFIG.device.current_app_ttl seconds
+    unless a device action runs in between.
+
     Args:
         device_id: Optional HDC device ID for multi-device setups.
 
     Returns:
         The app name if recognized, otherwise "System Home".
     """
-    hdc_prefix = _get_hdc_prefix(device_id)
+    cached = _CURRENT_APP_CACHE.get(device_id)
+    if cached is not None:
+        return cached
+
+    generation = _CURRENT_APP_CACHE.generation
+    app_name = _query_current_app(device_id)
+    _CURRENT_APP_CACHE.put(device_id, app_name, generation)
+    return app_name
+
 
+def invalidate_current_app(device_id: str | None = None) -> None:
+    """Forget the cached foreground app after an action on the device."""
+    _CURRENT_APP_CACHE.invalidate(device_id)
+
+
+def _query_current_app(device_id: str | None) -> str:
+    """Read the foreground mission from the device and map it to an app name."""
     # Use 'aa dump -l' to list running abilities
-    result = _run_hdc_command(
-        hdc_prefix + ["shell", "aa", "dump", "-l"],
-        capture_output=True,
-        text=True,
-        encoding="utf-8"
-    )
+    result = run_shell_command(["aa", "dump", "-l"], device_id)
     output = result.stdout
     # print(output)
     if not output:
         raise ValueError("No output from aa dump")
 
+    return _parse_current_app(output)
+
+
+def _parse_current_app(output: str) -> str:
+    """Map the foreground mission in ``aa dump -l`` output to an app name."""
     # Parse missions and find the one with FOREGROUND state
     # Output format:
     # Mission ID #139
@@ -67,9 +91,9 @@ def get_current_app(device_id: str | None = None) -> str:
 
     # Match against known apps
     if foreground_bundle:
-        for app_name, package in APP_PACKAGES.items():
-            if package == foreground_bundle:
-                return app_name
+        app_name = _APP_INDEX.name_for(foreground_bundle)
+        if app_name is not None:
+            return app_name
         # If bundle is found but not in our known apps, return the bundle name
         print(f'Bundle is found but not in our known apps: {foreground_bundle}')
         return foreground_bundle
@@ -87,19 +111,15 @@ def tap(
         x: X coordinate.
         y: Y coordinate.
         device_id: Optional HDC device ID.
-        delay: Delay in seconds after tap. If None, uses configured default.
+        delay: Delay in seconds after tap. If None, waits per the
+            configured settle mode.
     """
-    if delay is None:
-        delay = TIMING_CONFIG.device.default_tap_delay
-
-    hdc_prefix = _get_hdc_prefix(device_id)
-
     # HarmonyOS uses uitest uiInput click
-    _run_hdc_command(
-        hdc_prefix + ["shell", "uitest", "uiInput", "click", str(x), str(y)],
-        capture_output=True
+    run_shell_command(["uitest", "uiInput", "click", str(x), str(y)], device_id)
+    wait_after_action(
+        delay, TIMING_CONFIG.device.default_tap_delay, lambda: capture_frame(device_id)
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
 
 
 def double_tap(
@@ -112,19 +132,19 @@ def double_tap(
         x: X coordinate.
         y: Y coordinate.
         device_id: Optional HDC device ID.
-        delay: Delay in seconds after double tap. If None, uses configured default.
+        delay: Delay in seconds after double tap. If None, waits per the
+            configured settle mode.
     """
-    if delay is None:
-        delay = TIMING_CONFIG.device.default_double_tap_delay
-
-    hdc_prefix = _get_hdc_prefix(device_id)
-
     # HarmonyOS uses uitest uiInput doubleClick
-    _run_hdc_command(
-        hdc_prefix + ["shell", "uitest", "uiInput", "doubleClick", str(x), str(y)],
-        capture_output=True
+    run_shell_command(
+        ["uitest", "uiInput", "doubleClick", str(x), str(y)], device_id
+    )
+    wait_after_action(
+        delay,
+        TIMING_CONFIG.device.default_double_tap_delay,
+        lambda: capture_frame(device_id),
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
 
 
 def long_press(
@@ -142,20 +162,18 @@ def long_press(
         y: Y coordinate.
         duration_ms: Duration of press in milliseconds (note: HarmonyOS longClick may not support duration).
         device_id: Optional HDC device ID.
-        delay: Delay in seconds after long press. If None, uses configured default.
+        delay: Delay in seconds after long press. If None, waits per the
+            configured settle mode.
     """
-    if delay is None:
-        delay = TIMING_CONFIG.device.default_long_press_delay
-
-    hdc_prefix = _get_hdc_prefix(device_id)
-
     # HarmonyOS uses uitest uiInput longClick
     # Note: longClick may have a fixed duration, duration_ms parameter might not be supported
-    _run_hdc_command(
-        hdc_prefix + ["shell", "uitest", "uiInput", "longClick", str(x), str(y)],
-        capture_output=True,
+    run_shell_command(["uitest", "uiInput", "longClick", str(x), str(y)], device_id)
+    wait_after_action(
+        delay,
+        TIMING_CONFIG.device.default_long_press_delay,
+        lambda: capture_frame(device_id),
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
 
 
 def swipe(
@@ -177,25 +195,16 @@ def swipe(
         end_y: Ending Y coordinate.
         duration_ms: Duration of swipe in milliseconds (auto-calculated if None).
         device_id: Optional HDC device ID.
-        delay: Delay in seconds after swipe. If None, uses configured default.
+        delay: Delay in seconds after swipe. If None, waits per the
+            configured settle mode.
     """
-    if delay is None:
-        delay = TIMING_CONFIG.device.default_swipe_delay
-
-    hdc_prefix = _get_hdc_prefix(device_id)
-
     if duration_ms is None:
-        # Calculate duration based on distance
-        dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
-        duration_ms = int(dist_sq / 1000)
-        duration_ms = max(500, min(duration_ms, 1000))  # Clamp between 500-1000ms
+        duration_ms = _swipe_duration(start_x, start_y, end_x, end_y)
 
     # HarmonyOS uses uitest uiInput swipe
     # Format: swipe startX startY endX endY duration
-    _run_hdc_command(
-        hdc_prefix
-        + [
-            "shell",
+    run_shell_command(
+        [
             "uitest",
             "uiInput",
             "swipe",
@@ -205,9 +214,21 @@ def swipe(
             str(end_y),
             str(duration_ms),
         ],
-        capture_output=True,
+        device_id,
+    )
+    wait_after_action(
+        delay,
+        TIMING_CONFIG.device.default_swipe_delay,
+        lambda: capture_frame(device_id),
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
+
+
+def _swipe_duration(start_x: int, start_y: int, end_x: int, end_y: int) -> int:
+    """Calculate a swipe duration in milliseconds based on distance."""
+    dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
+    duration_ms = int(dist_sq / 1000)
+    return max(500, min(duration_ms, 1000))  # Clamp between 500-1000ms
 
 
 def back(device_id: str | None = None, delay: float | None = None) -> None:
@@ -216,19 +237,15 @@ def back(device_id: str | None = None, delay: float | None = None) -> None:
 
     Args:
         device_id: Optional HDC device ID.
-        delay: Delay in seconds after pressing back. If None, uses configured default.
+        delay: Delay in seconds after pressing back. If None, waits per the
+            configured settle mode.
     """
-    if delay is None:
-        delay = TIMING_CONFIG.device.default_back_delay
-
-    hdc_prefix = _get_hdc_prefix(device_id)
-
     # HarmonyOS uses uitest uiInput keyEvent Back
-    _run_hdc_command(
-        hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "Back"],
-        capture_output=True
+    run_shell_command(["uitest", "uiInput", "keyEvent", "Back"], device_id)
+    wait_after_action(
+        delay, TIMING_CONFIG.device.default_back_delay, lambda: capture_frame(device_id)
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
 
 
 def home(device_id: str | None = None, delay: float | None = None) -> None:
@@ -237,19 +254,15 @@ def home(device_id: str | None = None, delay: float | None = None) -> None:
 
     Args:
         device_id: Optional HDC device ID.
-        delay: Delay in seconds after pressing home. If None, uses configured default.
+        delay: Delay in seconds after pressing home. If None, waits per the
+            configured settle mode.
     """
-    if delay is None:
-        delay = TIMING_CONFIG.device.default_home_delay
-
-    hdc_prefix = _get_hdc_prefix(device_id)
-
     # HarmonyOS uses uitest uiInput keyEvent Home
-    _run_hdc_command(
-        hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "Home"],
-        capture_output=True
+    run_shell_command(["uitest", "uiInput", "keyEvent", "Home"], device_id)
+    wait_after_action(
+        delay, TIMING_CONFIG.device.default_home_delay, lambda: capture_frame(device_id)
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
 
 
 def launch_app(
@@ -261,20 +274,17 @@ def launch_app(
     Args:
         app_name: The app name (must be in APP_PACKAGES).
         device_id: Optional HDC device ID.
-        delay: Delay in seconds after launching. If None, uses configured default.
+        delay: Delay in seconds after launching. If None, waits per the
+            configured settle mode.
 
     Returns:
         True if app was launched, False if app not found.
     """
-    if delay is None:
-        delay = TIMING_CONFIG.device.default_launch_delay
-
     if app_name not in APP_PACKAGES:
         print(f"[HDC] App '{app_name}' not found in HarmonyOS app list")
         print(f"[HDC] Available apps: {', '.join(sorted(APP_PACKAGES.keys())[:10])}...")
         return False
 
-    hdc_prefix = _get_hdc_prefix(device_id)
     bundle = APP_PACKAGES[app_name]
 
     # Get the ability name for this bundle
@@ -283,28 +293,14 @@ def launch_app(
 
     # HarmonyOS uses 'aa start' command to launch apps
     # Format: aa start -b {bundle} -a {ability}
-    _run_hdc_command(
-        hdc_prefix
-        + [
-            "shell",
-            "aa",
-            "start",
-            "-b",
-            bundle,
-            "-a",
-            ability,
-        ],
-        capture_output=True,
+    run_shell_command(["aa", "start", "-b", bundle, "-a", ability], device_id)
+    wait_after_action(
+        delay,
+        TIMING_CONFIG.device.default_launch_delay,
+        lambda: capture_frame(device_id),
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
     return True
 
-
-def _get_hdc_prefix(device_id: str | None) -> list:
-    """Get HDC command prefix with optional device specifier."""
-    if device_id:
-        return ["hdc", "-t", device_id]
-    return ["hdc"]
-
 if __name__ == "__main__":
     print(get_current_app())
@@ -1,10 +1,10 @@
 """Input utilities for HarmonyOS device text input."""
 
 import base64
-import subprocess
 from typing import Optional
 
-from phone_agent.hdc.connection import _run_hdc_command
+from phone_agent.hdc.device import invalidate_current_app
+from phone_agent.hdc.shell import run_shell_command
 
 
 def type_text(text: str, device_id: str | None = None) -> None:
@@ -22,8 +22,6 @@ def type_text(text: str, device_id: str | None = None) -> None:
         ENTER key code in HarmonyOS: 2054
         Recommendation: Click on the input field first to focus it, then use this function.
     """
-    hdc_prefix = _get_hdc_prefix(device_id)
-
     # Handle multi-line text by splitting on newlines
     if '\n' in text:
         lines = text.split('\n')
@@ -32,19 +30,15 @@ def type_text(text: str, device_id: str | None = None) -> None:
                 # Escape special characters for shell
                 escaped_line = line.replace('"', '\\"').replace("$", "\\$")
 
-                _run_hdc_command(
-                    hdc_prefix + ["shell", "uitest", "uiInput", "text", escaped_line],
-                    capture_output=True,
-                    text=True,
+                run_shell_command(
+                    ["uitest", "uiInput", "text", escaped_line], device_id
                 )
 
             # Send ENTER key event after each line except the last one
             if i < len(lines) - 1:
                 try:
-                    _run_hdc_command(
-                        hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "2054"],
-                        capture_output=True,
-                        text=True,
+                    run_shell_command(
+                        ["uitest", "uiInput", "keyEvent", "2054"], device_id
                     )
                 except Exception as e:
                     print(f"[HDC] ENTER keyEvent failed: {e}")
@@ -56,11 +50,8 @@ def type_text(text: str, device_id: str | None = None) -> None:
 
         # HarmonyOS uitest uiInput text command
         # Format: hdc shell uitest uiInput text "文本内容"
-        _run_hdc_command(
-            hdc_prefix + ["shell", "uitest", "uiInput", "text", escaped_text],
-            capture_output=True,
-            text=True,
-        )
+        run_shell_command(["uitest", "uiInput", "text", escaped_text], device_id)
+    invalidate_current_app(device_id)
 
 
 def clear_text(device_id: str | None = None) -> None:
@@ -74,19 +65,12 @@ def clear_text(device_id: str | None = None) -> None:
         This method uses repeated delete key events to clear text.
         For HarmonyOS, you might also use select all + delete for better efficiency.
     """
-    hdc_prefix = _get_hdc_prefix(device_id)
     # Ctrl+A to select all (key code 2072 for Ctrl, 2017 for A)
     # Then delete
-    _run_hdc_command(
-        hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "2072", "2017"],
-        capture_output=True,
-        text=True,
-    )
-    _run_hdc_command(
-        hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "2055"],  # Delete key
-        capture_output=True,
-        text=True,
-    )
+    run_shell_command(["uitest", "uiInput", "keyEvent", "2072", "2017"], device_id)
+    # Delete key
+    run_shell_command(["uitest", "uiInput", "keyEvent", "2055"], device_id)
+    invalidate_current_app(device_id)
 
 
 def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
@@ -103,14 +87,10 @@ def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
         This is a placeholder. HarmonyOS may not support ADB Keyboard.
         If there's a similar tool for HarmonyOS, integrate it here.
     """
-    hdc_prefix = _get_hdc_prefix(device_id)
-
     # Get current IME (if HarmonyOS supports this)
     try:
-        result = _run_hdc_command(
-            hdc_prefix + ["shell", "settings", "get", "secure", "default_input_method"],
-            capture_output=True,
-            text=True,
+        result = run_shell_command(
+            ["settings", "get", "secure", "default_input_method"], device_id
         )
         current_ime = (result.stdout + result.stderr).strip()
 
@@ -132,18 +112,7 @@ def restore_keyboard(ime: str, device_id: str | None = None) -> None:
     if not ime:
         return
 
-    hdc_prefix = _get_hdc_prefix(device_id)
-
     try:
-        _run_hdc_command(
-            hdc_prefix + ["shell", "ime", "set", ime], capture_output=True, text=True
-        )
+        run_shell_command(["ime", "set", ime], device_id)
     except Exception:
         pass
-
-
-def _get_hdc_prefix(device_id: str | None) -> list:
-    """Get HDC command prefix with optional device specifier."""
-    if device_id:
-        return ["hdc", "-t", device_id]
-    return ["hdc"]
@@ -2,27 +2,31 @@
 
 import base64
 import os
-import subprocess
 import tempfile
 import uuid
-from dataclasses import dataclass
 from io import BytesIO
 from typing import Tuple
 
 from PIL import Image
+
 from phone_agent.hdc.connection import _run_hdc_command
+from phone_agent.hdc.shell import run_shell_command
+from phone_agent.imaging import Screenshot, jpeg_size
+from phone_agent.tracing import traced
 
 
-@dataclass
-class Screenshot:
-    """Represents a captured screenshot."""
+# Global flag to control sending the device JPEG without PNG transcoding
+_JPEG_PASSTHROUGH = os.getenv("PHONE_AGENT_HDC_JPEG_PASSTHROUGH", "true").lower() in (
+    "true",
+    "1",
+    "yes",
+)
 
-    base64_data: str
-    width: int
-    height: int
-    is_sensitive: bool = False
+# Device-side file the screenshot tools write to
+_REMOTE_PATH = "/data/local/tmp/tmp_screenshot.jpeg"
 
 
+@traced("hdc.screenshot")
 def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
     """
     Capture a screenshot from the connected HarmonyOS device.
@@ -35,65 +39,59 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
         Screenshot object containing base64 data and dimensions.
 
     Note:
+        By default the device's JPEG is passed through untouched and its
+        dimensions are read from the JPEG header; with passthrough disabled it
+        is decoded and re-encoded as PNG.
         If the screenshot fails (e.g., on sensitive screens like payment pages),
         a black fallback image is returned with is_sensitive=True.
     """
-    temp_path = os.path.join(tempfile.gettempdir(), f"screenshot_{uuid.uuid4()}.png")
-    hdc_prefix = _get_hdc_prefix(device_id)
+    temp_path = os.path.join(tempfile.gettempdir(), f"screenshot_{uuid.uuid4()}.jpeg")
 
     try:
         # Execute screenshot command
         # HarmonyOS HDC only supports JPEG format
-        remote_path = "/data/local/tmp/tmp_screenshot.jpeg"
-
-        # Try method 1: hdc shell screenshot (newer HarmonyOS versions)
-        result = _run_hdc_command(
-            hdc_prefix + ["shell", "screenshot", remote_path],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
+        # Try method 1: screenshot (newer HarmonyOS versions)
+        result = run_shell_command(["screenshot", _REMOTE_PATH], device_id, timeout)
 
         # Check for screenshot failure (sensitive screen)
         output = result.stdout + result.stderr
         if "fail" in output.lower() or "error" in output.lower() or "not found" in output.lower():
             # Try method 2: snapshot_display (older versions or different devices)
-            result = _run_hdc_command(
-                hdc_prefix + ["shell", "snapshot_display", "-f", remote_path],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
+            result = run_shell_command(
+                ["snapshot_display", "-f", _REMOTE_PATH], device_id, timeout
             )
             output = result.stdout + result.stderr
             if "fail" in output.lower() or "error" in output.lower():
                 return _create_fallback_screenshot(is_sensitive=True)
 
-        # Pull screenshot to local temp path
-        # Note: remote file is JPEG, but PIL can open it regardless of local extension
-        _run_hdc_command(
-            hdc_prefix + ["file", "recv", remote_path, temp_path],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-
-        if not os.path.exists(temp_path):
+        data = _receive_file(_REMOTE_PATH, temp_path, device_id, timeout=5)
+        if data is None:
             return _create_fallback_screenshot(is_sensitive=False)
 
+        if _JPEG_PASSTHROUGH:
+            size = jpeg_size(data)
+            if size is not None:
+                return Screenshot(
+                    image_data=data,
+                    width=size[0],
+                    height=size[1],
+                    is_sensitive=False,
+                    mime_type="image/jpeg",
+                )
+
         # Read JPEG image and convert to PNG for model inference
         # PIL automatically detects the image format from file content
-        img = Image.open(temp_path)
+        img = Image.open(BytesIO(data))
         width, height = img.size
 
         buffered = BytesIO()
         img.save(buffered, format="PNG")
-        base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
-
-        # Cleanup
-        os.remove(temp_path)
 
         return Screenshot(
-            base64_data=base64_data, width=width, height=height, is_sensitive=False
+            image_data=buffered.getvalue(),
+            width=width,
+            height=height,
+            is_sensitive=False,
         )
 
     except Exception as e:
@@ -101,6 +99,62 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
         return _create_fallback_screenshot(is_sensitive=False)
 
 
+def set_jpeg_passthrough(enabled: bool) -> None:
+    """Enable or disable sending the device JPEG without PNG transcoding."""
+    global _JPEG_PASSTHROUGH
+    _JPEG_PASSTHROUGH = enabled
+
+
+def capture_frame(device_id: str | None = None, timeout: int = 5) -> bytes:
+    """
+    Capture the raw JPEG bytes of the current screen for settle detection.
+
+    The frame is not converted to PNG, and no placeholder is returned on
+    failure.
+
+    Args:
+        device_id: Optional HDC device ID for multi-device setups.
+        timeout: Timeout in seconds for each HDC call.
+
+    Returns:
+        Encoded JPEG bytes.
+
+    Raises:
+        ValueError: If the capture failed.
+    """
+    remote_path = "/data/local/tmp/tmp_settle_frame.jpeg"
+    temp_path = os.path.join(tempfile.gettempdir(), f"frame_{uuid.uuid4()}.jpeg")
+
+    result = run_shell_command(["screenshot", remote_path], device_id, timeout)
+    output = (result.stdout + result.stderr).lower()
+    if "fail" in output or "error" in output:
+        raise ValueError(f"Screen capture failed: {output.strip()}")
+
+    data = _receive_file(remote_path, temp_path, device_id, timeout)
+    if data is None:
+        raise ValueError("Screen capture was not received")
+    return data
+
+
+def _receive_file(
+    remote_path: str, temp_path: str, device_id: str | None, timeout: int
+) -> bytes | None:
+    """Fetch a device file with ``hdc file recv`` and return its bytes."""
+    _run_hdc_command(
+        _get_hdc_prefix(device_id) + ["file", "recv", remote_path, temp_path],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    if not os.path.exists(temp_path):
+        return None
+    try:
+        with open(temp_path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(temp_path)
+
+
 def _get_hdc_prefix(device_id: str | None) -> list:
     """Get HDC command prefix with optional device specifier."""
     if device_id:
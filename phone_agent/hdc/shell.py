@@ -0,0 +1,124 @@
+"""Persistent hdc shell sessions shared by HarmonyOS device operations.
+
+Like the ADB backend, every ``hdc shell <cmd>`` otherwise pays for process
+creation and a client/server handshake. This module keeps one long-lived
+``hdc shell`` process per device and reuses the marker framing of
+``phone_agent.adb.shell``, falling back to a one-shot ``hdc shell`` process
+when the session cannot be used.
+"""
+
+import atexit
+import os
+import subprocess
+
+from phone_agent.adb.shell import ADBShellPool, ADBShellSession
+from phone_agent.hdc.connection import _run_hdc_command
+from phone_agent.tracing import traced
+
+# Global flag to control whether shell commands reuse a persistent session.
+# The session expects a piped ``hdc shell`` without a PTY: an echo of the
+# command line is skipped, but a prompt or line editing would end up in the
+# output, so hdc builds that allocate a terminal need this switched off.
+_SHELL_POOL_ENABLED = os.getenv("PHONE_AGENT_HDC_SHELL_POOL", "true").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+
+
+class HDCShellSession(ADBShellSession):
+    """
+    A long-lived ``hdc shell`` process that runs one command at a time.
+
+    Args:
+        device_id: Optional HDC device ID for multi-device setups.
+        hdc_path: Path to HDC executable.
+    """
+
+    def __init__(self, device_id: str | None = None, hdc_path: str = "hdc"):
+        super().__init__(device_id, hdc_path)
+
+    def _command(self) -> list[str]:
+        cmd = [self.adb_path]
+        if self.device_id:
+            cmd += ["-t", self.device_id]
+        return cmd + ["shell"]
+
+
+class HDCShellPool(ADBShellPool):
+    """
+    Keeps one persistent hdc shell session per device.
+
+    Args:
+        hdc_path: Path to HDC executable.
+    """
+
+    session_class = HDCShellSession
+
+    def __init__(self, hdc_path: str = "hdc"):
+        super().__init__(hdc_path)
+
+    def _run_subprocess(
+        self, args: list[str], device_id: str | None, timeout: float | None
+    ) -> subprocess.CompletedProcess:
+        return run_shell_subprocess(args, device_id, timeout, self.adb_path)
+
+
+def run_shell_subprocess(
+    args: list[str],
+    device_id: str | None = None,
+    timeout: float | None = None,
+    hdc_path: str = "hdc",
+) -> subprocess.CompletedProcess:
+    """Run a shell command with a one-shot ``hdc shell`` process."""
+    cmd = [hdc_path]
+    if device_id:
+        cmd += ["-t", device_id]
+    return _run_hdc_command(
+        cmd + ["shell"] + list(args),
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        timeout=timeout,
+    )
+
+
+_SHELL_POOL = HDCShellPool()
+atexit.register(_SHELL_POOL.close_all)
+
+
+def get_shell_pool() -> HDCShellPool:
+    """Return the global hdc shell session pool."""
+    return _SHELL_POOL
+
+
+def set_shell_pool_enabled(enabled: bool) -> None:
+    """Enable or disable persistent hdc shell sessions globally."""
+    global _SHELL_POOL_ENABLED
+    _SHELL_POOL_ENABLED = enabled
+    if not enabled:
+        _SHELL_POOL.close_all()
+
+
+@traced("hdc.shell")
+def run_shell_command(
+    args: list[str], device_id: str | None = None, timeout: float | None = None
+) -> subprocess.CompletedProcess:
+    """
+    Run a command in the HarmonyOS device shell.
+
+    Uses the persistent session pool when enabled, otherwise a one-shot
+    ``hdc shell`` subprocess.
+
+    Args:
+        args: Command arguments to run in the device shell.
+        device_id: Optional HDC device ID for multi-device setups.
+        timeout: Timeout in seconds.
+
+    Returns:
+        CompletedProcess with text output.
+    """
+    if not _SHELL_POOL_ENABLED:
+        return run_shell_subprocess(args, device_id, timeout)
+    return _SHELL_POOL.run(args, device_id, timeout)
@@ -0,0 +1,249 @@
+"""Image helpers shared by the device screenshot backends."""
+
+import base64
+import os
+import struct
+from dataclasses import dataclass
+from io import BytesIO
+
+from PIL import Image
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_IEND = b"IEND\xaeB`\x82"
+
+JPEG_SOI = b"\xff\xd8"
+# Start-of-frame markers carrying the image dimensions (not DHT, JPG or DAC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Pillow format name -> MIME type for model payloads
+IMAGE_FORMATS = {
+    "PNG": "image/png",
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+}
+
+
+@dataclass(eq=False)
+class Screenshot:
+    """
+    Represents a captured screenshot.
+
+    The encoded image is held as raw bytes; ``base64_data`` and ``data_url``
+    are computed on first access and cached. A screenshot may also be built
+    from base64 text, in which case the raw bytes are decoded on demand.
+    """
+
+    width: int
+    height: int
+    is_sensitive: bool = False
+    mime_type: str = "image/png"
+
+    def __init__(
+        self,
+        base64_data: str | None = None,
+        width: int = 0,
+        height: int = 0,
+        is_sensitive: bool = False,
+        image_data: bytes | None = None,
+        mime_type: str = "image/png",
+    ):
+        if base64_data is None and image_data is None:
+            raise ValueError("Screenshot requires base64_data or image_data")
+        self.width = width
+        self.height = height
+        self.is_sensitive = is_sensitive
+        self.mime_type = mime_type
+        self._base64_data = base64_data
+        self._image_data = image_data
+        self._data_url: str | None = None
+
+    @property
+    def image_data(self) -> bytes:
+        """Encoded image bytes."""
+        if self._image_data is None:
+            self._image_data = base64.b64decode(self._base64_data)
+        return self._image_data
+
+    @property
+    def base64_data(self) -> str:
+        """Base64 text of the encoded image, computed once."""
+        if self._base64_data is None:
+            self._base64_data = base64.b64encode(self._image_data).decode("utf-8")
+        return self._base64_data
+
+    @property
+    def data_url(self) -> str:
+        """``data:`` URL of the encoded image, computed once."""
+        if self._data_url is None:
+            self._data_url = f"data:{self.mime_type};base64,{self.base64_data}"
+        return self._data_url
+
+    @property
+    def byte_size(self) -> int:
+        """Size of the encoded image in bytes, without decoding base64."""
+        if self._image_data is not None:
+            return len(self._image_data)
+        padding = self._base64_data[-2:].count("=")
+        return len(self._base64_data) * 3 // 4 - padding
+
+
+@dataclass
+class ImageEncodingConfig:
+    """Configuration for the screenshot payload sent to the model."""
+
+    max_edge: int = 0  # Longest edge in pixels after downscaling (0 keeps size)
+    format: str = "PNG"  # Output format: PNG, JPEG or WEBP
+    quality: int = 85  # Quality for JPEG/WEBP (1-100)
+    grayscale: bool = False  # Convert to grayscale before encoding
+    passthrough_jpeg: bool = True  # Send JPEG captures as-is instead of as PNG
+
+    def __post_init__(self):
+        """Load values from environment variables if present."""
+        self.max_edge = int(os.getenv("PHONE_AGENT_IMAGE_MAX_EDGE", self.max_edge))
+        self.format = os.getenv("PHONE_AGENT_IMAGE_FORMAT", self.format).upper()
+        self.quality = int(os.getenv("PHONE_AGENT_IMAGE_QUALITY", self.quality))
+        self.grayscale = os.getenv(
+            "PHONE_AGENT_IMAGE_GRAYSCALE", str(self.grayscale)
+        ).lower() in ("true", "1", "yes")
+        self.passthrough_jpeg = os.getenv(
+            "PHONE_AGENT_IMAGE_PASSTHROUGH_JPEG", str(self.passthrough_jpeg)
+        ).lower() in ("true", "1", "yes")
+
+        if self.format == "JPG":
+            self.format = "JPEG"
+        if self.format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format: {self.format}")
+
+    @property
+    def mime_type(self) -> str:
+        """MIME type of the encoded output."""
+        return IMAGE_FORMATS[self.format]
+
+
+def encode_screenshot(
+    screenshot: Screenshot, config: ImageEncodingConfig | None = None
+) -> Screenshot:
+    """
+    Encode a screenshot into the payload sent to the model.
+
+    The screenshot is returned unchanged when it already has the requested
+    format, needs no downscaling and no grayscale conversion. JPEG captures
+    also pass through for the default PNG format unless
+    ``passthrough_jpeg`` is off.
+
+    Args:
+        screenshot: Captured screenshot.
+        config: Encoding options. Defaults to ImageEncodingConfig().
+
+    Returns:
+        Screenshot holding the encoded payload and its dimensions. Action
+        coordinates must still be mapped with the original screenshot's size.
+    """
+    config = config or ImageEncodingConfig()
+    longest = max(screenshot.width, screenshot.height)
+    needs_resize = 0 < config.max_edge < longest
+
+    # Re-encoding a lossy capture as PNG only makes the payload larger
+    keeps_jpeg = (
+        config.passthrough_jpeg
+        and config.format == "PNG"
+        and screenshot.mime_type == "image/jpeg"
+    )
+    if (
+        not needs_resize
+        and not config.grayscale
+        and (screenshot.mime_type == config.mime_type or keeps_jpeg)
+    ):
+        return screenshot
+
+    img = Image.open(BytesIO(screenshot.image_data))
+    if needs_resize:
+        scale = config.max_edge / longest
+        size = (
+            max(1, round(img.width * scale)),
+            max(1, round(img.height * scale)),
+        )
+        img = img.resize(size, Image.Resampling.LANCZOS)
+
+    if config.grayscale:
+        img = img.convert("L")
+    elif config.format == "JPEG" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    buffered = BytesIO()
+    if config.format == "PNG":
+        img.save(buffered, format="PNG")
+    else:
+        img.save(buffered, format=config.format, quality=config.quality)
+
+    return Screenshot(
+        image_data=buffered.getvalue(),
+        width=img.width,
+        height=img.height,
+        is_sensitive=screenshot.is_sensitive,
+        mime_type=config.mime_type,
+    )
+
+
+def png_size(data: bytes) -> tuple[int, int] | None:
+    """
+    Read the dimensions of a PNG image from its IHDR header.
+
+    Args:
+        data: Encoded PNG bytes.
+
+    Returns:
+        Tuple of (width, height), or None if the data is not a PNG.
+    """
+    if len(data) < 24 or not data.startswith(PNG_SIGNATURE):
+        return None
+    if data[12:16] != b"IHDR":
+        return None
+    width, height = struct.unpack(">II", data[16:24])
+    return width, height
+
+
+def is_complete_png(data: bytes) -> bool:
+    """Check that PNG bytes have a valid header and end with the IEND chunk."""
+    return png_size(data) is not None and data.endswith(PNG_IEND)
+
+
+def jpeg_size(data: bytes) -> tuple[int, int] | None:
+    """
+    Read the dimensions of a JPEG image from its start-of-frame segment.
+
+    Only the segment headers are walked; the image is not decoded.
+
+    Args:
+        data: Encoded JPEG bytes.
+
+    Returns:
+        Tuple of (width, height), or None if no frame header was found.
+    """
+    if not data.startswith(JPEG_SOI):
+        return None
+    offset = 2
+    while offset + 4 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            offset += 1
+            continue
+        if marker in (0x01, *range(0xD0, 0xD8)):
+            # Standalone markers without a length field
+            offset += 2
+            continue
+        (length,) = struct.unpack(">H", data[offset + 2 : offset + 4])
+        if marker in _JPEG_SOF_MARKERS:
+            if offset + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[offset + 5 : offset + 9])
+            return width, height
+        if marker == 0xDA:
+            # Start of scan: no frame header before the image data
+            return None
+        offset += 2 + length
+    return None
+
@@ -0,0 +1,354 @@
+"""Recording and replay of fixed action sequences.
+
+Short operations such as "open WeChat" tend to take the same actions every
+time. ``MacroRecorder`` turns a successful PhoneAgent run into a ``Macro``:
+the actions it took plus a checkpoint (current app and perceptual screen
+hash) of the screen each action led to. ``MacroPlayer`` replays a macro
+through the device without any model calls and compares the screen with
+the checkpoint after every action, stopping at the first divergence so the
+caller can hand the task to the live agent.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from phone_agent.actions import ActionHandler
+from phone_agent.decision_cache import hash_distance, normalize_task, perceptual_hash
+from phone_agent.device_factory import DeviceFactory
+from phone_agent.events import emit_agent_event
+from phone_agent.imaging import Screenshot
+
+logger = logging.getLogger(__name__)
+
+# Actions whose effect does not depend on the screen they start from
+SCREEN_INDEPENDENT_ACTIONS = frozenset({"Launch", "Home"})
+
+# Actions that need a person or the model, so a run using them is not recorded
+UNREPLAYABLE_ACTIONS = frozenset({"Take_over", "Interact", "Note", "Call_API"})
+
+
+@dataclass
+class Checkpoint:
+    """Lightweight fingerprint of a screen."""
+
+    app: str
+    screen_hash: int
+
+    def matches(self, app: str, screen_hash: int, max_distance: int) -> bool:
+        if app != self.app:
+            return False
+        return hash_distance(screen_hash, self.screen_hash) <= max_distance
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"app": self.app, "screen_hash": f"{self.screen_hash:x}"}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Checkpoint":
+        return cls(app=data["app"], screen_hash=int(data["screen_hash"], 16))
+
+
+@dataclass
+class MacroStep:
+    """One recorded action and the screen it led to."""
+
+    action: dict[str, Any]
+    checkpoint: Checkpoint
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"action": self.action, "checkpoint": self.checkpoint.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "MacroStep":
+        return cls(
+            action=data["action"], checkpoint=Checkpoint.from_dict(data["checkpoint"])
+        )
+
+
+@dataclass
+class Macro:
+    """
+    Actions of a successful run, replayable without the model.
+
+    Attributes:
+        intent: Task the macro performs, as given when recording.
+        start: Screen the recording started from.
+        steps: Actions in order with their checkpoints.
+        message: Final message of the recorded run.
+    """
+
+    intent: str
+    start: Checkpoint
+    steps: list[MacroStep] = field(default_factory=list)
+    message: str = ""
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "intent": self.intent,
+            "start": self.start.to_dict(),
+            "steps": [step.to_dict() for step in self.steps],
+            "message": self.message,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Macro":
+        return cls(
+            intent=data["intent"],
+            start=Checkpoint.from_dict(data["start"]),
+            steps=[MacroStep.from_dict(step) for step in data["steps"]],
+            message=data.get("message", ""),
+        )
+
+
+class MacroLibrary:
+    """
+    Macros keyed by normalized intent, optionally persisted to a JSON file.
+
+    The library is thread-safe; a newer recording of an intent replaces the
+    older one.
+
+    Args:
+        path: JSON file to load from and save to. Kept in memory when None.
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path is not None else None
+        self._macros: dict[str, Macro] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._macros)
+
+    def __contains__(self, intent: str) -> bool:
+        return normalize_task(intent) in self._macros
+
+    def get(self, intent: str) -> Macro | None:
+        return self._macros.get(normalize_task(intent))
+
+    def put(self, macro: Macro) -> None:
+        with self._lock:
+            self._macros[normalize_task(macro.intent)] = macro
+            self._save()
+
+    def remove(self, intent: str) -> None:
+        with self._lock:
+            if self._macros.pop(normalize_task(intent), None) is not None:
+                self._save()
+
+    def recorder(self, intent: str) -> "MacroRecorder":
+        """Start recording a run of ``intent`` into this library."""
+        return MacroRecorder(self, intent)
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            for item in data.get("macros", []):
+                macro = Macro.from_dict(item)
+                self._macros[normalize_task(macro.intent)] = macro
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable macro library %s: %s", self.path, e)
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"macros": [macro.to_dict() for macro in self._macros.values()]}
+        # Write a sibling file first so a crash never leaves half a library
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(
+            json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        os.replace(tmp_path, self.path)
+
+
+class MacroRecorder:
+    """
+    Records one agent run and stores it in a library if it succeeds.
+
+    Call ``observe`` with every screen the agent sees, ``record`` with every
+    action it executes and ``finish`` when the run ends. Runs that show a
+    sensitive screen, fail an action or use an action in
+    UNREPLAYABLE_ACTIONS are not stored.
+
+    Args:
+        library: Library the macro is stored in.
+        intent: Key of the macro.
+    """
+
+    def __init__(self, library: MacroLibrary, intent: str):
+        self.library = library
+        self.intent = intent
+        self._checkpoints: list[Checkpoint] = []
+        self._actions: list[dict[str, Any]] = []
+        self._replayable = True
+
+    def observe(self, screenshot: Screenshot, app: str) -> None:
+        if screenshot.is_sensitive:
+            self._replayable = False
+        if self._replayable:
+            screen_hash = perceptual_hash(screenshot.image_data)
+            self._checkpoints.append(Checkpoint(app, screen_hash))
+
+    def record(self, action: dict[str, Any], success: bool) -> None:
+        if action.get("_metadata") == "finish":
+            return
+        if not success or action.get("action") in UNREPLAYABLE_ACTIONS:
+            self._replayable = False
+        if self._replayable:
+            self._actions.append(action)
+
+    def finish(self, success: bool, message: str | None = None) -> Macro | None:
+        """
+        End the recording.
+
+        Returns:
+            The stored macro, or None when the run was not recordable.
+        """
+        checkpoints = self._checkpoints
+        if (
+            not success
+            or not self._replayable
+            or not self._actions
+            or len(checkpoints) != len(self._actions) + 1
+        ):
+            return None
+        macro = Macro(
+            intent=self.intent,
+            start=checkpoints[0],
+            steps=[
+                MacroStep(action, checkpoint)
+                for action, checkpoint in zip(self._actions, checkpoints[1:])
+            ],
+            message=message or "",
+        )
+        self.library.put(macro)
+        return macro
+
+
+@dataclass
+class MacroReplay:
+    """
+    Outcome of one macro replay.
+
+    Attributes:
+        success: Every action ran and every checkpoint matched.
+        completed_steps: Actions whose checkpoint matched.
+        message: Final message of the macro, when it succeeded.
+        diverged_at: Index of the step that diverged, if any. A mismatch of
+            the start screen is reported as step 0 with nothing executed.
+        reason: Why the replay stopped: "start", "sensitive",
+            "action_failed" or "checkpoint".
+        elapsed: Seconds the replay took.
+    """
+
+    success: bool
+    completed_steps: int
+    message: str | None = None
+    diverged_at: int | None = None
+    reason: str | None = None
+    elapsed: float = 0.0
+
+
+class MacroPlayer:
+    """
+    Replays macros on a device without the model.
+
+    Args:
+        device_id: Device to act on.
+        device_factory: Device factory to act through. Defaults to the global
+            factory from get_device_factory().
+        max_distance: Largest screen hash distance a checkpoint tolerates.
+        checkpoint_retries: Extra captures before a checkpoint counts as
+            missed, for screens that are still changing.
+        retry_interval: Seconds between those captures.
+    """
+
+    def __init__(
+        self,
+        device_id: str | None = None,
+        device_factory: DeviceFactory | None = None,
+        max_distance: int = 10,
+        checkpoint_retries: int = 2,
+        retry_interval: float = 0.3,
+    ):
+        self.device_id = device_id
+        self.max_distance = max_distance
+        self.checkpoint_retries = checkpoint_retries
+        self.retry_interval = retry_interval
+        self.action_handler = ActionHandler(
+            device_id=device_id, device_factory=device_factory
+        )
+
+    def play(self, macro: Macro) -> MacroReplay:
+        """Run the macro's actions, stopping at the first divergence."""
+        start_time = time.perf_counter()
+        replay = self._play(macro)
+        replay.elapsed = time.perf_counter() - start_time
+        emit_agent_event(
+            "macro_replay",
+            {
+                "intent": macro.intent,
+                "steps": len(macro.steps),
+                "completed_steps": replay.completed_steps,
+                "success": replay.success,
+                "diverged_at": replay.diverged_at,
+                "reason": replay.reason,
+                "elapsed": round(replay.elapsed, 3),
+            },
+            source="phone_agent.macro",
+        )
+        return replay
+
+    def _play(self, macro: Macro) -> MacroReplay:
+        screenshot, app = self._observe()
+        first_action = macro.steps[0].action.get("action") if macro.steps else None
+        if first_action not in SCREEN_INDEPENDENT_ACTIONS and not self._matches(
+            macro.start, screenshot, app
+        ):
+            return MacroReplay(False, 0, diverged_at=0, reason="start")
+
+        for index, step in enumerate(macro.steps):
+            if screenshot.is_sensitive:
+                return MacroReplay(False, index, diverged_at=index, reason="sensitive")
+            result = self.action_handler.execute(
+                step.action, screenshot.width, screenshot.height
+            )
+            if not result.success:
+                return MacroReplay(
+                    False, index, diverged_at=index, reason="action_failed"
+                )
+
+            screenshot, app = self._observe()
+            for _ in range(self.checkpoint_retries):
+                if self._matches(step.checkpoint, screenshot, app):
+                    break
+                time.sleep(self.retry_interval)
+                screenshot, app = self._observe()
+            if not self._matches(step.checkpoint, screenshot, app):
+                return MacroReplay(False, index, diverged_at=index, reason="checkpoint")
+
+        return MacroReplay(True, len(macro.steps), message=macro.message)
+
+    def _observe(self) -> tuple[Screenshot, str]:
+        factory = self.action_handler.device_factory
+        return (
+            factory.get_screenshot(self.device_id),
+            factory.get_current_app(self.device_id),
+        )
+
+    def _matches(
+        self, checkpoint: Checkpoint, screenshot: Screenshot, app: str
+    ) -> bool:
+        if screenshot.is_sensitive:
+            return False
+        return checkpoint.matches(
+            app, perceptual_hash(screenshot.image_data), self.max_distance
+        )
@@ -1,5 +1,5 @@
 """Model client module for AI inference."""
 
-from phone_agent.model.client import ModelClient, ModelConfig
+from phone_agent.model.client import AsyncModelClient, ModelClient, ModelConfig
 
-__all__ = ["ModelClient", "ModelConfig"]
+__all__ = ["AsyncModelClient", "ModelClient", "ModelConfig"]
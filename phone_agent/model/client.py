@@ -1,14 +1,18 @@
 """Model client for AI inference using OpenAI-compatible API."""
 
+import asyncio
+import inspect
 import json
+import threading
 import time
 from dataclasses import dataclass, field
 from typing import Any
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from phone_agent.config.i18n import get_message
 from phone_agent.events import emit_agent_event
+from phone_agent.model.stream_parser import ACTION_MARKERS, ActionStreamParser
 
 
 @dataclass
@@ -24,6 +28,15 @@ class ModelConfig:
     frequency_penalty: float = 0.2
     extra_body: dict[str, Any] = field(default_factory=dict)
     lang: str = "cn"  # Language for UI messages: 'cn' or 'en'
+    # Return as soon as the action call is complete and close the stream.
+    # The first complete call is dispatched: a reply that goes on after a
+    # do(...) to a finish(message=...), which parsing the full reply would
+    # prefer, runs the do(...) instead
+    early_dispatch: bool = False
+    # With early_dispatch, read every Nth cut stream to the end in the
+    # background to measure the tail the others skip; 0 never does, and
+    # then no time saved is reported
+    tail_sample_interval: int = 10
 
 
 @dataclass
@@ -37,6 +50,9 @@ class ModelResponse:
     time_to_first_token: float | None = None  # Time to first token (seconds)
     time_to_thinking_end: float | None = None  # Time to thinking end (seconds)
     total_time: float | None = None  # Total inference time (seconds)
+    time_to_action_end: float | None = None  # Time to complete action (seconds)
+    stream_cut: bool = False  # Stream closed early after the action
+    time_saved: float | None = None  # Measured mean stream tail not waited for
 
 
 class ModelClient:
@@ -49,9 +65,13 @@ class ModelClient:
 
     def __init__(self, config: ModelConfig | None = None):
         self.config = config or ModelConfig()
-        self.client = OpenAI(base_url=self.config.base_url, api_key=self.config.api_key)
+        self.client = self._create_client()
         self._run_id: str | None = None
         self._step: int | None = None
+        # Average time from a complete action to the end of the stream
+        self._tail_time: float | None = None
+        self._tail_lock = threading.Lock()
+        self._cut_streams = 0
 
     def set_event_context(self, run_id: str | None = None, step: int | None = None) -> None:
         """Set event context for request-scoped structured output."""
@@ -71,12 +91,50 @@ class ModelClient:
         Raises:
             ValueError: If the response cannot be parsed.
         """
-        # Start timing
-        start_time = time.time()
-        time_to_first_token = None
-        time_to_thinking_end = None
-
-        stream = self.client.chat.completions.create(
+        response_stream = _ResponseStream(self)
+        stream = self.client.chat.completions.create(**self._completion_params(messages))
+        for chunk in stream:
+            response_stream.feed(chunk)
+            if response_stream.can_cut:
+                response_stream.stream_cut = True
+                if self._sample_tail():
+                    threading.Thread(
+                        target=self._drain_tail,
+                        args=(stream, response_stream.action_end_at),
+                        name="model-tail",
+                        daemon=True,
+                    ).start()
+                    break
+                # Stop reading so the remaining tokens are not generated
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
+                break
+        return response_stream.finish()
+
+    def _sample_tail(self) -> bool:
+        """Whether this cut stream is read to the end to measure its tail."""
+        interval = self.config.tail_sample_interval
+        self._cut_streams += 1
+        return interval > 0 and (self._cut_streams - 1) % interval == 0
+
+    def _drain_tail(self, stream: Any, action_end_at: float) -> None:
+        try:
+            for _ in stream:
+                pass
+        except Exception:
+            return
+        self._record_tail(time.time() - action_end_at)
+
+    def _record_tail(self, tail: float) -> None:
+        with self._tail_lock:
+            self._tail_time = _average(self._tail_time, tail)
+
+    def _create_client(self):
+        return OpenAI(base_url=self.config.base_url, api_key=self.config.api_key)
+
+    def _completion_params(self, messages: list[dict[str, Any]]) -> dict[str, Any]:
+        return dict(
             messages=messages,
             model=self.config.model_name,
             max_tokens=self.config.max_tokens,
@@ -87,148 +145,15 @@ class ModelClient:
             stream=True,
         )
 
-        raw_content = ""
-        buffer = ""  # Buffer to hold content that might be part of a marker
-        action_markers = ["finish(message=", "do(action="]
-        in_action_phase = False  # Track if we've entered the action phase
-        first_token_received = False
-
-        for chunk in stream:
-            if len(chunk.choices) == 0:
-                continue
-            if chunk.choices[0].delta.content is not None:
-                content = chunk.choices[0].delta.content
-                raw_content += content
-
-                # Record time to first token
-                if not first_token_received:
-                    time_to_first_token = time.time() - start_time
-                    first_token_received = True
-
-                if in_action_phase:
-                    # Already in action phase, just accumulate content without printing
-                    continue
-
-                buffer += content
-
-                # Check if any marker is fully present in buffer
-                marker_found = False
-                for marker in action_markers:
-                    if marker in buffer:
-                        # Marker found, print everything before it
-                        thinking_part = buffer.split(marker, 1)[0]
-                        if thinking_part:
-                            emit_agent_event(
-                                "thinking_chunk",
-                                {"text": thinking_part},
-                                source="phone_agent.model.client",
-                                run_id=self._run_id,
-                                step=self._step,
-                            )
-                        emit_agent_event(
-                            "thinking_complete",
-                            {},
-                            source="phone_agent.model.client",
-                            run_id=self._run_id,
-                            step=self._step,
-                        )
-                        in_action_phase = True
-                        marker_found = True
-
-                        # Record time to thinking end
-                        if time_to_thinking_end is None:
-                            time_to_thinking_end = time.time() - start_time
-
-                        break
-
-                if marker_found:
-                    continue  # Continue to collect remaining content
-
-                # Check if buffer ends with a prefix of any marker
-                # If so, don't print yet (wait for more content)
-                is_potential_marker = False
-                for marker in action_markers:
-                    for i in range(1, len(marker)):
-                        if buffer.endswith(marker[:i]):
-                            is_potential_marker = True
-                            break
-                    if is_potential_marker:
-                        break
-
-                if not is_potential_marker:
-                    # Safe to print the buffer
-                    emit_agent_event(
-                        "thinking_chunk",
-                        {"text": buffer},
-                        source="phone_agent.model.client",
-                        run_id=self._run_id,
-                        step=self._step,
-                    )
-                    buffer = ""
-
-        # Calculate total time
-        total_time = time.time() - start_time
-
-        # Parse thinking and action from response
-        thinking, action = self._parse_response(raw_content)
-
-        # Emit performance metrics
-        lang = self.config.lang
+    def _emit(self, event_type: str, payload: dict[str, Any]) -> None:
         emit_agent_event(
-            "performance_metric",
-            {"name": "label", "label": get_message("performance_metrics", lang)},
-            source="phone_agent.model.client",
-            run_id=self._run_id,
-            step=self._step,
-        )
-        if time_to_first_token is not None:
-            emit_agent_event(
-                "performance_metric",
-                {
-                    "name": "time_to_first_token",
-                    "label": get_message("time_to_first_token", lang),
-                    "value": round(time_to_first_token, 3),
-                    "unit": "s",
-                },
-                source="phone_agent.model.client",
-                run_id=self._run_id,
-                step=self._step,
-            )
-        if time_to_thinking_end is not None:
-            emit_agent_event(
-                "performance_metric",
-                {
-                    "name": "time_to_thinking_end",
-                    "label": get_message("time_to_thinking_end", lang),
-                    "value": round(time_to_thinking_end, 3),
-                    "unit": "s",
-                },
-                source="phone_agent.model.client",
-                run_id=self._run_id,
-                step=self._step,
-            )
-        emit_agent_event(
-            "performance_metric",
-            {
-                "name": "total_inference_time",
-                "label": get_message("total_inference_time", lang),
-                "value": round(total_time, 3),
-                "unit": "s",
-            },
+            event_type,
+            payload,
             source="phone_agent.model.client",
             run_id=self._run_id,
             step=self._step,
         )
 
-        return ModelResponse(
-            thinking=thinking,
-            action=action,
-            raw_content=raw_content,
-            time_to_first_token=time_to_first_token,
-            time_to_thinking_end=time_to_thinking_end,
-            total_time=total_time,
-        )
-
     def _parse_response(self, content: str) -> tuple[str, str]:
         """
         Parse the model response into thinking and action parts.
@@ -272,6 +197,221 @@ class ModelClient:
         return "", content
 
 
+class AsyncModelClient(ModelClient):
+    """
+    ModelClient whose ``request`` is a coroutine over ``AsyncOpenAI``.
+
+    Streaming, events and parsing are identical to ModelClient.
+
+    Args:
+        config: Model configuration.
+    """
+
+    def __init__(self, config: ModelConfig | None = None):
+        super().__init__(config)
+        self._tail_tasks: set[asyncio.Task] = set()
+
+    def _create_client(self):
+        return AsyncOpenAI(base_url=self.config.base_url, api_key=self.config.api_key)
+
+    async def _drain_tail_async(self, stream: Any, action_end_at: float) -> None:
+        try:
+            async for _ in stream:
+                pass
+        except Exception:
+            return
+        self._record_tail(time.time() - action_end_at)
+
+    async def request(self, messages: list[dict[str, Any]]) -> ModelResponse:
+        """
+        Send a request to the model without blocking the event loop.
+
+        Args:
+            messages: List of message dictionaries in OpenAI format.
+
+        Returns:
+            ModelResponse containing thinking and action.
+        """
+        response_stream = _ResponseStream(self)
+        stream = await self.client.chat.completions.create(
+            **self._completion_params(messages)
+        )
+        async for chunk in stream:
+            response_stream.feed(chunk)
+            if response_stream.can_cut:
+                response_stream.stream_cut = True
+                if self._sample_tail():
+                    task = asyncio.get_running_loop().create_task(
+                        self._drain_tail_async(stream, response_stream.action_end_at)
+                    )
+                    self._tail_tasks.add(task)
+                    task.add_done_callback(self._tail_tasks.discard)
+                    break
+                close = getattr(stream, "close", None) or getattr(stream, "aclose", None)
+                if close is not None:
+                    result = close()
+                    if inspect.isawaitable(result):
+                        await result
+                break
+        return response_stream.finish()
+
+
+class _ResponseStream:
+    """
+    Accumulates one streamed completion.
+
+    Thinking text is emitted as ``thinking_chunk`` events while it arrives;
+    text that could be the start of an action marker is held back until the
+    marker is confirmed or ruled out. With ``early_dispatch`` the caller stops
+    reading once the action call is complete (``can_cut``).
+    """
+
+    ACTION_MARKERS = ACTION_MARKERS
+
+    def __init__(self, client: ModelClient):
+        self._client = client
+        self.start_time = time.time()
+        self.time_to_first_token: float | None = None
+        self.time_to_thinking_end: float | None = None
+        self.time_to_action_end: float | None = None
+        self.action_call: str | None = None
+        self.stream_cut = False
+        self.parser = ActionStreamParser(
+            on_thinking=self._on_thinking,
+            on_action_start=self._on_action_start,
+            on_action_end=self._on_action_end,
+        )
+
+    @property
+    def can_cut(self) -> bool:
+        """Whether the rest of the stream may be dropped."""
+        return self._client.config.early_dispatch and self.action_call is not None
+
+    @property
+    def raw_content(self) -> str:
+        return self.parser.text
+
+    @property
+    def action_end_at(self) -> float:
+        """Wall-clock time the action call completed."""
+        return self.start_time + (self.time_to_action_end or 0.0)
+
+    def _on_thinking(self, text: str) -> None:
+        self._client._emit("thinking_chunk", {"text": text})
+
+    def _on_action_start(self, marker: str) -> None:
+        self._client._emit("thinking_complete", {})
+        self.time_to_thinking_end = time.time() - self.start_time
+
+    def _on_action_end(self, call: str) -> None:
+        self.action_call = call
+        self.time_to_action_end = time.time() - self.start_time
+
+    def feed(self, chunk: Any) -> None:
+        """Consume one streamed chunk."""
+        if len(chunk.choices) == 0:
+            return
+        content = chunk.choices[0].delta.content
+        if content is None:
+            return
+
+        # Record time to first token
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.time() - self.start_time
+
+        self.parser.feed(content)
+
+    def finish(self) -> ModelResponse:
+        """Parse the accumulated content and emit performance metrics."""
+        # Calculate total time
+        total_time = time.time() - self.start_time
+
+        # Parse thinking and action from response
+        thinking, action = self.parser.close()
+        time_saved = None
+        if self.stream_cut:
+            action = self.action_call
+            time_saved = self._client._tail_time
+        elif self.time_to_action_end is not None:
+            self._client._record_tail(total_time - self.time_to_action_end)
+
+        # Emit performance metrics
+        emit = self._client._emit
+        lang = self._client.config.lang
+        emit(
+            "performance_metric",
+            {"name": "label", "label": get_message("performance_metrics", lang)},
+        )
+        if self.time_to_first_token is not None:
+            emit(
+                "performance_metric",
+                {
+                    "name": "time_to_first_token",
+                    "label": get_message("time_to_first_token", lang),
+                    "value": round(self.time_to_first_token, 3),
+                    "unit": "s",
+                },
+            )
+        if self.time_to_thinking_end is not None:
+            emit(
+                "performance_metric",
+                {
+                    "name": "time_to_thinking_end",
+                    "label": get_message("time_to_thinking_end", lang),
+                    "value": round(self.time_to_thinking_end, 3),
+                    "unit": "s",
+                },
+            )
+        emit(
+            "performance_metric",
+            {
+                "name": "total_inference_time",
+                "label": get_message("total_inference_time", lang),
+                "value": round(total_time, 3),
+                "unit": "s",
+            },
+        )
+        if self._client.config.early_dispatch and self.time_to_action_end is not None:
+            emit(
+                "performance_metric",
+                {
+                    "name": "time_to_action_end",
+                    "label": get_message("time_to_action_end", lang),
+                    "value": round(self.time_to_action_end, 3),
+                    "unit": "s",
+                },
+            )
+        if time_saved is not None:
+            emit(
+                "performance_metric",
+                {
+                    "name": "early_dispatch_time_saved",
+                    "label": get_message("early_dispatch_time_saved", lang),
+                    "value": round(time_saved, 3),
+                    "unit": "s",
+                },
+            )
+
+        return ModelResponse(
+            thinking=thinking,
+            action=action,
+            raw_content=self.raw_content,
+            time_to_first_token=self.time_to_first_token,
+            time_to_thinking_end=self.time_to_thinking_end,
+            total_time=total_time,
+            time_to_action_end=self.time_to_action_end,
+            stream_cut=self.stream_cut,
+            time_saved=time_saved,
+        )
+
+
+def _average(previous: float | None, value: float, weight: float = 0.3) -> float:
+    """Exponential moving average seeded with the first value."""
+    if previous is None:
+        return value
+    return previous + weight * (value - previous)
+
+
 class MessageBuilder:
     """Helper class for building conversation messages."""
 
@@ -282,27 +422,27 @@ class MessageBuilder:
 
     @staticmethod
     def create_user_message(
-        text: str, image_base64: str | None = None
+        text: str, image_base64: str | None = None, image_url: str | None = None
     ) -> dict[str, Any]:
         """
         Create a user message with optional image.
 
         Args:
             text: Text content.
-            image_base64: Optional base64-encoded image.
+            image_base64: Optional base64-encoded PNG image.
+            image_url: Optional prebuilt image URL (e.g. Screenshot.data_url).
+                Takes precedence over image_base64.
 
         Returns:
             Message dictionary.
         """
         content = []
 
-        if image_base64:
-            content.append(
-                {
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{image_base64}"},
-                }
-            )
+        if image_url is None and image_base64:
+            image_url = f"data:image/png;base64,{image_base64}"
+
+        if image_url:
+            content.append({"type": "image_url", "image_url": {"url": image_url}})
 
         content.append({"type": "text", "text": text})
 
@@ -0,0 +1,333 @@
+"""Incremental parser splitting a streamed model reply into thinking and action.
+
+A reply is free-form thinking followed by an action call starting with one
+of ``ACTION_MARKERS``. The parser runs an Aho-Corasick automaton over the
+markers, so every streamed character is examined once. It only holds back
+the few characters that could still be the start of a marker, so its
+scanning state is bounded by the longest marker.
+
+It can also report when the action call is syntactically complete, so the
+caller may act on it before the stream ends.
+"""
+
+import re
+from collections import deque
+from typing import Callable
+
+# Markers that start the action part of a reply, in _parse_response priority
+ACTION_MARKERS = ("finish(message=", "do(action=")
+
+# Actions whose text argument parse_action takes verbatim up to the final '")'
+FREE_TEXT_ACTIONS = ("Type", "Type_Name")
+
+_ACTION_NAME = re.compile(r'do\(action="([^"]*)"')
+_OPENERS = "([{"
+_CLOSERS = ")]}"
+
+
+class MarkerAutomaton:
+    """
+    Aho-Corasick automaton over a fixed set of markers.
+
+    States are integers; state 0 is the root. ``depth[state]`` is the length
+    of the longest marker prefix that ends the text seen so far, and
+    ``match[state]`` is the marker completed on entering the state, if any.
+
+    Args:
+        markers: Strings to detect. No marker may contain another.
+    """
+
+    def __init__(self, markers: tuple[str, ...]):
+        self.markers = markers
+        self.depth = [0]
+        self.match: list[str | None] = [None]
+        self._rows: list[dict[str, int]] = [{}]
+        for marker in markers:
+            state = 0
+            for char in marker:
+                row = self._rows[state]
+                if char not in row:
+                    row[char] = len(self._rows)
+                    self._rows.append({})
+                    self.depth.append(self.depth[state] + 1)
+                    self.match.append(None)
+                state = row[char]
+            self.match[state] = marker
+        self._complete_rows()
+        # Characters that leave the root state
+        self.start_chars = re.compile(
+            "[" + "".join(re.escape(c) for c in self._rows[0]) + "]"
+        )
+
+    def _complete_rows(self) -> None:
+        """Turn the trie into a DFA by following failure links breadth-first."""
+        trie = [dict(row) for row in self._rows]
+        fail = [0] * len(self._rows)
+        queue = deque(trie[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in trie[state].items():
+                # The failure state is shallower, so its row is already complete
+                fail[child] = self._rows[fail[state]].get(char, 0) if state else 0
+                if self.match[child] is None:
+                    self.match[child] = self.match[fail[child]]
+                queue.append(child)
+            for char, target in self._rows[fail[state]].items():
+                self._rows[state].setdefault(char, target)
+
+    def step(self, state: int, char: str) -> int:
+        """Return the state after reading ``char``."""
+        return self._rows[state].get(char, 0)
+
+
+_AUTOMATON = MarkerAutomaton(ACTION_MARKERS)
+
+
+class ActionStreamParser:
+    """
+    Splits a streamed reply into thinking and action as chunks arrive.
+
+    Callbacks:
+        on_thinking(text): Thinking text that can no longer be part of a
+            marker; at most one call per ``feed``.
+        on_action_start(marker): The first marker completed, which ends the
+            thinking part.
+        on_action(text): Action text, starting with the marker; at most one
+            call per ``feed``.
+        on_action_end(call): The first action call, from its marker to its
+            closing parenthesis, once it is syntactically complete. Calls
+            with a free-text argument (``finish`` and ``Type``) may contain
+            unescaped quotes, so they end at a ``")`` that is followed by
+            whitespace or ``<``; that needs one more character of lookahead.
+
+    ``close`` returns the same ``(thinking, action)`` split as
+    ``ModelClient._parse_response`` on the full text.
+    """
+
+    def __init__(
+        self,
+        on_thinking: Callable[[str], None] | None = None,
+        on_action_start: Callable[[str], None] | None = None,
+        on_action: Callable[[str], None] | None = None,
+        on_action_end: Callable[[str], None] | None = None,
+    ):
+        self.on_thinking = on_thinking
+        self.on_action_start = on_action_start
+        self.on_action = on_action
+        self.on_action_end = on_action_end
+        self._parts: list[str] = []
+        self._length = 0
+        self._state = 0
+        self._pending = ""  # Thinking text that may start a marker
+        self._action_start: int | None = None
+        self._finish_start: int | None = None
+        self._do_start: int | None = None
+        self._scanning = True
+        # Action call tracking, only while on_action_end is set
+        self._call = ""
+        self._call_pos = 0
+        self._call_depth = 0
+        self._call_quote: str | None = None
+        self._free_text: bool | None = None
+        self._call_done = on_action_end is None
+
+    @property
+    def in_action(self) -> bool:
+        """Whether an action marker has been seen."""
+        return self._action_start is not None
+
+    @property
+    def pending(self) -> str:
+        """Thinking text held back because it may start a marker."""
+        return self._pending
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def feed(self, chunk: str) -> None:
+        """Consume the next piece of the stream."""
+        if not chunk:
+            return
+        offset = self._length
+        self._parts.append(chunk)
+        self._length += len(chunk)
+
+        first_match = self._scan(chunk, offset) if self._scanning else None
+
+        if self._action_start is not None and first_match is None:
+            # Already in the action part before this chunk
+            if self.on_action:
+                self.on_action(chunk)
+            if not self._call_done:
+                self._track_call(chunk)
+            return
+
+        combined = self._pending + chunk
+        base = offset - len(self._pending)
+        if first_match is None:
+            keep = _AUTOMATON.depth[self._state]
+            safe = len(combined) - keep
+            self._pending = combined[safe:]
+            if safe and self.on_thinking:
+                self.on_thinking(combined[:safe])
+            return
+
+        # The first marker of the reply completed inside this chunk
+        marker, start = first_match
+        split = start - base
+        self._pending = ""
+        if split and self.on_thinking:
+            self.on_thinking(combined[:split])
+        if self.on_action_start:
+            self.on_action_start(marker)
+        if self.on_action:
+            self.on_action(combined[split:])
+        if not self._call_done:
+            self._track_call(combined[split:])
+
+    def _track_call(self, text: str) -> None:
+        """Extend the action call and report it once it is complete."""
+        self._call += text
+        call = self._call
+        if self._free_text is None:
+            name = _ACTION_NAME.match(call)
+            if call.startswith(ACTION_MARKERS[0]):
+                self._free_text = True
+            elif name is not None:
+                self._free_text = name.group(1) in FREE_TEXT_ACTIONS
+            elif len(call) <= len(ACTION_MARKERS[1]) or call.startswith('do(action="'):
+                return  # Action name still streaming
+            else:
+                self._free_text = False
+            # Both kinds of scan start inside the call's parenthesis
+            self._call_pos = call.index("(") + 1
+            self._call_depth = 1
+
+        end = self._free_text_end(call) if self._free_text else self._syntax_end(call)
+        if end is not None:
+            self._call_done = True
+            self.on_action_end(call[:end])
+
+    def _free_text_end(self, call: str) -> int | None:
+        """End of a call whose text argument runs up to a closing '")'."""
+        while True:
+            close = call.find('")', self._call_pos)
+            if close < 0:
+                # Keep a trailing quote, it may be followed by ')'
+                self._call_pos = max(self._call_pos, len(call) - 1)
+                return None
+            end = close + 2
+            if end == len(call):
+                self._call_pos = close  # Wait for the next character
+                return None
+            if call[end].isspace() or call[end] == "<":
+                return end
+            self._call_pos = close + 1
+
+    def _syntax_end(self, call: str) -> int | None:
+        """End of a call whose arguments are Python literals."""
+        depth = self._call_depth
+        quote = self._call_quote
+        i = self._call_pos
+        n = len(call)
+        while i < n:
+            char = call[i]
+            i += 1
+            if quote:
+                if char == "\\":
+                    if i == n:
+                        i -= 1  # Escaped character not streamed yet
+                        break
+                    i += 1
+                elif char == quote:
+                    quote = None
+            elif char in "\"'":
+                quote = char
+            elif char in _OPENERS:
+                depth += 1
+            elif char in _CLOSERS:
+                depth -= 1
+                if depth == 0:
+                    return i
+        self._call_depth = depth
+        self._call_quote = quote
+        self._call_pos = i
+        return None
+
+    def _scan(self, chunk: str, offset: int) -> tuple[str, int] | None:
+        """
+        Advance the automaton over ``chunk``.
+
+        Returns:
+            ``(marker, start)`` if this chunk completed the reply's first
+            marker, with ``start`` its position in the whole stream.
+        """
+        automaton = _AUTOMATON
+        step = automaton.step
+        match = automaton.match
+        start_chars = automaton.start_chars
+        state = self._state
+        first = None
+        i = 0
+        n = len(chunk)
+        while i < n:
+            if state == 0:
+                # Skip text that cannot begin a marker
+                found = start_chars.search(chunk, i)
+                if found is None:
+                    break
+                i = found.start()
+            state = step(state, chunk[i])
+            i += 1
+            marker = match[state]
+            if marker is None:
+                continue
+            start = offset + i - len(marker)
+            if self._action_start is None:
+                self._action_start = start
+                first = (marker, start)
+            if marker == ACTION_MARKERS[0]:
+                self._finish_start = start
+                # finish( wins over any do(; nothing left to look for
+                self._scanning = False
+                state = 0
+                break
+            if self._do_start is None:
+                self._do_start = start
+        self._state = state
+        return first
+
+    def close(self) -> tuple[str, str]:
+        """
+        Flush held-back thinking and return the final split.
+
+        Returns:
+            Tuple of (thinking, action), as ModelClient._parse_response.
+        """
+        if self._action_start is None and self._pending:
+            pending, self._pending = self._pending, ""
+            if self.on_thinking:
+                self.on_thinking(pending)
+        self._state = 0
+        return split_response(self.text, self._finish_start, self._do_start)
+
+
+def split_response(
+    content: str, finish_start: int | None, do_start: int | None
+) -> tuple[str, str]:
+    """Split a reply at known marker positions, with the legacy XML fallback."""
+    start = finish_start if finish_start is not None else do_start
+    if start is not None:
+        return content[:start].strip(), content[start:]
+
+    if "<answer>" in content:
+        parts = content.split("<answer>", 1)
+        thinking = parts[0].replace("<think>", "").replace("</think>", "").strip()
+        action = parts[1].replace("</answer>", "").strip()
+        return thinking, action
+
+    return "", content
@@ -0,0 +1,272 @@
+"""Observation stage that captures the screen state for an agent step."""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, ContextManager
+
+from phone_agent.imaging import Screenshot
+from phone_agent.settle import on_settled
+
+
+@dataclass
+class Observation:
+    """Screen state captured at the start of a step."""
+
+    screenshot: Screenshot
+    current_app: str
+    # Seconds spent per probe, the probes' wall time ("observation") and the
+    # time the step was blocked waiting for them ("wait")
+    timings: dict[str, float] = field(default_factory=dict)
+    prefetched: bool = False
+
+
+class ObservationStage:
+    """
+    Runs the screenshot and current-app probes for each step.
+
+    With ``parallel`` the two probes run concurrently on a small worker pool.
+    ``prefetch`` starts the next observation in the background so that
+    ``observe`` can return it without a device round trip. ``close`` stops
+    the worker pool; it is started again on the next use.
+
+    Probe failures are re-raised from ``observe`` in the same order as the
+    sequential capture: a screenshot error wins over a current-app error.
+
+    Args:
+        capture_screenshot: Returns the current screenshot.
+        get_current_app: Returns the name of the foreground app.
+        parallel: Whether to run the two probes concurrently.
+    """
+
+    def __init__(
+        self,
+        capture_screenshot: Callable[[], Screenshot],
+        get_current_app: Callable[[], str],
+        parallel: bool = True,
+    ):
+        self._capture_screenshot = capture_screenshot
+        self._get_current_app = get_current_app
+        self.parallel = parallel
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: Future | None = None
+
+    def observe(self) -> Observation:
+        """
+        Return the current observation, using a pending prefetch if any.
+
+        Returns:
+            Observation with the screenshot, current app and probe timings.
+        """
+        start = time.perf_counter()
+        pending, self._pending = self._pending, None
+
+        if pending is not None:
+            observation = pending.result()
+            observation.prefetched = True
+        else:
+            observation = self._collect()
+
+        observation.timings["wait"] = round(time.perf_counter() - start, 4)
+        return observation
+
+    def prefetch(self, restart: bool = False) -> None:
+        """
+        Start capturing the next observation in the background.
+
+        Args:
+            restart: Replace a pending prefetch, e.g. one taken before a
+                later action in the same step changed the screen again.
+        """
+        if restart:
+            self.discard()
+        if self._pending is None:
+            self._pending = self._submit(self._collect)
+
+    def prefetch_when_settled(self) -> ContextManager[None]:
+        """
+        Context in which every settled adaptive wait restarts the prefetch.
+
+        Wrapping an action in it starts the next capture as soon as the
+        screen is stable instead of after the action handler returns.
+        """
+        return on_settled(lambda: self.prefetch(restart=True))
+
+    def discard(self) -> None:
+        """Drop a pending prefetch, e.g. when the run finishes or resets."""
+        pending, self._pending = self._pending, None
+        if pending is not None and not pending.cancel():
+            # Let it finish in the background; its result is never used
+            pending.add_done_callback(lambda future: future.exception())
+
+    def close(self) -> None:
+        """Discard pending work and shut down the worker pool."""
+        self.discard()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            # Two probes, plus one slot for the prefetch that waits on them
+            self._executor = ThreadPoolExecutor(
+                max_workers=3, thread_name_prefix="observation"
+            )
+        return self._executor
+
+    def _submit(self, func: Callable, *args) -> Future:
+        # Run in a copy of the caller's context so probes keep its tracer
+        return self._pool().submit(contextvars.copy_context().run, func, *args)
+
+    def _collect(self) -> Observation:
+        start = time.perf_counter()
+        timings: dict[str, float] = {}
+
+        if self.parallel:
+            screenshot_future = self._submit(
+                _timed, self._capture_screenshot, timings, "screenshot"
+            )
+            app_future = self._submit(
+                _timed, self._get_current_app, timings, "current_app"
+            )
+            # Wait for both before raising so no probe outlives the step
+            screenshot_error = screenshot_future.exception()
+            app_error = app_future.exception()
+            if screenshot_error is not None:
+                raise screenshot_error
+            if app_error is not None:
+                raise app_error
+            screenshot = screenshot_future.result()
+            current_app = app_future.result()
+        else:
+            screenshot = _timed(self._capture_screenshot, timings, "screenshot")
+            current_app = _timed(self._get_current_app, timings, "current_app")
+
+        timings["observation"] = round(time.perf_counter() - start, 4)
+        return Observation(
+            screenshot=screenshot, current_app=current_app, timings=timings
+        )
+
+
+class AsyncObservationStage:
+    """
+    Asyncio counterpart of ObservationStage.
+
+    The probes are coroutines; with ``parallel`` they are gathered on the
+    event loop, and ``prefetch`` starts the next observation as a task.
+
+    Args:
+        capture_screenshot: Coroutine function returning the current screenshot.
+        get_current_app: Coroutine function returning the foreground app.
+        parallel: Whether to run the two probes concurrently.
+    """
+
+    def __init__(
+        self,
+        capture_screenshot: Callable[[], Awaitable[Screenshot]],
+        get_current_app: Callable[[], Awaitable[str]],
+        parallel: bool = True,
+    ):
+        self._capture_screenshot = capture_screenshot
+        self._get_current_app = get_current_app
+        self.parallel = parallel
+        self._pending: asyncio.Task | None = None
+
+    async def observe(self) -> Observation:
+        """
+        Return the current observation, using a pending prefetch if any.
+
+        Returns:
+            Observation with the screenshot, current app and probe timings.
+        """
+        start = time.perf_counter()
+        pending, self._pending = self._pending, None
+
+        if pending is not None:
+            observation = await pending
+            observation.prefetched = True
+        else:
+            observation = await self._collect()
+
+        observation.timings["wait"] = round(time.perf_counter() - start, 4)
+        return observation
+
+    def prefetch(self, restart: bool = False) -> None:
+        """
+        Start capturing the next observation in the background.
+
+        Args:
+            restart: Replace a pending prefetch, e.g. one taken before a
+                later action in the same step changed the screen again.
+        """
+        if restart:
+            self.discard()
+        if self._pending is None:
+            self._pending = asyncio.ensure_future(self._collect())
+
+    def prefetch_when_settled(self) -> ContextManager[None]:
+        """
+        Context in which every settled adaptive wait restarts the prefetch.
+
+        Wrapping an action in it starts the next capture as soon as the
+        screen is stable instead of after the action handler returns.
+        """
+        return on_settled(lambda: self.prefetch(restart=True))
+
+    def discard(self) -> None:
+        """Drop a pending prefetch, e.g. when the run finishes or resets."""
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            pending.cancel()
+            # Retrieve the outcome so a failed probe is not reported as unhandled
+            pending.add_done_callback(
+                lambda task: task.cancelled() or task.exception()
+            )
+
+    async def _collect(self) -> Observation:
+        start = time.perf_counter()
+        timings: dict[str, float] = {}
+
+        if self.parallel:
+            screenshot, current_app = await asyncio.gather(
+                _timed_async(self._capture_screenshot, timings, "screenshot"),
+                _timed_async(self._get_current_app, timings, "current_app"),
+                return_exceptions=True,
+            )
+            # Both probes have finished; raise in the sequential order
+            if isinstance(screenshot, BaseException):
+                raise screenshot
+            if isinstance(current_app, BaseException):
+                raise current_app
+        else:
+            screenshot = await _timed_async(
+                self._capture_screenshot, timings, "screenshot"
+            )
+            current_app = await _timed_async(
+                self._get_current_app, timings, "current_app"
+            )
+
+        timings["observation"] = round(time.perf_counter() - start, 4)
+        return Observation(
+            screenshot=screenshot, current_app=current_app, timings=timings
+        )
+
+
+def _timed(probe: Callable, timings: dict[str, float], name: str):
+    """Run a probe and record its duration under ``name``."""
+    start = time.perf_counter()
+    try:
+        return probe()
+    finally:
+        timings[name] = round(time.perf_counter() - start, 4)
+
+
+async def _timed_async(probe: Callable, timings: dict[str, float], name: str):
+    """Await a coroutine probe and record its duration under ``name``."""
+    start = time.perf_counter()
+    try:
+        return await probe()
+    finally:
+        timings[name] = round(time.perf_counter() - start, 4)
@@ -0,0 +1,289 @@
+"""Adaptive wait for the screen to settle after a device action.
+
+Instead of sleeping a fixed delay after every tap, swipe or launch, the
+detector polls low-resolution frames and returns as soon as consecutive
+frames agree, or when a ceiling is reached.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Awaitable, Callable, Iterator
+
+from PIL import Image, ImageChops
+
+from phone_agent.config.timing import TIMING_CONFIG, SettleTimingConfig
+from phone_agent.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+# Thumbnail used to compare frames (width, height)
+THUMBNAIL_SIZE = (36, 80)
+
+# Grey-level difference a thumbnail pixel must exceed to count as changed
+PIXEL_TOLERANCE = 8
+
+# Called by adaptive waits that saw a stable screen, in the waiting context
+_ON_SETTLED: contextvars.ContextVar[Callable[[], None] | None] = (
+    contextvars.ContextVar("phone_agent_on_settled", default=None)
+)
+
+
+@dataclass
+class SettleResult:
+    """Outcome of one adaptive wait."""
+
+    settled: bool
+    elapsed: float
+    frames: int
+
+
+def frame_signature(frame: bytes | Image.Image) -> Image.Image:
+    """
+    Reduce a frame to a small grayscale thumbnail for comparison.
+
+    Args:
+        frame: Encoded image bytes or a PIL image.
+
+    Returns:
+        Grayscale thumbnail of THUMBNAIL_SIZE.
+    """
+    img = Image.open(BytesIO(frame)) if isinstance(frame, bytes) else frame
+    # Lets the JPEG decoder skip most of the work; a no-op for PNG
+    img.draft("L", THUMBNAIL_SIZE)
+    return img.convert("L").resize(THUMBNAIL_SIZE, Image.Resampling.BILINEAR)
+
+
+def frame_difference(a: Image.Image, b: Image.Image) -> float:
+    """Fraction of thumbnail pixels that changed between two signatures."""
+    histogram = ImageChops.difference(a, b).histogram()
+    changed = sum(histogram[PIXEL_TOLERANCE + 1 :])
+    return changed / (a.width * a.height)
+
+
+class ScreenSettleDetector:
+    """
+    Waits until consecutive screen frames agree.
+
+    Args:
+        poll_interval: Delay between frame captures in seconds.
+        stable_frames: Consecutive matching frames that count as settled.
+        diff_threshold: Max fraction of changed thumbnail pixels for a match.
+        min_delay: Delay before the first frame is captured.
+        max_wait: Ceiling for the whole wait in seconds.
+        clock: Monotonic clock. Defaults to time.monotonic.
+        sleep: Sleep function. Defaults to time.sleep.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = 0.15,
+        stable_frames: int = 2,
+        diff_threshold: float = 0.01,
+        min_delay: float = 0.1,
+        max_wait: float = 3.0,
+        clock: Callable[[], float] | None = None,
+        sleep: Callable[[float], None] | None = None,
+    ):
+        self.poll_interval = poll_interval
+        self.stable_frames = max(2, stable_frames)
+        self.diff_threshold = diff_threshold
+        self.min_delay = min_delay
+        self.max_wait = max_wait
+        self._clock = clock or time.monotonic
+        self._sleep = sleep or time.sleep
+
+    @classmethod
+    def from_config(cls, config: SettleTimingConfig) -> "ScreenSettleDetector":
+        """Create a detector from a SettleTimingConfig."""
+        return cls(
+            poll_interval=config.poll_interval,
+            stable_frames=config.stable_frames,
+            diff_threshold=config.diff_threshold,
+            min_delay=config.min_delay,
+            max_wait=config.max_wait,
+        )
+
+    def wait(self, capture_frame: Callable[[], bytes | Image.Image]) -> SettleResult:
+        """
+        Poll frames until the screen is stable or max_wait is reached.
+
+        Args:
+            capture_frame: Returns the current screen as bytes or a PIL image.
+
+        Returns:
+            SettleResult describing whether the screen settled.
+        """
+        start = self._clock()
+        self._sleep(self.min_delay)
+
+        previous = None
+        streak = 0
+        frames = 0
+        while True:
+            signature = frame_signature(capture_frame())
+            frames += 1
+
+            if (
+                previous is not None
+                and frame_difference(previous, signature) <= self.diff_threshold
+            ):
+                streak += 1
+            else:
+                streak = 1
+            previous = signature
+
+            elapsed = self._clock() - start
+            if streak >= self.stable_frames:
+                return SettleResult(settled=True, elapsed=elapsed, frames=frames)
+            if elapsed + self.poll_interval > self.max_wait:
+                return SettleResult(settled=False, elapsed=elapsed, frames=frames)
+            self._sleep(self.poll_interval)
+
+    async def wait_async(
+        self, capture_frame: Callable[[], Awaitable[bytes | Image.Image]]
+    ) -> SettleResult:
+        """
+        Like ``wait``, for a coroutine frame source; sleeps with asyncio.
+
+        Args:
+            capture_frame: Coroutine function returning the current screen.
+
+        Returns:
+            SettleResult describing whether the screen settled.
+        """
+        start = self._clock()
+        await asyncio.sleep(self.min_delay)
+
+        previous = None
+        streak = 0
+        frames = 0
+        while True:
+            signature = frame_signature(await capture_frame())
+            frames += 1
+
+            if (
+                previous is not None
+                and frame_difference(previous, signature) <= self.diff_threshold
+            ):
+                streak += 1
+            else:
+                streak = 1
+            previous = signature
+
+            elapsed = self._clock() - start
+            if streak >= self.stable_frames:
+                return SettleResult(settled=True, elapsed=elapsed, frames=frames)
+            if elapsed + self.poll_interval > self.max_wait:
+                return SettleResult(settled=False, elapsed=elapsed, frames=frames)
+            await asyncio.sleep(self.poll_interval)
+
+
+@contextmanager
+def on_settled(callback: Callable[[], None]) -> Iterator[None]:
+    """
+    Call ``callback`` whenever an adaptive wait in this context sees a stable screen.
+
+    Agents use it to start capturing the next observation while the action
+    handler is still returning. Fixed and explicit delays do not report.
+
+    Args:
+        callback: Function called with no arguments; errors are logged.
+    """
+    token = _ON_SETTLED.set(callback)
+    try:
+        yield
+    finally:
+        _ON_SETTLED.reset(token)
+
+
+def _notify_settled(result: SettleResult) -> None:
+    callback = _ON_SETTLED.get()
+    if callback is None or not result.settled:
+        return
+    try:
+        callback()
+    except Exception as e:
+        logger.warning("Settle callback failed: %s", e)
+
+
+@traced("settle")
+def wait_after_action(
+    delay: float | None,
+    default_delay: float,
+    capture_frame: Callable[[], bytes | Image.Image],
+) -> None:
+    """
+    Wait after a device action according to the configured settle mode.
+
+    Args:
+        delay: Delay requested by the caller. An explicit value is always
+            honoured as a fixed sleep.
+        default_delay: Fixed delay from DeviceTimingConfig for this action.
+        capture_frame: Frame source used in adaptive mode.
+    """
+    if delay is not None:
+        time.sleep(delay)
+        return
+
+    config = TIMING_CONFIG.settle
+    if config.mode != "adaptive":
+        time.sleep(default_delay)
+        return
+
+    try:
+        result = ScreenSettleDetector.from_config(config).wait(capture_frame)
+        logger.debug(
+            "Screen settle: settled=%s elapsed=%.3fs frames=%d",
+            result.settled,
+            result.elapsed,
+            result.frames,
+        )
+    except Exception as e:
+        logger.warning("Screen settle failed, using fixed delay: %s", e)
+        time.sleep(default_delay)
+        return
+    _notify_settled(result)
+
+
+async def wait_after_action_async(
+    delay: float | None,
+    default_delay: float,
+    capture_frame: Callable[[], Awaitable[bytes | Image.Image]],
+) -> None:
+    """
+    Coroutine version of ``wait_after_action`` for the asyncio device backends.
+
+    Args:
+        delay: Delay requested by the caller, honoured as a fixed sleep.
+        default_delay: Fixed delay from DeviceTimingConfig for this action.
+        capture_frame: Coroutine frame source used in adaptive mode.
+    """
+    if delay is not None:
+        await asyncio.sleep(delay)
+        return
+
+    config = TIMING_CONFIG.settle
+    if config.mode != "adaptive":
+        await asyncio.sleep(default_delay)
+        return
+
+    try:
+        result = await ScreenSettleDetector.from_config(config).wait_async(
+            capture_frame
+        )
+        logger.debug(
+            "Screen settle: settled=%s elapsed=%.3fs frames=%d",
+            result.settled,
+            result.elapsed,
+            result.frames,
+        )
+    except Exception as e:
+        logger.warning("Screen settle failed, using fixed delay: %s", e)
+        await asyncio.sleep(default_delay)
+        return
+    _notify_settled(result)
@@ -0,0 +1,202 @@
+"""Detection of agent runs that stopped making progress.
+
+A stuck model keeps paying for requests until ``max_steps``: it taps the
+same spot on a screen that does not change, or bounces between two or
+three screens. ``StallDetector`` watches the recent (screen hash, app,
+action) triples of a run. When the newest ones repeat with a period of up
+to ``max_period`` steps, it first asks the agent to add a corrective hint
+to the next prompt and, if the run stalls again, to abort it.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any
+
+from phone_agent.decision_cache import hash_distance
+
+HINT = "hint"
+ABORT = "abort"
+
+
+@dataclass
+class StallDetectorConfig:
+    """
+    Settings of a StallDetector.
+
+    Attributes:
+        min_repeats: Times a step or cycle of steps must occur in a row.
+        max_period: Longest cycle, in steps, that is looked for.
+        max_distance: Largest screen hash distance that still counts as the
+            same screen.
+        coordinate_tolerance: Largest difference between coordinates, on
+            the model's 0-1000 scale, that still counts as the same target.
+        max_hints: Hints given before a stalled run is aborted. With 0 the
+            first stall aborts.
+    """
+
+    min_repeats: int = 3
+    max_period: int = 3
+    max_distance: int = 10
+    coordinate_tolerance: int = 10
+    max_hints: int = 1
+
+
+@dataclass
+class StallObservation:
+    """What one step saw and did."""
+
+    screen_hash: int | None  # None for screens that could not be hashed
+    app: str
+    action: dict[str, Any]
+
+
+@dataclass
+class Stall:
+    """A detected stall."""
+
+    kind: str  # "repeat" for period 1, otherwise "cycle"
+    period: int
+    repeats: int
+    decision: str  # HINT or ABORT
+
+
+@dataclass
+class StallStats:
+    """Counters of one StallDetector over all its runs."""
+
+    detections: int = 0
+    hints: int = 0
+    aborts: int = 0
+    steps_saved: int = 0
+    tokens_saved: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return dict(self.__dict__)
+
+
+def _action_key(action: dict[str, Any]) -> str:
+    return json.dumps(action, sort_keys=True, ensure_ascii=False)
+
+
+def same_action(a: dict[str, Any], b: dict[str, Any], tolerance: int = 0) -> bool:
+    """Whether two actions are the same, allowing nearby coordinates."""
+    if a.keys() != b.keys():
+        return False
+    for key, value in a.items():
+        other = b[key]
+        if (
+            isinstance(value, list)
+            and isinstance(other, list)
+            and len(value) == len(other)
+            and all(isinstance(v, (int, float)) for v in value + other)
+        ):
+            if any(abs(v - w) > tolerance for v, w in zip(value, other)):
+                return False
+        elif _action_key({key: value}) != _action_key({key: other}):
+            return False
+    return True
+
+
+def find_period(
+    observations: list[StallObservation], config: StallDetectorConfig
+) -> int | None:
+    """
+    Shortest period with which the newest observations repeat.
+
+    Returns:
+        A period of 1 to ``config.max_period`` steps whose cycle occurred
+        ``config.min_repeats`` times in a row at the end, or None.
+    """
+
+    def same(a: StallObservation, b: StallObservation) -> bool:
+        if a.screen_hash is None or b.screen_hash is None or a.app != b.app:
+            return False
+        if hash_distance(a.screen_hash, b.screen_hash) > config.max_distance:
+            return False
+        return same_action(a.action, b.action, config.coordinate_tolerance)
+
+    for period in range(1, config.max_period + 1):
+        needed = period * config.min_repeats
+        if len(observations) < needed:
+            break
+        recent = observations[-needed:]
+        if all(same(recent[i], recent[i + period]) for i in range(needed - period)):
+            return period
+    return None
+
+
+class StallDetector:
+    """
+    Online stall detection for one agent.
+
+    Call ``start`` when a run begins and ``observe`` with every decoded
+    action before it is executed.
+
+    Args:
+        config: Detection settings.
+    """
+
+    def __init__(self, config: StallDetectorConfig | None = None):
+        self.config = config or StallDetectorConfig()
+        self.stats = StallStats()
+        self.start(0)
+
+    def start(self, max_steps: int) -> None:
+        """Begin a run that may take up to ``max_steps`` steps."""
+        self._max_steps = max_steps
+        self._observations: list[StallObservation] = []
+        self._steps = 0
+        self._hints = 0
+        self._prompt_tokens = 0
+        self._prompts = 0
+
+    def observe(
+        self,
+        screen_hash: int | None,
+        app: str,
+        action: dict[str, Any],
+        prompt_tokens: int | None = None,
+    ) -> Stall | None:
+        """
+        Record a step and check for a stall.
+
+        Args:
+            screen_hash: Perceptual hash of the screen the action was chosen
+                on, or None.
+            app: Current app.
+            action: Parsed action.
+            prompt_tokens: Estimated tokens of the step's model request, if
+                one was made.
+
+        Returns:
+            The stall with the agent's next move, or None.
+        """
+        self._steps += 1
+        if prompt_tokens is not None:
+            self._prompt_tokens += prompt_tokens
+            self._prompts += 1
+        self._observations.append(StallObservation(screen_hash, app, action))
+        # Only the newest max_period * min_repeats steps can form a stall
+        del self._observations[: -self.config.max_period * self.config.min_repeats]
+
+        period = find_period(self._observations, self.config)
+        if period is None:
+            return None
+
+        self.stats.detections += 1
+        kind = "repeat" if period == 1 else "cycle"
+        if self._hints < self.config.max_hints:
+            self._hints += 1
+            self.stats.hints += 1
+            # The model gets a full window to recover before the next check
+            self._observations.clear()
+            return Stall(kind, period, self.config.min_repeats, HINT)
+
+        # A stuck run would otherwise take every remaining step
+        steps_saved = max(self._max_steps - self._steps, 0)
+        self.stats.aborts += 1
+        self.stats.steps_saved += steps_saved
+        if self._prompts:
+            mean_tokens = self._prompt_tokens // self._prompts
+            self.stats.tokens_saved += steps_saved * mean_tokens
+        return Stall(kind, period, self.config.min_repeats, ABORT)
@@ -0,0 +1,333 @@
+"""Lightweight latency tracing of agent steps.
+
+``span("name")`` marks a phase of the pipeline, such as the screenshot,
+the current-app probe, the model request or a device command. Spans nest
+per thread and are recorded by the active ``Tracer``. Without one, ``span``
+returns a shared no-op context manager and ``@traced`` functions call
+straight through, so instrumented code costs one context variable lookup.
+
+The active tracer is context-local: agents running in separate threads or
+asyncio tasks each record into their own tracer. Work handed to a thread
+pool keeps the tracer when submitted with ``contextvars.copy_context().run``
+(``asyncio.to_thread`` does this already).
+
+A tracer exports Chrome trace-event JSON (open it in chrome://tracing or
+Perfetto) and summarizes time per span name, optionally for a single run.
+"""
+
+import contextvars
+import functools
+import itertools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_ACTIVE: "contextvars.ContextVar[Tracer | None]" = contextvars.ContextVar(
+    "phone_agent_tracer", default=None
+)
+_RUN_ID: "contextvars.ContextVar[str | None]" = contextvars.ContextVar(
+    "phone_agent_trace_run_id", default=None
+)
+
+
+@dataclass
+class SpanRecord:
+    """One finished span."""
+
+    id: int
+    name: str
+    start_ns: int
+    duration_ns: int
+    thread_id: int
+    parent_id: int | None
+    depth: int
+    run_id: str | None = None
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class SpanStats:
+    """Time spent in one span name."""
+
+    name: str
+    count: int
+    total_ms: float
+    self_ms: float  # Total minus the time of child spans on the same thread
+    mean_ms: float
+    max_ms: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "self_ms": round(self.self_ms, 3),
+            "mean_ms": round(self.mean_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("_tracer", "_name", "_args", "_id", "_parent_id", "_depth", "_start")
+
+    def __init__(self, tracer: "Tracer", name: str, args: dict[str, Any]):
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+
+    def __enter__(self) -> "_Span":
+        stack = self._tracer._stack()
+        self._id = next(self._tracer._ids)
+        self._parent_id = stack[-1] if stack else None
+        self._depth = len(stack)
+        stack.append(self._id)
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        duration = time.perf_counter_ns() - self._start
+        self._tracer._stack().pop()
+        if exc_type is not None:
+            self._args["error"] = exc_type.__name__
+        run_id = _RUN_ID.get()
+        if run_id is None:
+            run_id = self._tracer.run_id
+        self._tracer._record(
+            SpanRecord(
+                id=self._id,
+                name=self._name,
+                start_ns=self._start,
+                duration_ns=duration,
+                thread_id=threading.get_ident(),
+                parent_id=self._parent_id,
+                depth=self._depth,
+                run_id=run_id,
+                args=self._args,
+            )
+        )
+        return False
+
+
+class Tracer:
+    """
+    Collects spans from every thread while active.
+
+    Args:
+        max_spans: Spans kept; later ones are counted in ``dropped``.
+    """
+
+    def __init__(self, max_spans: int = 100_000):
+        self.max_spans = max_spans
+        self.spans: list[SpanRecord] = []
+        self.dropped = 0
+        # Tagged onto spans that finish outside an ``activate`` run id
+        self.run_id: str | None = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def span(self, name: str, **args: Any) -> _Span:
+        """Open a span on this tracer, whether or not it is active."""
+        return _Span(self, name, args)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans = []
+            self.dropped = 0
+
+    def runs(self) -> list[str]:
+        """Run ids seen so far, in order."""
+        with self._lock:
+            spans = list(self.spans)
+        return list(dict.fromkeys(s.run_id for s in spans if s.run_id is not None))
+
+    def summary(self, run_id: str | None = None) -> list[SpanStats]:
+        """
+        Time per span name, slowest first.
+
+        Args:
+            run_id: Only count spans of this run. All spans when None.
+        """
+        spans = self._select(run_id)
+        child_ns: dict[int, int] = {}
+        for record in spans:
+            if record.parent_id is not None:
+                child_ns[record.parent_id] = (
+                    child_ns.get(record.parent_id, 0) + record.duration_ns
+                )
+
+        totals: dict[str, list[int]] = {}
+        for record in spans:
+            entry = totals.setdefault(record.name, [0, 0, 0, 0])
+            entry[0] += 1
+            entry[1] += record.duration_ns
+            entry[2] += record.duration_ns - child_ns.get(record.id, 0)
+            entry[3] = max(entry[3], record.duration_ns)
+
+        stats = [
+            SpanStats(
+                name=name,
+                count=count,
+                total_ms=total / 1e6,
+                self_ms=self_ns / 1e6,
+                mean_ms=total / count / 1e6,
+                max_ms=longest / 1e6,
+            )
+            for name, (count, total, self_ns, longest) in totals.items()
+        ]
+        return sorted(stats, key=lambda s: s.total_ms, reverse=True)
+
+    def format_summary(self, run_id: str | None = None) -> str:
+        """The summary as a fixed-width text table."""
+        lines = [
+            f"{'span':<24}{'count':>7}{'total ms':>11}{'self ms':>11}"
+            f"{'mean ms':>10}{'max ms':>10}"
+        ]
+        for s in self.summary(run_id):
+            lines.append(
+                f"{s.name:<24}{s.count:>7}{s.total_ms:>11.1f}{s.self_ms:>11.1f}"
+                f"{s.mean_ms:>10.2f}{s.max_ms:>10.2f}"
+            )
+        return "\n".join(lines)
+
+    def to_chrome_trace(self, run_id: str | None = None) -> dict[str, Any]:
+        """
+        Spans as Chrome trace-event JSON.
+
+        Every span becomes a complete ("X") event; timestamps are
+        microseconds from the first recorded span.
+        """
+        spans = self._select(run_id)
+        origin = min((s.start_ns for s in spans), default=0)
+        events = []
+        for record in sorted(spans, key=lambda s: s.start_ns):
+            args = dict(record.args)
+            if record.run_id is not None:
+                args["run_id"] = record.run_id
+            events.append(
+                {
+                    "name": record.name,
+                    "cat": record.name.split(".", 1)[0],
+                    "ph": "X",
+                    "ts": (record.start_ns - origin) / 1000,
+                    "dur": record.duration_ns / 1000,
+                    "pid": 1,
+                    "tid": record.thread_id,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str | Path, run_id: str | None = None) -> None:
+        """Write ``to_chrome_trace`` to a JSON file."""
+        Path(path).write_text(
+            json.dumps(self.to_chrome_trace(run_id), ensure_ascii=False, default=str),
+            encoding="utf-8",
+        )
+
+    def _select(self, run_id: str | None) -> list[SpanRecord]:
+        with self._lock:
+            spans = list(self.spans)
+        if run_id is None:
+            return spans
+        return [s for s in spans if s.run_id == run_id]
+
+    def _stack(self) -> list[int]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, record: SpanRecord) -> None:
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(record)
+            else:
+                self.dropped += 1
+
+
+def get_tracer() -> Tracer | None:
+    """Return the tracer active in the current context, if any."""
+    return _ACTIVE.get()
+
+
+def set_tracer(tracer: Tracer | None) -> Tracer | None:
+    """
+    Make ``tracer`` active in the current context, or disable tracing with None.
+
+    Other threads and asyncio tasks keep their own tracer.
+
+    Returns:
+        The previously active tracer, to restore afterwards.
+    """
+    previous = _ACTIVE.get()
+    _ACTIVE.set(tracer)
+    return previous
+
+
+@contextmanager
+def activate(tracer: Tracer, run_id: str | None = None) -> Iterator[Tracer]:
+    """
+    Make ``tracer`` active in the current context for the ``with`` block.
+
+    Args:
+        tracer: Tracer recording the spans opened in the block.
+        run_id: Tagged onto those spans, so runs sharing a tracer stay apart.
+    """
+    tracer_token = _ACTIVE.set(tracer)
+    run_token = _RUN_ID.set(run_id)
+    try:
+        yield tracer
+    finally:
+        _RUN_ID.reset(run_token)
+        _ACTIVE.reset(tracer_token)
+
+
+def span(name: str, **args: Any) -> _Span | _NoopSpan:
+    """
+    Context manager timing a phase on the active tracer.
+
+    Args:
+        name: Span name, dotted by layer ("adb.shell", "model_request").
+        **args: Details shown with the span in the trace viewer.
+    """
+    tracer = _ACTIVE.get()
+    if tracer is None:
+        return _NOOP_SPAN
+    return _Span(tracer, name, args)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator running a synchronous function inside ``span(name)``."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _ACTIVE.get()
+            if tracer is None:
+                return func(*args, **kwargs)
+            with _Span(tracer, name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -21,11 +21,21 @@ from phone_agent.xctest.input import (
     clear_text,
     type_text,
 )
-from phone_agent.xctest.screenshot import get_screenshot
+from phone_agent.xctest.mjpeg import MJPEGFrameSource
+from phone_agent.xctest.screenshot import disable_mjpeg, enable_mjpeg, get_screenshot
+from phone_agent.xctest.wda import (
+    WDAClient,
+    WDAError,
+    get_wda_client,
+    set_http_pool_enabled,
+)
 
 __all__ = [
     # Screenshot
     "get_screenshot",
+    "enable_mjpeg",
+    "disable_mjpeg",
+    "MJPEGFrameSource",
     # Input
     "type_text",
     "clear_text",
@@ -44,4 +54,9 @@ __all__ = [
     "ConnectionType",
     "quick_connect",
     "list_devices",
+    # WebDriverAgent HTTP
+    "WDAClient",
+    "WDAError",
+    "get_wda_client",
+    "set_http_pool_enabled",
 ]
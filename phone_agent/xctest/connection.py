@@ -5,6 +5,8 @@ import time
 from dataclasses import dataclass
 from enum import Enum
 
+from phone_agent.xctest.wda import WDAError, get_wda_client
+
 
 class ConnectionType(Enum):
     """Type of iOS connection."""
@@ -204,11 +206,7 @@ class XCTestConnection:
             True if WDA is ready, False otherwise.
         """
         try:
-            import requests
-
-            response = requests.get(
-                f"{self.wda_url}/status", timeout=timeout, verify=False
-            )
+            response = get_wda_client(self.wda_url).get("status", timeout=timeout)
             return response.status_code == 200
         except ImportError:
             print(
@@ -220,35 +218,22 @@ class XCTestConnection:
 
     def start_wda_session(self) -> tuple[bool, str]:
         """
-        Start a new WebDriverAgent session.
+        Start a WebDriverAgent session, reusing the live one if possible.
 
         Returns:
             Tuple of (success, session_id or error_message).
         """
         try:
-            import requests
-
-            response = requests.post(
-                f"{self.wda_url}/session",
-                json={"capabilities": {}},
-                timeout=30,
-                verify=False,
-            )
-
-            if response.status_code in (200, 201):
-                data = response.json()
-                session_id = data.get("sessionId") or data.get("value", {}).get(
-                    "sessionId"
-                )
-                return True, session_id or "session_started"
-            else:
-                return False, f"Failed to start session: {response.text}"
+            session_id = get_wda_client(self.wda_url).ensure_session()
+            return True, session_id or "session_started"
 
         except ImportError:
             return (
                 False,
                 "requests library not found. Install it: pip install requests",
             )
+        except WDAError as e:
+            return False, str(e)
         except Exception as e:
             return False, f"Error starting WDA session: {e}"
 
@@ -260,9 +245,7 @@ class XCTestConnection:
             Status dictionary or None if not available.
         """
         try:
-            import requests
-
-            response = requests.get(f"{self.wda_url}/status", timeout=5, verify=False)
+            response = get_wda_client(self.wda_url).get("status", timeout=5)
 
             if response.status_code == 200:
                 return response.json()
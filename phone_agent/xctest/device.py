@@ -1,10 +1,17 @@
 """Device control utilities for iOS automation via WebDriverAgent."""
 
 import subprocess
-import time
 from typing import Optional
 
+from phone_agent.app_resolver import CurrentAppCache, get_app_index
 from phone_agent.config.apps_ios import APP_PACKAGES_IOS as APP_PACKAGES
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.settle import wait_after_action
+from phone_agent.xctest.screenshot import capture_frame
+from phone_agent.xctest.wda import get_wda_client
+
+_APP_INDEX = get_app_index(APP_PACKAGES)
+_CURRENT_APP_CACHE = CurrentAppCache(lambda: TIMING_CONFIG.device.current_app_ttl)
 
 SCALE_FACTOR = 3 # 3 for most modern iPhone 
 
@@ -34,6 +41,9 @@ def get_current_app(
     """
     Get the currently active app bundle ID and name.
 
+    The result is reused for TIMING_CONFIG.device.current_app_ttl seconds
+    unless a device action runs in between.
+
     Args:
         wda_url: WebDriverAgent URL.
         session_id: Optional WDA session ID.
@@ -41,13 +51,15 @@ def get_current_app(
     Returns:
         The app name if recognized, otherwise "System Home".
     """
+    cached = _CURRENT_APP_CACHE.get(wda_url)
+    if cached is not None:
+        return cached
+
     try:
-        import requests
+        generation = _CURRENT_APP_CACHE.generation
 
         # Get active app info from WDA using activeAppInfo endpoint
-        response = requests.get(
-            f"{wda_url.rstrip('/')}/wda/activeAppInfo", timeout=5, verify=False
-        )
+        response = get_wda_client(wda_url).get("wda/activeAppInfo", timeout=5)
 
         if response.status_code == 200:
             data = response.json()
@@ -56,13 +68,13 @@ def get_current_app(
             value = data.get("value", {})
             bundle_id = value.get("bundleId", "")
 
+            app_name = "System Home"
             if bundle_id:
                 # Try to find app name from bundle ID
-                for app_name, package in APP_PACKAGES.items():
-                    if package == bundle_id:
-                        return app_name
+                app_name = _APP_INDEX.name_for(bundle_id) or app_name
 
-            return "System Home"
+            _CURRENT_APP_CACHE.put(wda_url, app_name, generation)
+            return app_name
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -72,12 +84,17 @@ def get_current_app(
     return "System Home"
 
 
+def invalidate_current_app(wda_url: str = "http://localhost:8100") -> None:
+    """Forget the cached foreground app after an action on the device."""
+    _CURRENT_APP_CACHE.invalidate(wda_url)
+
+
 def tap(
     x: int,
     y: int,
     wda_url: str = "http://localhost:8100",
     session_id: str | None = None,
-    delay: float = 1.0,
+    delay: float | None = None,
 ) -> None:
     """
     Tap at the specified coordinates using WebDriver W3C Actions API.
@@ -87,11 +104,10 @@ def tap(
         y: Y coordinate.
         wda_url: WebDriverAgent URL.
         session_id: Optional WDA session ID.
-        delay: Delay in seconds after tap.
+        delay: Delay in seconds after tap. If None, waits per
+            the configured settle mode.
     """
     try:
-        import requests
-
         url = _get_wda_session_url(wda_url, session_id, "actions")
 
         # W3C WebDriver Actions API for tap/click
@@ -111,9 +127,14 @@ def tap(
             ]
         }
 
-        requests.post(url, json=actions, timeout=15, verify=False)
+        get_wda_client(wda_url).post(url, json=actions, timeout=15)
 
-        time.sleep(delay)
+        wait_after_action(
+            delay,
+            TIMING_CONFIG.device.default_tap_delay,
+            lambda: capture_frame(wda_url, session_id),
+        )
+        invalidate_current_app(wda_url)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -126,7 +147,7 @@ def double_tap(
     y: int,
     wda_url: str = "http://localhost:8100",
     session_id: str | None = None,
-    delay: float = 1.0,
+    delay: float | None = None,
 ) -> None:
     """
     Double tap at the specified coordinates using WebDriver W3C Actions API.
@@ -136,11 +157,10 @@ def double_tap(
         y: Y coordinate.
         wda_url: WebDriverAgent URL.
         session_id: Optional WDA session ID.
-        delay: Delay in seconds after double tap.
+        delay: Delay in seconds after double tap. If None, waits per
+            the configured settle mode.
     """
     try:
-        import requests
-
         url = _get_wda_session_url(wda_url, session_id, "actions")
 
         # W3C WebDriver Actions API for double tap
@@ -164,9 +184,14 @@ def double_tap(
             ]
         }
 
-        requests.post(url, json=actions, timeout=10, verify=False)
+        get_wda_client(wda_url).post(url, json=actions, timeout=10)
 
-        time.sleep(delay)
+        wait_after_action(
+            delay,
+            TIMING_CONFIG.device.default_double_tap_delay,
+            lambda: capture_frame(wda_url, session_id),
+        )
+        invalidate_current_app(wda_url)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -180,7 +205,7 @@ def long_press(
     duration: float = 3.0,
     wda_url: str = "http://localhost:8100",
     session_id: str | None = None,
-    delay: float = 1.0,
+    delay: float | None = None,
 ) -> None:
     """
     Long press at the specified coordinates using WebDriver W3C Actions API.
@@ -191,11 +216,10 @@ def long_press(
         duration: Duration of press in seconds.
         wda_url: WebDriverAgent URL.
         session_id: Optional WDA session ID.
-        delay: Delay in seconds after long press.
+        delay: Delay in seconds after long press. If None, waits per
+            the configured settle mode.
     """
     try:
-        import requests
-
         url = _get_wda_session_url(wda_url, session_id, "actions")
 
         # W3C WebDriver Actions API for long press
@@ -218,9 +242,14 @@ def long_press(
             ]
         }
 
-        requests.post(url, json=actions, timeout=int(duration + 10), verify=False)
+        get_wda_client(wda_url).post(url, json=actions, timeout=int(duration + 10))
 
-        time.sleep(delay)
+        wait_after_action(
+            delay,
+            TIMING_CONFIG.device.default_long_press_delay,
+            lambda: capture_frame(wda_url, session_id),
+        )
+        invalidate_current_app(wda_url)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -236,7 +265,7 @@ def swipe(
     duration: float | None = None,
     wda_url: str = "http://localhost:8100",
     session_id: str | None = None,
-    delay: float = 1.0,
+    delay: float | None = None,
 ) -> None:
     """
     Swipe from start to end coordinates using WDA dragfromtoforduration endpoint.
@@ -249,11 +278,10 @@ def swipe(
         duration: Duration of swipe in seconds (auto-calculated if None).
         wda_url: WebDriverAgent URL.
         session_id: Optional WDA session ID.
-        delay: Delay in seconds after swipe.
+        delay: Delay in seconds after swipe. If None, waits per
+            the configured settle mode.
     """
     try:
-        import requests
-
         if duration is None:
             # Calculate duration based on distance
             dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
@@ -271,9 +299,14 @@ def swipe(
             "duration": duration,
         }
 
-        requests.post(url, json=payload, timeout=int(duration + 10), verify=False)
+        get_wda_client(wda_url).post(url, json=payload, timeout=int(duration + 10))
 
-        time.sleep(delay)
+        wait_after_action(
+            delay,
+            TIMING_CONFIG.device.default_swipe_delay,
+            lambda: capture_frame(wda_url, session_id),
+        )
+        invalidate_current_app(wda_url)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -284,7 +317,7 @@ def swipe(
 def back(
     wda_url: str = "http://localhost:8100",
     session_id: str | None = None,
-    delay: float = 1.0,
+    delay: float | None = None,
 ) -> None:
     """
     Navigate back (swipe from left edge).
@@ -292,15 +325,14 @@ def back(
     Args:
         wda_url: WebDriverAgent URL.
         session_id: Optional WDA session ID.
-        delay: Delay in seconds after navigation.
+        delay: Delay in seconds after navigation. If None, waits per
+            the configured settle mode.
 
     Note:
         iOS doesn't have a universal back button. This simulates a back gesture
         by swiping from the left edge of the screen.
     """
     try:
-        import requests
-
         url = _get_wda_session_url(wda_url, session_id, "wda/dragfromtoforduration")
 
         # Swipe from left edge to simulate back gesture
@@ -312,9 +344,14 @@ def back(
             "duration": 0.3,
         }
 
-        requests.post(url, json=payload, timeout=10, verify=False)
+        get_wda_client(wda_url).post(url, json=payload, timeout=10)
 
-        time.sleep(delay)
+        wait_after_action(
+            delay,
+            TIMING_CONFIG.device.default_back_delay,
+            lambda: capture_frame(wda_url, session_id),
+        )
+        invalidate_current_app(wda_url)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -325,7 +362,7 @@ def back(
 def home(
     wda_url: str = "http://localhost:8100",
     session_id: str | None = None,
-    delay: float = 1.0,
+    delay: float | None = None,
 ) -> None:
     """
     Press the home button.
@@ -333,16 +370,18 @@ def home(
     Args:
         wda_url: WebDriverAgent URL.
         session_id: Optional WDA session ID.
-        delay: Delay in seconds after pressing home.
+        delay: Delay in seconds after pressing home. If None, waits per
+            the configured settle mode.
     """
     try:
-        import requests
-
-        url = f"{wda_url.rstrip('/')}/wda/homescreen"
+        get_wda_client(wda_url).post("wda/homescreen", timeout=10)
 
-        requests.post(url, timeout=10, verify=False)
-
-        time.sleep(delay)
+        wait_after_action(
+            delay,
+            TIMING_CONFIG.device.default_home_delay,
+            lambda: capture_frame(wda_url, session_id),
+        )
+        invalidate_current_app(wda_url)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -354,7 +393,7 @@ def launch_app(
     app_name: str,
     wda_url: str = "http://localhost:8100",
     session_id: str | None = None,
-    delay: float = 1.0,
+    delay: float | None = None,
 ) -> bool:
     """
     Launch an app by name.
@@ -363,7 +402,8 @@ def launch_app(
         app_name: The app name (must be in APP_PACKAGES).
         wda_url: WebDriverAgent URL.
         session_id: Optional WDA session ID.
-        delay: Delay in seconds after launching.
+        delay: Delay in seconds after launching. If None, waits per
+            the configured settle mode.
 
     Returns:
         True if app was launched, False if app not found.
@@ -372,16 +412,19 @@ def launch_app(
         return False
 
     try:
-        import requests
-
         bundle_id = APP_PACKAGES[app_name]
         url = _get_wda_session_url(wda_url, session_id, "wda/apps/launch")
 
-        response = requests.post(
-            url, json={"bundleId": bundle_id}, timeout=10, verify=False
+        response = get_wda_client(wda_url).post(
+            url, json={"bundleId": bundle_id}, timeout=10
         )
 
-        time.sleep(delay)
+        wait_after_action(
+            delay,
+            TIMING_CONFIG.device.default_launch_delay,
+            lambda: capture_frame(wda_url, session_id),
+        )
+        invalidate_current_app(wda_url)
         return response.status_code in (200, 201)
 
     except ImportError:
@@ -406,11 +449,9 @@ def get_screen_size(
         Tuple of (width, height). Returns (375, 812) as default if unable to fetch.
     """
     try:
-        import requests
-
         url = _get_wda_session_url(wda_url, session_id, "window/size")
 
-        response = requests.get(url, timeout=5, verify=False)
+        response = get_wda_client(wda_url).get(url, timeout=5)
 
         if response.status_code == 200:
             data = response.json()
@@ -432,7 +473,7 @@ def press_button(
     button_name: str,
     wda_url: str = "http://localhost:8100",
     session_id: str | None = None,
-    delay: float = 1.0,
+    delay: float | None = None,
 ) -> None:
     """
     Press a physical button.
@@ -441,16 +482,20 @@ def press_button(
         button_name: Button name (e.g., "home", "volumeUp", "volumeDown").
         wda_url: WebDriverAgent URL.
         session_id: Optional WDA session ID.
-        delay: Delay in seconds after pressing.
+        delay: Delay in seconds after pressing. If None, waits per
+            the configured settle mode.
     """
     try:
-        import requests
-
-        url = f"{wda_url.rstrip('/')}/wda/pressButton"
-
-        requests.post(url, json={"name": button_name}, timeout=10, verify=False)
+        get_wda_client(wda_url).post(
+            "wda/pressButton", json={"name": button_name}, timeout=10
+        )
 
-        time.sleep(delay)
+        wait_after_action(
+            delay,
+            TIMING_CONFIG.device.default_home_delay,
+            lambda: capture_frame(wda_url, session_id),
+        )
+        invalidate_current_app(wda_url)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -2,6 +2,9 @@
 
 import time
 
+from phone_agent.xctest.device import invalidate_current_app
+from phone_agent.xctest.wda import get_wda_client
+
 
 def _get_wda_session_url(wda_url: str, session_id: str | None, endpoint: str) -> str:
     """
@@ -43,17 +46,16 @@ def type_text(
         Use tap() to focus on the input field first.
     """
     try:
-        import requests
-
         url = _get_wda_session_url(wda_url, session_id, "wda/keys")
 
         # Send text to WDA
-        response = requests.post(
-            url, json={"value": list(text), "frequency": frequency}, timeout=30, verify=False
+        response = get_wda_client(wda_url).post(
+            url, json={"value": list(text), "frequency": frequency}, timeout=30
         )
 
         if response.status_code not in (200, 201):
             print(f"Warning: Text input may have failed. Status: {response.status_code}")
+        invalidate_current_app(wda_url)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -77,12 +79,10 @@ def clear_text(
         The input field must be focused before calling this function.
     """
     try:
-        import requests
-
         # First, try to get the active element
         url = _get_wda_session_url(wda_url, session_id, "element/active")
 
-        response = requests.get(url, timeout=10, verify=False)
+        response = get_wda_client(wda_url).get(url, timeout=10)
 
         if response.status_code == 200:
             data = response.json()
@@ -91,7 +91,7 @@ def clear_text(
             if element_id:
                 # Clear the element
                 clear_url = _get_wda_session_url(wda_url, session_id, f"element/{element_id}/clear")
-                requests.post(clear_url, timeout=10, verify=False)
+                get_wda_client(wda_url).post(clear_url, timeout=10)
                 return
 
         # Fallback: send backspace commands
@@ -117,17 +117,14 @@ def _clear_with_backspace(
         max_backspaces: Maximum number of backspaces to send.
     """
     try:
-        import requests
-
         url = _get_wda_session_url(wda_url, session_id, "wda/keys")
 
         # Send backspace character multiple times
         backspace_char = "\u0008"  # Backspace Unicode character
-        requests.post(
+        get_wda_client(wda_url).post(
             url,
             json={"value": [backspace_char] * max_backspaces},
             timeout=10,
-            verify=False,
         )
 
     except Exception as e:
@@ -152,11 +149,10 @@ def send_keys(
         >>> send_keys(["\n"])  # Send enter key
     """
     try:
-        import requests
-
         url = _get_wda_session_url(wda_url, session_id, "wda/keys")
 
-        requests.post(url, json={"value": keys}, timeout=10, verify=False)
+        get_wda_client(wda_url).post(url, json={"value": keys}, timeout=10)
+        invalidate_current_app(wda_url)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -193,11 +189,9 @@ def hide_keyboard(
         session_id: Optional WDA session ID.
     """
     try:
-        import requests
-
         url = f"{wda_url.rstrip('/')}/wda/keyboard/dismiss"
 
-        requests.post(url, timeout=10, verify=False)
+        get_wda_client(wda_url).post(url, timeout=10)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -220,11 +214,9 @@ def is_keyboard_shown(
         True if keyboard is shown, False otherwise.
     """
     try:
-        import requests
-
         url = _get_wda_session_url(wda_url, session_id, "wda/keyboard/shown")
 
-        response = requests.get(url, timeout=5, verify=False)
+        response = get_wda_client(wda_url).get(url, timeout=5)
 
         if response.status_code == 200:
             data = response.json()
@@ -254,12 +246,10 @@ def set_pasteboard(
         After setting pasteboard, you can simulate paste gesture.
     """
     try:
-        import requests
-
         url = f"{wda_url.rstrip('/')}/wda/setPasteboard"
 
-        requests.post(
-            url, json={"content": text, "contentType": "plaintext"}, timeout=10, verify=False
+        get_wda_client(wda_url).post(
+            url, json={"content": text, "contentType": "plaintext"}, timeout=10
         )
 
     except ImportError:
@@ -281,11 +271,9 @@ def get_pasteboard(
         Pasteboard content or None if failed.
     """
     try:
-        import requests
-
         url = f"{wda_url.rstrip('/')}/wda/getPasteboard"
 
-        response = requests.post(url, timeout=10, verify=False)
+        response = get_wda_client(wda_url).post(url, timeout=10)
 
         if response.status_code == 200:
             data = response.json()
@@ -0,0 +1,219 @@
+"""Latest-frame source backed by WebDriverAgent's MJPEG stream.
+
+WDA can serve the screen as a ``multipart/x-mixed-replace`` MJPEG stream
+(``mjpegServerPort``, 9100 by default). Reading that stream in the background
+keeps the newest frame in memory, so a screenshot costs no HTTP round trip
+and no PNG encode on the device.
+
+The stream must run at full resolution (WDA ``mjpegScalingFactor`` 100) for
+frame dimensions to match the screen coordinates the agent maps actions to.
+"""
+
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+from phone_agent.imaging import JPEG_SOI
+
+JPEG_EOI = b"\xff\xd9"
+
+# Default WDA MJPEG server port
+MJPEG_PORT = 9100
+
+# Frames larger than this are dropped instead of growing the buffer (bytes)
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+
+def default_mjpeg_url(wda_url: str) -> str:
+    """Return the MJPEG stream URL on the same host as a WDA URL."""
+    parts = urlsplit(wda_url)
+    netloc = f"{parts.hostname}:{MJPEG_PORT}"
+    return urlunsplit((parts.scheme or "http", netloc, "", "", ""))
+
+
+class MJPEGParser:
+    """
+    Incremental parser splitting an MJPEG byte stream into JPEG frames.
+
+    Part headers with ``Content-Length`` are honoured; parts without one are
+    delimited by the JPEG end-of-image marker. Memory is bounded by
+    ``max_frame_bytes``.
+
+    Args:
+        max_frame_bytes: Largest frame kept before the buffer is discarded.
+    """
+
+    def __init__(self, max_frame_bytes: int = MAX_FRAME_BYTES):
+        self.max_frame_bytes = max_frame_bytes
+        self._buffer = bytearray()
+        self._length: int | None = None
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """Consume stream bytes and return the frames completed by them."""
+        self._buffer += data
+        frames = []
+        while True:
+            frame = self._next_frame()
+            if frame is None:
+                break
+            frames.append(frame)
+        if len(self._buffer) > self.max_frame_bytes:
+            self._buffer.clear()
+            self._length = None
+        return frames
+
+    def _next_frame(self) -> bytes | None:
+        buffer = self._buffer
+        if self._length is None:
+            start = buffer.find(JPEG_SOI)
+            if start < 0:
+                return None
+            # Only the part headers in front of the image carry a length
+            self._length = _content_length(bytes(buffer[:start]))
+            del buffer[:start]
+
+        if self._length:
+            if len(buffer) < self._length:
+                return None
+            end = self._length
+        else:
+            eoi = buffer.find(JPEG_EOI, 2)
+            if eoi < 0:
+                return None
+            end = eoi + len(JPEG_EOI)
+        frame = bytes(buffer[:end])
+        del buffer[:end]
+        self._length = None
+        return frame
+
+
+def _content_length(headers: bytes) -> int:
+    for line in headers.split(b"\r\n"):
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            try:
+                return int(value.strip())
+            except ValueError:
+                return 0
+    return 0
+
+
+class MJPEGFrameSource:
+    """
+    Reads an MJPEG stream on a background thread and holds the latest frame.
+
+    Args:
+        url: MJPEG stream URL.
+        timeout: Connect/read timeout for the stream in seconds.
+        reconnect_delay: Pause before reconnecting a dropped stream in seconds.
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0, reconnect_delay: float = 0.5):
+        self.url = url
+        self.timeout = timeout
+        self.reconnect_delay = reconnect_delay
+        self.frame_count = 0
+        self._frame: bytes | None = None
+        self._frame_time = 0.0
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._connection: http.client.HTTPConnection | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the reader thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "MJPEGFrameSource":
+        """Start reading the stream in the background."""
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the reader thread and close the stream."""
+        self._stop.set()
+        connection = self._connection
+        if connection is not None:
+            connection.close()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout)
+            self._thread = None
+        with self._condition:
+            self._condition.notify_all()
+
+    def latest(self, max_age: float | None = None) -> bytes | None:
+        """
+        Return the newest frame.
+
+        Args:
+            max_age: Ignore a frame older than this many seconds.
+
+        Returns:
+            JPEG bytes, or None if no (fresh enough) frame was received.
+        """
+        with self._condition:
+            if self._frame is None:
+                return None
+            if max_age is not None and time.monotonic() - self._frame_time > max_age:
+                return None
+            return self._frame
+
+    def next_frame(self, timeout: float | None = None) -> bytes | None:
+        """
+        Wait for a frame received after this call.
+
+        Args:
+            timeout: Maximum wait in seconds. Defaults to the stream timeout.
+
+        Returns:
+            JPEG bytes, or None if no new frame arrived in time.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._condition:
+            seen = self.frame_count
+            self._condition.wait_for(
+                lambda: self.frame_count > seen or self._stop.is_set(), timeout
+            )
+            return self._frame if self.frame_count > seen else None
+
+    def _publish(self, frame: bytes) -> None:
+        with self._condition:
+            self._frame = frame
+            self._frame_time = time.monotonic()
+            self.frame_count += 1
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        parts = urlsplit(self.url)
+        connection_class = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+        while not self._stop.is_set():
+            parser = MJPEGParser()
+            connection = connection_class(parts.netloc, timeout=self.timeout)
+            self._connection = connection
+            try:
+                connection.request("GET", path)
+                response = connection.getresponse()
+                # read1 returns what has arrived instead of waiting for a full chunk
+                while not self._stop.is_set():
+                    chunk = response.read1(64 * 1024)
+                    if not chunk:
+                        break
+                    for frame in parser.feed(chunk):
+                        self._publish(frame)
+            except Exception:
+                pass
+            finally:
+                connection.close()
+                self._connection = None
+            self._stop.wait(self.reconnect_delay)
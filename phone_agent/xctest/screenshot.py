@@ -4,21 +4,67 @@ import base64
 import os
 import subprocess
 import tempfile
+import threading
 import uuid
-from dataclasses import dataclass
 from io import BytesIO
 
 from PIL import Image
 
+from phone_agent.imaging import Screenshot, jpeg_size, png_size
+from phone_agent.xctest.mjpeg import MJPEGFrameSource, default_mjpeg_url
+from phone_agent.xctest.wda import get_wda_client
 
-@dataclass
-class Screenshot:
-    """Represents a captured screenshot."""
+# Oldest MJPEG frame still accepted as the current screen (seconds)
+MJPEG_MAX_AGE = float(os.getenv("PHONE_AGENT_WDA_MJPEG_MAX_AGE", "0.5"))
 
-    base64_data: str
-    width: int
-    height: int
-    is_sensitive: bool = False
+# WDA URL -> running MJPEG frame source
+_FRAME_SOURCES: dict[str, MJPEGFrameSource] = {}
+_FRAME_SOURCES_LOCK = threading.Lock()
+
+
+def enable_mjpeg(
+    wda_url: str = "http://localhost:8100", mjpeg_url: str | None = None
+) -> MJPEGFrameSource:
+    """
+    Serve screenshots for a WDA endpoint from its MJPEG stream.
+
+    Args:
+        wda_url: WebDriverAgent URL.
+        mjpeg_url: MJPEG stream URL. Defaults to port 9100 on the WDA host.
+
+    Returns:
+        The running frame source.
+    """
+    key = wda_url.rstrip("/")
+    with _FRAME_SOURCES_LOCK:
+        source = _FRAME_SOURCES.get(key)
+        if source is None or source.url != (mjpeg_url or default_mjpeg_url(key)):
+            if source is not None:
+                source.stop()
+            source = MJPEGFrameSource(mjpeg_url or default_mjpeg_url(key))
+            _FRAME_SOURCES[key] = source
+        return source.start()
+
+
+def disable_mjpeg(wda_url: str = "http://localhost:8100") -> None:
+    """Stop the MJPEG frame source of a WDA endpoint, if any."""
+    with _FRAME_SOURCES_LOCK:
+        source = _FRAME_SOURCES.pop(wda_url.rstrip("/"), None)
+    if source is not None:
+        source.stop()
+
+
+def _frame_source(wda_url: str) -> MJPEGFrameSource | None:
+    return _FRAME_SOURCES.get(wda_url.rstrip("/"))
+
+
+def _screenshot_from_jpeg(frame: bytes) -> Screenshot | None:
+    size = jpeg_size(frame)
+    if size is None:
+        return None
+    return Screenshot(
+        image_data=frame, width=size[0], height=size[1], mime_type="image/jpeg"
+    )
 
 
 def get_screenshot(
@@ -40,10 +86,18 @@ def get_screenshot(
         Screenshot object containing base64 data and dimensions.
 
     Note:
-        Tries WebDriverAgent first, falls back to idevicescreenshot if available.
-        If both fail, returns a black fallback image.
+        Uses the latest MJPEG frame when a stream is enabled for ``wda_url``,
+        then tries WebDriverAgent, then falls back to idevicescreenshot if
+        available. If all fail, returns a black fallback image.
     """
-    # Try WebDriverAgent first (preferred method)
+    source = _frame_source(wda_url)
+    if source is not None:
+        frame = source.latest(MJPEG_MAX_AGE) or source.next_frame(MJPEG_MAX_AGE)
+        screenshot = _screenshot_from_jpeg(frame) if frame else None
+        if screenshot:
+            return screenshot
+
+    # Try WebDriverAgent (preferred still-image method)
     screenshot = _get_screenshot_wda(wda_url, session_id, timeout)
     if screenshot:
         return screenshot
@@ -72,22 +126,14 @@ def _get_screenshot_wda(
         Screenshot object or None if failed.
     """
     try:
-        import requests
-
-        url = f"{wda_url.rstrip('/')}/screenshot"
-
-        response = requests.get(url, timeout=timeout, verify=False)
+        response = get_wda_client(wda_url).get("screenshot", timeout=timeout)
 
         if response.status_code == 200:
             data = response.json()
             base64_data = data.get("value", "")
 
             if base64_data:
-                # Decode to get dimensions
-                img_data = base64.b64decode(base64_data)
-                img = Image.open(BytesIO(img_data))
-                width, height = img.size
-
+                width, height = _base64_image_size(base64_data)
                 return Screenshot(
                     base64_data=base64_data,
                     width=width,
@@ -103,6 +149,55 @@ def _get_screenshot_wda(
     return None
 
 
+def _base64_image_size(base64_data: str) -> tuple[int, int]:
+    """
+    Read image dimensions from base64 text without decoding the whole image.
+
+    PNG dimensions sit in the first 24 bytes, i.e. the first 32 base64
+    characters. Other formats fall back to a full decode.
+    """
+    size = png_size(base64.b64decode(base64_data[:32]))
+    if size is None:
+        img_data = base64.b64decode(base64_data)
+        size = jpeg_size(img_data) or Image.open(BytesIO(img_data)).size
+    return size
+
+
+def capture_frame(
+    wda_url: str = "http://localhost:8100",
+    session_id: str | None = None,
+    timeout: int = 5,
+) -> bytes:
+    """
+    Capture the raw image bytes of the current screen for settle detection.
+
+    Args:
+        wda_url: WebDriverAgent URL.
+        session_id: Optional WDA session ID.
+        timeout: Timeout in seconds.
+
+    Returns:
+        Encoded image bytes: the next MJPEG frame when a stream is enabled,
+        otherwise a PNG from WebDriverAgent.
+
+    Raises:
+        ValueError: If WebDriverAgent returned no image.
+    """
+    source = _frame_source(wda_url)
+    if source is not None:
+        frame = source.next_frame(timeout)
+        if frame:
+            return frame
+
+    response = get_wda_client(wda_url).get("screenshot", timeout=timeout)
+    base64_data = ""
+    if response.status_code == 200:
+        base64_data = response.json().get("value", "")
+    if not base64_data:
+        raise ValueError(f"WDA screenshot failed with status {response.status_code}")
+    return base64.b64decode(base64_data)
+
+
 def _get_screenshot_idevice(
     device_id: str | None, timeout: int
 ) -> Screenshot | None:
@@ -0,0 +1,190 @@
+"""Pooled HTTP access to WebDriverAgent.
+
+A bare ``requests.get``/``requests.post`` builds a throwaway session for every
+call, so each tap or screenshot pays for a new TCP connection to WDA (and a
+TLS handshake when WDA is reached through a tunnel). This module keeps one
+keep-alive ``requests.Session`` per WDA endpoint and remembers the WDA session
+created on it, so later agents on the same endpoint reuse it instead of
+starting a fresh one.
+"""
+
+import atexit
+import os
+import threading
+from typing import Any
+
+# Global flag to control whether WDA calls share a keep-alive HTTP session
+_HTTP_POOL_ENABLED = os.getenv("PHONE_AGENT_WDA_HTTP_POOL", "true").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+
+# Connections kept open per WDA endpoint (observation and actions may overlap)
+DEFAULT_POOL_SIZE = int(os.getenv("PHONE_AGENT_WDA_POOL_SIZE", "4"))
+
+
+class WDAError(RuntimeError):
+    """Raised when WebDriverAgent rejects a session request."""
+
+
+class WDAClient:
+    """
+    HTTP client for one WebDriverAgent endpoint.
+
+    Requests go through a shared ``requests.Session`` whose connection pool
+    keeps sockets to WDA open between calls. The WDA session created by
+    ``ensure_session`` is remembered and reused while WDA still knows it.
+
+    Args:
+        wda_url: WebDriverAgent URL.
+        pool_size: Maximum number of connections kept open to WDA.
+    """
+
+    def __init__(self, wda_url: str, pool_size: int = DEFAULT_POOL_SIZE):
+        self.wda_url = wda_url.rstrip("/")
+        self.pool_size = pool_size
+        self.session_id: str | None = None
+        self._http = None
+        self._lock = threading.Lock()
+
+    @property
+    def http(self):
+        """The keep-alive ``requests.Session``, created on first use."""
+        if self._http is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            http = requests.Session()
+            http.verify = False
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            http.mount("http://", adapter)
+            http.mount("https://", adapter)
+            self._http = http
+        return self._http
+
+    def url(self, endpoint: str) -> str:
+        """Return the absolute URL of a WDA endpoint path or pass a URL through."""
+        if endpoint.startswith(("http://", "https://")):
+            return endpoint
+        return f"{self.wda_url}/{endpoint.lstrip('/')}"
+
+    def request(self, method: str, endpoint: str, **kwargs: Any):
+        """
+        Send an HTTP request to WDA.
+
+        Args:
+            method: HTTP method.
+            endpoint: Endpoint path relative to the WDA URL, or an absolute URL.
+            **kwargs: Passed to ``requests``.
+
+        Returns:
+            The ``requests.Response``.
+        """
+        if not _HTTP_POOL_ENABLED:
+            import requests
+
+            kwargs.setdefault("verify", False)
+            return requests.request(method, self.url(endpoint), **kwargs)
+        return self.http.request(method, self.url(endpoint), **kwargs)
+
+    def get(self, endpoint: str, **kwargs: Any):
+        """Send a GET request to WDA."""
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint: str, **kwargs: Any):
+        """Send a POST request to WDA."""
+        return self.request("POST", endpoint, **kwargs)
+
+    def ensure_session(
+        self, capabilities: dict | None = None, timeout: float = 30
+    ) -> str | None:
+        """
+        Return a live WDA session, creating one only when needed.
+
+        The remembered session is reused if WDA still knows it; otherwise the
+        session WDA reports in ``/status`` is adopted; otherwise a new session
+        is created.
+
+        Args:
+            capabilities: Capabilities for a newly created session.
+            timeout: Timeout in seconds for creating a session.
+
+        Returns:
+            The session ID, or None if WDA created a session without reporting
+            its ID.
+
+        Raises:
+            WDAError: If WDA refused to create a session.
+        """
+        with self._lock:
+            if self.session_id and self._session_alive(self.session_id):
+                return self.session_id
+
+            response = self.get("status", timeout=5)
+            if response.status_code == 200:
+                active = response.json().get("sessionId")
+                if active and self._session_alive(active):
+                    self.session_id = active
+                    return active
+
+            response = self.post(
+                "session",
+                json={"capabilities": capabilities or {}},
+                timeout=timeout,
+            )
+            if response.status_code not in (200, 201):
+                raise WDAError(f"Failed to start session: {response.text}")
+            data = response.json()
+            self.session_id = data.get("sessionId") or data.get("value", {}).get(
+                "sessionId"
+            )
+            return self.session_id
+
+    def forget_session(self) -> None:
+        """Drop the remembered WDA session so the next call creates one."""
+        self.session_id = None
+
+    def _session_alive(self, session_id: str) -> bool:
+        try:
+            return self.get(f"session/{session_id}", timeout=5).status_code == 200
+        except Exception:
+            return False
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+
+_CLIENTS: dict[str, WDAClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_wda_client(wda_url: str = "http://localhost:8100") -> WDAClient:
+    """Return the shared client for a WDA endpoint."""
+    key = wda_url.rstrip("/")
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = _CLIENTS[key] = WDAClient(key)
+        return client
+
+
+def close_all() -> None:
+    """Close the connections of every shared WDA client."""
+    with _CLIENTS_LOCK:
+        for client in _CLIENTS.values():
+            client.close()
+
+
+def set_http_pool_enabled(enabled: bool) -> None:
+    """Enable or disable keep-alive HTTP sessions to WDA globally."""
+    global _HTTP_POOL_ENABLED
+    _HTTP_POOL_ENABLED = enabled
+    if not enabled:
+        close_all()
+
+
+atexit.register(close_all)
@@ -0,0 +1,221 @@
+"""Local fake ``adb`` executable for exercising device code without a phone."""
+
+import os
+import stat
+import struct
+import sys
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+_ADB_TEMPLATE = """#!{python}
+import os
+import shutil
+import sys
+import time
+
+root = {root!r}
+args = sys.argv[1:]
+if args[:1] == ["-s"]:
+    args = args[2:]
+
+with open(os.path.join(root, "adb.log"), "a", encoding="utf-8") as log:
+    log.write(" ".join(args) + "\\n")
+
+time.sleep({latency!r})
+
+env = dict(os.environ)
+env["PATH"] = os.path.join(root, "device") + os.pathsep + env.get("PATH", "")
+env["FAKE_DEVICE_ROOT"] = root
+
+if args[:1] == ["devices"]:
+    print("List of devices attached")
+    for serial in {devices!r}:
+        if "-l" in args:
+            print(serial + "          device product:fake model:Fake_Phone")
+        else:
+            print(serial + "\tdevice")
+    sys.exit(0)
+if args[:1] == ["connect"] and len(args) == 2:
+    print("connected to " + args[1])
+    sys.exit(0)
+if args == ["shell"]:
+    os.execvpe("sh", ["sh"], env)
+if args[:1] in (["shell"], ["exec-out"]):
+    os.execvpe("sh", ["sh", "-c", " ".join(args[1:])], env)
+if args[:1] == ["pull"] and len(args) == 3:
+    source = os.path.join(root, "sdcard", os.path.basename(args[1]))
+    if not os.path.exists(source):
+        sys.stderr.write("adb: error: remote object does not exist\\n")
+        sys.exit(1)
+    shutil.copyfile(source, args[2])
+    sys.exit(0)
+sys.stderr.write("fake adb: unsupported command: " + " ".join(args) + "\\n")
+sys.exit(1)
+"""
+
+_DEVICE_LOG = 'echo "$(basename "$0") $*" >> "$FAKE_DEVICE_ROOT/device.log"\n'
+
+_DEVICE_TOOLS = {
+    "input": "",
+    "am": (
+        'if [ "$1" = "start" ]; then\n'
+        '  for arg; do component="$arg"; done\n'
+        '  package="${component%%/*}"\n'
+        '  if ! grep -q "^$package " "$FAKE_DEVICE_ROOT/launchers.txt"; then\n'
+        '    echo "Error: Activity class {$component} does not exist."\n'
+        "    exit 1\n"
+        "  fi\n"
+        '  printf "  mCurrentFocus=Window{1 u0 %s}\\n" "$component" '
+        '> "$FAKE_DEVICE_ROOT/dumpsys_window.txt"\n'
+        '  echo "Starting: Intent { cmp=$component }"\n'
+        '  echo "Status: ok"\n'
+        '  echo "LaunchState: COLD"\n'
+        '  echo "Activity: $component"\n'
+        '  echo "TotalTime: 420"\n'
+        '  echo "WaitTime: 431"\n'
+        '  echo "Complete"\n'
+        "else\n"
+        '  echo "Broadcast completed: result=0"\n'
+        "fi\n"
+    ),
+    "cmd": (
+        'for arg; do package="$arg"; done\n'
+        'component=$(grep "^$package " "$FAKE_DEVICE_ROOT/launchers.txt" | cut -d" " -f2)\n'
+        'if [ -n "$component" ]; then\n'
+        '  echo "priority=0 preferredOrder=0 match=0x108000 isDefault=true"\n'
+        '  echo "$component"\n'
+        "else\n"
+        '  echo "No activity found"\n'
+        "fi\n"
+    ),
+    "monkey": 'echo "Events injected: 1"\n',
+    "ime": (
+        'if [ "$1" = "set" ]; then\n'
+        '  echo "$2" > "$FAKE_DEVICE_ROOT/ime.txt"\n'
+        '  echo "Input method $2 selected for user #0"\n'
+        "fi\n"
+    ),
+    "settings": 'cat "$FAKE_DEVICE_ROOT/ime.txt"\n',
+    "dumpsys": (
+        'if [ "$1" = "input_method" ]; then\n'
+        '  echo "  mCurMethodId=$(cat "$FAKE_DEVICE_ROOT/ime.txt")"\n'
+        "else\n"
+        '  cat "$FAKE_DEVICE_ROOT/dumpsys_window.txt"\n'
+        "fi\n"
+    ),
+    "screencap": (
+        'if [ "$1" = "-p" ] && [ -n "$2" ]; then\n'
+        '  cp "$FAKE_DEVICE_ROOT/screen.png" "$FAKE_DEVICE_ROOT/sdcard/$(basename "$2")"\n'
+        'elif [ "$1" = "-p" ]; then\n'
+        '  cat "$FAKE_DEVICE_ROOT/screen.png"\n'
+        'else\n'
+        '  cat "$FAKE_DEVICE_ROOT/screen.raw"\n'
+        "fi\n"
+    ),
+}
+
+DEFAULT_DUMPSYS_WINDOW = (
+    "WINDOW MANAGER WINDOWS (dumpsys window windows)\n"
+    "  mCurrentFocus=Window{1a2b3c u0 com.tencent.mm/com.tencent.mm.ui.LauncherUI}\n"
+    "  mFocusedApp=ActivityRecord{4d5e6f u0 com.tencent.mm/.ui.LauncherUI t12}\n"
+)
+
+DEFAULT_LAUNCHERS = {"com.tencent.mm": "com.tencent.mm/.ui.LauncherUI"}
+
+
+def make_fake_adb(
+    root: Path,
+    latency: float = 0.0,
+    dumpsys_window: str = DEFAULT_DUMPSYS_WINDOW,
+    current_ime: str = "com.example.keyboard/.LatinIME",
+    screen_png: bytes = b"",
+    devices: tuple[str, ...] = ("serial-1",),
+    launchers: dict[str, str] | None = None,
+) -> Path:
+    """
+    Create a fake ``adb`` executable backed by the host ``sh``.
+
+    Device-side tools (``input``, ``am``, ``dumpsys`` ...) are small shell
+    scripts that log their invocation to ``root / "device.log"``; every adb
+    invocation is logged to ``root / "adb.log"``.
+
+    Args:
+        root: Directory to populate.
+        latency: Seconds to sleep on every adb invocation, simulating the
+            client/server handshake.
+        dumpsys_window: Output of ``dumpsys window``.
+        current_ime: Output of ``settings get secure default_input_method``.
+        screen_png: Bytes returned by ``screencap -p``. Plain ``screencap``
+            returns the same image as a raw RGBA frame, or nothing when the
+            bytes are not an image.
+        devices: Serials listed by ``adb devices``.
+        launchers: Package to launcher component, used by ``cmd package
+            resolve-activity`` and ``am start``. Defaults to WeChat only.
+
+    Returns:
+        Directory containing ``adb``, to be prepended to ``PATH``.
+    """
+    root = Path(root)
+    bin_dir = root / "bin"
+    device_dir = root / "device"
+    for directory in (bin_dir, device_dir, root / "sdcard"):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    (root / "dumpsys_window.txt").write_text(dumpsys_window, encoding="utf-8")
+    (root / "ime.txt").write_text(current_ime + "\n", encoding="utf-8")
+    (root / "screen.png").write_bytes(screen_png)
+    (root / "screen.raw").write_bytes(_raw_frame(screen_png))
+    if launchers is None:
+        launchers = DEFAULT_LAUNCHERS
+    (root / "launchers.txt").write_text(
+        "".join(f"{package} {component}\n" for package, component in launchers.items()),
+        encoding="utf-8",
+    )
+
+    adb = bin_dir / "adb"
+    adb.write_text(
+        _ADB_TEMPLATE.format(
+            python=sys.executable,
+            root=str(root),
+            latency=latency,
+            devices=tuple(devices),
+        ),
+        encoding="utf-8",
+    )
+    _make_executable(adb)
+
+    for name, body in _DEVICE_TOOLS.items():
+        tool = device_dir / name
+        tool.write_text("#!/bin/sh\n" + _DEVICE_LOG + body, encoding="utf-8")
+        _make_executable(tool)
+
+    return bin_dir
+
+
+def _raw_frame(png: bytes) -> bytes:
+    """Encode an image like ``screencap`` without ``-p`` on Android 12+."""
+    try:
+        image = Image.open(BytesIO(png)).convert("RGBA")
+    except Exception:
+        return b""
+    header = struct.pack("<IIII", image.width, image.height, 1, 0)
+    return header + image.tobytes()
+
+
+def read_log(root: Path, name: str) -> list[str]:
+    """Read ``adb.log`` or ``device.log`` lines from a fake adb root."""
+    path = Path(root) / name
+    if not path.exists():
+        return []
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+def _make_executable(path: Path) -> None:
+    path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+def prepend_path(monkeypatch, bin_dir: Path) -> None:
+    """Put a fake tool directory first on ``PATH`` for the current test."""
+    monkeypatch.setenv("PATH", str(bin_dir) + os.pathsep + os.environ.get("PATH", ""))
@@ -0,0 +1,221 @@
+"""In-process fake adb server speaking the smart-socket protocol.
+
+Runs device commands with the same device-side tool scripts as
+``fake_adb.make_fake_adb``, so the wire transport and the CLI transport can be
+compared command for command against identical fake devices.
+"""
+
+import os
+import socketserver
+import struct
+import subprocess
+import threading
+from pathlib import Path
+
+from tests.factories.fake_adb import make_fake_adb
+
+
+class FakeADBServer:
+    """
+    Threaded TCP server implementing the adb server services used by the
+    wire client.
+
+    Every service request is logged to ``root / "server.log"``.
+
+    Args:
+        root: Fake device root created by ``make_fake_adb``.
+        devices: Serials reported by ``host:devices``; ``host:transport``
+            rejects any other serial.
+        shell_v2: Whether ``shell,v2`` is supported. Without it the client
+            must fall back to ``shell:``.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        devices: tuple[str, ...] = ("serial-1",),
+        shell_v2: bool = True,
+    ):
+        self.root = Path(root)
+        self.devices = list(devices)
+        self.shell_v2 = shell_v2
+        self._server = socketserver.ThreadingTCPServer(
+            ("127.0.0.1", 0), self._handler_class(), bind_and_activate=True
+        )
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> "FakeADBServer":
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                server._serve(self.request)
+
+        return Handler
+
+    def _log(self, service: str) -> None:
+        with open(self.root / "server.log", "a", encoding="utf-8") as log:
+            log.write(service + "\n")
+
+    def _serve(self, sock) -> None:
+        while True:
+            header = _recv_exact(sock, 4)
+            if header is None:
+                return
+            service = _recv_exact(sock, int(header, 16)).decode("utf-8")
+            self._log(service)
+
+            if service in ("host:devices", "host:devices-l"):
+                long = service.endswith("-l")
+                listing = "".join(
+                    f"{serial}          device product:fake model:Fake_Phone\n"
+                    if long
+                    else f"{serial}\tdevice\n"
+                    for serial in self.devices
+                )
+                _okay(sock, listing)
+                return
+            if service.startswith("host:connect:"):
+                address = service.split(":", 2)[2]
+                if address not in self.devices:
+                    self.devices.append(address)
+                _okay(sock, f"connected to {address}")
+                return
+            if service.startswith("host:transport:"):
+                serial = service.split(":", 2)[2]
+                if serial not in self.devices:
+                    _fail(sock, f"device '{serial}' not found")
+                    return
+                sock.sendall(b"OKAY")
+                continue
+            if service == "host:transport-any":
+                if not self.devices:
+                    _fail(sock, "no devices/emulators found")
+                    return
+                sock.sendall(b"OKAY")
+                continue
+            if service.startswith("shell,v2,raw:"):
+                if not self.shell_v2:
+                    _fail(sock, "closed")
+                    return
+                sock.sendall(b"OKAY")
+                self._shell_v2(sock, service.split(":", 1)[1])
+                return
+            if service.startswith("shell:"):
+                sock.sendall(b"OKAY")
+                result = self._run(service.split(":", 1)[1], merge=True)
+                sock.sendall(result.stdout)
+                return
+            if service.startswith("exec:"):
+                sock.sendall(b"OKAY")
+                sock.sendall(self._run(service.split(":", 1)[1]).stdout)
+                return
+            if service == "sync:":
+                sock.sendall(b"OKAY")
+                self._sync(sock)
+                return
+            _fail(sock, f"unknown service {service}")
+            return
+
+    def _run(self, command: str, merge: bool = False) -> subprocess.CompletedProcess:
+        env = dict(os.environ)
+        env["PATH"] = str(self.root / "device") + os.pathsep + env.get("PATH", "")
+        env["FAKE_DEVICE_ROOT"] = str(self.root)
+        return subprocess.run(
+            ["sh", "-c", command],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT if merge else subprocess.PIPE,
+            env=env,
+        )
+
+    def _shell_v2(self, sock, command: str) -> None:
+        # Wait for the client to close stdin before running the command
+        header = _recv_exact(sock, 5)
+        if header is not None:
+            _recv_exact(sock, struct.unpack("<BI", header)[1])
+        result = self._run(command)
+        for packet_id, payload in ((1, result.stdout), (2, result.stderr)):
+            if payload:
+                sock.sendall(struct.pack("<BI", packet_id, len(payload)) + payload)
+        sock.sendall(struct.pack("<BI", 3, 1) + bytes([result.returncode & 0xFF]))
+
+    def _sync(self, sock) -> None:
+        while True:
+            header = _recv_exact(sock, 8)
+            if header is None:
+                return
+            packet_id, length = header[:4], struct.unpack("<I", header[4:])[0]
+            if packet_id == b"QUIT":
+                return
+            payload = _recv_exact(sock, length).decode("utf-8")
+            if packet_id == b"RECV":
+                path = self.root / "sdcard" / os.path.basename(payload)
+                if not path.exists():
+                    message = b"No such file or directory"
+                    sock.sendall(b"FAIL" + struct.pack("<I", len(message)) + message)
+                    continue
+                data = path.read_bytes()
+                for start in range(0, len(data), 64 * 1024):
+                    chunk = data[start : start + 64 * 1024]
+                    sock.sendall(b"DATA" + struct.pack("<I", len(chunk)) + chunk)
+                sock.sendall(b"DONE" + struct.pack("<I", 0))
+            elif packet_id == b"SEND":
+                remote = payload.rsplit(",", 1)[0]
+                data = bytearray()
+                while True:
+                    chunk_header = _recv_exact(sock, 8)
+                    chunk_id = chunk_header[:4]
+                    chunk_length = struct.unpack("<I", chunk_header[4:])[0]
+                    if chunk_id == b"DONE":
+                        break
+                    data += _recv_exact(sock, chunk_length)
+                (self.root / "sdcard" / os.path.basename(remote)).write_bytes(data)
+                sock.sendall(b"OKAY" + struct.pack("<I", 0))
+
+
+def start_fake_adb_server(root: Path, **kwargs) -> FakeADBServer:
+    """
+    Create a fake device under ``root`` and serve it over the adb protocol.
+
+    Keyword arguments are split between ``make_fake_adb`` and
+    ``FakeADBServer``.
+    """
+    server_kwargs = {
+        key: kwargs.pop(key) for key in ("devices", "shell_v2") if key in kwargs
+    }
+    make_fake_adb(root, **kwargs)
+    return FakeADBServer(root, **server_kwargs).start()
+
+
+def _okay(sock, payload: str) -> None:
+    data = payload.encode("utf-8")
+    sock.sendall(b"OKAY" + b"%04x" % len(data) + data)
+
+
+def _fail(sock, message: str) -> None:
+    data = message.encode("utf-8")
+    sock.sendall(b"FAIL" + b"%04x" % len(data) + data)
+
+
+def _recv_exact(sock, size: int) -> bytes | None:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
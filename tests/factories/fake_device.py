@@ -0,0 +1,126 @@
+"""In-process fake device and model doubles for PhoneAgent tests."""
+
+import asyncio
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from phone_agent.device_factory import DeviceType
+from phone_agent.imaging import Screenshot
+from phone_agent.model.client import ModelResponse
+
+
+def make_png(width: int = 1080, height: int = 2400, color="white") -> bytes:
+    """Encode a solid-colour PNG."""
+    buffered = BytesIO()
+    Image.new("RGB", (width, height), color=color).save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+class FakeDeviceFactory:
+    """
+    Stand-in for DeviceFactory that records every call.
+
+    ``screens`` is a list of PNG bytes served in order; the last one repeats.
+    ``apps`` works the same way for get_current_app. Every call takes
+    ``latency`` seconds.
+    """
+
+    device_type = DeviceType.ADB
+
+    def __init__(self, screens=None, apps=None, width=1080, height=2400, latency=0.0):
+        self.screens = list(screens or [make_png(width, height)])
+        self.apps = list(apps or ["System Home"])
+        self.width = width
+        self.height = height
+        self.latency = latency
+        self.calls: list[tuple] = []
+        self._screen_index = 0
+        self._app_index = 0
+
+    def _pause(self):
+        time.sleep(self.latency)
+
+    def get_screenshot(self, device_id=None, timeout=10):
+        self._pause()
+        self.calls.append(("get_screenshot", device_id))
+        data = self.screens[min(self._screen_index, len(self.screens) - 1)]
+        self._screen_index += 1
+        return Screenshot(image_data=data, width=self.width, height=self.height)
+
+    def get_current_app(self, device_id=None):
+        self._pause()
+        self.calls.append(("get_current_app", device_id))
+        app = self.apps[min(self._app_index, len(self.apps) - 1)]
+        self._app_index += 1
+        return app
+
+    def __getattr__(self, name):
+        # tap, swipe, back, home, launch_app, type_text, ...
+        def _record(*args, **kwargs):
+            self._pause()
+            self.calls.append((name, *args))
+            return True if name == "launch_app" else ""
+
+        return _record
+
+    def actions(self) -> list[tuple]:
+        """Calls other than the per-step observation probes."""
+        return [
+            call
+            for call in self.calls
+            if call[0] not in ("get_screenshot", "get_current_app")
+        ]
+
+
+class FakeAsyncDeviceFactory(FakeDeviceFactory):
+    """FakeDeviceFactory whose methods are coroutines; latency is awaited."""
+
+    def _pause(self):
+        pass
+
+    async def get_screenshot(self, device_id=None, timeout=10):
+        await asyncio.sleep(self.latency)
+        return super().get_screenshot(device_id, timeout)
+
+    async def get_current_app(self, device_id=None):
+        await asyncio.sleep(self.latency)
+        return super().get_current_app(device_id)
+
+    def __getattr__(self, name):
+        record = super().__getattr__(name)
+
+        async def _record(*args, **kwargs):
+            await asyncio.sleep(self.latency)
+            return record(*args, **kwargs)
+
+        return _record
+
+
+class FakeModelClient:
+    """Stand-in for ModelClient that replays scripted ``do(...)`` answers."""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.requests: list[list[dict]] = []
+
+    def set_event_context(self, run_id=None, step=None):
+        pass
+
+    def request(self, messages):
+        self.requests.append([dict(message) for message in messages])
+        answer = self.answers.pop(0) if self.answers else 'finish(message="done")'
+        return ModelResponse(thinking="thinking", action=answer, raw_content=answer)
+
+
+class FakeAsyncModelClient(FakeModelClient):
+    """FakeModelClient whose ``request`` is a coroutine taking ``latency`` seconds."""
+
+    def __init__(self, answers, latency=0.0):
+        super().__init__(answers)
+        self.latency = latency
+
+    async def request(self, messages):
+        await asyncio.sleep(self.latency)
+        return super().request(messages)
@@ -0,0 +1,122 @@
+"""Local fake ``hdc`` executable for exercising HarmonyOS code without a phone."""
+
+import sys
+from pathlib import Path
+
+from tests.factories.fake_adb import _DEVICE_LOG, _make_executable
+
+_HDC_TEMPLATE = """#!{python}
+import os
+import shutil
+import sys
+import time
+
+root = {root!r}
+args = sys.argv[1:]
+if args[:1] == ["-t"]:
+    args = args[2:]
+
+with open(os.path.join(root, "hdc.log"), "a", encoding="utf-8") as log:
+    log.write(" ".join(args) + "\\n")
+
+time.sleep({latency!r})
+
+env = dict(os.environ)
+env["PATH"] = os.path.join(root, "device") + os.pathsep + env.get("PATH", "")
+env["FAKE_DEVICE_ROOT"] = root
+
+if args == ["shell"]:
+    os.execvpe("sh", ["sh", "-v"] if {echo_input!r} else ["sh"], env)
+if args[:1] == ["shell"]:
+    os.execvpe("sh", ["sh", "-c", " ".join(args[1:])], env)
+if args[:2] == ["file", "recv"] and len(args) == 4:
+    source = os.path.join(root, "data", os.path.basename(args[2]))
+    if not os.path.exists(source):
+        print("[Fail]Error opening file: No such file or directory")
+        sys.exit(0)
+    shutil.copyfile(source, args[3])
+    print("FileTransfer finish, Size:" + str(os.path.getsize(args[3])))
+    sys.exit(0)
+if args == ["list", "targets"]:
+    print("hdc-serial-1")
+    sys.exit(0)
+print("[Fail]Unknown command: " + " ".join(args))
+sys.exit(0)
+"""
+
+_DEVICE_TOOLS = {
+    "uitest": "",
+    "ime": "",
+    "settings": 'echo "com.example.keyboard/.InputService"\n',
+    "aa": (
+        'if [ "$1" = "dump" ]; then\n'
+        '  cat "$FAKE_DEVICE_ROOT/aa_dump.txt"\n'
+        "else\n"
+        '  echo "start ability successfully."\n'
+        "fi\n"
+    ),
+    "screenshot": (
+        'cp "$FAKE_DEVICE_ROOT/screen.jpeg" "$FAKE_DEVICE_ROOT/data/$(basename "$1")"\n'
+        'echo "ScreenShot saved to $1"\n'
+    ),
+    "snapshot_display": (
+        'cp "$FAKE_DEVICE_ROOT/screen.jpeg" "$FAKE_DEVICE_ROOT/data/$(basename "$2")"\n'
+        'echo "snapshot saved to $2"\n'
+    ),
+}
+
+
+def make_fake_hdc(
+    root: Path,
+    latency: float = 0.0,
+    aa_dump: str = "",
+    screen_jpeg: bytes = b"",
+    echo_input: bool = False,
+) -> Path:
+    """
+    Create a fake ``hdc`` executable backed by the host ``sh``.
+
+    Device-side tools (``uitest``, ``aa``, ``screenshot`` ...) log their
+    invocation to ``root / "device.log"``; every hdc invocation is logged to
+    ``root / "hdc.log"``. Like the real hdc, failures are reported on stdout
+    with exit code 0.
+
+    Args:
+        root: Directory to populate.
+        latency: Seconds to sleep on every hdc invocation, simulating the
+            client/server handshake.
+        aa_dump: Output of ``aa dump -l``.
+        screen_jpeg: Bytes written by ``screenshot``.
+        echo_input: Echo every line the interactive shell reads, like a
+            shell attached to a terminal.
+
+    Returns:
+        Directory containing ``hdc``, to be prepended to ``PATH``.
+    """
+    root = Path(root)
+    bin_dir = root / "bin"
+    device_dir = root / "device"
+    for directory in (bin_dir, device_dir, root / "data"):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    (root / "aa_dump.txt").write_text(aa_dump, encoding="utf-8")
+    (root / "screen.jpeg").write_bytes(screen_jpeg)
+
+    hdc = bin_dir / "hdc"
+    hdc.write_text(
+        _HDC_TEMPLATE.format(
+            python=sys.executable,
+            root=str(root),
+            latency=latency,
+            echo_input=echo_input,
+        ),
+        encoding="utf-8",
+    )
+    _make_executable(hdc)
+
+    for name, body in _DEVICE_TOOLS.items():
+        tool = device_dir / name
+        tool.write_text("#!/bin/sh\n" + _DEVICE_LOG + body, encoding="utf-8")
+        _make_executable(tool)
+
+    return bin_dir
@@ -0,0 +1,134 @@
+"""In-process fake OpenAI-compatible streaming chat completions endpoint.
+
+Serves ``POST /v1/chat/completions`` with ``stream=True`` as server-sent
+events, one token per chunk, so model clients can be tested and benchmarked
+offline with realistic time-to-first-token and per-token pacing.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+# Words, runs of whitespace and single punctuation characters
+_TOKEN_PATTERN = re.compile(r"\w+|\s+|[^\w\s]")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into small tokens whose concatenation is the text."""
+    return _TOKEN_PATTERN.findall(text)
+
+
+class FakeOpenAIServer:
+    """
+    Threaded fake chat completions server.
+
+    Args:
+        respond: Returns the reply text for the request's messages. Defaults
+            to a constant ``finish`` answer.
+        first_token_delay: Delay before the first token in seconds.
+        token_delay: Delay between tokens in seconds.
+    """
+
+    def __init__(
+        self,
+        respond: Callable[[list[dict]], str] | None = None,
+        first_token_delay: float = 0.0,
+        token_delay: float = 0.0,
+    ):
+        self.respond = respond or (lambda messages: 'finish(message="done")')
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.requests: list[dict] = []
+        # Tokens written per request; less than the reply if the client hung up
+        self.tokens_sent: list[int] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def handle(self):
+                try:
+                    super().handle()
+                except ConnectionResetError:
+                    # Clients drop idle keep-alive connections when closed
+                    pass
+
+            def do_POST(self):
+                server._complete(self)
+
+        return Handler
+
+    def _complete(self, handler: BaseHTTPRequestHandler) -> None:
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = json.loads(handler.rfile.read(length) or b"{}")
+        with self._lock:
+            self.requests.append(body)
+            index = len(self.tokens_sent)
+            self.tokens_sent.append(0)
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        time.sleep(self.first_token_delay)
+        try:
+            for i, token in enumerate(tokenize(self.respond(body.get("messages", [])))):
+                if i:
+                    time.sleep(self.token_delay)
+                self._send(handler, _chunk(body, {"content": token}))
+                self.tokens_sent[index] += 1
+            self._send(handler, _chunk(body, {}, finish_reason="stop"))
+            self._send_raw(handler, b"data: [DONE]\n\n")
+            handler.wfile.write(b"0\r\n\r\n")
+            handler.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            handler.close_connection = True
+
+    def _send(self, handler: BaseHTTPRequestHandler, chunk: dict) -> None:
+        self._send_raw(handler, f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+
+    @staticmethod
+    def _send_raw(handler: BaseHTTPRequestHandler, data: bytes) -> None:
+        handler.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        handler.wfile.flush()
+
+
+def _chunk(body: dict, delta: dict, finish_reason: str | None = None) -> dict:
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+def start_fake_openai_server(**kwargs) -> FakeOpenAIServer:
+    """Create and start a ``FakeOpenAIServer``."""
+    return FakeOpenAIServer(**kwargs).start()
@@ -0,0 +1,191 @@
+"""In-process fake WebDriverAgent HTTP server.
+
+Implements the WDA endpoints used by ``phone_agent.xctest`` over HTTP/1.1
+keep-alive, plus an MJPEG stream, so the iOS backend can be tested and
+benchmarked offline. ``connect_latency`` is paid once per TCP connection and
+``latency`` once per request, which separates the cost of reconnecting from
+the cost of the call itself.
+"""
+
+import base64
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BOUNDARY = "--BoundaryString"
+
+
+class FakeWDAServer:
+    """
+    Threaded fake WDA server.
+
+    Every request is recorded as ``"METHOD /path"`` in ``requests``, and every
+    accepted TCP connection increments ``connections``.
+
+    Args:
+        screen_png: PNG bytes served by ``/screenshot``.
+        frames: JPEG frames cycled through by the ``/mjpeg`` stream.
+        fps: Frame rate of the MJPEG stream.
+        connect_latency: Delay per new TCP connection in seconds.
+        latency: Delay per request in seconds.
+        bundle_id: Bundle ID reported by ``/wda/activeAppInfo``.
+    """
+
+    def __init__(
+        self,
+        screen_png: bytes = b"",
+        frames: tuple[bytes, ...] = (),
+        fps: float = 20.0,
+        connect_latency: float = 0.0,
+        latency: float = 0.0,
+        bundle_id: str = "com.apple.springboard",
+    ):
+        self.screen_png = screen_png
+        self.frames = list(frames)
+        self.fps = fps
+        self.connect_latency = connect_latency
+        self.latency = latency
+        self.bundle_id = bundle_id
+        self.requests: list[str] = []
+        self.connections = 0
+        self.sessions: set[str] = set()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "FakeWDAServer":
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._closed.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count(self, request: str) -> int:
+        """Number of recorded requests equal to ``"METHOD /path"``."""
+        with self._lock:
+            return self.requests.count(request)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; avoid delayed-ACK stalls
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+                time.sleep(server.connect_latency)
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                server._dispatch(self, "GET")
+
+            def do_POST(self):
+                server._dispatch(self, "POST")
+
+        return Handler
+
+    def _dispatch(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = json.loads(handler.rfile.read(length) or b"{}") if length else {}
+        path = handler.path.split("?", 1)[0]
+        with self._lock:
+            self.requests.append(f"{method} {path}")
+        time.sleep(self.latency)
+
+        if method == "GET" and path == "/mjpeg":
+            self._stream(handler)
+            return
+        status, value, extra = self._respond(method, path, body)
+        payload = json.dumps({"value": value, **extra}).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def _respond(self, method: str, path: str, body: dict) -> tuple[int, object, dict]:
+        parts = path.strip("/").split("/")
+        if path == "/status":
+            active = next(iter(self.sessions), None)
+            return 200, {"ready": True}, {"sessionId": active} if active else {}
+        if method == "POST" and path == "/session":
+            session_id = uuid.uuid4().hex.upper()
+            self.sessions.add(session_id)
+            return 200, {"sessionId": session_id}, {"sessionId": session_id}
+        if parts[0] == "session" and len(parts) > 1:
+            if parts[1] not in self.sessions:
+                return 404, {"error": "invalid session id"}, {}
+            if len(parts) == 2:
+                return 200, {"capabilities": {}}, {"sessionId": parts[1]}
+            parts = parts[2:]
+        endpoint = "/".join(parts)
+        if endpoint == "screenshot":
+            return 200, base64.b64encode(self.screen_png).decode("ascii"), {}
+        if endpoint == "wda/activeAppInfo":
+            return 200, {"bundleId": self.bundle_id, "name": "", "pid": 1}, {}
+        if endpoint == "window/size":
+            return 200, {"width": 390, "height": 844}, {}
+        if endpoint == "element/active":
+            return 404, {"error": "no such element"}, {}
+        if endpoint == "wda/keyboard/shown":
+            return 200, False, {}
+        if endpoint == "wda/apps/launch":
+            self.bundle_id = body.get("bundleId", self.bundle_id)
+            return 200, None, {}
+        if endpoint == "wda/homescreen":
+            self.bundle_id = "com.apple.springboard"
+            return 200, None, {}
+        if endpoint in (
+            "actions",
+            "wda/dragfromtoforduration",
+            "wda/keys",
+            "wda/keyboard/dismiss",
+            "wda/pressButton",
+        ):
+            return 200, None, {}
+        return 404, {"error": f"unknown command {method} {path}"}, {}
+
+    def _stream(self, handler: BaseHTTPRequestHandler) -> None:
+        handler.send_response(200)
+        handler.send_header(
+            "Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}"
+        )
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+        index = 0
+        try:
+            while not self._closed.is_set() and self.frames:
+                frame = self.frames[index % len(self.frames)]
+                handler.wfile.write(
+                    f"{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                    f"Content-Length: {len(frame)}\r\n\r\n".encode("ascii")
+                    + frame
+                    + b"\r\n"
+                )
+                handler.wfile.flush()
+                index += 1
+                time.sleep(1 / self.fps)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        handler.close_connection = True
+
+
+def start_fake_wda_server(**kwargs) -> FakeWDAServer:
+    """Create and start a ``FakeWDAServer``."""
+    return FakeWDAServer(**kwargs).start()
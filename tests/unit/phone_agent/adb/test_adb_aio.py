@@ -0,0 +1,64 @@
+import asyncio
+import subprocess
+
+import pytest
+
+from phone_agent.adb import aio, device
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.device_factory import AsyncDeviceFactory, DeviceType
+from tests.factories.fake_adb import read_log
+from tests.factories.fake_device import make_png
+
+
+@pytest.fixture(autouse=True)
+def fixed_settle(monkeypatch):
+    monkeypatch.setattr(TIMING_CONFIG.settle, "mode", "fixed")
+
+
+def test_probes_run_as_asyncio_subprocesses(fake_adb):
+    root = fake_adb(screen_png=make_png(64, 128))
+
+    async def observe():
+        return await asyncio.gather(
+            aio.get_screenshot("serial-1"), aio.get_current_app("serial-1")
+        )
+
+    screenshot, app = asyncio.run(observe())
+
+    assert (screenshot.width, screenshot.height) == (64, 128)
+    assert not screenshot.is_sensitive
+    assert app == "微信"
+    assert sorted(read_log(root, "adb.log")) == [
+        "exec-out screencap -p",
+        "shell dumpsys window | grep -E 'mCurrentFocus|mFocusedApp'",
+    ]
+
+
+def test_current_app_cache_is_shared_and_invalidated_by_actions(fake_adb):
+    root = fake_adb(screen_png=make_png(64, 128))
+    factory = AsyncDeviceFactory(DeviceType.ADB)
+
+    async def scenario():
+        first = await factory.get_current_app()
+        # Served from the cache that the synchronous backend also uses
+        assert device.get_current_app() == first
+        await factory.tap(10, 20, delay=0)
+        await factory.swipe(0, 0, 0, 100, delay=0)
+        await factory.back(delay=0)
+        return await factory.get_current_app()
+
+    assert asyncio.run(scenario()) == "微信"
+    assert read_log(root, "device.log")[1:4] == [
+        "input tap 10 20",
+        "input swipe 0 0 0 100 1000",
+        "input keyevent 4",
+    ]
+    dumpsys = [line for line in read_log(root, "adb.log") if "dumpsys" in line]
+    assert len(dumpsys) == 2
+
+
+def test_timeout_kills_the_command(fake_adb):
+    fake_adb(screen_png=make_png(64, 128))
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(aio.run_shell_command(["sleep", "1"], timeout=0.2))
@@ -0,0 +1,129 @@
+import base64
+import subprocess
+
+import pytest
+
+from phone_agent.adb import input as adb_input
+from tests.factories.fake_adb import read_log
+
+ORIGINAL_IME = "com.example.keyboard/.LatinIME"
+
+
+def typed_text(root) -> str:
+    """Decode every ADB_INPUT_B64 payload sent to the fake device."""
+    text = ""
+    for line in read_log(root, "device.log"):
+        if "ADB_INPUT_B64" in line:
+            text += base64.b64decode(line.split("--es msg ")[1]).decode("utf-8")
+    return text
+
+
+def test_keyboard_stays_selected_across_type_actions(fake_adb):
+    root = fake_adb()
+
+    for text in ("hello", "world"):
+        assert adb_input.detect_and_set_adb_keyboard("serial-1") == ORIGINAL_IME
+        adb_input.clear_text("serial-1")
+        adb_input.type_text(text, "serial-1")
+    adb_input.restore_keyboard(ORIGINAL_IME, "serial-1")
+
+    log = read_log(root, "device.log")
+    assert log.count("settings get secure default_input_method") == 1
+    assert log.count(f"ime set {adb_input.ADB_KEYBOARD_IME}") == 1
+    assert log[-1] == f"ime set {ORIGINAL_IME}"
+    assert log.count(f"ime set {ORIGINAL_IME}") == 1
+    assert typed_text(root) == "helloworld"
+
+
+def test_switch_is_confirmed_by_the_input_method_service(fake_adb):
+    root = fake_adb()
+
+    adb_input.detect_and_set_adb_keyboard("serial-1")
+
+    assert read_log(root, "device.log")[:3] == [
+        "settings get secure default_input_method",
+        f"ime set {adb_input.ADB_KEYBOARD_IME}",
+        "dumpsys input_method",
+    ]
+
+
+def test_restore_forgets_state_so_next_run_detects_again(fake_adb):
+    root = fake_adb()
+    manager = adb_input.get_ime_manager("serial-1")
+
+    manager.activate()
+    manager.restore()
+    assert not manager.active
+    manager.activate()
+
+    log = read_log(root, "device.log")
+    assert log.count("settings get secure default_input_method") == 2
+
+
+def test_already_selected_adb_keyboard_is_left_alone(fake_adb):
+    root = fake_adb(current_ime=adb_input.ADB_KEYBOARD_IME)
+
+    original = adb_input.detect_and_set_adb_keyboard("serial-1")
+    adb_input.restore_keyboard(original, "serial-1")
+
+    assert not any(line.startswith("ime set") for line in read_log(root, "device.log"))
+
+
+def test_managers_are_per_device(fake_adb):
+    root = fake_adb()
+
+    adb_input.detect_and_set_adb_keyboard("serial-1")
+    adb_input.detect_and_set_adb_keyboard("serial-2")
+
+    log = read_log(root, "device.log")
+    assert log.count("settings get secure default_input_method") == 2
+
+
+def test_long_text_is_chunked_on_character_boundaries(fake_adb, monkeypatch):
+    root = fake_adb()
+    monkeypatch.setattr(adb_input, "MAX_CHUNK_BYTES", 100)
+    text = "你好, world! " * 40 + "🙂"
+
+    adb_input.type_text(text, "serial-1")
+
+    broadcasts = [
+        line for line in read_log(root, "device.log") if "ADB_INPUT_B64" in line
+    ]
+    assert len(broadcasts) > 1
+    for line in broadcasts:
+        payload = base64.b64decode(line.split("--es msg ")[1])
+        assert len(payload) <= 100
+    assert typed_text(root) == text
+
+
+@pytest.mark.parametrize(
+    ("text", "limit", "expected"),
+    [
+        ("", 10, [""]),
+        ("abc", 3, ["abc"]),
+        ("abcd", 3, ["abc", "d"]),
+        ("中文字", 6, ["中文", "字"]),
+    ],
+)
+def test_chunk_text(text, limit, expected):
+    assert adb_input._chunk_text(text, limit) == expected
+
+
+def test_unconfirmed_broadcast_warns_and_falls_back(monkeypatch, caplog):
+    commands, sleeps = [], []
+
+    def fake_run(args, device_id=None, timeout=None):
+        commands.append(args)
+        # Some ROMs print nothing for am broadcast
+        return subprocess.CompletedProcess(args, 0, stdout="")
+
+    monkeypatch.setattr(adb_input, "run_shell_command", fake_run)
+    monkeypatch.setattr(adb_input.time, "sleep", sleeps.append)
+
+    with caplog.at_level("WARNING", logger=adb_input.__name__):
+        adb_input.clear_text("serial-1")
+        adb_input.type_text("hi", "serial-1")
+
+    assert [args[3] for args in commands] == ["ADB_CLEAR_TEXT", "ADB_INPUT_B64"]
+    assert sleeps == [adb_input.TIMING_CONFIG.action.text_clear_delay]
+    assert len([r for r in caplog.records if "not confirmed" in r.message]) == 2
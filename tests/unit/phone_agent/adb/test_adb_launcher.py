@@ -0,0 +1,144 @@
+import json
+
+import pytest
+
+from phone_agent.adb import device as adb_device
+from phone_agent.adb import launcher
+from phone_agent.adb.launcher import LauncherCache, LaunchHistory, LaunchRecord
+from tests.factories.fake_adb import read_log
+
+WECHAT = "com.tencent.mm"
+WECHAT_LAUNCHER = "com.tencent.mm/.ui.LauncherUI"
+
+AM_START = [
+    "am start -W -a android.intent.action.MAIN "
+    f"-c android.intent.category.LAUNCHER -n {WECHAT_LAUNCHER}"
+]
+FOCUS_QUERY = ["dumpsys window"]
+
+
+@pytest.fixture
+def waits(monkeypatch):
+    """Settle waits requested by launch_app, recorded instead of slept."""
+    recorded = []
+    monkeypatch.setattr(adb_device, "LAUNCH_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(
+        adb_device, "wait_after_action", lambda *args: recorded.append(args)
+    )
+    return recorded
+
+
+def test_launch_resolves_once_and_returns_when_in_foreground(
+    fake_adb, waits, tmp_path
+):
+    root = fake_adb(
+        dumpsys_window="  mCurrentFocus=Window{1 u0 com.android.launcher/.Home}\n"
+    )
+
+    assert adb_device.launch_app("微信", "serial-1")
+    assert adb_device.launch_app("微信", "serial-1")
+
+    resolve = (
+        "cmd package resolve-activity --brief -c android.intent.category.LAUNCHER "
+        f"{WECHAT}"
+    )
+    assert read_log(root, "device.log") == [resolve] + (AM_START + FOCUS_QUERY) * 2
+    assert waits == []
+    assert adb_device.get_current_app("serial-1") == "微信"
+
+    persisted = json.loads((tmp_path / "launchers.json").read_text(encoding="utf-8"))
+    assert persisted == {"serial-1": {WECHAT: WECHAT_LAUNCHER}}
+
+
+def test_launch_history_records_am_timings(fake_adb):
+    fake_adb()
+
+    adb_device.launch_app("微信", "serial-1")
+
+    [record] = launcher.get_launch_history().get("serial-1")
+    assert (record.method, record.component, record.launch_state) == (
+        "am_start",
+        WECHAT_LAUNCHER,
+        "COLD",
+    )
+    assert (record.this_time_ms, record.total_time_ms, record.wait_time_ms) == (
+        None,
+        420,
+        431,
+    )
+    assert record.foreground_s is not None
+    assert launcher.get_launch_history().get("serial-2") == []
+
+
+def test_stale_cached_component_falls_back_to_monkey(fake_adb):
+    root = fake_adb(launchers={})
+    launcher.get_launcher_cache().put("serial-1", WECHAT, WECHAT_LAUNCHER)
+
+    assert adb_device.launch_app("微信", "serial-1")
+
+    log = read_log(root, "device.log")
+    assert log[:2] == AM_START + [
+        f"monkey -p {WECHAT} -c android.intent.category.LAUNCHER 1"
+    ]
+    assert launcher.get_launcher_cache().get("serial-1", WECHAT) is None
+    assert launcher.get_launch_history().get("serial-1")[0].method == "monkey"
+
+
+def test_launch_that_never_gets_focus_stops_at_the_focus_budget(
+    fake_adb, waits, monkeypatch
+):
+    # A permission dialog of another package keeps the focus
+    fake_adb(
+        dumpsys_window=(
+            "  mCurrentFocus=Window{1 u0 "
+            "com.android.permissioncontroller/.GrantPermissionsActivity}\n"
+        )
+    )
+    monkeypatch.setattr(adb_device.TIMING_CONFIG.device, "launch_timeout", 0.2)
+
+    assert adb_device.launch_app("淘宝", "serial-1")
+
+    # No settle delay is added on top of the timed-out poll
+    assert waits == []
+    assert launcher.get_launch_history().get("serial-1")[0].foreground_s is None
+
+
+def test_explicit_delay_is_still_honoured(fake_adb, waits):
+    fake_adb()
+
+    adb_device.launch_app("微信", "serial-1", delay=0.5)
+
+    assert waits[0][0] == 0.5
+
+
+def test_cache_is_loaded_from_disk_per_device(tmp_path):
+    path = tmp_path / "launchers.json"
+    LauncherCache(str(path)).put("a", WECHAT, WECHAT_LAUNCHER)
+
+    cache = LauncherCache(str(path))
+    assert cache.get("a", WECHAT) == WECHAT_LAUNCHER
+    assert cache.get("b", WECHAT) is None
+
+
+def test_history_summary_groups_cold_and_warm():
+    history = LaunchHistory(size=3)
+    for state, total in [("COLD", 900), ("WARM", 200), ("WARM", 300), ("HOT", 50)]:
+        history.record(
+            "a", LaunchRecord(WECHAT, "am_start", launch_state=state, total_time_ms=total)
+        )
+
+    summary = history.summary("a")
+
+    assert set(summary) == {"WARM", "HOT"}
+    assert summary["WARM"]["count"] == 2
+    assert summary["WARM"]["mean_total_time_ms"] == 250
+
+
+def test_parse_am_start_on_older_android():
+    output = "Starting: Intent { cmp=a/.B }\nStatus: ok\nActivity: a/.B\nThisTime: 310\nTotalTime: 310\nComplete\n"
+
+    assert launcher.parse_am_start(output) == {
+        "Status": "ok",
+        "ThisTime": "310",
+        "TotalTime": "310",
+    }
@@ -0,0 +1,110 @@
+import base64
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from phone_agent.adb import screenshot
+from tests.factories.fake_adb import make_fake_adb, prepend_path, read_log
+
+
+def _encode(fmt: str, size=(108, 240)) -> bytes:
+    buffered = BytesIO()
+    Image.new("RGB", size, color="red").save(buffered, format=fmt)
+    return buffered.getvalue()
+
+
+@pytest.fixture
+def fake_device(tmp_path, monkeypatch):
+    def _install(screen: bytes):
+        prepend_path(monkeypatch, make_fake_adb(tmp_path, screen_png=screen))
+        return tmp_path
+
+    monkeypatch.setattr(screenshot, "_STREAM_CAPTURE", True)
+    return _install
+
+
+def test_stream_capture_passes_png_through_untouched(fake_device):
+    png = _encode("PNG")
+    root = fake_device(png)
+
+    shot = screenshot.get_screenshot("serial-1")
+
+    assert base64.b64decode(shot.base64_data) == png
+    assert (shot.width, shot.height) == (108, 240)
+    assert shot.is_sensitive is False
+    assert read_log(root, "adb.log") == ["exec-out screencap -p"]
+    assert not list((root / "sdcard").iterdir())
+
+
+def test_stream_capture_reports_sensitive_screen(fake_device):
+    root = fake_device(b"Status: -1\nFailed to take screenshot\n")
+
+    shot = screenshot.get_screenshot()
+
+    assert shot.is_sensitive is True
+    assert read_log(root, "adb.log") == ["exec-out screencap -p"]
+
+
+def test_stream_capture_falls_back_to_pull_for_non_png(fake_device):
+    root = fake_device(_encode("JPEG"))
+
+    shot = screenshot.get_screenshot()
+
+    assert base64.b64decode(shot.base64_data).startswith(b"\x89PNG")
+    assert (shot.width, shot.height) == (108, 240)
+    assert read_log(root, "adb.log")[0] == "exec-out screencap -p"
+    assert read_log(root, "adb.log")[1] == "shell screencap -p /sdcard/tmp.png"
+    assert read_log(root, "adb.log")[2].startswith("pull /sdcard/tmp.png ")
+
+
+def test_disabled_stream_capture_uses_pull_path(fake_device, monkeypatch):
+    monkeypatch.setattr(screenshot, "_STREAM_CAPTURE", False)
+    root = fake_device(_encode("PNG"))
+
+    shot = screenshot.get_screenshot()
+
+    assert (shot.width, shot.height) == (108, 240)
+    assert len(read_log(root, "adb.log")) == 2
+
+
+def test_capture_frame_decodes_raw_screencap(fake_device, monkeypatch):
+    monkeypatch.setattr(screenshot, "_RAW_FRAMES", True)
+    root = fake_device(_encode("PNG"))
+
+    frame = screenshot.capture_frame("serial-1")
+
+    assert frame.size == (108, 240)
+    assert frame.getpixel((0, 0))[:3] == (255, 0, 0)
+    assert read_log(root, "adb.log") == ["exec-out screencap"]
+
+
+def test_capture_frame_falls_back_to_png(fake_device, monkeypatch):
+    png = _encode("PNG")
+    monkeypatch.setattr(screenshot, "_RAW_FRAMES", False)
+    root = fake_device(png)
+    assert screenshot.capture_frame("serial-1") == png
+
+    monkeypatch.setattr(screenshot, "_RAW_FRAMES", True)
+    (root / "screen.raw").write_bytes(b"\x00" * 8)
+    assert screenshot.capture_frame("serial-1") == png
+
+    assert read_log(root, "adb.log") == [
+        "exec-out screencap -p",
+        "exec-out screencap",
+        "exec-out screencap -p",
+    ]
+
+
+@pytest.mark.parametrize("header_words", [3, 4])
+def test_raw_frames_without_colour_space_word_decode_too(header_words):
+    pixels = bytes([0, 0, 255, 0]) * 6
+    header = (2).to_bytes(4, "little") + (3).to_bytes(4, "little")
+    header += (2).to_bytes(4, "little") + b"\x00" * 4 * (header_words - 3)
+
+    frame = screenshot._decode_raw_frame(header + pixels)
+
+    assert (frame.mode, frame.size) == ("RGBX", (2, 3))
+    assert frame.getpixel((1, 2))[:3] == (0, 0, 255)
+    with pytest.raises(ValueError):
+        screenshot._decode_raw_frame(header + pixels[:-1])
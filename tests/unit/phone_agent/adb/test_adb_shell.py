@@ -0,0 +1,119 @@
+import subprocess
+
+import pytest
+
+from phone_agent.adb import device, input as adb_input, shell
+from phone_agent.adb.shell import ADBShellSession, ShellSessionError
+from tests.factories.fake_adb import read_log
+
+
+def test_session_frames_output_and_exit_codes(fake_adb):
+    root = fake_adb()
+    session = ADBShellSession("emulator-5554")
+    try:
+        assert session.run(["echo", "hello"]).stdout == "hello\n"
+        assert session.run(["printf", "no-newline"]).stdout == "no-newline"
+        assert session.run(["printf", "'a\\n\\n'"]).stdout == "a\n\n"
+        assert session.run(["true"]).stdout == ""
+
+        failed = session.run(["sh", "-c", "'echo oops >&2; exit 3'"])
+        assert failed.returncode == 3
+        assert failed.stdout == "oops\n"
+    finally:
+        session.close()
+
+    # One adb process served every command
+    assert read_log(root, "adb.log") == ["shell"]
+
+
+def test_session_timeout_closes_and_next_call_reconnects(fake_adb):
+    root = fake_adb()
+    session = ADBShellSession()
+    try:
+        with pytest.raises(subprocess.TimeoutExpired):
+            session.run(["sleep", "5"], timeout=0.2)
+        assert not session.alive
+
+        assert session.run(["echo", "back"]).stdout == "back\n"
+    finally:
+        session.close()
+
+    assert read_log(root, "adb.log") == ["shell", "shell"]
+
+
+def test_pool_reconnects_after_session_dies(fake_adb):
+    root = fake_adb()
+    pool = shell.get_shell_pool()
+    assert pool.run(["echo", "one"], "serial-1").stdout == "one\n"
+
+    pool.get_session("serial-1")._process.kill()
+
+    assert pool.run(["echo", "two"], "serial-1").stdout == "two\n"
+    assert read_log(root, "adb.log") == ["shell", "shell"]
+
+
+def test_pool_falls_back_to_subprocess(fake_adb, monkeypatch):
+    root = fake_adb()
+
+    def broken_run(self, args, timeout=None):
+        raise ShellSessionError("broken")
+
+    monkeypatch.setattr(ADBShellSession, "run", broken_run)
+
+    result = shell.run_shell_command(["echo", "fallback"], "serial-1")
+
+    assert result.returncode == 0
+    assert result.stdout.strip() == "fallback"
+    assert read_log(root, "adb.log") == ["shell echo fallback"]
+
+
+def test_disabled_pool_uses_one_shot_subprocess(fake_adb, monkeypatch):
+    root = fake_adb()
+    monkeypatch.setattr(shell, "_SHELL_POOL_ENABLED", False)
+
+    shell.run_shell_command(["input", "keyevent", "4"])
+
+    assert read_log(root, "adb.log") == ["shell input keyevent 4"]
+
+
+def test_device_actions_share_one_session(fake_adb, monkeypatch):
+    root = fake_adb()
+    monkeypatch.setattr(device.time, "sleep", lambda _: None)
+
+    device.tap(10, 20, "serial-1")
+    device.double_tap(1, 2, "serial-1")
+    device.swipe(0, 0, 100, 100, device_id="serial-1")
+    device.back("serial-1")
+    device.home("serial-1")
+    assert device.launch_app("微信", "serial-1") is True
+    assert device.get_current_app("serial-1") == "微信"
+
+    adb_input.clear_text("serial-1")
+    adb_input.type_text("hi", "serial-1")
+    assert adb_input.detect_and_set_adb_keyboard("serial-1") == (
+        "com.example.keyboard/.LatinIME"
+    )
+    adb_input.restore_keyboard("com.example.keyboard/.LatinIME", "serial-1")
+
+    assert read_log(root, "adb.log") == ["shell"]
+    assert read_log(root, "device.log") == [
+        "input tap 10 20",
+        "input tap 1 2",
+        "input tap 1 2",
+        "input swipe 0 0 100 100 1000",
+        "input keyevent 4",
+        "input keyevent KEYCODE_HOME",
+        "cmd package resolve-activity --brief -c android.intent.category.LAUNCHER "
+        "com.tencent.mm",
+        "am start -W -a android.intent.action.MAIN "
+        "-c android.intent.category.LAUNCHER -n com.tencent.mm/.ui.LauncherUI",
+        "dumpsys window",
+        "dumpsys window",
+        "am broadcast -a ADB_CLEAR_TEXT",
+        "am broadcast -a ADB_INPUT_B64 --es msg aGk=",
+        "settings get secure default_input_method",
+        "ime set com.android.adbkeyboard/.AdbIME",
+        "dumpsys input_method",
+        "am broadcast -a ADB_INPUT_B64 --es msg ",
+        "ime set com.example.keyboard/.LatinIME",
+    ]
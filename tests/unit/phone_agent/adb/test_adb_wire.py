@@ -0,0 +1,173 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from phone_agent.adb import device as adb_device
+from phone_agent.adb import input as adb_input
+from phone_agent.adb import launcher
+from phone_agent.adb import screenshot, shell
+from phone_agent.adb.connection import ADBConnection
+from phone_agent.adb.shell import ADBShellPool
+from phone_agent.adb.wire import ADBWireClient, ADBWireError
+from phone_agent.device_factory import DeviceFactory, DeviceType
+from phone_agent.fleet import FleetDevice
+from tests.factories.fake_adb import make_fake_adb, prepend_path, read_log
+from tests.factories.fake_adb_server import start_fake_adb_server
+
+SERIAL = "serial-1"
+
+
+def _png(size=(108, 240)) -> bytes:
+    buffered = BytesIO()
+    Image.new("RGB", size, color="red").save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+@pytest.fixture
+def engines(tmp_path, monkeypatch):
+    """Build an identical fake device for the CLI or the wire transport."""
+    servers = []
+    pool = ADBShellPool()
+    monkeypatch.setattr(shell, "_SHELL_POOL", pool)
+    monkeypatch.setattr(shell, "_SHELL_POOL_ENABLED", True)
+    monkeypatch.setattr(adb_device, "wait_after_action", lambda *args: None)
+
+    def _use(transport, **kwargs):
+        root = tmp_path / transport
+        monkeypatch.setattr(adb_input, "_IME_MANAGERS", {})
+        monkeypatch.setattr(launcher, "_LAUNCHER_CACHE", launcher.LauncherCache())
+        adb_device._CURRENT_APP_CACHE.clear()
+        if transport == "wire":
+            server = start_fake_adb_server(root, **kwargs)
+            servers.append(server)
+            monkeypatch.setattr(shell, "_WIRE_CLIENT", ADBWireClient(port=server.port))
+        else:
+            prepend_path(monkeypatch, make_fake_adb(root, **kwargs))
+        monkeypatch.setattr(shell, "_TRANSPORT", transport)
+        return root
+
+    yield _use
+    adb_device._CURRENT_APP_CACHE.clear()
+    pool.close_all()
+    for server in servers:
+        server.close()
+
+
+def scenario() -> list:
+    """Drive every ADB operation the agent uses and collect the results."""
+    results = [
+        [(d.device_id, d.status, d.model) for d in ADBConnection().list_devices()],
+        adb_device.get_current_app(SERIAL),
+    ]
+    adb_device.tap(10, 20, SERIAL)
+    adb_device.double_tap(30, 40, SERIAL)
+    adb_device.long_press(50, 60, 1000, SERIAL)
+    adb_device.swipe(1, 2, 3, 4, 300, SERIAL)
+    adb_device.back(SERIAL)
+    adb_device.home(SERIAL)
+    results.append(adb_device.launch_app("微信", SERIAL))
+
+    original = adb_input.detect_and_set_adb_keyboard(SERIAL)
+    adb_input.clear_text(SERIAL)
+    adb_input.type_text("你好 world", SERIAL)
+    adb_input.restore_keyboard(original, SERIAL)
+    results.append(original)
+
+    shot = screenshot._get_screenshot_stream(SERIAL, 10)
+    results.append((shot.base64_data, shot.width, shot.height))
+    shot = screenshot._get_screenshot_pull(SERIAL, 10)
+    results.append((shot.width, shot.height, shot.is_sensitive))
+    return results
+
+
+@pytest.mark.parametrize("shell_v2", [True, False])
+def test_wire_transport_matches_cli_command_for_command(engines, shell_v2):
+    png = _png()
+
+    cli_root = engines("cli", screen_png=png)
+    cli_results = scenario()
+    wire_root = engines("wire", screen_png=png, shell_v2=shell_v2)
+    wire_results = scenario()
+
+    assert wire_results == cli_results
+    assert read_log(wire_root, "device.log") == read_log(cli_root, "device.log")
+    assert not (wire_root / "adb.log").exists()
+
+
+def test_shell_v2_reports_exit_code_and_stderr(engines):
+    engines("wire")
+
+    result = shell.run_shell_command(["echo", "out;", "echo", "err", ">&2;", "exit", "3"])
+
+    assert (result.returncode, result.stdout, result.stderr) == (3, "out\n", "err\n")
+
+
+def test_transport_selects_device_by_serial(engines):
+    root = engines("wire")
+
+    shell.run_shell_command(["input", "keyevent", "4"], SERIAL)
+    shell.run_shell_command(["input", "keyevent", "3"])
+
+    assert read_log(root, "server.log") == [
+        f"host:transport:{SERIAL}",
+        "shell,v2,raw:input keyevent 4",
+        "host:transport-any",
+        "shell,v2,raw:input keyevent 3",
+    ]
+    with pytest.raises(ADBWireError, match="not found"):
+        shell.run_shell_command(["true"], "missing")
+
+
+def test_sync_push_and_pull_round_trip(engines, tmp_path):
+    root = engines("wire")
+    client = shell.get_wire_client()
+    data = bytes(range(256)) * 600
+    local = tmp_path / "upload.bin"
+    local.write_bytes(data)
+
+    client.push(str(local), "/sdcard/upload.bin", SERIAL)
+    client.pull("/sdcard/upload.bin", str(tmp_path / "download.bin"), SERIAL)
+
+    assert (root / "sdcard" / "upload.bin").read_bytes() == data
+    assert (tmp_path / "download.bin").read_bytes() == data
+
+
+def test_failed_pull_leaves_no_file(engines, tmp_path):
+    engines("wire")
+    target = tmp_path / "missing.png"
+
+    assert not shell.pull_file("/sdcard/missing.png", str(target), SERIAL)
+    assert not target.exists()
+
+
+def test_connect_over_wire(engines):
+    engines("wire")
+
+    ok, message = ADBConnection().connect("192.168.1.5")
+
+    assert ok, message
+    assert ("192.168.1.5:5555", "device") in shell.get_wire_client().list_devices()
+
+
+def test_device_factory_selects_transport(monkeypatch):
+    monkeypatch.setattr(shell, "_TRANSPORT", "cli")
+    monkeypatch.setattr(shell, "_CLAIMED_TRANSPORT", None)
+
+    DeviceFactory(DeviceType.ADB, adb_transport="wire").module
+    DeviceFactory(DeviceType.ADB, adb_transport="WIRE").module
+    DeviceFactory(DeviceType.ADB).module
+
+    assert shell.get_transport() == "wire"
+    with pytest.raises(ValueError, match="Unknown ADB transport"):
+        shell.set_transport("usb")
+
+
+def test_factories_asking_for_different_transports_are_refused(monkeypatch):
+    monkeypatch.setattr(shell, "_TRANSPORT", "cli")
+    monkeypatch.setattr(shell, "_CLAIMED_TRANSPORT", None)
+    DeviceFactory(DeviceType.ADB, adb_transport="wire").module
+
+    with pytest.raises(ValueError, match="process-wide"):
+        FleetDevice("emulator-5554", adb_transport="cli").factory.module
+    assert shell.get_transport() == "wire"
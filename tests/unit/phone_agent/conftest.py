@@ -0,0 +1,38 @@
+import pytest
+
+from phone_agent.adb import device as adb_device
+from phone_agent.adb import input as adb_input
+from phone_agent.adb import launcher, shell
+from phone_agent.adb.launcher import LauncherCache, LaunchHistory
+from phone_agent.adb.shell import ADBShellPool
+from tests.factories.fake_adb import make_fake_adb, prepend_path
+
+
+@pytest.fixture
+def fake_adb(tmp_path, monkeypatch):
+    """
+    Put a fake adb on PATH behind a fresh shell pool and empty device caches.
+
+    Call it with ``make_fake_adb`` keyword arguments (``dumpsys_window``,
+    ``current_ime``, ``screen_png``, ...); it returns the directory holding
+    the fake's ``adb.log`` and ``device.log``.
+    """
+
+    def _make(**kwargs):
+        root = tmp_path / "device"
+        prepend_path(monkeypatch, make_fake_adb(root, **kwargs))
+        return root
+
+    pool = ADBShellPool()
+    monkeypatch.setattr(shell, "_TRANSPORT", "cli")
+    monkeypatch.setattr(shell, "_SHELL_POOL", pool)
+    monkeypatch.setattr(shell, "_SHELL_POOL_ENABLED", True)
+    monkeypatch.setattr(
+        launcher, "_LAUNCHER_CACHE", LauncherCache(str(tmp_path / "launchers.json"))
+    )
+    monkeypatch.setattr(launcher, "_LAUNCH_HISTORY", LaunchHistory())
+    monkeypatch.setattr(adb_input, "_IME_MANAGERS", {})
+    adb_device._CURRENT_APP_CACHE.clear()
+    yield _make
+    adb_device._CURRENT_APP_CACHE.clear()
+    pool.close_all()
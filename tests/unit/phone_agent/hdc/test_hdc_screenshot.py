@@ -0,0 +1,74 @@
+import base64
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from phone_agent.hdc import screenshot, shell
+from phone_agent.hdc.shell import HDCShellPool
+from phone_agent.imaging import encode_screenshot
+from tests.factories.fake_adb import prepend_path, read_log
+from tests.factories.fake_hdc import make_fake_hdc
+
+
+def _jpeg(size=(108, 240)) -> bytes:
+    buffered = BytesIO()
+    Image.new("RGB", size, color="red").save(buffered, format="JPEG")
+    return buffered.getvalue()
+
+
+@pytest.fixture
+def fake_device(tmp_path, monkeypatch):
+    def _install(screen: bytes):
+        prepend_path(monkeypatch, make_fake_hdc(tmp_path, screen_jpeg=screen))
+        return tmp_path
+
+    pool = HDCShellPool()
+    monkeypatch.setattr(shell, "_SHELL_POOL", pool)
+    monkeypatch.setattr(shell, "_SHELL_POOL_ENABLED", True)
+    monkeypatch.setattr(screenshot, "_JPEG_PASSTHROUGH", True)
+    yield _install
+    pool.close_all()
+
+
+def test_jpeg_is_passed_through_untouched(fake_device):
+    jpeg = _jpeg()
+    root = fake_device(jpeg)
+
+    shot = screenshot.get_screenshot("hdc-serial-1")
+
+    assert base64.b64decode(shot.base64_data) == jpeg
+    assert (shot.width, shot.height, shot.mime_type) == (108, 240, "image/jpeg")
+    assert shot.is_sensitive is False
+    assert encode_screenshot(shot) is shot
+    assert read_log(root, "hdc.log")[0] == "shell"
+    assert read_log(root, "hdc.log")[1].startswith(
+        "file recv /data/local/tmp/tmp_screenshot.jpeg "
+    )
+
+
+def test_disabled_passthrough_transcodes_to_png(fake_device):
+    fake_device(_jpeg())
+    screenshot.set_jpeg_passthrough(False)
+
+    shot = screenshot.get_screenshot("hdc-serial-1")
+
+    assert shot.mime_type == "image/png"
+    assert base64.b64decode(shot.base64_data).startswith(b"\x89PNG")
+    assert (shot.width, shot.height) == (108, 240)
+
+
+def test_missing_file_returns_fallback(fake_device):
+    root = fake_device(_jpeg())
+    (root / "device" / "screenshot").write_text("#!/bin/sh\necho saved\n")
+
+    shot = screenshot.get_screenshot("hdc-serial-1")
+
+    assert (shot.width, shot.height, shot.is_sensitive) == (1080, 2400, False)
+
+
+def test_capture_frame_returns_device_jpeg(fake_device):
+    jpeg = _jpeg()
+    fake_device(jpeg)
+
+    assert screenshot.capture_frame("hdc-serial-1") == jpeg
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import pytest
+
+from phone_agent.hdc import device, input as hdc_input, shell
+from phone_agent.hdc.shell import HDCShellPool, HDCShellSession
+from tests.factories.fake_adb import prepend_path, read_log
+from tests.factories.fake_hdc import make_fake_hdc
+
+FIXTURES = Path(__file__).resolve().parents[3] / "fixtures" / "dumpsys"
+
+
+@pytest.fixture
+def fake_hdc(tmp_path, monkeypatch):
+    aa_dump = (FIXTURES / "aa_dump_l.txt").read_text(encoding="utf-8")
+    prepend_path(monkeypatch, make_fake_hdc(tmp_path, aa_dump=aa_dump))
+    pool = HDCShellPool()
+    monkeypatch.setattr(shell, "_SHELL_POOL", pool)
+    monkeypatch.setattr(shell, "_SHELL_POOL_ENABLED", True)
+    monkeypatch.setattr(device, "wait_after_action", lambda *args: None)
+    device.invalidate_current_app()
+    yield tmp_path
+    device.invalidate_current_app()
+    pool.close_all()
+
+
+def test_session_selects_device_with_t_flag(fake_hdc):
+    session = HDCShellSession("hdc-serial-1")
+    try:
+        result = session.run(["sh", "-c", "'echo hi; exit 4'"])
+    finally:
+        session.close()
+
+    assert (result.stdout, result.returncode) == ("hi\n", 4)
+    assert read_log(fake_hdc, "hdc.log") == ["shell"]
+
+
+def test_session_skips_echoed_command_lines(tmp_path, monkeypatch):
+    prepend_path(monkeypatch, make_fake_hdc(tmp_path / "echo", echo_input=True))
+    session = HDCShellSession("hdc-serial-1")
+    try:
+        first = session.run(["sh", "-c", "'echo hi; exit 4'"])
+        second = session.run(["echo", "there"])
+    finally:
+        session.close()
+
+    assert (first.stdout, first.returncode) == ("hi\n", 4)
+    assert (second.stdout, second.returncode) == ("there\n", 0)
+
+
+def test_device_actions_share_one_session(fake_hdc):
+    device.tap(10, 20, "hdc-serial-1")
+    device.swipe(0, 0, 100, 100, 600, "hdc-serial-1")
+    device.back("hdc-serial-1")
+    device.home("hdc-serial-1")
+    assert device.launch_app("快手", "hdc-serial-1") is True
+    assert device.get_current_app("hdc-serial-1") == "快手"
+    hdc_input.clear_text("hdc-serial-1")
+    hdc_input.type_text("hi\nthere", "hdc-serial-1")
+
+    assert read_log(fake_hdc, "hdc.log") == ["shell"]
+    assert read_log(fake_hdc, "device.log") == [
+        "uitest uiInput click 10 20",
+        "uitest uiInput swipe 0 0 100 100 600",
+        "uitest uiInput keyEvent Back",
+        "uitest uiInput keyEvent Home",
+        "aa start -b com.kuaishou.hmapp -a EntryAbility",
+        "aa dump -l",
+        "uitest uiInput keyEvent 2072 2017",
+        "uitest uiInput keyEvent 2055",
+        "uitest uiInput text hi",
+        "uitest uiInput keyEvent 2054",
+        "uitest uiInput text there",
+    ]
+
+
+def test_disabled_pool_runs_one_shot_processes(fake_hdc):
+    shell.set_shell_pool_enabled(False)
+
+    device.tap(1, 2, "hdc-serial-1")
+
+    assert read_log(fake_hdc, "hdc.log") == ["shell uitest uiInput click 1 2"]
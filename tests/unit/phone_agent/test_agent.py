@@ -0,0 +1,231 @@
+import threading
+
+import pytest
+
+from phone_agent import settle
+from phone_agent.actions import ActionHandler
+from phone_agent.actions import handler as handler_module
+from phone_agent.agent import AgentConfig, PhoneAgent
+from phone_agent.config.timing import TIMING_CONFIG, SettleTimingConfig
+from phone_agent.device_factory import DeviceType
+from phone_agent.events import get_global_event_emitter
+from phone_agent.imaging import ImageEncodingConfig
+from tests.factories.fake_device import FakeDeviceFactory, FakeModelClient, make_png
+
+
+@pytest.fixture
+def events():
+    received = []
+    emitter = get_global_event_emitter()
+    emitter.on(received.append)
+    yield received
+    emitter.off(received.append)
+
+
+def make_agent(monkeypatch, answers, factory=None, **config):
+    factory = factory or FakeDeviceFactory()
+    monkeypatch.setattr(handler_module, "get_device_factory", lambda: factory)
+    agent = PhoneAgent(agent_config=AgentConfig(verbose=False, **config))
+    agent.model_client = FakeModelClient(answers)
+    return agent, factory
+
+
+def test_run_sends_png_data_url_by_default(monkeypatch):
+    agent, factory = make_agent(monkeypatch, ['do(action="Tap", element=[500, 500])'])
+
+    assert agent.run("tap the middle") == "done"
+
+    first_user = agent.model_client.requests[0][1]
+    assert first_user["content"][0]["image_url"]["url"].startswith(
+        "data:image/png;base64,"
+    )
+    assert factory.actions() == [("tap", 540, 1200, None)]
+
+
+def test_image_encoding_shrinks_payload_but_keeps_action_coordinates(
+    monkeypatch, events
+):
+    agent, factory = make_agent(
+        monkeypatch,
+        ['do(action="Tap", element=[500, 500])'],
+        image_encoding=ImageEncodingConfig(max_edge=600, format="JPEG"),
+    )
+
+    agent.run("tap the middle")
+
+    first_user = agent.model_client.requests[0][1]
+    assert first_user["content"][0]["image_url"]["url"].startswith(
+        "data:image/jpeg;base64,"
+    )
+    # Coordinates are mapped against the captured screen, not the payload
+    assert factory.actions() == [("tap", 540, 1200, None)]
+
+    encoded = [e for e in events if e["type"] == "screenshot_encoded"]
+    assert len(encoded) == 2
+    payload = encoded[0]["payload"]
+    assert (payload["width"], payload["height"]) == (270, 600)
+    assert payload["mime_type"] == "image/jpeg"
+    assert payload["encoded_bytes"] > 0 and payload["original_bytes"] > 0
+    assert payload["encode_time"] >= 0
+
+
+def test_step_result_reports_probe_timings(monkeypatch):
+    agent, _ = make_agent(monkeypatch, [])
+
+    result = agent.step("look at the screen")
+
+    assert result.finished
+    assert set(result.timings) >= {"screenshot", "current_app", "observation"}
+
+
+def test_observation_failure_propagates_like_sequential_capture(monkeypatch):
+    factory = FakeDeviceFactory()
+
+    def broken_screenshot(device_id=None, timeout=10):
+        raise RuntimeError("device offline")
+
+    monkeypatch.setattr(factory, "get_screenshot", broken_screenshot)
+    agent, _ = make_agent(monkeypatch, [], factory=factory)
+
+    with pytest.raises(RuntimeError, match="device offline"):
+        agent.run("anything")
+    assert agent.model_client.requests == []
+
+
+def test_prefetch_observation_reuses_capture_for_next_step(monkeypatch):
+    agent, factory = make_agent(
+        monkeypatch,
+        ['do(action="Back")', 'do(action="Home")'],
+        prefetch_observation=True,
+    )
+
+    assert agent.run("go back then home") == "done"
+
+    # One capture per step; the prefetch is not repeated at step start
+    assert factory.calls.count(("get_screenshot", None)) == 3
+    assert factory.actions() == [("back", None), ("home", None)]
+
+
+def test_prefetch_starts_as_soon_as_the_action_settles(monkeypatch):
+    monkeypatch.setattr(TIMING_CONFIG, "settle", SettleTimingConfig(mode="adaptive"))
+    capture_started = threading.Event()
+
+    class SettlingFactory(FakeDeviceFactory):
+        def get_screenshot(self, device_id=None, timeout=10):
+            capture_started.set()
+            return super().get_screenshot(device_id, timeout)
+
+        def back(self, device_id=None):
+            capture_started.clear()
+            self.calls.append(("back", device_id))
+            settle.wait_after_action(None, 1.0, make_png)
+            # The next capture is already running before the action returns
+            self.calls.append(("prefetching", capture_started.wait(5)))
+
+    agent, factory = make_agent(
+        monkeypatch,
+        ['do(action="Back")'],
+        factory=SettlingFactory(),
+        prefetch_observation=True,
+    )
+
+    assert agent.run("go back") == "done"
+
+    assert factory.actions() == [("back", None), ("prefetching", True)]
+    assert factory.calls.count(("get_screenshot", None)) == 2
+
+
+def test_run_stops_the_observation_workers(monkeypatch):
+    agent, _ = make_agent(monkeypatch, ['do(action="Back")'], prefetch_observation=True)
+    before = set(threading.enumerate())
+
+    agent.run("go back")
+
+    started = set(threading.enumerate()) - before
+    workers = [t for t in started if t.name.startswith("observation")]
+    for worker in workers:
+        worker.join(5)
+    assert not any(worker.is_alive() for worker in workers)
+
+
+def test_keyboard_is_switched_per_type_and_restored_once_per_run(monkeypatch):
+    monkeypatch.setattr(handler_module.time, "sleep", lambda _: None)
+    agent, factory = make_agent(
+        monkeypatch,
+        ['do(action="Type", text="hello")', 'do(action="Type", text="world")'],
+    )
+
+    agent.run("type twice")
+
+    names = [call[0] for call in factory.actions()]
+    assert names == [
+        "detect_and_set_adb_keyboard",
+        "clear_text",
+        "type_text",
+        "detect_and_set_adb_keyboard",
+        "clear_text",
+        "type_text",
+        "restore_keyboard",
+    ]
+
+
+@pytest.mark.parametrize(
+    "device_type, delays",
+    [
+        (DeviceType.ADB, ["text_input_delay"]),
+        (
+            DeviceType.HDC,
+            ["keyboard_switch_delay", "text_clear_delay", "text_input_delay"],
+        ),
+    ],
+)
+def test_type_waits_fixed_delays_only_where_input_is_unconfirmed(
+    monkeypatch, device_type, delays
+):
+    sleeps = []
+    monkeypatch.setattr(handler_module.time, "sleep", sleeps.append)
+    factory = FakeDeviceFactory()
+    factory.device_type = device_type
+    handler = ActionHandler(device_factory=factory)
+
+    action = {"_metadata": "do", "action": "Type", "text": "hi"}
+    assert handler.execute(action, 1080, 2400).success
+
+    timing = handler_module.TIMING_CONFIG.action
+    # FakeDeviceFactory sleeps 0 s per call
+    assert [s for s in sleeps if s] == [getattr(timing, name) for name in delays]
+
+
+def test_request_stop_ends_run_before_the_next_step(monkeypatch):
+    agent, factory = make_agent(
+        monkeypatch, ['do(action="Tap", element=[500, 500])'] * 5
+    )
+    request = agent.model_client.request
+
+    def request_then_stop(messages):
+        agent.request_stop()
+        return request(messages)
+
+    agent.model_client.request = request_then_stop
+
+    assert agent.run("tap forever") == "Task stopped"
+    assert agent.step_count == 1
+    assert factory.actions() == [("tap", 540, 1200, None)]
+
+
+def test_stop_requested_before_run_starts_is_kept_until_the_run_ends(monkeypatch):
+    agent, factory = make_agent(
+        monkeypatch,
+        ['do(action="Tap", element=[500, 500])'] * 2 + ['finish(message="done")'],
+    )
+
+    agent.request_stop()
+    assert agent.run("tap forever") == "Task stopped"
+    assert agent.step_count == 1
+    # The request ended with that run and does not stop the next one
+    assert agent.run("tap twice") == "done"
+    assert agent.step_count == 2
+
+    agent.request_stop()
+    agent.reset()
+    assert not agent._stop_requested.is_set()
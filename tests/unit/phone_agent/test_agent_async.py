@@ -0,0 +1,215 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from phone_agent.actions import handler as handler_module
+from phone_agent.agent import AgentConfig, PhoneAgent
+from phone_agent.agent_async import AsyncPhoneAgent
+from phone_agent.events import AgentEventEmitter, get_global_event_emitter
+from phone_agent.model.client import AsyncModelClient, ModelClient, ModelConfig
+from tests.factories.fake_device import (
+    FakeAsyncDeviceFactory,
+    FakeAsyncModelClient,
+    FakeDeviceFactory,
+    FakeModelClient,
+)
+
+ANSWERS = [
+    'do(action="Tap", element=[500, 500])',
+    'do(action="Swipe", start=[500, 800], end=[500, 200])',
+    'do(action="Back")',
+    'do(action="Launch", app="WeChat")',
+]
+
+# Event fields that carry wall-clock measurements
+TIMING_FIELDS = ("encode_time", "timestamp")
+
+
+@pytest.fixture
+def events():
+    received = []
+    emitter = get_global_event_emitter()
+    emitter.on(received.append)
+    yield received
+    emitter.off(received.append)
+
+
+def make_async_agent(answers, factory=None, latency=0.0, **config):
+    factory = factory or FakeAsyncDeviceFactory(latency=latency)
+    agent = AsyncPhoneAgent(
+        agent_config=AgentConfig(verbose=False, **config), device_factory=factory
+    )
+    agent.model_client = FakeAsyncModelClient(answers, latency=latency)
+    return agent, factory
+
+
+def comparable(events):
+    return [
+        (
+            event["type"],
+            event["step"],
+            event["source"],
+            {k: v for k, v in event["payload"].items() if k not in TIMING_FIELDS},
+        )
+        for event in events
+    ]
+
+
+def test_async_agent_matches_sync_agent(monkeypatch, events):
+    sync_factory = FakeDeviceFactory()
+    monkeypatch.setattr(handler_module, "get_device_factory", lambda: sync_factory)
+    sync_agent = PhoneAgent(agent_config=AgentConfig(verbose=False))
+    sync_agent.model_client = FakeModelClient(ANSWERS)
+    sync_result = sync_agent.run("do things")
+    sync_events = list(events)
+    events.clear()
+
+    agent, factory = make_async_agent(ANSWERS)
+    result = asyncio.run(agent.run("do things"))
+
+    assert result == sync_result == "done"
+    assert factory.actions() == sync_factory.actions()
+    # Probes run concurrently, so only their counts are comparable
+    assert sorted(factory.calls) == sorted(sync_factory.calls)
+    assert agent.context == sync_agent.context
+    assert agent.model_client.requests == sync_agent.model_client.requests
+    assert comparable(events) == comparable(sync_events)
+    assert len({e["run_id"] for e in events}) == 1
+
+
+def test_one_loop_drives_many_runs_concurrently():
+    agents = [make_async_agent(ANSWERS, latency=0.05)[0] for _ in range(20)]
+    threads_before = threading.active_count()
+
+    async def run_all():
+        return await asyncio.gather(
+            *(agent.run(f"task {i}") for i, agent in enumerate(agents))
+        )
+
+    start = time.perf_counter()
+    results = asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+
+    assert results == ["done"] * 20
+    # 5 steps of ~4 sequential 50 ms waits each; 20 sequential runs would take 20x
+    assert elapsed < 3
+    # Only the encode worker pool is added, not a thread per agent
+    assert threading.active_count() - threads_before < 20
+
+
+def test_request_stop_ends_run_before_the_next_step():
+    agent, factory = make_async_agent(['do(action="Tap", element=[500, 500])'] * 5)
+    request = agent.model_client.request
+
+    async def request_then_stop(messages):
+        agent.request_stop()
+        return await request(messages)
+
+    agent.model_client.request = request_then_stop
+
+    assert asyncio.run(agent.run("tap forever")) == "Task stopped"
+    assert agent.step_count == 1
+    assert factory.actions() == [("tap", 540, 1200, None)]
+
+
+def test_max_steps_and_coroutine_confirmation_callback():
+    asked = []
+
+    async def confirm(message):
+        asked.append(message)
+        return False
+
+    agent = AsyncPhoneAgent(
+        agent_config=AgentConfig(verbose=False, max_steps=2),
+        device_factory=FakeAsyncDeviceFactory(),
+        confirmation_callback=confirm,
+    )
+    agent.model_client = FakeAsyncModelClient(
+        ['do(action="Back")'] * 3
+        + ['do(action="Tap", element=[1, 1], message="pay")']
+    )
+    assert asyncio.run(agent.run("loop")) == "Max steps reached"
+
+    agent.model_client.answers = ['do(action="Tap", element=[1, 1], message="pay")']
+    assert asyncio.run(agent.run("pay")) == "User cancelled sensitive operation"
+    assert asked == ["pay"]
+
+
+def test_emit_async_awaits_coroutine_listeners_in_order():
+    emitter = AgentEventEmitter()
+    seen = []
+
+    async def slow(event):
+        await asyncio.sleep(0.01)
+        seen.append(("slow", event["type"]))
+
+    def broken(event):
+        raise RuntimeError("listener bug")
+
+    emitter.on(slow)
+    emitter.on(broken)
+    emitter.on(lambda event: seen.append(("sync", event["type"])))
+
+    asyncio.run(emitter.emit_async({"type": "a"}))
+    assert seen == [("slow", "a"), ("sync", "a")]
+
+    # Synchronous emit without a loop runs the coroutine to completion
+    emitter.emit({"type": "b"})
+    assert seen[-2:] == [("slow", "b"), ("sync", "b")]
+
+    async def emit_inside_loop():
+        emitter.emit({"type": "c"})
+        assert ("slow", "c") not in seen
+        await asyncio.sleep(0.05)
+
+    asyncio.run(emit_inside_loop())
+    assert ("slow", "c") in seen
+
+
+def _chunks(*texts):
+    return [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+        for text in texts
+    ]
+
+
+STREAM = ("I should ", "tap the ", "icon. do", "(act", 'ion="Tap", element=[1, 2])')
+
+
+def test_async_model_client_streams_like_sync_client(events):
+    sync_client = ModelClient(ModelConfig(lang="en"))
+    sync_client.client = SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(create=lambda **kwargs: iter(_chunks(*STREAM)))
+        )
+    )
+    sync_response = sync_client.request([])
+    sync_events = [(e["type"], e["payload"].get("text")) for e in events]
+    events.clear()
+
+    async def create(**kwargs):
+        assert kwargs["stream"] is True
+
+        async def stream():
+            for chunk in _chunks(*STREAM):
+                yield chunk
+
+        return stream()
+
+    client = AsyncModelClient(ModelConfig(lang="en"))
+    client.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    response = asyncio.run(client.request([]))
+
+    assert (response.thinking, response.action) == (
+        sync_response.thinking,
+        sync_response.action,
+    )
+    assert response.action == 'do(action="Tap", element=[1, 2])'
+    assert [(e["type"], e["payload"].get("text")) for e in events] == sync_events
+    assert ("thinking_chunk", "I should ") in sync_events
+    assert ("thinking_complete", None) in sync_events
@@ -0,0 +1,207 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from phone_agent.adb import device as adb_device
+from phone_agent.app_resolver import AppIndex, CurrentAppCache, get_app_index
+from phone_agent.config.apps import APP_PACKAGES
+from phone_agent.config.apps_harmonyos import APP_PACKAGES as HARMONY_PACKAGES
+from phone_agent.config.apps_ios import APP_PACKAGES_IOS
+from phone_agent.hdc import device as hdc_device
+from tests.factories.fake_adb import read_log
+
+FIXTURES = Path(__file__).resolve().parents[2] / "fixtures" / "dumpsys"
+
+
+def legacy_adb_app(output: str) -> str:
+    """The nested scan get_current_app used before the index."""
+    for line in output.split("\n"):
+        if "mCurrentFocus" in line or "mFocusedApp" in line:
+            for app_name, package in APP_PACKAGES.items():
+                if package in line:
+                    return app_name
+    return "System Home"
+
+
+def indexed_adb_app(output: str) -> str:
+    index = get_app_index(APP_PACKAGES)
+    for line in output.split("\n"):
+        if "mCurrentFocus" in line or "mFocusedApp" in line:
+            app_name = index.find_in(line)
+            if app_name is not None:
+                return app_name
+    return "System Home"
+
+
+def focus_lines(package: str, activity: str = ".MainActivity") -> str:
+    return (
+        f"  mCurrentFocus=Window{{8f1c2d4 u0 {package}/{activity}}}\n"
+        f"  mFocusedApp=ActivityRecord{{d2c7e90 u0 {package}/{activity} t12}}\n"
+    )
+
+
+@pytest.mark.parametrize("fixture", ["window_wechat.txt", "window_launcher.txt"])
+def test_index_matches_legacy_scan_on_fixtures(fixture):
+    output = (FIXTURES / fixture).read_text(encoding="utf-8")
+
+    assert indexed_adb_app(output) == legacy_adb_app(output)
+
+
+def test_index_matches_legacy_scan_for_every_package():
+    activities = [".MainActivity", "com.tencent.mm.ui.LauncherUI", ".editors.docs"]
+    for package in set(APP_PACKAGES.values()):
+        for activity in activities:
+            output = focus_lines(package, activity)
+            assert indexed_adb_app(output) == legacy_adb_app(output), package
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        # One package is a prefix of another
+        "mCurrentFocus=Window{1 u0 com.google.android.apps.docs.editors.docs/.Main}",
+        # A known package inside a longer unknown token
+        "mCurrentFocus=Window{1 u0 xcom.tencent.mmx/.Main}",
+        # Two known packages on one line
+        "mFocusedApp=ActivityRecord{1 u0 com.xingin.xhs/com.tencent.mm.Share t3}",
+        "mCurrentFocus=null",
+        "mCurrentFocus=Window{1 u0 com.example.unknown/.Main}",
+    ],
+)
+def test_index_matches_legacy_scan_on_edge_cases(line):
+    assert indexed_adb_app(line) == legacy_adb_app(line)
+
+
+def test_duplicate_packages_resolve_to_first_name():
+    index = AppIndex({"Docs": "com.example.docs", "文档": "com.example.docs"})
+
+    assert index.name_for("com.example.docs") == "Docs"
+    assert index.find_in("u0 com.example.docs/.Main") == "Docs"
+    assert index.name_for("com.example.other") is None
+
+
+@pytest.mark.parametrize("table", [HARMONY_PACKAGES, APP_PACKAGES_IOS])
+def test_exact_lookup_matches_legacy_scan(table):
+    index = get_app_index(table)
+    for package in set(table.values()) | {"com.example.unknown"}:
+        legacy = next((name for name, p in table.items() if p == package), None)
+        assert index.name_for(package) == legacy
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_expires_after_ttl():
+    clock = Clock()
+    cache = CurrentAppCache(lambda: 0.5, clock=clock)
+    cache.put("serial", "微信")
+
+    clock.now = 0.4
+    assert cache.get("serial") == "微信"
+    clock.now = 0.5
+    assert cache.get("serial") is None
+
+
+def test_cache_invalidation():
+    cache = CurrentAppCache(lambda: 10)
+    cache.put("a", "微信")
+    cache.put("b", "淘宝")
+    cache.put(None, "设置")
+
+    cache.invalidate("a")
+    assert (cache.get("a"), cache.get("b"), cache.get(None)) == (None, "淘宝", None)
+
+    cache.invalidate()
+    assert cache.get("b") is None
+
+
+def test_cache_skips_lookups_started_before_invalidation():
+    cache = CurrentAppCache(lambda: 10)
+    generation = cache.generation
+    cache.invalidate("a")
+
+    cache.put("a", "stale", generation)
+
+    assert cache.get("a") is None
+
+
+def test_zero_ttl_disables_cache():
+    cache = CurrentAppCache(lambda: 0)
+    cache.put("a", "微信")
+
+    assert cache.get("a") is None
+
+
+def test_adb_query_is_filtered_and_cached_until_an_action(fake_adb, monkeypatch):
+    root = fake_adb(
+        dumpsys_window=(FIXTURES / "window_wechat.txt").read_text(encoding="utf-8")
+    )
+    monkeypatch.setattr(adb_device, "wait_after_action", lambda *args: None)
+
+    assert adb_device.get_current_app("serial-1") == "微信"
+    assert adb_device.get_current_app("serial-1") == "微信"
+    assert read_log(root, "device.log") == ["dumpsys window"]
+
+    adb_device.back("serial-1")
+    assert adb_device.get_current_app("serial-1") == "微信"
+    assert read_log(root, "device.log") == [
+        "dumpsys window",
+        "input keyevent 4",
+        "dumpsys window",
+    ]
+
+
+def test_adb_falls_back_to_full_dump_without_focus_lines(fake_adb):
+    root = fake_adb(dumpsys_window="WINDOW MANAGER WINDOWS (dumpsys window windows)\n")
+
+    assert adb_device.get_current_app("serial-1") == "System Home"
+    assert read_log(root, "device.log") == ["dumpsys window", "dumpsys window"]
+
+
+def test_adb_raises_on_empty_dump_like_before(fake_adb):
+    fake_adb(dumpsys_window="")
+
+    with pytest.raises(ValueError, match="No output from dumpsys window"):
+        adb_device.get_current_app("serial-1")
+
+
+def legacy_hdc_bundle(output: str) -> str | None:
+    foreground_bundle = None
+    current_bundle = None
+    for line in output.split("\n"):
+        if "app name [" in line:
+            current_bundle = line.split("[", 1)[1].split("]", 1)[0]
+        if "state #FOREGROUND" in line or "state #foreground" in line.lower():
+            if current_bundle:
+                foreground_bundle = current_bundle
+                break
+        if "Mission ID" in line:
+            current_bundle = None
+    return foreground_bundle
+
+
+def test_hdc_resolver_matches_fixture(monkeypatch):
+    output = (FIXTURES / "aa_dump_l.txt").read_text(encoding="utf-8")
+    calls = []
+
+    def fake_run(args, device_id=None, timeout=None):
+        calls.append(args)
+        return subprocess.CompletedProcess(args, 0, stdout=output, stderr="")
+
+    monkeypatch.setattr(hdc_device, "run_shell_command", fake_run)
+    hdc_device._CURRENT_APP_CACHE.clear()
+
+    bundle = legacy_hdc_bundle(output)
+    expected = next(
+        name for name, package in HARMONY_PACKAGES.items() if package == bundle
+    )
+    assert hdc_device.get_current_app("hdc-1") == expected == "快手"
+    assert hdc_device.get_current_app("hdc-1") == expected
+    assert len(calls) == 1
+    hdc_device._CURRENT_APP_CACHE.clear()
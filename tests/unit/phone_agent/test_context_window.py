@@ -0,0 +1,139 @@
+import pytest
+
+from phone_agent.actions import handler as handler_module
+from phone_agent.agent import AgentConfig, PhoneAgent
+from phone_agent.context_window import (
+    HISTORY_HEADER,
+    ContextWindow,
+    ContextWindowConfig,
+    estimate_tokens,
+)
+from phone_agent.events import get_global_event_emitter
+from tests.factories.fake_device import FakeDeviceFactory, FakeModelClient
+
+ANSWERS = [
+    'do(action="Tap", element=[500, 500])',
+    'do(action="Swipe", start=[500, 800], end=[500, 200])',
+    'do(action="Back")',
+    'do(action="Type", text="hello")',
+]
+
+
+@pytest.fixture
+def events():
+    received = []
+    emitter = get_global_event_emitter()
+    emitter.on(received.append)
+    yield received
+    emitter.off(received.append)
+
+
+def run_agent(monkeypatch, answers, window=None, max_steps=100):
+    factory = FakeDeviceFactory()
+    monkeypatch.setattr(handler_module, "get_device_factory", lambda: factory)
+    config = AgentConfig(verbose=False, max_steps=max_steps)
+    if window is not None:
+        config.context_window = window
+    agent = PhoneAgent(agent_config=config)
+    agent.model_client = FakeModelClient(answers)
+    result = agent.run("send a message")
+    return agent, factory, result
+
+
+def text_of(message):
+    content = message["content"]
+    if isinstance(content, str):
+        return content
+    return "".join(item["text"] for item in content if item["type"] == "text")
+
+
+def test_short_runs_are_unchanged(monkeypatch):
+    full, full_factory, full_result = run_agent(
+        monkeypatch, ANSWERS, ContextWindowConfig(enabled=False)
+    )
+    windowed, factory, result = run_agent(monkeypatch, ANSWERS)
+
+    assert result == full_result == "done"
+    assert windowed.context == full.context
+    assert windowed.model_client.requests == full.model_client.requests
+    assert factory.actions() == full_factory.actions()
+
+
+def test_long_runs_keep_the_last_steps_and_summarize_the_rest(monkeypatch, events):
+    answers = ['do(action="Back")'] * 30
+    agent, _, result = run_agent(
+        monkeypatch, answers, ContextWindowConfig(keep_steps=4), max_steps=40
+    )
+
+    assert result == "done"
+    last = agent.model_client.requests[-1]
+    roles = [message["role"] for message in last]
+    assert roles == ["system"] + ["user", "assistant"] * 3 + ["user"]
+
+    head = text_of(last[1])
+    assert head.startswith("send a message\n\n" + HISTORY_HEADER)
+    assert "Step 1 [System Home] Back() -> ok" in head
+    assert "Step 27 [System Home] Back() -> ok" in head
+    assert "Step 28 " not in head
+    # The newest steps stay verbatim
+    assert text_of(last[-1]).startswith("** Screen Info **")
+    assert text_of(last[-2]) == '<think>thinking</think><answer>do(action="Back")</answer>'
+
+    stats = [e["payload"] for e in events if e["type"] == "prompt_stats"]
+    assert len(stats) == 31
+    assert [s["messages"] for s in stats[:4]] == [2, 4, 6, 8]
+    assert {s["messages"] for s in stats[4:]} == {8}
+    assert stats[-1]["summarized_steps"] == 27
+    assert stats[0]["image_bytes"] > 0
+
+
+def test_budget_folds_steps_and_drops_old_summaries():
+    window = ContextWindow(ContextWindowConfig(keep_steps=10, max_bytes=600))
+    window.start("task")
+    context = [{"role": "system", "content": "system prompt"}]
+    sizes = []
+    for step in range(1, 41):
+        context.append(
+            {"role": "user", "content": [{"type": "text", "text": f"screen {step}"}]}
+        )
+        stats = window.fit(context)
+        sizes.append(stats.text_bytes)
+        assert stats.text_bytes == window.measure(context).text_bytes
+        context.append({"role": "assistant", "content": "x" * 100})
+        window.record(step, "Settings", {"_metadata": "do", "action": "Back"}, True)
+
+    assert max(sizes) <= 600
+    steps = (len(context) - 1) // 2
+    assert [m["role"] for m in context] == ["system"] + ["user", "assistant"] * steps
+    head = text_of(context[1])
+    assert head.startswith("task\n\n" + HISTORY_HEADER + "\n(")
+    assert "earlier steps omitted)" in head
+    assert stats.summarized_steps == 40 - steps
+    assert head.endswith("\n\nscreen 40")
+
+
+def test_summaries_are_short_and_report_failures():
+    window = ContextWindow(ContextWindowConfig(keep_steps=1))
+    window.start("t")
+    context = [
+        {"role": "system", "content": "s"},
+        {"role": "user", "content": "first"},
+        {"role": "assistant", "content": "a"},
+        {"role": "user", "content": "second"},
+    ]
+    action = {"_metadata": "do", "action": "Type", "text": "y" * 500}
+    window.record(1, "Notes", action, False, "no field")
+    window.fit(context)
+
+    assert len(context) == 2
+    summary = context[1]["content"].split("\n")[3]
+    assert summary.startswith("Step 1 [Notes] Type(text='yyy")
+    assert summary.endswith("...) -> failed: no field")
+    assert len(summary) < 120
+    assert context[1]["content"].endswith("\n\nsecond")
+
+
+def test_estimate_tokens_counts_cjk_per_character():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("打开微信") == 4
@@ -0,0 +1,131 @@
+from pathlib import Path
+
+import pytest
+
+from phone_agent.actions import handler as handler_module
+from phone_agent.agent import AgentConfig, PhoneAgent
+from phone_agent.decision_cache import (
+    DecisionCache,
+    hash_distance,
+    normalize_task,
+    perceptual_hash,
+)
+from phone_agent.events import get_global_event_emitter
+from tests.factories.fake_device import FakeDeviceFactory, FakeModelClient
+
+SCREENS = Path(__file__).resolve().parents[2] / "fixtures" / "screens"
+
+ANSWERS = [
+    'do(action="Launch", app="微信")',
+    'do(action="Tap", element=[150, 160])',
+    'finish(message="Opened the chat")',
+]
+
+
+def screen(name):
+    return (SCREENS / f"{name}.png").read_bytes()
+
+
+@pytest.fixture
+def events():
+    received = []
+    emitter = get_global_event_emitter()
+    emitter.on(received.append)
+    yield received
+    emitter.off(received.append)
+
+
+def run(monkeypatch, cache, answers, screens, task="Open the chat with Zhang Wei"):
+    factory = FakeDeviceFactory(
+        screens=[screen(name) for name in screens],
+        apps=["System Home" if name.startswith("home") else "微信" for name in screens],
+        width=270,
+        height=600,
+    )
+    monkeypatch.setattr(handler_module, "get_device_factory", lambda: factory)
+    agent = PhoneAgent(agent_config=AgentConfig(verbose=False, decision_cache=cache))
+    agent.model_client = FakeModelClient(answers)
+    result = agent.run(task)
+    return agent, factory, result
+
+
+def test_fixture_screens_hash_apart_and_minor_changes_hash_together():
+    hashes = {
+        name: perceptual_hash(screen(name))
+        for name in ("home", "home_later", "wechat_chats", "wechat_chat")
+    }
+    # Only the clock differs
+    assert hash_distance(hashes["home"], hashes["home_later"]) <= 10
+    for a, b in (("home", "wechat_chats"), ("wechat_chats", "wechat_chat")):
+        assert hash_distance(hashes[a], hashes[b]) > 40
+
+
+def test_tasks_are_normalized():
+    assert normalize_task(" Open  the chat with Zhang Wei. ") == normalize_task(
+        "open the chat with zhang wei"
+    )
+    assert normalize_task("打开微信。") == normalize_task("打开 微信")
+
+
+def test_repeated_run_is_served_from_the_cache(monkeypatch, events):
+    cache = DecisionCache()
+    _, first, result = run(
+        monkeypatch, cache, ANSWERS, ["home", "wechat_chats", "wechat_chat"]
+    )
+    assert result == "Opened the chat"
+    assert len(cache) == 3
+    events.clear()
+
+    agent, second, result = run(
+        monkeypatch,
+        cache,
+        [],
+        ["home_later", "wechat_chats", "wechat_chat"],
+        task="open the chat with zhang wei",
+    )
+
+    assert result == "Opened the chat"
+    assert agent.model_client.requests == []
+    assert second.actions() == first.actions()
+    assert (cache.stats.hits, cache.stats.lookups) == (3, 6)
+    assert cache.stats.hit_rate == 0.5
+    assert cache.stats.time_saved > 0
+
+    cache_events = [e["payload"] for e in events if e["type"] == "decision_cache"]
+    assert [e["hit"] for e in cache_events] == [True, True, True]
+    assert cache_events[-1]["hit_rate"] == 0.5
+    assert not [e for e in events if e["type"] == "screenshot_encoded"]
+
+
+def test_unexpected_screen_evicts_and_falls_back_to_the_model(monkeypatch):
+    cache = DecisionCache()
+    run(monkeypatch, cache, ANSWERS, ["home", "wechat_chats", "wechat_chat"])
+
+    # The launch did not change the screen this time
+    agent, factory, result = run(
+        monkeypatch,
+        cache,
+        ['do(action="Launch", app="微信")', 'finish(message="gave up")'],
+        ["home", "home", "wechat_chats", "wechat_chat"],
+    )
+
+    assert cache.stats.evictions == 1
+    # The fallback step did no lookup, so it does not count as a miss
+    assert (cache.stats.hits, cache.stats.lookups) == (3, 6)
+    assert len(agent.model_client.requests) == 1
+    # Step 3 sees the chat list again and is served from the cache
+    assert [call[0] for call in factory.actions()] == ["launch_app", "launch_app", "tap"]
+    assert result == "Opened the chat"
+
+
+def test_failed_runs_are_not_cached(monkeypatch):
+    cache = DecisionCache()
+    factory = FakeDeviceFactory(screens=[screen("home")])
+    monkeypatch.setattr(handler_module, "get_device_factory", lambda: factory)
+    agent = PhoneAgent(
+        agent_config=AgentConfig(verbose=False, max_steps=2, decision_cache=cache)
+    )
+    agent.model_client = FakeModelClient(['do(action="Back")'] * 2)
+
+    assert agent.run("go back") == "Max steps reached"
+    assert len(cache) == 0
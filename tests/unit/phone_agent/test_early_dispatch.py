@@ -0,0 +1,205 @@
+import asyncio
+import time
+
+import pytest
+
+from phone_agent.agent import AgentConfig, PhoneAgent
+from phone_agent.events import get_global_event_emitter
+from phone_agent.model.client import AsyncModelClient, ModelClient, ModelConfig
+from phone_agent.model.stream_parser import ActionStreamParser
+from tests.factories.fake_device import FakeDeviceFactory
+from tests.factories.fake_openai import start_fake_openai_server, tokenize
+
+THINKING = "The settings icon is on the home screen, so I tap it. "
+# Tokens some models emit after the call; early dispatch does not wait for them
+TAIL = "\n</answer>" + " trailing explanation" * 20
+TOKEN_DELAY = 0.01
+
+
+def action_ends(text, chunk=3):
+    ends = []
+    parser = ActionStreamParser(on_action_end=ends.append)
+    for i in range(0, len(text), chunk):
+        parser.feed(text[i : i + chunk])
+        if ends:
+            return ends, i + chunk
+    parser.close()
+    return ends, None
+
+
+@pytest.mark.parametrize(
+    "call",
+    [
+        'do(action="Tap", element=[500, 500])',
+        'do(action="Swipe", start=[1, 2], end=[3, 4])',
+        'do(action="Launch", app="Notes (beta)")',
+        'do(action="Tap", element=[1, 2], message="pay \\"now\\")")',
+        'do(action="Back")',
+    ],
+)
+def test_structured_call_ends_at_its_closing_parenthesis(call):
+    ends, fed = action_ends(THINKING + call + TAIL, chunk=1)
+    assert ends == [call]
+    # Reported on the closing parenthesis itself
+    assert fed == len(THINKING + call)
+
+
+@pytest.mark.parametrize(
+    "call",
+    [
+        'finish(message="done")',
+        'finish(message="He said "ok")!")',
+        'do(action="Type", text="a "quoted" word")',
+        'do(action="Type_Name", text="x")y")',
+    ],
+)
+def test_free_text_call_needs_one_character_of_lookahead(call):
+    ends, fed = action_ends(THINKING + call + TAIL, chunk=1)
+    assert ends == [call]
+    assert fed == len(THINKING + call) + 1
+
+
+def test_incomplete_calls_are_not_reported():
+    for text in (
+        'do(action="Tap", element=[500, 500]',
+        'do(action="Type", text="unterminated',
+        'finish(message="done")',  # No lookahead character
+        "no action at all",
+    ):
+        assert action_ends(THINKING + text)[0] == []
+
+
+@pytest.fixture
+def events():
+    received = []
+    emitter = get_global_event_emitter()
+    emitter.on(received.append)
+    yield received
+    emitter.off(received.append)
+
+
+@pytest.fixture
+def server():
+    server = start_fake_openai_server(
+        respond=lambda messages: THINKING + 'do(action="Tap", element=[500, 500])' + TAIL,
+        token_delay=TOKEN_DELAY,
+    )
+    yield server
+    server.close()
+
+
+def make_config(server, **kwargs):
+    return ModelConfig(base_url=server.base_url, api_key="fake", lang="en", **kwargs)
+
+
+def metrics(events):
+    return {
+        event["payload"]["name"]: event["payload"].get("value")
+        for event in events
+        if event["type"] == "performance_metric"
+    }
+
+
+def test_early_dispatch_returns_the_action_and_drops_the_stream(server, events):
+    full = ModelClient(make_config(server)).request([])
+    tail_tokens = len(tokenize(TAIL))
+    assert server.tokens_sent == [len(tokenize(full.raw_content))]
+    assert full.action.endswith(TAIL) and not full.stream_cut
+    events.clear()
+
+    response = ModelClient(
+        make_config(server, early_dispatch=True, tail_sample_interval=0)
+    ).request([])
+
+    assert response.stream_cut
+    assert response.action == 'do(action="Tap", element=[500, 500])'
+    assert response.thinking == full.thinking
+    assert response.total_time < full.total_time - tail_tokens * TOKEN_DELAY / 2
+    assert response.time_to_action_end <= response.total_time
+    # No tail has been measured, so no time saved is claimed
+    assert response.time_saved is None
+
+    # The server stops producing tokens once the client hangs up
+    time.sleep(10 * TOKEN_DELAY)
+    assert server.tokens_sent[1] < len(tokenize(full.raw_content)) - tail_tokens / 2
+
+    recorded = metrics(events)
+    assert "early_dispatch_time_saved" not in recorded
+    assert recorded["time_to_action_end"] == round(response.time_to_action_end, 3)
+
+
+def test_sampled_cut_streams_are_drained_to_measure_the_tail(server, events):
+    client = ModelClient(make_config(server, early_dispatch=True))
+    full_tokens = len(tokenize(THINKING + 'do(action="Tap", element=[500, 500])' + TAIL))
+
+    first = client.request([])
+    assert first.stream_cut and first.time_saved is None
+    # The first cut stream is read to the end in the background
+    deadline = time.monotonic() + 5
+    while client._tail_time is None and time.monotonic() < deadline:
+        time.sleep(TOKEN_DELAY)
+    assert server.tokens_sent == [full_tokens]
+    tail = client._tail_time
+    assert tail > len(tokenize(TAIL)) * TOKEN_DELAY / 2
+
+    events.clear()
+    second = client.request([])
+    assert second.stream_cut and second.time_saved == tail
+    assert metrics(events)["early_dispatch_time_saved"] == round(tail, 3)
+    time.sleep(10 * TOKEN_DELAY)
+    assert server.tokens_sent[1] < full_tokens
+
+
+def test_time_saved_uses_the_tail_of_earlier_full_streams(server):
+    client = ModelClient(make_config(server))
+    full = client.request([])
+    client.config.early_dispatch = True
+    response = client.request([])
+
+    assert response.stream_cut
+    assert response.time_saved == pytest.approx(
+        full.total_time - full.time_to_action_end
+    )
+
+
+def test_first_complete_call_wins_over_a_later_finish():
+    reply = THINKING + 'do(action="Back") then finish(message="late") '
+    server = start_fake_openai_server(respond=lambda messages: reply, token_delay=0)
+    try:
+        full = ModelClient(make_config(server)).request([])
+        cut = ModelClient(make_config(server, early_dispatch=True)).request([])
+    finally:
+        server.close()
+
+    # Documented on ModelConfig.early_dispatch
+    assert full.action.startswith('finish(message="late")')
+    assert cut.action == 'do(action="Back")'
+
+
+def test_async_client_cuts_the_stream_too(server):
+    client = AsyncModelClient(make_config(server, early_dispatch=True))
+    response = asyncio.run(client.request([]))
+
+    assert response.stream_cut
+    assert response.action == 'do(action="Tap", element=[500, 500])'
+
+
+def test_agent_runs_the_action_before_the_stream_would_end(server):
+    factory = FakeDeviceFactory()
+    agent = PhoneAgent(
+        make_config(server, early_dispatch=True),
+        AgentConfig(verbose=False, max_steps=2),
+        device_factory=factory,
+    )
+
+    start = time.perf_counter()
+    result = agent.step("open settings")
+    elapsed = time.perf_counter() - start
+
+    assert result.action["action"] == "Tap"
+    assert factory.actions() == [("tap", 540, 1200, None)]
+    # The context keeps the clean call, without the dropped tail
+    assert agent.context[-1]["content"].endswith(
+        '<answer>do(action="Tap", element=[500, 500])</answer>'
+    )
+    assert elapsed < len(tokenize(THINKING + TAIL)) * TOKEN_DELAY
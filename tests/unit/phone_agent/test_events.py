@@ -0,0 +1,163 @@
+import threading
+import time
+
+import pytest
+
+from phone_agent.events import (
+    OVERFLOW_BLOCK,
+    OVERFLOW_COALESCE,
+    OVERFLOW_DROP_OLDEST,
+    AgentEvent,
+    AgentEventEmitter,
+    DispatchConfig,
+)
+
+
+@pytest.fixture
+def emitter():
+    emitter = AgentEventEmitter()
+    yield emitter
+    emitter.stop_dispatch()
+
+
+def event(index, event_type="status", **payload):
+    return AgentEvent(type=event_type, payload={"index": index, **payload}, step=1)
+
+
+class Gate:
+    """Listener that holds its worker on the first event until opened."""
+
+    def __init__(self):
+        self.received = []
+        self.started = threading.Event()
+        self.opened = threading.Event()
+
+    def __call__(self, payload):
+        self.started.set()
+        self.opened.wait(5)
+        self.received.append(payload)
+
+
+def test_batched_delivery_keeps_emission_order(emitter):
+    batches = []
+    emitter.on(batches.append, batched=True)
+    emitter.start_dispatch(DispatchConfig(max_batch=16, batch_window=0.05))
+
+    for index in range(100):
+        emitter.emit(event(index))
+    assert emitter.flush(5)
+
+    flat = [payload["payload"]["index"] for batch in batches for payload in batch]
+    assert flat == list(range(100))
+    assert max(len(batch) for batch in batches) == 16
+    assert len(batches) < 100
+
+
+def test_slow_and_failing_listeners_do_not_hold_up_the_producer(emitter):
+    gate, fast = Gate(), []
+
+    def failing(payload):
+        raise RuntimeError("boom")
+
+    def slow_listener(payload):
+        gate(payload)
+
+    for listener in (failing, slow_listener, fast.append):
+        emitter.on(listener)
+    emitter.start_dispatch()
+
+    for index in range(5):
+        emitter.emit(event(index))
+
+    # Every emit returned while the slow listener is still stuck on the first
+    assert gate.started.wait(5)
+    assert gate.received == []
+    time.sleep(0.1)
+    gate.opened.set()
+
+    assert emitter.flush(5)
+    assert len(gate.received) == len(fast) == 5
+    stats = {s["listener"]: s for s in emitter.dispatch_stats()}
+    assert stats[failing.__qualname__]["errors"] == 5
+    assert stats[slow_listener.__qualname__]["max_lag_ms"] >= 100
+
+
+def test_drop_oldest_keeps_the_newest_events(emitter):
+    gate = Gate()
+    emitter.on(gate)
+    emitter.start_dispatch(DispatchConfig(max_queue=3, overflow=OVERFLOW_DROP_OLDEST))
+
+    emitter.emit(event(0))
+    assert gate.started.wait(5)
+    for index in range(1, 10):
+        emitter.emit(event(index))
+
+    (stats,) = emitter.dispatch_stats()
+    assert (stats["depth"], stats["max_depth"], stats["dropped"]) == (3, 3, 6)
+    gate.opened.set()
+    assert emitter.flush(5)
+    assert [p["payload"]["index"] for p in gate.received] == [0, 7, 8, 9]
+
+
+def test_coalesce_merges_thinking_text_without_losing_any(emitter):
+    gate = Gate()
+    emitter.on(gate)
+    emitter.start_dispatch(DispatchConfig(max_queue=2, overflow=OVERFLOW_COALESCE))
+
+    emitter.emit(event(0))
+    assert gate.started.wait(5)
+    chunks = [f"part {index}, " for index in range(20)]
+    for chunk in chunks:
+        emitter.emit(AgentEvent(type="thinking_chunk", payload={"text": chunk}, step=1))
+    # Other events cannot be merged and fall back to dropping the oldest
+    emitter.emit(event(1))
+
+    gate.opened.set()
+    assert emitter.flush(5)
+    texts = [p["payload"]["text"] for p in gate.received if p["type"] == "thinking_chunk"]
+    (stats,) = emitter.dispatch_stats()
+    assert stats["coalesced"] == 18 and stats["dropped"] == 1
+    assert texts == ["".join(chunks[1:])]
+    assert gate.received[-1]["payload"]["index"] == 1
+
+
+def test_block_waits_for_the_listener_and_loses_nothing(emitter):
+    gate = Gate()
+    emitter.on(gate)
+    emitter.start_dispatch(DispatchConfig(max_queue=2, overflow=OVERFLOW_BLOCK))
+
+    producer = threading.Thread(
+        target=lambda: [emitter.emit(event(index)) for index in range(10)]
+    )
+    producer.start()
+    assert gate.started.wait(5)
+    producer.join(0.1)
+    assert producer.is_alive()
+
+    gate.opened.set()
+    producer.join(5)
+    assert emitter.flush(5)
+    assert [p["payload"]["index"] for p in gate.received] == list(range(10))
+    assert emitter.dispatch_stats()[0]["dropped"] == 0
+
+
+def test_off_delivers_queued_events_and_stop_returns_to_sync(emitter):
+    received = []
+
+    def listener(payload):
+        time.sleep(0.01)
+        received.append(payload)
+
+    emitter.on(listener)
+    emitter.start_dispatch()
+    for index in range(5):
+        emitter.emit(event(index))
+    emitter.off(listener)
+    assert len(received) == 5
+    assert emitter.dispatch_stats() == []
+
+    emitter.stop_dispatch()
+    batches = []
+    emitter.on(batches.append, batched=True)
+    emitter.emit(event(5))
+    assert [[p["payload"]["index"] for p in batch] for batch in batches] == [[5]]
@@ -0,0 +1,242 @@
+import threading
+import time
+
+import pytest
+
+from phone_agent import agent as agent_module
+from phone_agent.device_factory import DeviceFactory, DeviceType
+from phone_agent.fleet import FleetDevice, FleetScheduler, TaskStatus
+from tests.factories.fake_device import FakeDeviceFactory, FakeModelClient
+
+
+class StepAgent:
+    """Fake agent taking ``steps`` steps of ``step_time`` seconds each."""
+
+    active: dict[str, int] = {}
+    overlaps: list[str] = []
+    lock = threading.Lock()
+
+    def __init__(self, device, steps=2, step_time=0.02, fail=False):
+        self.device = device
+        self.steps = steps
+        self.step_time = step_time
+        self.fail = fail
+        self.runs: list[str] = []
+        self._stop = threading.Event()
+
+    def run(self, task):
+        device_id = self.device.device_id
+        with self.lock:
+            self.active[device_id] = self.active.get(device_id, 0) + 1
+            if self.active[device_id] > 1:
+                self.overlaps.append(device_id)
+        try:
+            self.runs.append(task)
+            if self.fail:
+                raise RuntimeError("device offline")
+            for _ in range(self.steps):
+                if self._stop.is_set():
+                    return "Task stopped"
+                time.sleep(self.step_time)
+            return f"{task} on {device_id}"
+        finally:
+            self._stop.clear()
+            with self.lock:
+                self.active[device_id] -= 1
+
+    def request_stop(self):
+        self._stop.set()
+
+    def reset(self):
+        self._stop.clear()
+
+
+@pytest.fixture
+def fleet():
+    schedulers = []
+    StepAgent.active = {}
+    StepAgent.overlaps = []
+
+    def _make(devices, **agent_kwargs):
+        agents = {}
+
+        def factory(device):
+            agents[device.device_id] = StepAgent(device, **agent_kwargs)
+            return agents[device.device_id]
+
+        scheduler = FleetScheduler(devices, agent_factory=factory).start()
+        scheduler.agents = agents
+        schedulers.append(scheduler)
+        return scheduler
+
+    yield _make
+    for scheduler in schedulers:
+        scheduler.shutdown(cancel_pending=True)
+
+
+def android_fleet(count):
+    return [FleetDevice(f"adb-{i}", factory=FakeDeviceFactory()) for i in range(count)]
+
+
+def test_tasks_run_concurrently_with_one_task_per_device(fleet):
+    scheduler = fleet(android_fleet(3), steps=3)
+
+    tasks = [scheduler.submit(f"task {i}") for i in range(9)]
+
+    assert scheduler.join(timeout=10)
+    assert [t.status for t in tasks] == [TaskStatus.COMPLETED] * 9
+    assert StepAgent.overlaps == []
+    assert {t.assigned_device for t in tasks} == {"adb-0", "adb-1", "adb-2"}
+    assert sorted(len(a.runs) for a in scheduler.agents.values()) == [3, 3, 3]
+
+    metrics = scheduler.metrics()
+    assert (metrics.submitted, metrics.completed, metrics.pending) == (9, 9, 0)
+    assert metrics.throughput > 0
+    # Six tasks had to queue behind a busy device
+    assert metrics.queue_wait_max >= 0.05
+    assert metrics.queue_wait_mean <= metrics.queue_wait_p95 <= metrics.queue_wait_max
+    assert all(0 < u <= 1 for u in metrics.utilization.values())
+
+
+def test_tasks_bind_to_devices_of_the_requested_platform(fleet):
+    devices = [
+        FleetDevice("adb-1", factory=FakeDeviceFactory()),
+        FleetDevice("hdc-1", DeviceType.HDC, factory=FakeDeviceFactory()),
+        FleetDevice("ios-1", DeviceType.IOS, wda_url="http://ios-1:8100"),
+    ]
+    scheduler = fleet(devices)
+
+    hdc = scheduler.submit("harmony", device_type=DeviceType.HDC)
+    ios = scheduler.submit("iphone", device_type=DeviceType.IOS)
+    pinned = scheduler.submit("pinned", device_id="adb-1")
+    scheduler.join(timeout=10)
+
+    assert (hdc.assigned_device, ios.assigned_device) == ("hdc-1", "ios-1")
+    assert pinned.assigned_device == "adb-1"
+    assert ios.result == "iphone on ios-1"
+    with pytest.raises(ValueError, match="No device"):
+        scheduler.submit("nothing", device_type=DeviceType.HDC, device_id="adb-1")
+
+
+def test_devices_get_their_own_factories():
+    adb, hdc = FleetDevice("adb-1"), FleetDevice("hdc-1", DeviceType.HDC)
+
+    assert isinstance(adb.factory, DeviceFactory) and adb.factory is not hdc.factory
+    assert hdc.factory.device_type == DeviceType.HDC
+    assert FleetDevice("ios-1", DeviceType.IOS).factory is None
+
+
+def test_timeout_stops_task_and_frees_the_device(fleet):
+    scheduler = fleet(android_fleet(1), steps=1000, step_time=0.01)
+
+    slow = scheduler.submit("forever", timeout=0.1)
+    after = scheduler.submit("next", timeout=0.05)
+    assert slow.wait(5) and after.wait(5)
+
+    assert slow.status == after.status == TaskStatus.TIMED_OUT
+    assert slow.result == "Task stopped"
+    assert 0.1 <= slow.run_time < 1
+    assert after.started_at >= slow.finished_at
+    assert scheduler.metrics().timed_out == 2
+
+
+def test_cancel_pending_and_running_tasks(fleet):
+    scheduler = fleet(android_fleet(1), steps=1000, step_time=0.01)
+
+    running = scheduler.submit("running")
+    queued = scheduler.submit("queued")
+    while running.status != TaskStatus.RUNNING:
+        time.sleep(0.005)
+
+    assert scheduler.cancel(queued.task_id)
+    assert queued.done and queued.status == TaskStatus.CANCELLED
+    assert queued.started_at is None
+    assert scheduler.cancel(running)
+    assert running.wait(5) and running.status == TaskStatus.CANCELLED
+    assert not scheduler.cancel(running)
+    assert scheduler.agents["adb-0"].runs == ["running"]
+
+
+def test_cancel_just_before_the_agent_run_starts_is_not_lost():
+    entered, proceed = threading.Event(), threading.Event()
+
+    class LateStartingAgent(StepAgent):
+        def run(self, task):
+            # The cancel lands after the scheduler's check but before run()
+            # looks at the stop flag
+            entered.set()
+            proceed.wait(5)
+            return super().run(task)
+
+    scheduler = FleetScheduler(
+        android_fleet(1),
+        agent_factory=lambda device: LateStartingAgent(device, steps=500),
+    ).start()
+    try:
+        task = scheduler.submit("scroll forever")
+        assert entered.wait(5)
+        assert scheduler.cancel(task)
+        proceed.set()
+
+        assert task.wait(2)
+        assert task.status == TaskStatus.CANCELLED
+        assert task.result == "Task stopped" and task.run_time < 2
+    finally:
+        proceed.set()
+        scheduler.shutdown(cancel_pending=True)
+
+
+def test_cancel_after_the_run_returns_does_not_stop_the_next_task():
+    scheduler = None
+
+    class LateCancelledAgent(StepAgent):
+        def run(self, task):
+            result = super().run(task)
+            if task == "first":
+                # The run has ended but the scheduler has not finished the task
+                scheduler.cancel(scheduler.tasks[0])
+            return result
+
+    scheduler = FleetScheduler(
+        android_fleet(1),
+        agent_factory=lambda device: LateCancelledAgent(device, steps=3),
+    ).start()
+    try:
+        first = scheduler.submit("first")
+        second = scheduler.submit("second")
+
+        assert second.wait(2)
+        assert first.status == TaskStatus.CANCELLED
+        assert second.status == TaskStatus.COMPLETED
+        assert second.result == "second on adb-0"
+    finally:
+        scheduler.shutdown(cancel_pending=True)
+
+
+def test_agent_error_fails_only_that_task(fleet):
+    scheduler = fleet(android_fleet(2), fail=True)
+
+    task = scheduler.submit("boom")
+    scheduler.join(timeout=10)
+
+    assert task.status == TaskStatus.FAILED
+    assert task.error == "device offline"
+    assert scheduler.metrics().failed == 1
+
+
+def test_default_agents_act_through_their_device_factory(monkeypatch):
+    monkeypatch.setattr(
+        agent_module,
+        "ModelClient",
+        lambda config: FakeModelClient(['do(action="Tap", element=[500, 500])']),
+    )
+    devices = android_fleet(2)
+    scheduler = FleetScheduler(devices).start()
+
+    first = scheduler.submit("tap", device_id="adb-0")
+    second = scheduler.submit("tap", device_id="adb-1")
+    scheduler.shutdown()
+
+    assert first.result == second.result == "done"
+    for device in devices:
+        assert device.factory.actions() == [("tap", 540, 1200, device.device_id)]
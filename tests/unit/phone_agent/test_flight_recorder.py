@@ -0,0 +1,134 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from phone_agent.agent import AgentConfig, PhoneAgent
+from phone_agent.events import AgentEvent, AgentEventEmitter
+from phone_agent.flight_recorder import (
+    FlightRecorder,
+    install_flight_recorder,
+    load_dump,
+    main,
+    replay,
+)
+from tests.factories.fake_device import FakeDeviceFactory, FakeModelClient, make_png
+
+SCREENS = Path(__file__).resolve().parents[2] / "fixtures" / "screens"
+
+
+@pytest.fixture
+def emitter():
+    return AgentEventEmitter()
+
+
+def event(index, level="info", timestamp=None):
+    return AgentEvent(
+        type="status",
+        payload={"message": f"event {index}"},
+        level=level,
+        timestamp=timestamp,
+    )
+
+
+def test_ring_buffer_keeps_the_newest_events(emitter):
+    recorder = FlightRecorder(capacity=4)
+    recorder.attach(emitter)
+    for index in range(10):
+        emitter.emit(event(index))
+    recorder.detach()
+    emitter.emit(event(10))
+
+    dump = recorder.snapshot()
+    assert len(recorder) == 4 and recorder.recorded == 10
+    assert [e["payload"]["message"] for e in dump.events] == [
+        f"event {index}" for index in range(6, 10)
+    ]
+
+
+@pytest.mark.parametrize("name", ["dump.jsonl", "dump.jsonl.gz"])
+def test_screenshots_are_stored_once_per_hash_and_round_trip(tmp_path, name):
+    recorder = FlightRecorder(capacity=10, max_screenshots=2)
+    red, blue, green = (make_png(8, 8, color) for color in ("red", "blue", "green"))
+    hashes = [
+        recorder.record_screenshot(image, step=step)
+        for step, image in enumerate([red, red, blue, green], start=1)
+    ]
+    assert hashes[0] == hashes[1] != hashes[2]
+
+    path = recorder.dump(tmp_path / name)
+    dump = load_dump(path)
+
+    assert [e["step"] for e in dump.events] == [1, 2, 3, 4]
+    # Only the two newest distinct screenshots are kept
+    assert dump.screenshots == {hashes[2]: blue, hashes[3]: green}
+    assert dump.header["events"] == 4 and dump.header["screenshots"] == 2
+
+
+def test_error_event_dumps_once_per_interval(emitter, tmp_path):
+    recorder = FlightRecorder(dump_dir=tmp_path, dump_interval=60)
+    recorder.attach(emitter)
+    emitter.emit(event(0))
+    emitter.emit(event(1, level="error"))
+    emitter.emit(event(2, level="error"))
+    recorder.detach()
+
+    deadline = time.monotonic() + 5
+    while not list(tmp_path.glob("*.jsonl.gz")) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    (path,) = tmp_path.glob("flight-*.jsonl.gz")
+    messages = [e["payload"]["message"] for e in load_dump(path).events]
+    assert messages[:2] == ["event 0", "event 1"]
+
+
+def test_timestamped_dumps_beyond_max_dumps_are_deleted(tmp_path):
+    recorder = FlightRecorder(dump_dir=tmp_path, max_dumps=2)
+    named = recorder.dump(tmp_path / "kept.jsonl")
+    written = [recorder.dump() for _ in range(4)]
+
+    assert sorted(tmp_path.iterdir()) == sorted([named] + written[-2:])
+
+
+def test_replay_keeps_the_original_spacing_scaled_by_speed():
+    events = [
+        event(index, timestamp=f"2026-01-01T00:00:0{second}").to_dict()
+        for index, second in enumerate([0, 1, 3])
+    ]
+    received, delays = [], []
+
+    assert replay(events, [received.append], speed=2, sleep=delays.append) == 3
+    assert received == events and delays == [0.5, 1.0]
+
+    delays.clear()
+    replay(events, [received.append], speed=0, sleep=delays.append)
+    assert delays == []
+
+
+def test_agent_records_step_screenshots_and_replays_them(tmp_path, capsys, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    recorder = FlightRecorder(max_screenshots=4)
+    install_flight_recorder(recorder)
+    try:
+        agent = PhoneAgent(
+            agent_config=AgentConfig(verbose=False),
+            device_factory=FakeDeviceFactory(
+                screens=[(SCREENS / "home.png").read_bytes()], width=270, height=600
+            ),
+        )
+        agent.model_client = FakeModelClient(['do(action="Home")'])
+        agent.run("Go home")
+    finally:
+        install_flight_recorder(None)
+
+    path = recorder.dump(tmp_path / "run.jsonl.gz")
+    dump = load_dump(path)
+    screenshots = [e for e in dump.events if e["type"] == "screenshot"]
+    assert [e["step"] for e in screenshots] == [1, 2]
+    assert len(dump.screenshots) == 1
+    assert dump.events[0]["type"] == "run_started"
+
+    main([str(path), "--formatter", "json", "--speed", "0", "--screenshots", "out"])
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == len(dump.events)
+    assert len(list((tmp_path / "out").glob("*.png"))) == 1
@@ -0,0 +1,137 @@
+import base64
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from phone_agent.imaging import (
+    ImageEncodingConfig,
+    Screenshot,
+    encode_screenshot,
+    is_complete_png,
+    jpeg_size,
+    png_size,
+)
+
+
+def _png(width: int, height: int) -> bytes:
+    buffered = BytesIO()
+    Image.new("RGB", (width, height), color="white").save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+def test_png_size_reads_ihdr():
+    assert png_size(_png(108, 240)) == (108, 240)
+
+
+def test_png_size_rejects_other_data():
+    assert png_size(b"") is None
+    assert png_size(b"Status: -1 Failed to take screenshot") is None
+
+    buffered = BytesIO()
+    Image.new("RGB", (4, 4)).save(buffered, format="JPEG")
+    assert png_size(buffered.getvalue()) is None
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"progressive": True}, {"exif": Image.Exif(), "quality": 50}],
+)
+def test_jpeg_size_reads_frame_header(options):
+    buffered = BytesIO()
+    Image.new("RGB", (108, 240)).save(buffered, format="JPEG", **options)
+
+    assert jpeg_size(buffered.getvalue()) == (108, 240)
+
+
+def test_jpeg_size_rejects_other_data():
+    assert jpeg_size(b"") is None
+    assert jpeg_size(_png(4, 4)) is None
+    assert jpeg_size(b"\xff\xd8\xff\xe0\x00") is None
+
+
+def test_is_complete_png_detects_truncation():
+    data = _png(20, 30)
+
+    assert is_complete_png(data)
+    assert not is_complete_png(data[:-4])
+
+
+def test_screenshot_computes_base64_and_data_url_once():
+    data = _png(10, 20)
+    shot = Screenshot(image_data=data, width=10, height=20)
+
+    assert shot.byte_size == len(data)
+    assert shot.base64_data == base64.b64encode(data).decode("utf-8")
+    assert shot.base64_data is shot.base64_data
+    assert shot.data_url.startswith("data:image/png;base64,")
+    assert shot.data_url is shot.data_url
+
+
+def test_screenshot_from_base64_decodes_on_demand():
+    data = _png(10, 20)
+    shot = Screenshot(base64_data=base64.b64encode(data).decode("utf-8"), width=10, height=20)
+
+    assert shot.byte_size == len(data)
+    assert shot.image_data == data
+
+    with pytest.raises(ValueError):
+        Screenshot(width=1, height=1)
+
+
+def test_encode_screenshot_passes_through_when_nothing_to_do():
+    shot = Screenshot(image_data=_png(108, 240), width=108, height=240)
+
+    assert encode_screenshot(shot, ImageEncodingConfig()) is shot
+    assert encode_screenshot(shot, ImageEncodingConfig(max_edge=480)) is shot
+
+
+def test_encode_screenshot_downscales_and_converts():
+    shot = Screenshot(image_data=_png(1080, 2400), width=1080, height=2400)
+
+    encoded = encode_screenshot(
+        shot, ImageEncodingConfig(max_edge=1200, format="jpg", quality=60, grayscale=True)
+    )
+
+    assert (encoded.width, encoded.height) == (540, 1200)
+    assert encoded.mime_type == "image/jpeg"
+    assert encoded.data_url.startswith("data:image/jpeg;base64,")
+    img = Image.open(BytesIO(encoded.image_data))
+    assert (img.format, img.mode, img.size) == ("JPEG", "L", (540, 1200))
+
+
+def test_encode_screenshot_webp_keeps_size():
+    shot = Screenshot(image_data=_png(100, 50), width=100, height=50)
+
+    encoded = encode_screenshot(shot, ImageEncodingConfig(format="webp"))
+
+    assert Image.open(BytesIO(encoded.image_data)).format == "WEBP"
+    assert (encoded.width, encoded.height) == (100, 50)
+
+
+def test_image_encoding_config_reads_env_and_validates(monkeypatch):
+    monkeypatch.setenv("PHONE_AGENT_IMAGE_MAX_EDGE", "960")
+    monkeypatch.setenv("PHONE_AGENT_IMAGE_FORMAT", "jpeg")
+    monkeypatch.setenv("PHONE_AGENT_IMAGE_GRAYSCALE", "1")
+
+    config = ImageEncodingConfig()
+
+    assert (config.max_edge, config.format, config.grayscale) == (960, "JPEG", True)
+
+    monkeypatch.setenv("PHONE_AGENT_IMAGE_FORMAT", "gif")
+    with pytest.raises(ValueError):
+        ImageEncodingConfig()
+
+
+def test_encode_screenshot_keeps_jpeg_captures_unless_disabled(monkeypatch):
+    buffered = BytesIO()
+    Image.new("RGB", (30, 20)).save(buffered, format="JPEG")
+    shot = Screenshot(
+        image_data=buffered.getvalue(), width=30, height=20, mime_type="image/jpeg"
+    )
+
+    assert encode_screenshot(shot, ImageEncodingConfig()) is shot
+
+    payload = encode_screenshot(shot, ImageEncodingConfig(passthrough_jpeg=False))
+    assert payload.mime_type == "image/png"
+    assert payload.image_data.startswith(b"\x89PNG")
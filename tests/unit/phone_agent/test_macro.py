@@ -0,0 +1,118 @@
+from pathlib import Path
+
+import pytest
+
+from phone_agent.agent import AgentConfig, PhoneAgent
+from phone_agent.events import get_global_event_emitter
+from phone_agent.macro import MacroLibrary, MacroPlayer
+from tests.factories.fake_device import FakeDeviceFactory, FakeModelClient
+
+SCREENS = Path(__file__).resolve().parents[2] / "fixtures" / "screens"
+
+ANSWERS = [
+    'do(action="Launch", app="微信")',
+    'do(action="Tap", element=[150, 160])',
+    'finish(message="Opened the chat")',
+]
+
+
+def screen(name):
+    return (SCREENS / f"{name}.png").read_bytes()
+
+
+def device(*names):
+    return FakeDeviceFactory(
+        screens=[screen(name) for name in names],
+        apps=["System Home" if name.startswith("home") else "微信" for name in names],
+        width=270,
+        height=600,
+    )
+
+
+def record(library, answers=ANSWERS, screens=("home", "wechat_chats", "wechat_chat")):
+    factory = device(*screens)
+    agent = PhoneAgent(
+        agent_config=AgentConfig(verbose=False, macro_library=library),
+        takeover_callback=lambda message: None,
+        device_factory=factory,
+    )
+    agent.model_client = FakeModelClient(answers)
+    result = agent.run("Open the chat with Zhang Wei\n\nprompt", macro_intent="Open the chat")
+    return factory, result
+
+
+@pytest.fixture
+def events():
+    received = []
+    emitter = get_global_event_emitter()
+    emitter.on(received.append)
+    yield received
+    emitter.off(received.append)
+
+
+def test_successful_run_is_recorded_and_replayed_without_the_model(events):
+    library = MacroLibrary()
+    live, result = record(library)
+    assert result == "Opened the chat"
+
+    macro = library.get("open the chat.")
+    assert [step.action["action"] for step in macro.steps] == ["Launch", "Tap"]
+    assert [step.checkpoint.app for step in macro.steps] == ["微信", "微信"]
+    assert macro.message == "Opened the chat"
+
+    factory = device("home_later", "wechat_chats", "wechat_chat")
+    replay = MacroPlayer(device_factory=factory).play(macro)
+
+    assert replay.success and replay.message == "Opened the chat"
+    assert replay.completed_steps == 2
+    assert factory.actions() == live.actions()
+    payload = [e["payload"] for e in events if e["type"] == "macro_replay"][-1]
+    assert payload["success"] and payload["completed_steps"] == 2
+
+
+def test_replay_stops_at_the_first_missed_checkpoint():
+    library = MacroLibrary()
+    record(library)
+
+    # The launch leaves the home screen up
+    factory = device("home", "home", "home", "wechat_chats")
+    replay = MacroPlayer(device_factory=factory, checkpoint_retries=1, retry_interval=0).play(
+        library.get("open the chat")
+    )
+
+    assert not replay.success
+    assert (replay.diverged_at, replay.reason, replay.completed_steps) == (0, "checkpoint", 0)
+    assert [call[0] for call in factory.actions()] == ["launch_app"]
+
+
+def test_screen_dependent_first_action_checks_the_start_screen():
+    library = MacroLibrary()
+    record(library, ANSWERS[1:], ("wechat_chats", "wechat_chat"))
+
+    factory = device("home")
+    replay = MacroPlayer(device_factory=factory).play(library.get("open the chat"))
+
+    assert (replay.success, replay.reason) == (False, "start")
+    assert factory.actions() == []
+
+
+def test_library_persists_to_json(tmp_path):
+    path = tmp_path / "macros.json"
+    record(MacroLibrary(path))
+
+    reloaded = MacroLibrary(path)
+    assert "Open the chat" in reloaded
+    macro = reloaded.get("Open the chat")
+    assert macro.steps[1].action == {"_metadata": "do", "action": "Tap", "element": [150, 160]}
+
+    reloaded.remove("open the chat")
+    assert len(MacroLibrary(path)) == 0
+
+
+def test_runs_needing_a_person_or_failing_are_not_recorded():
+    library = MacroLibrary()
+    record(library, ['do(action="Take_over", message="log in")', ANSWERS[2]])
+    assert len(library) == 0
+
+    record(library, ['do(action="Fly")', ANSWERS[2]])
+    assert len(library) == 0
@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+
+from phone_agent.imaging import Screenshot
+from phone_agent.observation import ObservationStage
+from tests.factories.fake_device import make_png
+
+
+def slow(value, delay=0.2, log=None, name=None):
+    def probe():
+        if log is not None:
+            log.append((name, threading.current_thread().name))
+        time.sleep(delay)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    return probe
+
+
+@pytest.fixture
+def screenshot():
+    return Screenshot(image_data=make_png(10, 20), width=10, height=20)
+
+
+def test_parallel_probes_overlap(screenshot):
+    stage = ObservationStage(slow(screenshot), slow("WeChat"))
+
+    start = time.perf_counter()
+    observation = stage.observe()
+    elapsed = time.perf_counter() - start
+    stage.close()
+
+    assert observation.screenshot is screenshot
+    assert observation.current_app == "WeChat"
+    assert elapsed < 0.35
+    assert observation.timings["screenshot"] >= 0.2
+    assert observation.timings["current_app"] >= 0.2
+    assert observation.timings["observation"] < 0.35
+    assert not observation.prefetched
+
+
+def test_sequential_mode_runs_on_caller_thread(screenshot):
+    log = []
+    stage = ObservationStage(
+        slow(screenshot, 0, log, "screenshot"),
+        slow("WeChat", 0, log, "current_app"),
+        parallel=False,
+    )
+
+    stage.observe()
+
+    caller = threading.current_thread().name
+    assert log == [("screenshot", caller), ("current_app", caller)]
+
+
+@pytest.mark.parametrize("parallel", [True, False])
+def test_screenshot_error_wins_like_sequential_capture(parallel):
+    stage = ObservationStage(
+        slow(RuntimeError("screencap failed"), 0.05),
+        slow(ValueError("dumpsys failed"), 0),
+        parallel=parallel,
+    )
+
+    with pytest.raises(RuntimeError, match="screencap failed"):
+        stage.observe()
+
+
+@pytest.mark.parametrize("parallel", [True, False])
+def test_current_app_error_is_raised(screenshot, parallel):
+    stage = ObservationStage(
+        slow(screenshot, 0), slow(ValueError("dumpsys failed"), 0), parallel=parallel
+    )
+
+    with pytest.raises(ValueError, match="dumpsys failed"):
+        stage.observe()
+
+
+def test_prefetch_is_returned_by_next_observe(screenshot):
+    calls = []
+
+    def app():
+        calls.append(1)
+        time.sleep(0.2)
+        return f"app-{len(calls)}"
+
+    stage = ObservationStage(slow(screenshot, 0), app)
+    stage.prefetch()
+    time.sleep(0.3)
+
+    observation = stage.observe()
+
+    assert observation.prefetched
+    assert observation.current_app == "app-1"
+    assert observation.timings["wait"] < 0.1
+    assert stage.observe().current_app == "app-2"
+    stage.close()
+
+
+def test_prefetch_failure_surfaces_on_observe(screenshot):
+    stage = ObservationStage(slow(screenshot, 0), slow(ValueError("gone"), 0))
+    stage.prefetch()
+
+    with pytest.raises(ValueError, match="gone"):
+        stage.observe()
+
+
+def test_discard_drops_pending_prefetch(screenshot):
+    gate = threading.Event()
+    apps = iter(["stale", "fresh"])
+
+    def app():
+        name = next(apps)
+        if name == "stale":
+            gate.wait(1)
+        return name
+
+    stage = ObservationStage(slow(screenshot, 0), app)
+    stage.prefetch()
+    time.sleep(0.05)
+    stage.discard()
+    gate.set()
+
+    observation = stage.observe()
+
+    assert not observation.prefetched
+    assert observation.current_app == "fresh"
+    stage.close()
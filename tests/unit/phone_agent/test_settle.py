@@ -0,0 +1,181 @@
+import io
+
+import pytest
+from PIL import Image, ImageDraw
+
+from phone_agent import settle
+from phone_agent.config.timing import TIMING_CONFIG, SettleTimingConfig
+from phone_agent.settle import ScreenSettleDetector, frame_difference, frame_signature
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def frame(offset=0, noise=0):
+    """Synthetic screen: a card sliding down by ``offset`` pixels."""
+    img = Image.new("RGB", (360, 800), color="white")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((20, 100 + offset, 340, 300 + offset), fill="black")
+    if noise:
+        # A blinking cursor-sized blob that should stay under the threshold
+        draw.rectangle((300, 700, 300 + noise, 700 + noise), fill="black")
+    return img
+
+
+def frames_source(sequence):
+    frames = list(sequence)
+
+    def capture():
+        return frames.pop(0) if len(frames) > 1 else frames[0]
+
+    return capture
+
+
+def make_detector(clock, **kwargs):
+    options = dict(poll_interval=0.1, stable_frames=2, min_delay=0.05, max_wait=2.0)
+    options.update(kwargs)
+    return ScreenSettleDetector(clock=clock, sleep=clock.sleep, **options)
+
+
+def test_signature_accepts_bytes_and_images():
+    buffered = io.BytesIO()
+    frame().save(buffered, format="PNG")
+
+    from_bytes = frame_signature(buffered.getvalue())
+    from_image = frame_signature(frame())
+
+    assert from_bytes.size == settle.THUMBNAIL_SIZE
+    assert frame_difference(from_bytes, from_image) == 0
+
+
+def test_static_screen_settles_after_two_frames():
+    clock = FakeClock()
+    result = make_detector(clock).wait(frames_source([frame()]))
+
+    assert result.settled
+    assert result.frames == 2
+    assert result.elapsed == pytest.approx(0.15)
+
+
+def test_animation_waits_for_consecutive_matching_frames():
+    clock = FakeClock()
+    sequence = [frame(offset) for offset in (0, 120, 240, 300)] + [frame(300)]
+
+    result = make_detector(clock).wait(frames_source(sequence))
+
+    assert result.settled
+    assert result.frames == 5
+
+
+def test_stable_frames_counts_the_whole_streak():
+    clock = FakeClock()
+    result = make_detector(clock, stable_frames=3).wait(frames_source([frame()]))
+
+    assert result.frames == 3
+
+
+def test_small_changes_below_threshold_count_as_stable():
+    clock = FakeClock()
+    sequence = [frame(noise=0), frame(noise=8), frame(noise=0)]
+
+    result = make_detector(clock, diff_threshold=0.01).wait(frames_source(sequence))
+
+    assert result.settled
+    assert result.frames == 2
+
+
+def test_never_settling_screen_hits_the_ceiling():
+    clock = FakeClock()
+    offsets = iter(range(0, 10_000, 150))
+
+    result = make_detector(clock, max_wait=1.0).wait(
+        lambda: frame(next(offsets) % 450)
+    )
+
+    assert not result.settled
+    assert result.elapsed <= 1.0
+    assert clock.now <= 1.0
+
+
+@pytest.fixture
+def settle_mode(monkeypatch):
+    def _set(mode):
+        monkeypatch.setattr(TIMING_CONFIG, "settle", SettleTimingConfig(mode=mode))
+
+    return _set
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(settle.time, "sleep", recorded.append)
+    return recorded
+
+
+def test_explicit_delay_is_a_fixed_sleep(settle_mode, sleeps):
+    settle_mode("adaptive")
+
+    settle.wait_after_action(0.3, 1.0, lambda: pytest.fail("should not capture"))
+
+    assert sleeps == [0.3]
+
+
+def test_fixed_mode_sleeps_default_delay(settle_mode, sleeps):
+    settle_mode("fixed")
+
+    settle.wait_after_action(None, 1.0, lambda: pytest.fail("should not capture"))
+
+    assert sleeps == [1.0]
+
+
+def test_adaptive_mode_polls_frames(settle_mode, sleeps):
+    settle_mode("adaptive")
+    captured = []
+
+    def capture():
+        captured.append(1)
+        return frame()
+
+    settle.wait_after_action(None, 1.0, capture)
+
+    config = TIMING_CONFIG.settle
+    assert len(captured) == 2
+    assert sleeps == [config.min_delay, config.poll_interval]
+
+
+def test_adaptive_mode_falls_back_to_fixed_delay_on_capture_error(
+    settle_mode, sleeps
+):
+    settle_mode("adaptive")
+
+    def capture():
+        raise ValueError("no frame")
+
+    settle.wait_after_action(None, 1.0, capture)
+
+    assert sleeps[-1] == 1.0
+
+
+def test_only_settled_adaptive_waits_are_reported(settle_mode, sleeps):
+    reported = []
+
+    with settle.on_settled(lambda: reported.append(len(sleeps))):
+        settle_mode("fixed")
+        settle.wait_after_action(None, 1.0, frame)
+        settle_mode("adaptive")
+        settle.wait_after_action(0.3, 1.0, frame)
+        settle.wait_after_action(None, 1.0, frame)
+    settle.wait_after_action(None, 1.0, frame)
+
+    # Reported right after the adaptive wait's two polls, and not outside
+    assert reported == [4]
@@ -0,0 +1,143 @@
+from pathlib import Path
+
+import pytest
+
+from phone_agent.agent import AgentConfig, PhoneAgent
+from phone_agent.config import get_message
+from phone_agent.events import get_global_event_emitter
+from phone_agent.stall_detector import (
+    ABORT,
+    HINT,
+    StallDetector,
+    StallDetectorConfig,
+    same_action,
+)
+from tests.factories.fake_device import FakeDeviceFactory, FakeModelClient
+
+SCREENS = Path(__file__).resolve().parents[2] / "fixtures" / "screens"
+
+TAP = {"_metadata": "do", "action": "Tap", "element": [500, 500]}
+BACK = {"_metadata": "do", "action": "Back"}
+SWIPE = {"_metadata": "do", "action": "Swipe", "start": [500, 800], "end": [500, 200]}
+
+
+def replay(detector, trace, prompt_tokens=None):
+    """Feed (screen hash, app, action) steps and collect the verdicts."""
+    return [
+        detector.observe(screen_hash, app, action, prompt_tokens)
+        for screen_hash, app, action in trace
+    ]
+
+
+@pytest.fixture
+def events():
+    received = []
+    emitter = get_global_event_emitter()
+    emitter.on(received.append)
+    yield received
+    emitter.off(received.append)
+
+
+def test_repeated_step_on_an_unchanged_screen_is_detected():
+    detector = StallDetector(StallDetectorConfig(max_hints=0))
+    detector.start(max_steps=10)
+
+    # The screen hash jitters by a few bits between captures
+    verdicts = replay(detector, [(0b1010, "微信", TAP), (0b1011, "微信", TAP)])
+    assert verdicts == [None, None]
+
+    stall = detector.observe(0b1110, "微信", dict(TAP, element=[503, 498]))
+    assert (stall.kind, stall.period, stall.decision) == ("repeat", 1, ABORT)
+
+
+def test_cycle_between_screens_is_detected():
+    detector = StallDetector(StallDetectorConfig(max_hints=0))
+    detector.start(max_steps=10)
+    step_in = (0xF0F0, "微信", TAP)
+    step_out = (0x0F0F, "微信", BACK)
+
+    verdicts = replay(detector, [step_in, step_out] * 3)
+
+    assert verdicts[:-1] == [None] * 5
+    assert (verdicts[-1].kind, verdicts[-1].period) == ("cycle", 2)
+
+
+def test_progress_is_not_a_stall():
+    detector = StallDetector()
+    detector.start(max_steps=20)
+
+    # Scrolling a list keeps the action but changes the screen
+    scrolling = [(0xFFFF << (16 * i), "微信", SWIPE) for i in range(6)]
+    # The same action in different apps is not a repeat either
+    switching = [(0, app, BACK) for app in ("微信", "QQ", "微信", "QQ", "微信")]
+
+    assert replay(detector, scrolling + switching) == [None] * 11
+    assert detector.stats.detections == 0
+
+
+def test_hint_comes_first_then_the_run_is_aborted_with_savings():
+    detector = StallDetector(StallDetectorConfig(min_repeats=3, max_hints=1))
+    detector.start(max_steps=20)
+
+    verdicts = replay(detector, [(0, "微信", TAP)] * 6, prompt_tokens=1000)
+
+    assert [v and v.decision for v in verdicts] == [
+        None, None, HINT, None, None, ABORT
+    ]
+    assert detector.stats.to_dict() == {
+        "detections": 2,
+        "hints": 1,
+        "aborts": 1,
+        "steps_saved": 14,
+        "tokens_saved": 14000,
+    }
+
+    # A new run starts with a fresh window and hint budget
+    detector.start(max_steps=20)
+    assert replay(detector, [(0, "微信", TAP)] * 3)[-1].decision == HINT
+
+
+def test_unhashable_screens_never_match():
+    detector = StallDetector(StallDetectorConfig(max_hints=0))
+    detector.start(max_steps=10)
+    assert replay(detector, [(None, "微信", TAP)] * 5) == [None] * 5
+
+
+def test_same_action_tolerates_nearby_coordinates_only():
+    assert same_action(TAP, dict(TAP, element=[510, 490]), tolerance=10)
+    assert not same_action(TAP, dict(TAP, element=[511, 500]), tolerance=10)
+    assert not same_action(TAP, dict(TAP, message="pay"), tolerance=10)
+    assert not same_action(
+        {"action": "Type", "text": "a"}, {"action": "Type", "text": "b"}
+    )
+
+
+def test_agent_hints_then_aborts_a_stuck_run(events):
+    factory = FakeDeviceFactory(
+        screens=[(SCREENS / "wechat_chats.png").read_bytes()],
+        apps=["微信"],
+        width=270,
+        height=600,
+    )
+    agent = PhoneAgent(
+        agent_config=AgentConfig(
+            max_steps=20, verbose=False, stall_detection=StallDetectorConfig()
+        ),
+        device_factory=factory,
+    )
+    agent.model_client = FakeModelClient(['do(action="Tap", element=[150, 160])'] * 20)
+
+    result = agent.run("Open the chat with Zhang Wei")
+
+    assert result == get_message("stall_aborted", "cn")
+    # Three taps, a hint, three more decisions and the last one is not executed
+    assert len(agent.model_client.requests) == 6
+    assert len(factory.actions()) == 5
+    hinted = agent.model_client.requests[3][-1]["content"]
+    assert any(get_message("stall_hint", "cn") in part.get("text", "") for part in hinted)
+
+    stalls = [e["payload"] for e in events if e["type"] == "stall_detected"]
+    assert [s["decision"] for s in stalls] == [HINT, ABORT]
+    assert stalls[-1]["steps_saved"] == 14
+    finished = [e["payload"] for e in events if e["type"] == "run_finished"][-1]
+    assert finished["reason"] == "stalled" and not finished["success"]
@@ -0,0 +1,144 @@
+import random
+
+import pytest
+
+from phone_agent.model import stream_parser
+from phone_agent.model.client import ModelClient
+from phone_agent.model.stream_parser import (
+    ACTION_MARKERS,
+    ActionStreamParser,
+    MarkerAutomaton,
+)
+
+LONGEST_MARKER = max(len(marker) for marker in ACTION_MARKERS)
+
+GOLDEN = [
+    "",
+    "no marker at all",
+    'I will tap. do(action="Tap", element=[1, 2])',
+    'finish(message="done")',
+    'Done. finish(message="ok") trailing',
+    'do(action="Back") then finish(message="late")',
+    'finish(message="a") do(action="Back")',
+    'do do( do(act do(action="Home")',
+    'fin finish finish(messag finish(message="x")',
+    "ffinish(message=1",
+    "dodo(action=2",
+    "<think>plan</think><answer>do(action=\"Back\")</answer>",
+    "<think>plan</think><answer>answer only",
+    '中文思考。do(action="Launch", app="微信")',
+    "ends with a prefix do(act",
+    "ends with a prefix finish(",
+]
+
+PIECES = [
+    "think ", "d", "f", "do", "do(", "do(act", "fin", "finish(", "finish(message",
+    "ish(message=", "finish(message=", "do(action=", "<answer>", "</answer>",
+    "<think>", "\n", "中文", '"x")', ")",
+]
+
+
+def feed_in_chunks(text, rng, max_chunk=6):
+    thinking, action, starts = [], [], []
+    parser = ActionStreamParser(
+        on_thinking=thinking.append,
+        on_action_start=starts.append,
+        on_action=action.append,
+    )
+    i = 0
+    while i < len(text):
+        size = rng.randint(1, max_chunk)
+        parser.feed(text[i : i + size])
+        assert len(parser.pending) < LONGEST_MARKER
+        i += size
+    return parser, parser.close(), thinking, action, starts
+
+
+def check(text, rng):
+    parser, result, thinking, action, starts = feed_in_chunks(text, rng)
+    assert result == ModelClient._parse_response(None, text)
+    assert parser.text == text
+    assert "".join(thinking) + "".join(action) == text
+    found = [text.find(marker) for marker in ACTION_MARKERS if marker in text]
+    if found:
+        first = min(found)
+        assert "".join(thinking) == text[:first]
+        assert len(starts) == 1 and text.startswith(starts[0], first)
+    else:
+        assert starts == [] and action == []
+
+
+@pytest.mark.parametrize("text", GOLDEN)
+def test_golden_replies_match_parse_response(text):
+    rng = random.Random(text)
+    for _ in range(20):
+        check(text, rng)
+
+
+def test_random_streams_match_parse_response():
+    rng = random.Random(14)
+    for _ in range(3000):
+        text = "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 14)))
+        check(text, rng)
+
+
+def test_callbacks_fire_at_most_once_per_feed():
+    thinking, action = [], []
+    parser = ActionStreamParser(on_thinking=thinking.append, on_action=action.append)
+    parser.feed("think do")
+    assert thinking == ["think "] and parser.pending == "do"
+    parser.feed('(action="Back") more')
+    assert thinking == ["think "]
+    assert action == ['do(action="Back") more']
+    parser.feed(" tail")
+    assert action[-1] == " tail"
+    assert parser.close() == ("think", 'do(action="Back") more tail')
+
+
+def test_held_back_prefix_is_flushed_on_close():
+    thinking = []
+    parser = ActionStreamParser(on_thinking=thinking.append)
+    parser.feed("no action, just fin")
+    assert "".join(thinking) == "no action, just "
+    assert parser.close() == ("", "no action, just fin")
+    assert "".join(thinking) == "no action, just fin"
+
+
+def synthetic_reply(length):
+    # Dense with marker starts and near misses so the automaton does real work
+    filler = "dfo do( finish( fin do(act finish(messag 中文 "
+    body = (filler * (length // len(filler) + 1))[:length]
+    return body + 'finish(message="done")'
+
+
+class CountingAutomaton(MarkerAutomaton):
+    """Counts the characters the parser steps the automaton over."""
+
+    def __init__(self, markers):
+        super().__init__(markers)
+        self.steps = 0
+
+    def step(self, state, char):
+        self.steps += 1
+        return super().step(state, char)
+
+
+def test_long_stream_examines_each_character_at_most_once(monkeypatch):
+    # Timing lives in benchmarks/bench_stream_parser.py
+    automaton = CountingAutomaton(ACTION_MARKERS)
+    monkeypatch.setattr(stream_parser, "_AUTOMATON", automaton)
+    text = synthetic_reply(200_000)
+    emitted = []
+    parser = ActionStreamParser(on_thinking=emitted.append)
+
+    for i in range(0, len(text), 4):
+        parser.feed(text[i : i + 4])
+        assert len(parser.pending) < LONGEST_MARKER
+    thinking, action = parser.close()
+
+    assert action == 'finish(message="done")'
+    assert thinking == text[: -len(action)].strip()
+    assert "".join(emitted) == text[: -len(action)]
+    assert len(parser.pending) == 0
+    # Linear in the stream length; the old per-chunk prefix scan is not
+    assert 0 < automaton.steps <= len(text)
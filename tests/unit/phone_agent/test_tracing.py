@@ -0,0 +1,227 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from phone_agent import tracing
+from phone_agent.actions import ActionHandler
+from phone_agent.adb import shell
+from phone_agent.agent import AgentConfig, PhoneAgent
+from phone_agent.device_factory import DeviceFactory
+from phone_agent.events import get_global_event_emitter
+from phone_agent.observation import ObservationStage
+from phone_agent.tracing import (
+    Tracer,
+    activate,
+    get_tracer,
+    set_tracer,
+    span,
+    traced,
+)
+from tests.factories.fake_device import FakeDeviceFactory, FakeModelClient
+
+SCREENS = Path(__file__).resolve().parents[2] / "fixtures" / "screens"
+
+
+@pytest.fixture
+def tracer():
+    tracer = Tracer()
+    previous = set_tracer(tracer)
+    yield tracer
+    set_tracer(previous)
+
+
+@pytest.fixture
+def events():
+    received = []
+    emitter = get_global_event_emitter()
+    emitter.on(received.append)
+    yield received
+    emitter.off(received.append)
+
+
+def by_name(tracer):
+    return {record.name: record for record in tracer.spans}
+
+
+def test_spans_nest_per_thread_and_export_to_chrome_trace(tracer, tmp_path):
+    with span("outer", step=1):
+        with span("middle"):
+            with span("inner"):
+                time.sleep(0.01)
+        with span("sibling"):
+            pass
+
+    spans = by_name(tracer)
+    assert spans["outer"].parent_id is None and spans["outer"].depth == 0
+    assert spans["middle"].parent_id == spans["outer"].id
+    assert spans["inner"].parent_id == spans["middle"].id
+    assert spans["inner"].depth == 2
+    assert spans["sibling"].parent_id == spans["outer"].id
+
+    summary = {s.name: s for s in tracer.summary()}
+    assert summary["middle"].total_ms >= 10
+    assert summary["middle"].self_ms < summary["middle"].total_ms - 9
+
+    path = tmp_path / "trace.json"
+    tracer.export_chrome_trace(path)
+    events = {e["name"]: e for e in json.loads(path.read_text())["traceEvents"]}
+    outer, inner = events["outer"], events["inner"]
+    assert outer["ph"] == "X" and outer["args"] == {"step": 1}
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+
+
+def test_failing_span_is_recorded_with_the_error(tracer):
+    with pytest.raises(ValueError):
+        with span("boom"):
+            raise ValueError("bad")
+    assert tracer.spans[0].args == {"error": "ValueError"}
+
+
+def test_agent_run_traces_each_phase(events):
+    tracer = Tracer()
+    agent = PhoneAgent(
+        agent_config=AgentConfig(verbose=False, tracer=tracer),
+        device_factory=FakeDeviceFactory(
+            screens=[(SCREENS / "home.png").read_bytes()], width=270, height=600
+        ),
+    )
+    agent.model_client = FakeModelClient(
+        ['do(action="Tap", element=[150, 160])', 'finish(message="done")']
+    )
+
+    agent.run("Tap the icon")
+
+    assert get_tracer() is None
+    (run_id,) = tracer.runs()
+    spans = by_name(tracer)
+    for name in (
+        "observe",
+        "encode_screenshot",
+        "build_messages",
+        "context_fit",
+        "model_request",
+        "parse_action",
+    ):
+        assert spans[name].parent_id is not None
+    steps = [s for s in tracer.spans if s.name == "step"]
+    assert [s.args["step"] for s in steps] == [1, 2]
+    assert all(s.parent_id == spans["run"].id for s in steps)
+    (action,) = [s for s in tracer.spans if s.name == "action"]
+    parent = next(s for s in tracer.spans if s.id == action.parent_id)
+    assert action.args == {"action": "Tap"} and parent.name == "execute_action"
+
+    summary = [e["payload"] for e in events if e["type"] == "trace_summary"][-1]
+    assert {"step", "model_request"} <= {row["name"] for row in summary["spans"]}
+    assert "model_request" in tracer.format_summary(run_id)
+
+
+def test_device_module_spans_nest_under_the_action(tracer, monkeypatch):
+    commands = []
+    monkeypatch.setattr(shell, "_TRANSPORT", "cli")
+    monkeypatch.setattr(shell, "_SHELL_POOL_ENABLED", False)
+    monkeypatch.setattr(
+        shell,
+        "run_shell_subprocess",
+        lambda args, device_id=None, timeout=None: commands.append(args),
+    )
+    handler = ActionHandler(device_factory=DeviceFactory())
+
+    action = {"_metadata": "do", "action": "Back"}
+    monkeypatch.setattr(
+        "phone_agent.adb.device.TIMING_CONFIG.device.default_back_delay", 0
+    )
+    monkeypatch.setattr("phone_agent.adb.device.TIMING_CONFIG.settle.mode", "fixed")
+    assert handler.execute(action, 1080, 2400).success
+
+    spans = by_name(tracer)
+    assert commands == [["input", "keyevent", "4"]]
+    assert spans["adb.shell"].parent_id == spans["action"].id
+    assert spans["settle"].parent_id == spans["action"].id
+
+
+def interleave_runs(first, second):
+    """Activate A, activate B, leave A, then leave B, in two threads."""
+    barrier = threading.Barrier(2)
+    active_after = {}
+
+    def run(tracer, run_id, finish_first):
+        with activate(tracer, run_id):
+            barrier.wait()
+            if not finish_first:
+                barrier.wait()
+            with span("adb.shell"):
+                pass
+        active_after[run_id] = get_tracer()
+        if finish_first:
+            barrier.wait()
+
+    threads = [
+        threading.Thread(target=run, args=(first, "a", True)),
+        threading.Thread(target=run, args=(second, "b", False)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return active_after
+
+
+def test_concurrent_runs_record_into_their_own_tracer():
+    first, second = Tracer(), Tracer()
+
+    assert interleave_runs(first, second) == {"a": None, "b": None}
+    assert [(s.name, s.run_id) for s in first.spans] == [("adb.shell", "a")]
+    assert [(s.name, s.run_id) for s in second.spans] == [("adb.shell", "b")]
+    assert get_tracer() is None
+
+
+def test_concurrent_runs_sharing_a_tracer_keep_their_run_ids():
+    shared = Tracer()
+
+    interleave_runs(shared, shared)
+    assert sorted(s.run_id for s in shared.spans) == ["a", "b"]
+    assert shared.run_id is None
+
+
+def test_observation_probes_keep_the_tracer_in_pool_threads(tracer):
+    stage = ObservationStage(
+        capture_screenshot=traced("screenshot")(lambda: None),
+        get_current_app=traced("current_app")(lambda: "System Home"),
+    )
+    try:
+        stage.prefetch()
+        stage.observe()
+    finally:
+        stage.close()
+
+    spans = by_name(tracer)
+    assert {"screenshot", "current_app"} <= set(spans)
+    assert spans["screenshot"].thread_id != threading.get_ident()
+
+
+def test_disabled_tracing_records_nothing(monkeypatch):
+    assert get_tracer() is None
+    created = []
+
+    class CountingSpan(tracing._Span):
+        def __init__(self, *args):
+            created.append(args)
+            super().__init__(*args)
+
+    monkeypatch.setattr(tracing, "_Span", CountingSpan)
+
+    @traced("noop")
+    def noop():
+        return "done"
+
+    for _ in range(100):
+        with span("noop") as current:
+            assert noop() == "done"
+        assert current is tracing._NOOP_SPAN
+
+    # The per-call cost is tracked by benchmarks/bench_tracing.py
+    assert created == []
@@ -0,0 +1,51 @@
+from io import BytesIO
+
+from PIL import Image
+
+from phone_agent.xctest.mjpeg import MJPEGParser, default_mjpeg_url
+
+
+def _jpeg(color: str) -> bytes:
+    buffered = BytesIO()
+    Image.new("RGB", (32, 48), color=color).save(buffered, format="JPEG")
+    return buffered.getvalue()
+
+
+def _part(frame: bytes, with_length: bool = True) -> bytes:
+    headers = "--BoundaryString\r\nContent-Type: image/jpeg\r\n"
+    if with_length:
+        headers += f"Content-Length: {len(frame)}\r\n"
+    return headers.encode("ascii") + b"\r\n" + frame + b"\r\n"
+
+
+def test_frames_split_across_chunks():
+    frames = [_jpeg("red"), _jpeg("green"), _jpeg("blue")]
+    stream = b"".join(_part(frame) for frame in frames)
+    parser = MJPEGParser()
+
+    parsed = []
+    for i in range(0, len(stream), 7):
+        parsed += parser.feed(stream[i : i + 7])
+
+    assert parsed == frames
+
+
+def test_parts_without_length_end_at_eoi():
+    frames = [_jpeg("red"), _jpeg("blue")]
+    parser = MJPEGParser()
+
+    parsed = parser.feed(b"".join(_part(frame, with_length=False) for frame in frames))
+
+    assert parsed == frames
+
+
+def test_incomplete_frame_beyond_limit_is_discarded():
+    frame = _jpeg("red")
+    parser = MJPEGParser(max_frame_bytes=len(frame) // 2)
+
+    assert parser.feed(_part(frame)[: len(frame) - 10]) == []
+    assert parser.feed(_part(frame)) == [frame]
+
+
+def test_default_url_uses_wda_host():
+    assert default_mjpeg_url("http://192.168.1.9:8100/") == "http://192.168.1.9:9100"
@@ -0,0 +1,141 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from phone_agent.imaging import encode_screenshot
+from phone_agent.xctest import device, input as ios_input, screenshot, wda
+from phone_agent.xctest.connection import XCTestConnection
+from tests.factories.fake_wda import start_fake_wda_server
+
+
+def _image(fmt: str, size=(117, 253), color="red") -> bytes:
+    buffered = BytesIO()
+    Image.new("RGB", size, color=color).save(buffered, format=fmt)
+    return buffered.getvalue()
+
+
+@pytest.fixture
+def fake_wda(monkeypatch):
+    servers = []
+    monkeypatch.setattr(wda, "_CLIENTS", {})
+    monkeypatch.setattr(wda, "_HTTP_POOL_ENABLED", True)
+    monkeypatch.setattr(screenshot, "_FRAME_SOURCES", {})
+    monkeypatch.setattr(device, "wait_after_action", lambda *args: None)
+    device._CURRENT_APP_CACHE.clear()
+
+    def _start(**kwargs):
+        server = start_fake_wda_server(**kwargs)
+        servers.append(server)
+        return server
+
+    yield _start
+    for source in list(screenshot._FRAME_SOURCES.values()):
+        source.stop()
+    wda.close_all()
+    device._CURRENT_APP_CACHE.clear()
+    for server in servers:
+        server.close()
+
+
+def drive(url: str) -> None:
+    device.get_current_app(url)
+    device.tap(300, 600, url)
+    device.swipe(300, 1500, 300, 500, 0.3, url)
+    device.back(url)
+    device.home(url)
+    ios_input.type_text("hello", url)
+    screenshot.get_screenshot(url)
+
+
+def test_calls_share_one_keep_alive_connection(fake_wda):
+    server = fake_wda(screen_png=_image("PNG"))
+
+    drive(server.url)
+
+    assert len(server.requests) == 7
+    assert server.connections == 1
+
+
+def test_disabled_pool_opens_a_connection_per_call(fake_wda, monkeypatch):
+    server = fake_wda(screen_png=_image("PNG"))
+    monkeypatch.setattr(wda, "_HTTP_POOL_ENABLED", False)
+
+    drive(server.url)
+
+    assert server.connections == len(server.requests) == 7
+
+
+def test_wda_session_is_reused_across_connections(fake_wda, monkeypatch):
+    server = fake_wda()
+
+    ok, first = XCTestConnection(server.url).start_wda_session()
+    ok_again, second = XCTestConnection(server.url + "/").start_wda_session()
+    # A fresh process adopts the session WDA reports in /status
+    monkeypatch.setattr(wda, "_CLIENTS", {})
+    ok_adopted, adopted = XCTestConnection(server.url).start_wda_session()
+
+    assert ok and ok_again and ok_adopted
+    assert first == second == adopted
+    assert server.count("POST /session") == 1
+
+
+def test_stale_wda_session_is_recreated(fake_wda):
+    server = fake_wda()
+    client = wda.get_wda_client(server.url)
+    first = client.ensure_session()
+
+    server.sessions.clear()
+    second = client.ensure_session()
+
+    assert second != first
+    assert server.sessions == {second}
+    assert server.count("POST /session") == 2
+
+
+def test_screenshot_size_is_read_from_png_header(fake_wda, monkeypatch):
+    png = _image("PNG")
+    server = fake_wda(screen_png=png)
+
+    def no_decode(*args, **kwargs):
+        raise AssertionError("screenshot decoded")
+
+    monkeypatch.setattr(screenshot.Image, "open", no_decode)
+    shot = screenshot.get_screenshot(server.url)
+
+    assert (shot.width, shot.height, shot.mime_type) == (117, 253, "image/png")
+    assert shot.image_data == png
+
+
+def test_screenshot_size_falls_back_for_other_formats(fake_wda):
+    server = fake_wda(screen_png=_image("JPEG"))
+
+    shot = screenshot.get_screenshot(server.url)
+
+    assert (shot.width, shot.height) == (117, 253)
+
+
+def test_mjpeg_stream_serves_screenshots(fake_wda):
+    frames = (_image("JPEG", color="red"), _image("JPEG", color="blue"))
+    server = fake_wda(frames=frames, fps=50)
+    screenshot.enable_mjpeg(server.url, server.url + "/mjpeg")
+
+    shot = screenshot.get_screenshot(server.url)
+    frame = screenshot.capture_frame(server.url)
+
+    assert (shot.width, shot.height, shot.mime_type) == (117, 253, "image/jpeg")
+    assert shot.image_data in frames
+    assert encode_screenshot(shot) is shot
+    assert frame in frames
+    assert server.count("GET /screenshot") == 0
+
+
+def test_disabled_mjpeg_falls_back_to_wda_screenshot(fake_wda):
+    server = fake_wda(screen_png=_image("PNG"), frames=(_image("JPEG"),))
+    screenshot.enable_mjpeg(server.url, server.url + "/mjpeg")
+    screenshot.disable_mjpeg(server.url)
+
+    shot = screenshot.get_screenshot(server.url)
+
+    assert shot.mime_type == "image/png"
+    assert server.count("GET /screenshot") == 1
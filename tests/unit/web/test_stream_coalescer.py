@@ -0,0 +1,130 @@
+import asyncio
+import json
+import random
+import threading
+import time
+
+from web.core.stream_coalescer import StreamCoalescer
+
+
+def chunk(text, step=1, run_id="run"):
+    return {
+        "type": "thinking_chunk",
+        "payload": {"text": text},
+        "run_id": run_id,
+        "step": step,
+        "timestamp": "2026-01-01T00:00:00.000001",
+    }
+
+
+def event(event_type, step=1):
+    return {"type": event_type, "payload": {}, "run_id": "run", "step": step}
+
+
+def size(evt):
+    return len(json.dumps(evt, ensure_ascii=False).encode("utf-8"))
+
+
+def test_boundaries_flush_pending_text_in_order():
+    frames = []
+    coalescer = StreamCoalescer(frames.append, interval=60)
+
+    for text in ["先", "点击", "搜索"]:
+        coalescer.push(chunk(text))
+    coalescer.push(event("action_decoded"))
+    coalescer.push(chunk("再", step=2))
+    coalescer.push(chunk("输入", step=2))
+    coalescer.push(chunk("下一步", step=3))
+    coalescer.push(event("performance_metric", step=3))
+    coalescer.close()
+
+    assert [(f["type"], f["step"]) for f in frames] == [
+        ("thinking_chunk", 1),
+        ("action_decoded", 1),
+        ("thinking_chunk", 2),
+        ("thinking_chunk", 3),
+        ("performance_metric", 3),
+    ]
+    texts = [f["payload"]["text"] for f in frames if f["type"] == "thinking_chunk"]
+    assert texts == ["先点击搜索", "再输入", "下一步"]
+    assert coalescer.stats.chunks == 6 and coalescer.stats.frames == 3
+
+
+def test_frames_are_bounded_by_size():
+    frames = []
+    coalescer = StreamCoalescer(frames.append, interval=60, max_chars=10)
+
+    for index in range(30):
+        coalescer.push(chunk(f"{index:03d}"))
+    coalescer.close()
+
+    assert [len(f["payload"]["text"]) for f in frames] == [12] * 7 + [6]
+    assert "".join(f["payload"]["text"] for f in frames) == "".join(
+        f"{index:03d}" for index in range(30)
+    )
+
+
+def test_pending_text_is_flushed_by_the_event_loop_timer():
+    async def scenario():
+        frames = []
+        coalescer = StreamCoalescer(
+            frames.append, loop=asyncio.get_running_loop(), interval=0.02
+        )
+        producer = threading.Thread(
+            target=lambda: [coalescer.push(chunk(t)) for t in ("a", "b", "c")]
+        )
+        producer.start()
+        producer.join()
+        assert frames == []
+
+        await asyncio.sleep(0.1)
+        assert [f["payload"]["text"] for f in frames] == ["abc"]
+
+    asyncio.run(scenario())
+
+
+def test_pending_text_is_flushed_by_a_thread_timer_without_a_loop():
+    frames = []
+    coalescer = StreamCoalescer(frames.append, interval=0.02)
+    coalescer.push(chunk("a"))
+    coalescer.push(chunk("b"))
+
+    deadline = time.monotonic() + 2
+    while not frames and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert [f["payload"]["text"] for f in frames] == ["ab"]
+
+
+def test_concurrent_stream_keeps_exact_text_and_counts_bytes_saved():
+    frames = []
+    coalescer = StreamCoalescer(frames.append, interval=0.005, max_chars=64)
+    rng = random.Random(7)
+    chunks = [
+        chunk("".join(rng.choice('思考ab "\\\n') for _ in range(rng.randint(0, 4))))
+        for _ in range(3000)
+    ]
+
+    for index, evt in enumerate(chunks):
+        coalescer.push(evt)
+        if index % 100 == 0:
+            time.sleep(0.002)
+    coalescer.close()
+
+    stats = coalescer.stats
+    expected = "".join(evt["payload"]["text"] for evt in chunks)
+    assert "".join(f["payload"]["text"] for f in frames) == expected
+    assert stats.chunks == 3000 and stats.frames == len(frames) < 3000
+    assert stats.bytes_in == sum(size(evt) for evt in chunks)
+    assert stats.bytes_out == sum(size(f) for f in frames)
+    assert stats.bytes_saved > 0
+    assert stats.to_dict()["frames_per_second"] < stats.to_dict()["chunks_per_second"]
+
+
+def test_zero_interval_passes_chunks_through():
+    frames = []
+    coalescer = StreamCoalescer(frames.append, interval=0)
+    coalescer.push(chunk("a"))
+    coalescer.push(chunk("b"))
+
+    assert [f["payload"]["text"] for f in frames] == ["a", "b"]
+    assert coalescer.stats.bytes_saved == 0
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from web.core.ws_manager import (
+    SLOW_CLIENT_CLOSE_CODE,
+    SLOW_CLIENT_DISCONNECT,
+    ConnectionManager,
+    coalesce_messages,
+)
+
+
+class FakeWebSocket:
+    """Records sent frames; ``delay`` slows every send, ``stall`` blocks forever."""
+
+    def __init__(self, delay=0.0, stall=False):
+        self.delay = delay
+        self.stall = stall
+        self.frames = []
+        self.sends = 0
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sends += 1
+        if self.stall:
+            await asyncio.Event().wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames.append(json.loads(text))
+
+    async def send_json(self, message):
+        self.frames.append(message)
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+    def text(self):
+        return "".join(f["data"] for f in self.frames if f["type"] == "output")
+
+
+def output(text):
+    return {"type": "output", "data": text, "timestamp": "2026-01-01T00:00:00"}
+
+
+async def drain(manager, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = manager.get_stats()["clients"]
+        if all(client["queued"] == 0 for client in stats):
+            break
+        await asyncio.sleep(0.005)
+    await asyncio.sleep(0.01)
+
+
+def test_broadcast_and_personal_messages_keep_their_order():
+    async def scenario():
+        manager = ConnectionManager()
+        first, second = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(first)
+        await manager.connect(second)
+
+        await manager.send_personal_message({"type": "init"}, first)
+        await manager.broadcast(output("a"))
+        await manager.broadcast({"type": "toast", "message": "b"})
+        await drain(manager)
+
+        assert [f["type"] for f in first.frames] == ["init", "output", "toast"]
+        assert second.frames == first.frames[1:]
+        await manager.disconnect(first)
+        assert manager.active_connections == [second]
+
+    asyncio.run(scenario())
+
+
+def test_stalled_client_does_not_hold_up_the_others():
+    async def scenario():
+        manager = ConnectionManager(max_queue=1000, send_timeout=None)
+        stalled, fast = FakeWebSocket(stall=True), FakeWebSocket()
+        await manager.connect(stalled)
+        await manager.connect(fast)
+
+        for index in range(100):
+            await manager.broadcast(output(f"{index},"))
+        await asyncio.sleep(0.05)
+
+        assert len(fast.frames) == 100
+        assert stalled.frames == []
+        assert len(manager.active_connections) == 2
+
+    asyncio.run(scenario())
+
+
+def test_slow_client_receives_coalesced_frames_with_the_same_text():
+    async def scenario():
+        manager = ConnectionManager(max_queue=8)
+        slow = FakeWebSocket(delay=0.002)
+        await manager.connect(slow)
+
+        expected = ""
+        for index in range(300):
+            await manager.broadcast(output(f"{index},"))
+            expected += f"{index},"
+            if index % 100 == 0:
+                await manager.broadcast({"type": "state_update", "data": {"n": index}})
+            if index % 10 == 0:
+                await asyncio.sleep(0)
+        await drain(manager)
+
+        stats = manager.get_stats()
+        assert slow.text() == expected
+        assert len(slow.frames) < 300
+        assert stats["clients"][0]["coalesced"] > 0
+        assert stats["slow_disconnects"] == 0 and slow.close_code is None
+
+    asyncio.run(scenario())
+
+
+def test_disconnect_policy_closes_the_slow_client():
+    async def scenario():
+        manager = ConnectionManager(
+            max_queue=4, slow_client_policy=SLOW_CLIENT_DISCONNECT
+        )
+        slow, fast = FakeWebSocket(delay=0.05), FakeWebSocket()
+        await manager.connect(slow)
+        await manager.connect(fast)
+
+        for index in range(10):
+            await manager.broadcast(output(f"{index},"))
+            await asyncio.sleep(0)
+        await drain(manager)
+
+        assert manager.active_connections == [fast]
+        assert manager.slow_disconnects == 1
+        assert slow.close_code == SLOW_CLIENT_CLOSE_CODE
+        assert len(fast.frames) == 10
+
+    asyncio.run(scenario())
+
+
+def test_send_timeout_disconnects_a_stalled_client():
+    async def scenario():
+        manager = ConnectionManager(send_timeout=0.05)
+        stalled = FakeWebSocket(stall=True)
+        await manager.connect(stalled)
+
+        await manager.broadcast(output("x"))
+        await asyncio.sleep(0.2)
+
+        assert manager.active_connections == []
+        assert stalled.close_code == SLOW_CLIENT_CLOSE_CODE
+
+    asyncio.run(scenario())
+
+
+def test_broadcast_from_another_threads_event_loop():
+    async def scenario():
+        manager = ConnectionManager()
+        client = FakeWebSocket()
+        await manager.connect(client)
+
+        def worker():
+            loop = asyncio.new_event_loop()
+            loop.run_until_complete(manager.broadcast(output("from thread")))
+            loop.close()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        await asyncio.to_thread(thread.join)
+        await drain(manager)
+
+        assert client.text() == "from thread"
+
+    asyncio.run(scenario())
+
+
+def test_load_with_many_clients_some_of_them_slow():
+    async def scenario():
+        manager = ConnectionManager(max_queue=64)
+        fast = [FakeWebSocket() for _ in range(200)]
+        slow = [FakeWebSocket(delay=0.005) for _ in range(20)]
+        clients = fast + slow
+        for websocket in clients:
+            await manager.connect(websocket)
+
+        expected = ""
+        sends_during_broadcast = 0
+        for index in range(500):
+            before = sum(ws.sends for ws in clients)
+            await manager.broadcast(output(f"{index},"))
+            sends_during_broadcast += sum(ws.sends for ws in clients) - before
+            expected += f"{index},"
+            if index % 10 == 0:
+                await asyncio.sleep(0)
+        await drain(manager, timeout=20)
+
+        assert all(len(ws.frames) == 500 and ws.text() == expected for ws in fast)
+        assert all(ws.text() == expected for ws in slow)
+        assert all(len(ws.frames) < 500 for ws in slow)
+        assert manager.slow_disconnects == 0
+        # Enqueueing for 220 clients never waits on a send
+        assert sends_during_broadcast == 0
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize(
+    "older, newer, merged",
+    [
+        (output("a"), output("b"), output("ab")),
+        (
+            {"type": "state_update", "data": {"a": 1, "b": 1}},
+            {"type": "state_update", "data": {"b": 2}},
+            {"type": "state_update", "data": {"a": 1, "b": 2}},
+        ),
+        (
+            {"type": "tts_loading", "show": True},
+            {"type": "tts_loading", "show": False},
+            {"type": "tts_loading", "show": False},
+        ),
+        (output("a"), {"type": "toast", "message": "b"}, None),
+        ({"type": "toast", "message": "a"}, {"type": "toast", "message": "b"}, None),
+    ],
+)
+def test_coalesce_messages(older, newer, merged):
+    assert coalesce_messages(older, newer) == merged
+
+
+def test_coalesce_agent_text_events_of_the_same_step():
+    def chunk(text, step=1):
+        event = {"type": "thinking_chunk", "payload": {"text": text}, "step": step}
+        return {"type": "agent_event", "event": event}
+
+    merged = coalesce_messages(chunk("思考"), chunk("中"))
+    assert merged["event"]["payload"]["text"] == "思考中"
+    assert coalesce_messages(chunk("a"), chunk("b", step=2)) is None
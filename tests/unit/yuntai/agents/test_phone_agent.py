@@ -2,6 +2,7 @@ from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 from yuntai.agents.phone_agent import PhoneAgent, PhoneAgentWrapper
+from yuntai.tools.intent_matcher import IntentMatch
 
 
 def test_wrapper_execute_success_and_keyword_failure(monkeypatch):
@@ -38,6 +39,59 @@ def test_wrapper_execute_success_and_keyword_failure(monkeypatch):
     assert "cleanup" in calls
 
 
+def test_wrapper_execute_records_macros_under_the_bare_task(monkeypatch):
+    monkeypatch.setattr("yuntai.agents.phone_agent.PHONE_OPERATION_PROMPT", "PROMPT")
+    runs = []
+
+    class _Agent:
+        agent_config = SimpleNamespace(macro_library=None)
+
+        def run(self, task, macro_intent=None):
+            runs.append((task, macro_intent, self.agent_config.macro_library))
+            return "执行完成"
+
+    wrapper = PhoneAgentWrapper(device_id="dev-1")
+    wrapper._setup_pipe = lambda: None
+    wrapper._cleanup_pipe = lambda: None
+    wrapper._get_agent = lambda: _Agent()
+    wrapper._reset_agent = lambda: None
+
+    library = object()
+    assert wrapper.execute("打开微信", macro_library=library) == (True, "执行完成")
+    assert runs == [("打开微信\n\nPROMPT", "打开微信", library)]
+
+
+def test_wrapper_execute_uses_the_macro_library_for_one_run_only(monkeypatch):
+    runs = []
+
+    class _Agent:
+        def __init__(self):
+            self.agent_config = SimpleNamespace(macro_library=None)
+
+        def run(self, task, macro_intent=None):
+            runs.append(self.agent_config.macro_library)
+            if len(runs) == 1:
+                raise RuntimeError("device lost")
+            return "执行完成"
+
+    agent = _Agent()
+    wrapper = PhoneAgentWrapper(device_id="dev-1")
+    wrapper._setup_pipe = lambda: None
+    wrapper._cleanup_pipe = lambda: None
+    # 失败时不会重置，后续执行复用同一个缓存的 Agent
+    wrapper._get_agent = lambda: agent
+    wrapper._reset_agent = lambda: None
+
+    library = object()
+    assert wrapper.execute("打开微信", macro_library=library) == (
+        False,
+        "执行失败: device lost",
+    )
+    assert agent.agent_config.macro_library is None
+    assert wrapper.execute("打开微信") == (True, "执行完成")
+    assert runs == [library, None]
+
+
 def test_wrapper_execute_exception_path(monkeypatch):
     wrapper = PhoneAgentWrapper(device_id="dev-1")
     touched = []
@@ -108,7 +162,7 @@ def test_phone_agent_delegation_and_state_cache(monkeypatch):
         def __init__(self, device_id):
             created.append(device_id)
 
-        def execute(self, task):
+        def execute(self, task, macro_library=None):
             return True, f"exec:{task}"
 
         def open_app(self, app_name):
@@ -137,6 +191,23 @@ def test_phone_agent_delegation_and_state_cache(monkeypatch):
     assert created == ["d1", "d2"]
 
 
+def test_run_intent_calls_the_device_directly(monkeypatch):
+    calls = []
+    factory = SimpleNamespace(
+        launch_app=lambda app, device_id: calls.append(("launch", app, device_id)) or app != "未知",
+        home=lambda device_id: calls.append(("home", device_id)),
+        back=lambda device_id: calls.append(("back", device_id)),
+    )
+    monkeypatch.setattr("yuntai.agents.phone_agent.get_device_factory", lambda: factory)
+    agent = PhoneAgent("d1")
+
+    assert agent.run_intent(IntentMatch("launch", app_name="微信")) == (True, "已打开微信")
+    assert agent.run_intent(IntentMatch("home")) == (True, "已回到桌面")
+    assert agent.run_intent(IntentMatch("back")) == (True, "已返回上一页")
+    assert agent.run_intent(IntentMatch("launch", app_name="未知"))[0] is False
+    assert calls == [("launch", "微信", "d1"), ("home", "d1"), ("back", "d1"), ("launch", "未知", "d1")]
+
+
 class TestPhoneAgentCoverageGaps:
     def _make_wrapper(self, monkeypatch):
         import yuntai.agents.phone_agent as mod
@@ -2,8 +2,10 @@ from types import SimpleNamespace
 
 import pytest
 
+from phone_agent.macro import Checkpoint, Macro, MacroLibrary, MacroReplay, MacroStep
 from yuntai.agents.judgement_agent import TaskJudgementResult
 from yuntai.chains.task_chain import TaskChain
+from yuntai.tools.intent_matcher import IntentMatcher
 from yuntai.prompts import (
     TASK_TYPE_BASIC_OPERATION,
     TASK_TYPE_COMPLEX_OPERATION,
@@ -146,3 +148,138 @@ def test_task_chain_setters_and_continuous_branch(monkeypatch):
     assert chain.tts_manager is None
     chain.stop_continuous_reply()
     assert "stopped" in spoken
+
+
+def test_basic_operation_replays_macros_and_falls_back_on_divergence():
+    calls = []
+    replays = [MacroReplay(True, 1, message="已打开微信"), MacroReplay(False, 0, diverged_at=0, reason="checkpoint")]
+
+    def execute_operation(task, macro_library=None):
+        calls.append(("live", task, macro_library))
+        return True, "完成"
+
+    def replay_macro(macro):
+        calls.append(("replay", macro.intent))
+        return replays.pop(0)
+
+    library = MacroLibrary()
+    chain = TaskChain(
+        phone_agent=SimpleNamespace(execute_operation=execute_operation, replay_macro=replay_macro),
+        judgement_agent=SimpleNamespace(judge=lambda *a, **k: None),
+        chat_agent=SimpleNamespace(chat=lambda *a, **k: "chat"),
+        reply_chain=SimpleNamespace(),
+        callback_manager=SimpleNamespace(get_callbacks=lambda **k: []),
+        macro_library=library,
+    )
+
+    # No macro yet: the live agent runs and records into the library
+    assert chain._execute_basic_operation("打开微信") == (True, "完成")
+    assert calls == [("live", "打开微信", library)]
+
+    calls.clear()
+    start = Checkpoint("System Home", 0)
+    library.put(Macro("打开微信", start, [MacroStep({"_metadata": "do", "action": "Home"}, start)]))
+    assert chain._execute_basic_operation("打开微信") == (True, "已打开微信")
+    assert calls == [("replay", "打开微信")]
+
+    calls.clear()
+    assert chain._execute_basic_operation("打开微信") == (True, "完成")
+    assert calls == [("replay", "打开微信"), ("live", "打开微信", library)]
+
+
+def test_failed_live_operation_drops_its_macro():
+    library = MacroLibrary()
+    start = Checkpoint("System Home", 0)
+    library.put(Macro("打开微信", start, [MacroStep({"_metadata": "do", "action": "Home"}, start)]))
+    chain = TaskChain(
+        phone_agent=SimpleNamespace(
+            execute_operation=lambda task, macro_library=None: (False, "失败"),
+            replay_macro=lambda macro: MacroReplay(False, 0, diverged_at=0, reason="start"),
+        ),
+        judgement_agent=SimpleNamespace(judge=lambda *a, **k: None),
+        chat_agent=SimpleNamespace(chat=lambda *a, **k: "chat"),
+        reply_chain=SimpleNamespace(),
+        callback_manager=SimpleNamespace(get_callbacks=lambda **k: []),
+        macro_library=library,
+    )
+
+    assert chain._handle_basic_operation("打开微信") == "❌ 操作失败: 失败"
+    assert "打开微信" not in library
+
+
+def _fast_path_chain(run_intent, judged, **kwargs):
+    def judge(text, callbacks=None):
+        judged.append(text)
+        return _jr(TASK_TYPE_BASIC_OPERATION, app="微信")
+
+    return TaskChain(
+        phone_agent=SimpleNamespace(
+            run_intent=run_intent,
+            execute_operation=lambda task: (True, "live"),
+        ),
+        judgement_agent=SimpleNamespace(judge=judge),
+        chat_agent=SimpleNamespace(chat=lambda *a, **k: "chat"),
+        reply_chain=SimpleNamespace(),
+        callback_manager=SimpleNamespace(get_callbacks=lambda **k: []),
+        intent_matcher=IntentMatcher(),
+        **kwargs,
+    )
+
+
+def test_fast_path_skips_the_judgement_and_records_latency(monkeypatch):
+    events = []
+    monkeypatch.setattr("yuntai.chains.task_chain.prepare_callbacks_with_manager", lambda *a, **k: [])
+    monkeypatch.setattr("yuntai.chains.task_chain.emit_agent_event", lambda *a, **k: events.append(a))
+    intents, judged = [], []
+
+    def run_intent(match):
+        intents.append((match.intent, match.app_name))
+        return True, f"已打开{match.app_name}"
+
+    chain = _fast_path_chain(run_intent, judged)
+
+    result, info = chain.process("帮我打开微信")
+    assert result == "✅ 操作完成"
+    assert info["fast_path"] is True and info["target_app"] == "微信"
+    assert intents == [("launch", "微信")]
+    assert judged == []
+
+    # Not a bare command: the judgement and the phone agent take over
+    result, info = chain.process("打开微信给张三发消息")
+    assert result == "✅ 操作完成" and "fast_path" not in info
+    assert judged == ["打开微信给张三发消息"]
+
+    summary = chain.latency_summary()
+    assert summary["fast"]["count"] == 1 and summary["full"]["count"] == 1
+    assert summary["fast"]["p50"] <= summary["fast"]["max"]
+    metrics = [payload["name"] for name, payload in events if name == "performance_metric"]
+    assert metrics == ["fast_path_latency", "full_path_latency"]
+
+
+def test_latency_is_not_recorded_without_the_fast_path(monkeypatch):
+    events = []
+    monkeypatch.setattr("yuntai.chains.task_chain.prepare_callbacks_with_manager", lambda *a, **k: [])
+    monkeypatch.setattr("yuntai.chains.task_chain.emit_agent_event", lambda *a, **k: events.append(a))
+    chain = _fast_path_chain(lambda match: (True, ""), [])
+    chain.intent_matcher = None
+
+    result, _ = chain.process("打开微信")
+
+    assert result == "✅ 操作完成"
+    assert all(row["count"] == 0 for row in chain.latency_summary().values())
+    assert [name for name, _ in events] == ["task_type"]
+
+
+def test_failed_fast_path_falls_back_and_explain_mode_reports_the_trace(monkeypatch):
+    events = []
+    monkeypatch.setattr("yuntai.chains.task_chain.prepare_callbacks_with_manager", lambda *a, **k: [])
+    monkeypatch.setattr("yuntai.chains.task_chain.emit_agent_event", lambda *a, **k: events.append(a))
+    judged = []
+    chain = _fast_path_chain(lambda match: (False, "无法直接启动"), judged, explain_intents=True)
+
+    result, info = chain.process("回到桌面")
+
+    assert judged == ["回到桌面"]
+    assert info["task_type"] == TASK_TYPE_BASIC_OPERATION
+    status = [payload["message"] for name, payload in events if name == "status"]
+    assert status and "命中桌面说法" in status[0]
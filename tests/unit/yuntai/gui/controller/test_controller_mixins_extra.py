@@ -264,3 +264,30 @@ def test_command_multimodal_chat_paths(tmp_path):
     obj.multimodal_processor = _MM()
     assert obj._handle_multimodal_chat("hi", [str(f)]) == "response"
     assert "saved" in logs
+
+
+def test_flight_recorder_dump_replays_through_gui_and_web_formatters(tmp_path, capsys):
+    from phone_agent.events import AgentEvent, AgentEventEmitter
+    from phone_agent.flight_recorder import FlightRecorder, main
+    from web.core.handlers.command_handler import (
+        format_agent_event_text as format_web_event_text,
+    )
+    from yuntai.gui.controller.core import format_agent_event_text
+
+    emitter = AgentEventEmitter()
+    recorder = FlightRecorder()
+    recorder.attach(emitter)
+    events = [
+        AgentEvent("thinking_chunk", {"text": "先打开微信"}),
+        AgentEvent("action_decoded", {"action": {"action": "Launch", "app": "微信"}}),
+        AgentEvent("result", {"message": "完成"}),
+    ]
+    for event in events:
+        emitter.emit(event)
+    path = recorder.dump(tmp_path / "dump.jsonl.gz")
+
+    formatters = {"gui": format_agent_event_text, "web": format_web_event_text}
+    for name, formatter in formatters.items():
+        main([str(path), "--formatter", name, "--speed", "0"])
+        expected = "".join(formatter(event.to_dict()) for event in events)
+        assert capsys.readouterr().out == expected
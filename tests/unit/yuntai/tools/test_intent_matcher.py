@@ -0,0 +1,79 @@
+import pytest
+
+from yuntai.tools.intent_matcher import (
+    INTENT_BACK,
+    INTENT_HOME,
+    INTENT_LAUNCH,
+    IntentMatcher,
+    normalize,
+)
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return IntentMatcher()
+
+
+@pytest.mark.parametrize(
+    ("text", "app_name"),
+    [
+        ("打开微信", "微信"),
+        ("帮我打开微信吧", "微信"),
+        ("请打开一下 QQ音乐", "QQ音乐"),
+        ("启动抖音", "抖音"),
+        ("打开 WeChat app", "WeChat"),
+        ("打开b站", "bilibili"),
+        ("打开设置", "Settings"),
+        ("Open Google Maps", "GoogleMaps"),
+    ],
+)
+def test_launch_commands_resolve_to_apps(matcher, text, app_name):
+    match = matcher.match(text)
+    assert (match.intent, match.app_name, match.confidence) == (INTENT_LAUNCH, app_name, 1.0)
+
+
+def test_fuzzy_app_names_carry_their_confidence(matcher):
+    match = matcher.match("open google map")
+    assert match.app_name == "GoogleMaps"
+    assert 0.85 <= match.confidence < 1.0
+    assert any("模糊匹配" in line for line in match.trace)
+
+
+@pytest.mark.parametrize(
+    ("text", "intent"),
+    [("回到桌面", INTENT_HOME), ("请返回主页吧", INTENT_HOME), ("返回", INTENT_BACK), ("Go back", INTENT_BACK)],
+)
+def test_home_and_back_synonyms(matcher, text, intent):
+    assert matcher.match(text).intent == intent
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["打开微信给张三发消息", "今天天气怎么样", "打开微新", "打开", "返回微信", "", "打开" + "很长的名字" * 6],
+)
+def test_anything_beyond_a_bare_command_is_left_to_the_full_path(matcher, text):
+    assert matcher.match(text) is None
+
+
+def test_ambiguous_fuzzy_matches_are_rejected():
+    matcher = IntentMatcher(apps={"Photo Editor": "a.editor", "Photo Editer": "b.editer"}, aliases={})
+    assert matcher.match("open photo editor").app_name == "Photo Editor"
+    assert matcher.match("open photo editr") is None
+    assert "歧义" in matcher.explain("open photo editr")
+
+
+def test_aliases_for_unknown_apps_are_ignored():
+    matcher = IntentMatcher(apps={"微信": "com.tencent.mm"}, aliases={"抖音": ("douyin",)})
+    assert matcher.match("打开douyin") is None
+
+
+def test_explain_walks_through_each_stage(matcher):
+    explanation = matcher.explain("帮我打开微信吧")
+    assert explanation.splitlines() == [
+        "规范化: '帮我打开微信吧' -> '帮我打开微信吧'",
+        "去除礼貌用语和语气词: '打开微信'",
+        "启动动词 '打开'，APP 名 '微信'",
+        "精确匹配 APP '微信'",
+        "结论: {'intent': 'launch', 'app_name': '微信', 'confidence': 1.0}",
+    ]
+    assert normalize("Google-Maps!") == "googlemaps"
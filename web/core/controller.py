@@ -37,7 +37,13 @@ from typing import Any, TYPE_CHECKING
 
 from yuntai.core.config import (
     PROJECT_ROOT, SCRCPY_PATH, SHORTCUTS, CONVERSATION_HISTORY_FILE, TEMP_DIR,
-    APP_VERSION
+    APP_VERSION, FLIGHT_RECORDER_ENABLED, FLIGHT_RECORDER_CAPACITY,
+    FLIGHT_RECORDER_SCREENSHOTS, FLIGHT_RECORDER_DIR, FLIGHT_RECORDER_MAX_DUMPS
+)
+from phone_agent.flight_recorder import (
+    FlightRecorder,
+    get_flight_recorder,
+    install_flight_recorder,
 )
 from yuntai.services.task_manager import TaskManager, TTSManager
 from yuntai.chains import TaskChain, ReplyChain
@@ -116,6 +122,15 @@ class WebController:
 
         self._setup_callbacks()
 
+        # 初始化事件飞行记录器，出错时自动转储最近的事件
+        if FLIGHT_RECORDER_ENABLED and get_flight_recorder() is None:
+            install_flight_recorder(FlightRecorder(
+                capacity=FLIGHT_RECORDER_CAPACITY,
+                max_screenshots=FLIGHT_RECORDER_SCREENSHOTS,
+                dump_dir=FLIGHT_RECORDER_DIR,
+                max_dumps=FLIGHT_RECORDER_MAX_DUMPS,
+            ))
+
     def _setup_callbacks(self) -> None:
         """设置 LangChain Callbacks"""
         self.logging_handler = LoggingCallbackHandler(
@@ -28,6 +28,12 @@ from pathlib import Path
 from typing import TYPE_CHECKING
 
 from phone_agent.events import get_global_event_emitter
+from yuntai.core.config import (
+    WEB_STREAM_COALESCE_INTERVAL,
+    WEB_STREAM_COALESCE_MAX_CHARS,
+)
+
+from ..stream_coalescer import StreamCoalescer
 
 logger = logging.getLogger(__name__)
 
@@ -56,8 +62,12 @@ if TYPE_CHECKING:
     from ..controller import WebController
 
 
-def _format_agent_event_text(event: dict) -> str:
-    """Fallback text renderer for structured events."""
+def format_agent_event_text(event: dict) -> str:
+    """
+    Fallback text renderer for structured events.
+
+    Also used by ``python -m phone_agent.flight_recorder --formatter web``.
+    """
     event_type = event.get("type", "")
     payload = event.get("payload", {}) or {}
     if event_type == "thinking_chunk":
@@ -135,11 +145,20 @@ async def handle_command(websocket, data: dict, controller: "WebController"):
     loop = asyncio.get_event_loop()
     emitter = get_global_event_emitter()
 
-    def on_agent_event(event: dict):
-        asyncio.run_coroutine_threadsafe(controller.send_agent_event(event), loop)
-        text = _format_agent_event_text(event)
+    async def send_event_frames(event: dict):
+        await controller.send_agent_event(event)
+        text = format_agent_event_text(event)
         if text:
-            asyncio.run_coroutine_threadsafe(controller.send_output(text, "output"), loop)
+            await controller.send_output(text, "output")
+
+    # 连续的思考文本块合并成帧，每帧只切换一次事件循环
+    coalescer = StreamCoalescer(
+        lambda event: asyncio.run_coroutine_threadsafe(send_event_frames(event), loop),
+        loop=loop,
+        interval=WEB_STREAM_COALESCE_INTERVAL,
+        max_chars=WEB_STREAM_COALESCE_MAX_CHARS,
+    )
+    on_agent_event = coalescer.push
 
     def run_command():
         result_text = ""
@@ -185,6 +204,7 @@ async def handle_command(websocket, data: dict, controller: "WebController"):
                                     )
                                 except Exception as e:
                                     logger.error("持续回复错误: %s", str(e), exc_info=True)
+                                    coalescer.flush()
                                     asyncio.run_coroutine_threadsafe(
                                         controller.send_agent_event({
                                             "type": "error",
@@ -196,6 +216,7 @@ async def handle_command(websocket, data: dict, controller: "WebController"):
                                     )
                                 finally:
                                     emitter.off(on_agent_event_with_flag)
+                                    coalescer.close()
                                     controller.is_continuous_mode = False
                                     asyncio.run_coroutine_threadsafe(
                                         controller.send_state_update({
@@ -223,6 +244,7 @@ async def handle_command(websocket, data: dict, controller: "WebController"):
         finally:
             if not controller.is_continuous_mode:
                 emitter.off(on_agent_event_with_flag)
+                coalescer.close()
             if result_text and not has_attachments and not event_seen:
                 fallback_text = result_text if result_text.startswith("❌") else f"🎉 结果：{result_text}\n"
                 asyncio.run_coroutine_threadsafe(
@@ -0,0 +1,210 @@
+"""
+stream_coalescer.py - 思考流合并
+================================
+
+把模型流式输出的 thinking_chunk 事件合并成较少的 WebSocket 帧。
+
+主要组件:
+    - StreamCoalescer: 流式文本事件合并器
+    - StreamStats: 合并统计
+
+合并规则:
+    - 同一运行、同一步骤的连续文本块合并为一帧
+    - 每帧最多等待 ``interval`` 秒或累积 ``max_chars`` 个字符
+    - 其他事件（步骤、动作边界等）到达时先发出已合并的文本，再原样转发
+    - 文本按原顺序拼接，内容与逐块发送完全一致
+
+使用示例:
+    >>> coalescer = StreamCoalescer(on_frame, loop=loop)
+    >>> emitter.on(coalescer.push)
+    >>> ...
+    >>> coalescer.close()
+"""
+
+import json
+import logging
+import threading
+import time
+from asyncio import AbstractEventLoop
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from phone_agent.events import TEXT_EVENT_TYPES, coalesce_text_events
+
+logger = logging.getLogger(__name__)
+
+
+def _utf8_len(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+@dataclass
+class StreamStats:
+    """
+    合并统计
+
+    字节数按事件的 JSON 序列化长度（UTF-8）计算。
+
+    Attributes:
+        chunks: 收到的文本块数
+        frames: 发出的文本帧数
+        bytes_in: 逐块发送时的字节数
+        bytes_out: 合并后实际发送的字节数
+        started: 第一个文本块到达的时间（time.monotonic）
+        finished: 最后一帧发出的时间（time.monotonic）
+    """
+
+    chunks: int = 0
+    frames: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    started: float | None = None
+    finished: float | None = None
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+    @property
+    def duration(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.duration if self.duration > 0 else 0.0
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.frames / self.duration if self.duration > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "chunks": self.chunks,
+            "frames": self.frames,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_saved,
+            "chunks_per_second": round(self.chunks_per_second, 1),
+            "frames_per_second": round(self.frames_per_second, 1),
+        }
+
+
+class StreamCoalescer:
+    """
+    流式文本事件合并器
+
+    ``push`` 可在任意线程调用，合并后的事件按原顺序交给 ``sink``。
+    对 ``sink`` 的调用在内部锁内进行，因此调用顺序即事件顺序。
+
+    每帧只在开始累积时安排一次定时刷新：有事件循环时用
+    ``loop.call_later``，否则用 ``threading.Timer``。
+
+    Args:
+        sink: 接收合并后事件的回调
+        loop: 用于定时刷新的事件循环
+        interval: 每帧最长累积时间（秒），0 表示不合并
+        max_chars: 每帧最多累积的字符数
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[dict[str, Any]], Any],
+        loop: AbstractEventLoop | None = None,
+        interval: float = 0.04,
+        max_chars: int = 4096,
+    ) -> None:
+        self.sink = sink
+        self.loop = loop
+        self.interval = interval
+        self.max_chars = max_chars
+        self.stats = StreamStats()
+        self._pending: dict[str, Any] | None = None
+        self._pending_chunks = 0
+        self._pending_chars = 0
+        self._frame_id = 0
+        self._lock = threading.Lock()
+
+    def push(self, event: dict[str, Any]) -> None:
+        """接收一个事件，文本块进入合并，其他事件先刷新再转发"""
+        with self._lock:
+            if event.get("type") not in TEXT_EVENT_TYPES:
+                self._flush_locked()
+                self.sink(event)
+                return
+            self.stats.chunks += 1
+            if self.stats.started is None:
+                self.stats.started = time.monotonic()
+            if self.interval <= 0:
+                self._emit(event, 1)
+                return
+            text = (event.get("payload") or {}).get("text", "")
+            if self._pending is not None:
+                merged = coalesce_text_events(self._pending, event)
+                if merged is None:
+                    # 运行或步骤变化，先发出上一帧
+                    self._flush_locked()
+                else:
+                    self._pending = merged
+                    self._pending_chunks += 1
+                    self._pending_chars += len(text)
+            if self._pending is None:
+                self._pending = event
+                self._pending_chunks = 1
+                self._pending_chars = len(text)
+                self._frame_id += 1
+                self._schedule(self._frame_id)
+            if self._pending_chars >= self.max_chars:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """立即发出已累积的文本"""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """发出剩余文本并记录统计"""
+        self.flush()
+        if self.stats.chunks:
+            logger.debug("思考流合并统计: %s", self.stats.to_dict())
+
+    def _schedule(self, frame_id: int) -> None:
+        loop = self.loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(
+                    loop.call_later, self.interval, self._flush_frame, frame_id
+                )
+                return
+            except RuntimeError:
+                # 事件循环已关闭，退回线程定时器
+                pass
+        timer = threading.Timer(self.interval, self._flush_frame, args=(frame_id,))
+        timer.daemon = True
+        timer.start()
+
+    def _flush_frame(self, frame_id: int) -> None:
+        with self._lock:
+            # 该帧可能已因边界事件或长度上限提前发出
+            if frame_id == self._frame_id:
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._pending is None:
+            return
+        event, chunks = self._pending, self._pending_chunks
+        self._pending = None
+        self._pending_chunks = self._pending_chars = 0
+        self._emit(event, chunks)
+
+    def _emit(self, event: dict[str, Any], chunks: int) -> None:
+        size = _utf8_len(json.dumps(event, ensure_ascii=False, default=str))
+        text = (event.get("payload") or {}).get("text", "")
+        # 每个被合并掉的文本块本会再带一份除文本外的事件字段
+        overhead = size - _utf8_len(json.dumps(text, ensure_ascii=False)) + 2
+        self.stats.frames += 1
+        self.stats.bytes_out += size
+        self.stats.bytes_in += size + (chunks - 1) * overhead
+        self.stats.finished = time.monotonic()
+        self.sink(event)
@@ -6,63 +6,191 @@ WebSocket 连接管理器模块
 
 主要组件:
     - ConnectionManager: WebSocket 连接管理器
+    - ClientStats: 单个连接的发送统计
 
 功能特点:
     - 支持多客户端同时连接
-    - 线程安全的连接管理
-    - 支持个人消息和广播消息
+    - 每个连接一个有界发送队列和一个写协程，慢客户端不会拖慢其他客户端
+    - 广播只序列化一次并立即返回，不等待任何发送完成
+    - 慢客户端按策略合并积压消息或断开连接
+    - 支持从其他线程的事件循环中广播
     - 首次连接状态跟踪
 """
 import asyncio
+import json
 import logging
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any
 
 from fastapi import WebSocket
 
+from phone_agent.events import coalesce_text_events
+
 logger = logging.getLogger(__name__)
 
+# 慢客户端策略
+SLOW_CLIENT_COALESCE = "coalesce"  # 合并积压消息，合并后仍积压则断开
+SLOW_CLIENT_DISCONNECT = "disconnect"  # 队列满时直接断开
+
+# data 字段为文本、可按顺序拼接的消息类型
+TEXT_MESSAGE_TYPES = frozenset({"output"})
+# data 字段为字典、可按键合并的消息类型
+MERGE_MESSAGE_TYPES = frozenset({"state_update"})
+# 只需保留最新一条的消息类型
+LATEST_MESSAGE_TYPES = frozenset({"tts_loading"})
+
+# 慢客户端被断开时使用的关闭码（1013: Try Again Later）
+SLOW_CLIENT_CLOSE_CODE = 1013
+
+
+def encode_message(message: dict[str, Any]) -> str:
+    """按 WebSocket.send_json 的格式序列化消息"""
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+
+
+def coalesce_messages(
+    older: dict[str, Any], newer: dict[str, Any]
+) -> dict[str, Any] | None:
+    """
+    将相邻的两条消息合并为一条
+
+    合并后客户端看到的最终内容与逐条接收时一致。
+
+    Args:
+        older: 先发送的消息
+        newer: 后发送的消息
+
+    Returns:
+        合并后的消息，无法合并时返回 None
+    """
+    msg_type = newer.get("type")
+    if older.get("type") != msg_type:
+        return None
+    if msg_type in TEXT_MESSAGE_TYPES:
+        if isinstance(older.get("data"), str) and isinstance(newer.get("data"), str):
+            return {**older, "data": older["data"] + newer["data"]}
+    elif msg_type in MERGE_MESSAGE_TYPES:
+        if isinstance(older.get("data"), dict) and isinstance(newer.get("data"), dict):
+            return {**newer, "data": {**older["data"], **newer["data"]}}
+    elif msg_type in LATEST_MESSAGE_TYPES:
+        return newer
+    elif msg_type == "agent_event":
+        event = coalesce_text_events(older.get("event") or {}, newer.get("event") or {})
+        if event is not None:
+            return {**older, "event": event}
+    return None
+
+
+@dataclass
+class ClientStats:
+    """
+    单个连接的发送统计
+
+    Attributes:
+        sent: 已发送的帧数
+        coalesced: 被合并掉的消息数
+        overflows: 队列超出上限的次数
+        max_depth: 队列的最大深度
+    """
+
+    sent: int = 0
+    coalesced: int = 0
+    overflows: int = 0
+    max_depth: int = 0
+
+
+class _Client:
+    """一个连接的发送队列和写协程"""
+
+    __slots__ = ("websocket", "queue", "wakeup", "writer", "slow", "closed", "stats")
+
+    def __init__(self, websocket: WebSocket) -> None:
+        self.websocket = websocket
+        # 队列元素为 [消息, 序列化文本]，合并产生的消息文本为 None，发送时再序列化
+        self.queue: deque[list[Any]] = deque()
+        self.wakeup = asyncio.Event()
+        self.writer: asyncio.Task | None = None
+        self.slow = False  # 队列溢出过且尚未清空
+        self.closed = False
+        self.stats = ClientStats()
+
 
 class ConnectionManager:
     """
     WebSocket 连接管理器
-    
+
     管理所有 WebSocket 连接，支持消息广播和个人消息发送。
-    
+
+    每个连接拥有一个有界发送队列和一个写协程。广播把同一份序列化文本
+    追加到各连接的队列后立即返回，发送由各连接的写协程完成，因此一个
+    卡住的浏览器标签页只会积压自己的队列。队列超出上限的连接被视为慢
+    客户端，按 ``slow_client_policy`` 合并积压消息或断开连接；单帧发送
+    超过 ``send_timeout`` 秒的连接直接断开。
+
+    所有队列操作都在服务器事件循环中进行，其他线程的事件循环调用
+    ``broadcast`` 时会转交给服务器事件循环。
+
+    Args:
+        max_queue: 每个连接允许积压的消息数
+        slow_client_policy: SLOW_CLIENT_COALESCE 或 SLOW_CLIENT_DISCONNECT
+        send_timeout: 单帧发送超时（秒），None 表示不限制
+
     Attributes:
         active_connections: 当前活跃的 WebSocket 连接列表
-        _lock: 异步锁，保证线程安全
+        slow_disconnects: 因发送过慢被断开的连接数
         _first_connection_occurred: 是否已有首次连接
-    
+
     使用示例:
         >>> manager = ConnectionManager()
         >>> await manager.connect(websocket)
         >>> await manager.broadcast({"type": "message", "data": "hello"})
     """
-    
-    def __init__(self) -> None:
+
+    def __init__(
+        self,
+        max_queue: int = 256,
+        slow_client_policy: str = SLOW_CLIENT_COALESCE,
+        send_timeout: float | None = 10.0,
+    ) -> None:
         """初始化连接管理器"""
-        self.active_connections: list[WebSocket] = []
-        self._lock = asyncio.Lock()
+        if slow_client_policy not in (SLOW_CLIENT_COALESCE, SLOW_CLIENT_DISCONNECT):
+            raise ValueError(f"未知的慢客户端策略: {slow_client_policy}")
+        self.max_queue = max_queue
+        self.slow_client_policy = slow_client_policy
+        self.send_timeout = send_timeout
+        self.slow_disconnects = 0
+        self._clients: dict[WebSocket, _Client] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._closing: set[asyncio.Task] = set()
         self._first_connection_occurred = False
         logger.debug("ConnectionManager 初始化完成")
-    
+
+    @property
+    def active_connections(self) -> list[WebSocket]:
+        """当前活跃的 WebSocket 连接列表"""
+        return list(self._clients)
+
     async def connect(self, websocket: WebSocket) -> None:
         """
         接受新的 WebSocket 连接
-        
+
         Args:
             websocket: WebSocket 连接实例
         """
         await websocket.accept()
-        async with self._lock:
-            self.active_connections.append(websocket)
-        logger.debug("WebSocket 连接建立，当前连接数: %d", len(self.active_connections))
+        self._loop = asyncio.get_running_loop()
+        client = _Client(websocket)
+        self._clients[websocket] = client
+        client.writer = self._loop.create_task(self._write(client))
+        logger.debug("WebSocket 连接建立，当前连接数: %d", len(self._clients))
 
     def is_first_connection(self) -> bool:
         """
         检查是否是首次连接
-        
+
         用于判断是否需要显示欢迎遮罩。
-        
+
         Returns:
             如果是后端启动后的第一个连接返回 True
         """
@@ -72,55 +200,191 @@ class ConnectionManager:
         """标记首次连接已完成"""
         self._first_connection_occurred = True
         logger.debug("首次连接标记完成")
-    
+
     async def disconnect(self, websocket: WebSocket) -> None:
         """
         断开 WebSocket 连接
-        
+
+        未发送的消息随之丢弃。
+
         Args:
             websocket: 要断开的 WebSocket 连接实例
         """
-        async with self._lock:
-            if websocket in self.active_connections:
-                self.active_connections.remove(websocket)
-        logger.debug("WebSocket 连接断开，当前连接数: %d", len(self.active_connections))
-    
+        self._remove(websocket)
+        logger.debug("WebSocket 连接断开，当前连接数: %d", len(self._clients))
+
     async def send_personal_message(self, message: dict, websocket: WebSocket) -> None:
         """
         发送个人消息
-        
-        向指定的 WebSocket 连接发送消息。
-        
+
+        向指定的 WebSocket 连接发送消息。消息进入该连接的发送队列，
+        与广播消息保持先后顺序。
+
         Args:
             message: 要发送的消息字典
             websocket: 目标 WebSocket 连接实例
         """
-        try:
-            await websocket.send_json(message)
-            logger.debug(f"发送个人消息: {message.get('type', 'unknown')}")
-        except Exception as e:
-            logger.warning(f"发送消息失败: {e}")
-    
+        client = self._clients.get(websocket)
+        if client is None:
+            # 未经 connect 管理的连接，直接发送
+            try:
+                await websocket.send_json(message)
+            except Exception as e:
+                logger.warning(f"发送消息失败: {e}")
+            return
+        self._dispatch(self._enqueue, client, message, encode_message(message))
+        logger.debug(f"发送个人消息: {message.get('type', 'unknown')}")
+
     async def broadcast(self, message: dict) -> None:
         """
         广播消息到所有连接
-        
-        向所有活跃的 WebSocket 连接发送消息。
-        
+
+        消息只序列化一次，追加到所有连接的发送队列后立即返回。
+
         Args:
             message: 要广播的消息字典
         """
-        async with self._lock:
-            disconnected = []
-            for connection in self.active_connections:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    disconnected.append(connection)
-            
-            for conn in disconnected:
-                if conn in self.active_connections:
-                    self.active_connections.remove(conn)
-        
-        if len(disconnected) > 0:
-            logger.debug(f"广播消息完成，清理 {len(disconnected)} 个断开的连接")
+        if self._clients:
+            self._dispatch(self._fan_out, message, encode_message(message))
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        获取发送统计
+
+        Returns:
+            连接数、慢客户端断开数及每个连接的队列深度和发送统计
+        """
+        return {
+            "connections": len(self._clients),
+            "slow_disconnects": self.slow_disconnects,
+            "clients": [
+                {
+                    **asdict(client.stats),
+                    "queued": len(client.queue),
+                    "slow": client.slow,
+                }
+                for client in self._clients.values()
+            ],
+        }
+
+    def _dispatch(self, func: Any, *args: Any) -> None:
+        """在服务器事件循环中执行队列操作"""
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            func(*args)
+            return
+        try:
+            loop.call_soon_threadsafe(func, *args)
+        except RuntimeError:
+            logger.debug("服务器事件循环已关闭，丢弃消息")
+
+    def _fan_out(self, message: dict[str, Any], text: str) -> None:
+        # 入队可能断开慢客户端，遍历副本
+        for client in tuple(self._clients.values()):
+            self._enqueue(client, message, text)
+
+    def _enqueue(self, client: _Client, message: dict[str, Any], text: str) -> None:
+        if client.closed:
+            return
+        queue = client.queue
+        if client.slow and queue:
+            merged = coalesce_messages(queue[-1][0], message)
+            if merged is not None:
+                queue[-1] = [merged, None]
+                client.stats.coalesced += 1
+                return
+        queue.append([message, text])
+        if len(queue) > self.max_queue:
+            client.stats.overflows += 1
+            client.slow = True
+            coalesce = self.slow_client_policy == SLOW_CLIENT_COALESCE
+            if not (coalesce and self._compact(client)):
+                self._drop_slow_client(client, "发送队列已满")
+                return
+        client.stats.max_depth = max(client.stats.max_depth, len(queue))
+        client.wakeup.set()
+
+    def _compact(self, client: _Client) -> bool:
+        """
+        合并慢客户端队列中的相邻消息
+
+        Returns:
+            合并后队列是否降到上限的一半以下
+        """
+        compacted: deque[list[Any]] = deque()
+        for entry in client.queue:
+            if compacted:
+                merged = coalesce_messages(compacted[-1][0], entry[0])
+                if merged is not None:
+                    compacted[-1] = [merged, None]
+                    client.stats.coalesced += 1
+                    continue
+            compacted.append(entry)
+        client.queue = compacted
+        # 留出余量，避免每次广播都重新合并整个队列
+        return len(compacted) <= self.max_queue // 2
+
+    async def _write(self, client: _Client) -> None:
+        """连接的写协程，按顺序发送队列中的消息"""
+        websocket = client.websocket
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                if not client.queue:
+                    client.slow = False
+                    client.wakeup.clear()
+                    await client.wakeup.wait()
+                    continue
+                message, text = client.queue.popleft()
+                if text is None:
+                    text = encode_message(message)
+                if self.send_timeout is None:
+                    await websocket.send_text(text)
+                else:
+                    # 用定时器而不是 wait_for，避免每帧额外创建一个任务
+                    timer = loop.call_later(
+                        self.send_timeout, self._drop_slow_client, client, "发送超时"
+                    )
+                    try:
+                        await websocket.send_text(text)
+                    finally:
+                        timer.cancel()
+                client.stats.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug("发送消息失败，移除连接: %s", e)
+            self._remove(websocket)
+
+    def _drop_slow_client(self, client: _Client, reason: str) -> None:
+        """移除慢客户端并关闭其连接，客户端重连后会重新获取完整状态"""
+        self._remove(client.websocket)
+        self.slow_disconnects += 1
+        logger.warning("断开慢客户端（%s），当前连接数: %d", reason, len(self._clients))
+        task = asyncio.get_running_loop().create_task(self._close(client.websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket) -> None:
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=SLOW_CLIENT_CLOSE_CODE), self.send_timeout
+            )
+        except Exception as e:
+            logger.debug("关闭慢客户端连接失败: %s", e)
+
+    def _remove(self, websocket: WebSocket) -> None:
+        client = self._clients.pop(websocket, None)
+        if client is None:
+            return
+        client.closed = True
+        client.queue.clear()
+        writer = client.writer
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
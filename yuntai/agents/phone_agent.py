@@ -24,10 +24,13 @@
 from __future__ import annotations
 
 import logging
+from typing import TYPE_CHECKING
 
 from phone_agent import PhoneAgent as ExternalPhoneAgent
 from phone_agent.model import ModelConfig
 from phone_agent.agent import AgentConfig
+from phone_agent.device_factory import get_device_factory
+from phone_agent.macro import Macro, MacroLibrary, MacroPlayer, MacroReplay
 
 from yuntai.core.config import (
     ZHIPU_API_KEY,
@@ -52,6 +55,10 @@ from yuntai.core.agent_executor import AgentExecutor
 # 导入聊天消息提示词
 from yuntai.prompts.agent_executor_prompt import CHAT_MESSAGE_PROMPT
 
+# 类型检查时导入，避免 yuntai.tools 与本模块循环导入
+if TYPE_CHECKING:
+    from yuntai.tools.intent_matcher import IntentMatch
+
 # 配置模块级日志记录器
 logger = logging.getLogger(__name__)
 
@@ -163,7 +170,7 @@ class PhoneAgentWrapper:
         logger.debug("清理标准输入管道")
         AgentExecutor._cleanup_stdin_pipe()
 
-    def execute(self, task: str) -> tuple[bool, str]:
+    def execute(self, task: str, macro_library: MacroLibrary | None = None) -> tuple[bool, str]:
         """
         执行手机操作
         
@@ -171,6 +178,7 @@ class PhoneAgentWrapper:
         
         Args:
             task: 操作指令，描述要执行的任务
+            macro_library: 宏库，不为 None 时成功的执行会以 task 为键录制为宏
         
         Returns:
             tuple[bool, str]: (是否成功, 执行结果描述)
@@ -189,7 +197,17 @@ class PhoneAgentWrapper:
             # 构建带提示词的任务
             task_with_prompt = task + "\n\n" + PHONE_OPERATION_PROMPT
             # 执行任务
-            result = agent.run(task_with_prompt)
+            if macro_library is not None:
+                # 以原始指令为键录制，不含提示词；宏库只用于本次执行，
+                # 失败时缓存的 Agent 不会被重置，因此须在 finally 中恢复
+                previous_library = agent.agent_config.macro_library
+                agent.agent_config.macro_library = macro_library
+                try:
+                    result = agent.run(task_with_prompt, macro_intent=task)
+                finally:
+                    agent.agent_config.macro_library = previous_library
+            else:
+                result = agent.run(task_with_prompt)
             # 重置 Agent
             self._reset_agent()
             
@@ -205,6 +223,22 @@ class PhoneAgentWrapper:
             # 确保清理管道
             self._cleanup_pipe()
     
+    def replay(self, macro: Macro) -> MacroReplay:
+        """
+        回放宏
+        
+        按录制的动作序列直接操作设备，不调用模型；
+        每个动作后校验屏幕检查点，遇到第一个偏离即停止。
+        
+        Args:
+            macro: 要回放的宏
+        
+        Returns:
+            MacroReplay: 回放结果
+        """
+        logger.info("回放宏: %s (%d 步)", macro.intent, len(macro.steps))
+        return MacroPlayer(device_id=self.device_id or None).play(macro)
+    
     def open_app(self, app_name: str) -> tuple[bool, str]:
         """
         打开 APP
@@ -401,7 +435,9 @@ class PhoneAgent:
             self._wrapper = PhoneAgentWrapper(self.device_id)
         return self._wrapper
 
-    def execute_operation(self, task: str) -> tuple[bool, str]:
+    def execute_operation(
+        self, task: str, macro_library: MacroLibrary | None = None
+    ) -> tuple[bool, str]:
         """
         执行复杂操作
         
@@ -409,6 +445,7 @@ class PhoneAgent:
         
         Args:
             task: 操作指令
+            macro_library: 宏库，不为 None 时成功的执行会被录制为宏
         
         Returns:
             tuple[bool, str]: (是否成功, 执行结果)
@@ -417,9 +454,56 @@ class PhoneAgent:
             >>> success, result = agent.execute_operation("在微信中找到张三并发送你好")
         """
         logger.info("执行复杂操作: %s", task[:50] if len(task) > 50 else task)
-        return self._get_wrapper().execute(task)
+        return self._get_wrapper().execute(task, macro_library=macro_library)
+
+    def replay_macro(self, macro: Macro) -> MacroReplay:
+        """
+        回放宏
+        
+        不调用模型，直接在设备上回放录制的动作序列。
+        
+        Args:
+            macro: 要回放的宏
+        
+        Returns:
+            MacroReplay: 回放结果，success 为 False 时应交由 execute_operation 执行
+        """
+        return self._get_wrapper().replay(macro)
 
     
+    def run_intent(self, match: IntentMatch) -> tuple[bool, str]:
+        """
+        直接执行意图
+        
+        将 IntentMatcher 的匹配结果直接转换为设备调用，不经过模型。
+        
+        Args:
+            match: 意图匹配结果
+        
+        Returns:
+            tuple[bool, str]: (是否成功, 执行结果)，失败时应交由完整流程执行
+        """
+        from yuntai.tools.intent_matcher import INTENT_BACK, INTENT_HOME, INTENT_LAUNCH
+
+        logger.info("直接执行意图: %s", match.to_dict())
+        device_id = self.device_id or None
+        try:
+            factory = get_device_factory()
+            if match.intent == INTENT_LAUNCH:
+                if not factory.launch_app(match.app_name, device_id):
+                    return False, f"无法直接启动 {match.app_name}"
+                return True, f"已打开{match.app_name}"
+            if match.intent == INTENT_HOME:
+                factory.home(device_id)
+                return True, "已回到桌面"
+            if match.intent == INTENT_BACK:
+                factory.back(device_id)
+                return True, "已返回上一页"
+        except Exception as e:
+            logger.error("直接执行意图失败: %s", str(e), exc_info=True)
+            return False, f"执行失败: {str(e)}"
+        return False, f"不支持的意图: {match.intent}"
+
     def open_app(self, app_name: str) -> tuple[bool, str]:
         """
         打开 APP
@@ -9,6 +9,8 @@
     - 任务分发：根据任务类型分发到对应的处理逻辑
     - 任务执行：执行自由聊天、基础操作、回复等任务
     - 持续回复：支持启动持续回复流程
+    - 宏回放：基础操作优先回放已录制的宏，偏离时回退到 PhoneAgent
+    - 快速路径：打开 APP、回到桌面等简单指令直接调用设备，跳过模型
 
 类说明：
     - TaskChain: 任务处理链类
@@ -27,6 +29,8 @@ from __future__ import annotations
 
 import logging
 import threading
+import time
+from collections import deque
 from typing import Any, TYPE_CHECKING
 
 from langchain_core.callbacks import BaseCallbackHandler
@@ -34,6 +38,7 @@ from langchain_core.callbacks import BaseCallbackHandler
 from yuntai.agents import JudgementAgent, ChatAgent, PhoneAgent
 from yuntai.chains.reply_chain import ReplyChain
 from yuntai.tools.callback_utils import prepare_callbacks_with_manager
+from yuntai.tools.intent_matcher import IntentMatcher
 from yuntai.prompts import (
     TASK_TYPE_FREE_CHAT,
     TASK_TYPE_BASIC_OPERATION,
@@ -41,9 +46,17 @@ from yuntai.prompts import (
     TASK_TYPE_CONTINUOUS_REPLY,
     TASK_TYPE_COMPLEX_OPERATION,
 )
-from yuntai.core.config import SHORTCUTS, TTS_SPEAK_DELAY_TASK
+from yuntai.core.config import (
+    SHORTCUTS,
+    TTS_SPEAK_DELAY_TASK,
+    PHONE_MACRO_ENABLED,
+    PHONE_MACRO_LIBRARY_FILE,
+    INTENT_FAST_PATH_ENABLED,
+    INTENT_FAST_PATH_EXPLAIN,
+)
 from yuntai.callbacks import get_callback_manager
 from phone_agent.events import emit_agent_event
+from phone_agent.macro import MacroLibrary
 
 # 类型检查时导入，避免运行时循环导入
 if TYPE_CHECKING:
@@ -54,6 +67,12 @@ if TYPE_CHECKING:
 # 配置模块级日志记录器
 logger = logging.getLogger(__name__)
 
+# 每条路径保留的耗时样本数
+LATENCY_SAMPLES = 200
+
+# 耗时指标的显示名称
+LATENCY_LABELS = {"fast": "快速路径耗时", "full": "完整路径耗时"}
+
 
 class TaskChain:
     """
@@ -71,6 +90,9 @@ class TaskChain:
         chat_agent: 聊天 Agent
         phone_agent: 手机操作 Agent
         reply_chain: 回复处理链
+        macro_library: 基础操作宏库，为 None 时不录制也不回放
+        intent_matcher: 直接意图匹配器，为 None 时不走快速路径
+        explain_intents: 是否输出意图匹配过程
         _continuous_reply_thread: 持续回复线程
     
     使用示例：
@@ -87,7 +109,10 @@ class TaskChain:
         chat_agent: ChatAgent | None = None,
         phone_agent: PhoneAgent | None = None,
         reply_chain: ReplyChain | None = None,
-        callback_manager=None
+        callback_manager=None,
+        macro_library: MacroLibrary | None = None,
+        intent_matcher: IntentMatcher | None = None,
+        explain_intents: bool = INTENT_FAST_PATH_EXPLAIN,
     ) -> None:
         """
         初始化任务处理链
@@ -101,6 +126,9 @@ class TaskChain:
             phone_agent: 手机操作 Agent，为 None 时自动创建
             reply_chain: 回复处理链，为 None 时自动创建
             callback_manager: 回调管理器实例，为 None 时自动获取单例
+            macro_library: 基础操作宏库，为 None 时按 PHONE_MACRO_ENABLED 配置创建
+            intent_matcher: 直接意图匹配器，为 None 时按 INTENT_FAST_PATH_ENABLED 配置创建
+            explain_intents: 是否在日志和状态事件中输出意图匹配过程
         """
         # 设备 ID
         self.device_id: str = device_id
@@ -126,6 +154,21 @@ class TaskChain:
             tts_manager=tts_manager, callback_manager=self.callback_manager
         )
 
+        # 基础操作宏库
+        if macro_library is None and PHONE_MACRO_ENABLED:
+            macro_library = MacroLibrary(PHONE_MACRO_LIBRARY_FILE)
+        self.macro_library: MacroLibrary | None = macro_library
+
+        # 直接意图快速路径
+        if intent_matcher is None and INTENT_FAST_PATH_ENABLED:
+            intent_matcher = IntentMatcher()
+        self.intent_matcher: IntentMatcher | None = intent_matcher
+        self.explain_intents: bool = explain_intents
+        # 快速路径与完整路径的耗时样本（秒）
+        self._latencies: dict[str, deque[float]] = {
+            path: deque(maxlen=LATENCY_SAMPLES) for path in LATENCY_LABELS
+        }
+
         # 持续回复线程
         self._continuous_reply_thread: threading.Thread | None = None
         
@@ -169,8 +212,9 @@ class TaskChain:
         主要的处理入口方法，执行以下流程：
         1. 检查输入有效性
         2. 检查快捷指令
-        3. JudgementAgent 判断任务类型
-        4. 根据任务类型分发到对应的处理逻辑
+        3. 尝试直接意图快速路径
+        4. JudgementAgent 判断任务类型
+        5. 根据任务类型分发到对应的处理逻辑
         
         Args:
             user_input: 用户输入的文本
@@ -202,6 +246,14 @@ class TaskChain:
                 logger.info("匹配到快捷指令: %s -> %s", letter, task)
                 return self._handle_basic_operation(task), {}
 
+        # 简单指令直接调用设备
+        # 仅在启用快速路径时计时，用于对比快速路径和完整路径的耗时
+        start_time = time.perf_counter() if self.intent_matcher is not None else None
+        fast_result = self._try_fast_path(user_input)
+        if fast_result is not None:
+            self._record_latency("fast", time.perf_counter() - start_time)
+            return fast_result
+
         # 使用 JudgementAgent 判断任务类型
         logger.debug("开始判断任务类型")
         judgement_result = self.judgement_agent.judge(
@@ -264,8 +316,106 @@ class TaskChain:
             logger.debug("未知任务类型，默认为自由聊天")
             result = self._handle_free_chat(user_input, all_callbacks)
 
+        if (
+            start_time is not None
+            and judgement_result.task_type == TASK_TYPE_BASIC_OPERATION
+        ):
+            self._record_latency("full", time.perf_counter() - start_time)
+
         return result, task_info
 
+    def _try_fast_path(self, user_input: str) -> tuple[str, dict[str, Any]] | None:
+        """
+        尝试直接意图快速路径
+        
+        IntentMatcher 有把握时直接执行设备操作，跳过 JudgementAgent 和 PhoneAgent。
+        
+        Args:
+            user_input: 用户输入的文本
+        
+        Returns:
+            命中且执行成功时返回 (处理结果, 任务信息字典)，否则返回 None
+        """
+        if self.intent_matcher is None:
+            return None
+
+        match = self.intent_matcher.match(user_input)
+        if self.explain_intents:
+            explanation = self.intent_matcher.explain(user_input)
+            logger.info("意图匹配过程:\n%s", explanation)
+            emit_agent_event(
+                "status",
+                {"message": explanation},
+                source="yuntai.task_chain",
+            )
+        if match is None:
+            return None
+
+        success, result = self.phone_agent.run_intent(match)
+        if not success:
+            logger.info("快速路径执行失败，转入完整流程: %s", result)
+            return None
+
+        emit_agent_event(
+            "task_type",
+            {"task_type": TASK_TYPE_BASIC_OPERATION, "fast_path": True},
+            source="yuntai.task_chain",
+        )
+        logger.info("快速路径完成: %s", result)
+
+        # TTS 语音播报
+        if self.tts_manager and getattr(self.tts_manager, 'tts_enabled', False) and result:
+            threading.Timer(TTS_SPEAK_DELAY_TASK, lambda: self.tts_manager.speak_text_intelligently(result)).start()
+
+        task_info = {
+            "task_type": TASK_TYPE_BASIC_OPERATION,
+            "target_app": match.app_name or "",
+            "fast_path": True,
+            **match.to_dict(),
+        }
+        return "✅ 操作完成", task_info
+
+    def _record_latency(self, path: str, seconds: float) -> None:
+        """
+        记录一次处理耗时
+        
+        Args:
+            path: "fast" 为快速路径，"full" 为经过判断模型的完整路径
+            seconds: 耗时（秒）
+        """
+        self._latencies[path].append(seconds)
+        emit_agent_event(
+            "performance_metric",
+            {
+                "name": f"{path}_path_latency",
+                "label": LATENCY_LABELS[path],
+                "value": round(seconds, 3),
+                "unit": "s",
+            },
+            source="yuntai.task_chain",
+        )
+
+    def latency_summary(self) -> dict[str, dict[str, float]]:
+        """
+        快速路径与完整路径的耗时统计
+        
+        完整路径只统计被判断为基础操作的输入，与快速路径可直接对比。
+        
+        Returns:
+            {"fast": {...}, "full": {...}}，每项包含 count、mean、p50、max（秒）
+        """
+        summary = {}
+        for path, samples in self._latencies.items():
+            ordered = sorted(samples)
+            count = len(ordered)
+            summary[path] = {
+                "count": count,
+                "mean": sum(ordered) / count if count else 0.0,
+                "p50": ordered[count // 2] if count else 0.0,
+                "max": ordered[-1] if count else 0.0,
+            }
+        return summary
+
     def _handle_free_chat(
         self,
         user_input: str,
@@ -302,7 +452,7 @@ class TaskChain:
         logger.info("执行基础操作: %s", task)
         
         # 执行操作
-        success, result = self.phone_agent.execute_operation(task)
+        success, result = self._execute_basic_operation(task)
 
         if success:
             # TTS 语音播报
@@ -314,6 +464,41 @@ class TaskChain:
             logger.error("操作失败: %s", result)
             return f"❌ 操作失败: {result}"
 
+    def _execute_basic_operation(self, task: str) -> tuple[bool, str]:
+        """
+        执行基础操作，优先回放宏
+        
+        宏库中有该指令的宏时直接回放，不调用模型；回放偏离检查点时
+        从当前屏幕交由 PhoneAgent 执行。PhoneAgent 成功执行的指令会
+        被录制为新宏，失败时删除旧宏。
+        
+        Args:
+            task: 操作指令
+        
+        Returns:
+            tuple[bool, str]: (是否成功, 执行结果)
+        """
+        if self.macro_library is None:
+            return self.phone_agent.execute_operation(task)
+
+        macro = self.macro_library.get(task)
+        if macro is not None:
+            replay = self.phone_agent.replay_macro(macro)
+            if replay.success:
+                logger.info("宏回放完成，耗时 %.2f 秒", replay.elapsed)
+                return True, replay.message or ""
+            logger.info(
+                "宏回放在第 %d 步偏离 (%s)，转交 PhoneAgent 执行",
+                (replay.diverged_at or 0) + 1, replay.reason,
+            )
+
+        success, result = self.phone_agent.execute_operation(
+            task, macro_library=self.macro_library
+        )
+        if not success:
+            self.macro_library.remove(task)
+        return success, result
+
     def _handle_single_reply(
         self,
         app_name: str,
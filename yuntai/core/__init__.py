@@ -75,6 +75,20 @@ from .config import (
     TTS_ENABLE_PARALLEL,
     PHONE_AGENT_MAX_STEPS,
     PHONE_AGENT_LANG,
+    PHONE_MACRO_ENABLED,
+    PHONE_MACRO_LIBRARY_FILE,
+    INTENT_FAST_PATH_ENABLED,
+    INTENT_FAST_PATH_EXPLAIN,
+    FLIGHT_RECORDER_ENABLED,
+    FLIGHT_RECORDER_CAPACITY,
+    FLIGHT_RECORDER_SCREENSHOTS,
+    FLIGHT_RECORDER_DIR,
+    FLIGHT_RECORDER_MAX_DUMPS,
+    WEB_WS_SEND_QUEUE_SIZE,
+    WEB_WS_SLOW_CLIENT_POLICY,
+    WEB_WS_SEND_TIMEOUT,
+    WEB_STREAM_COALESCE_INTERVAL,
+    WEB_STREAM_COALESCE_MAX_CHARS,
     PHONE_SUCCESS_KEYWORDS,
     SIMILARITY_THRESHOLD,
     SIMILARITY_CHECK_NEW_THRESHOLD,
@@ -171,6 +185,20 @@ __all__ = [
     'TTS_ENABLE_PARALLEL',
     'PHONE_AGENT_MAX_STEPS',
     'PHONE_AGENT_LANG',
+    'PHONE_MACRO_ENABLED',
+    'PHONE_MACRO_LIBRARY_FILE',
+    'INTENT_FAST_PATH_ENABLED',
+    'INTENT_FAST_PATH_EXPLAIN',
+    'FLIGHT_RECORDER_ENABLED',
+    'FLIGHT_RECORDER_CAPACITY',
+    'FLIGHT_RECORDER_SCREENSHOTS',
+    'FLIGHT_RECORDER_DIR',
+    'FLIGHT_RECORDER_MAX_DUMPS',
+    'WEB_WS_SEND_QUEUE_SIZE',
+    'WEB_WS_SLOW_CLIENT_POLICY',
+    'WEB_WS_SEND_TIMEOUT',
+    'WEB_STREAM_COALESCE_INTERVAL',
+    'WEB_STREAM_COALESCE_MAX_CHARS',
     'PHONE_SUCCESS_KEYWORDS',
     'SIMILARITY_THRESHOLD',
     'SIMILARITY_CHECK_NEW_THRESHOLD',
@@ -224,6 +224,36 @@ TTS_ENABLE_PARALLEL = True  # 是否启用并行分段合成
 PHONE_AGENT_MAX_STEPS = 100  # 单次任务最大步数
 PHONE_AGENT_LANG = "cn"  # 操作界面语言：cn=中文
 
+# 基础操作宏录制与回放
+# 启用后，成功的基础操作会被录制为宏，再次执行相同指令时直接回放，不调用模型
+PHONE_MACRO_ENABLED = False  # 是否启用宏录制与回放
+PHONE_MACRO_LIBRARY_FILE = TEMP_DIR / "phone_macros.json"  # 宏库文件
+
+# 直接意图快速路径
+# 启用后，“打开微信”“回到桌面”“返回”等简单指令直接调用设备，跳过判断模型和 PhoneAgent
+INTENT_FAST_PATH_ENABLED = False  # 是否启用快速路径
+INTENT_FAST_PATH_EXPLAIN = False  # 是否输出意图匹配过程
+
+# 事件飞行记录器
+# 在内存中保留最近的结构化事件和步骤截图，出错时自动转储
+# 转储文件可用 python -m phone_agent.flight_recorder 回放
+FLIGHT_RECORDER_ENABLED = True  # 是否启用飞行记录器
+FLIGHT_RECORDER_CAPACITY = 5000  # 保留的事件数
+FLIGHT_RECORDER_SCREENSHOTS = 0  # 保留的截图数，0 表示不保留截图
+FLIGHT_RECORDER_DIR = TEMP_DIR / "flight_recorder"  # 转储目录
+FLIGHT_RECORDER_MAX_DUMPS = 20  # 转储目录保留的转储文件数，0 表示全部保留
+
+# Web 端 WebSocket 发送队列
+# 每个连接一个有界发送队列，慢客户端合并积压消息（coalesce）或直接断开（disconnect）
+WEB_WS_SEND_QUEUE_SIZE = 256  # 每个连接允许积压的消息数
+WEB_WS_SLOW_CLIENT_POLICY = "coalesce"  # 慢客户端策略: coalesce / disconnect
+WEB_WS_SEND_TIMEOUT = 10.0  # 单帧发送超时（秒），超时的连接会被断开
+
+# Web 端思考流合并
+# 连续的 thinking_chunk 文本块按时间或长度合并成一帧发送，步骤和动作边界立即发出
+WEB_STREAM_COALESCE_INTERVAL = 0.04  # 每帧最长累积时间（秒），0 表示不合并
+WEB_STREAM_COALESCE_MAX_CHARS = 4096  # 每帧最多累积的字符数
+
 # 消息发送成功的关键字列表
 # 系统通过检测屏幕文本来判断消息是否发送成功
 PHONE_SUCCESS_KEYWORDS = [
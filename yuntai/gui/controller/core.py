@@ -31,12 +31,56 @@ def _format_action_lines(action: dict) -> str:
         lines.append(f"{key}: {value}")
     return "\n".join(lines)
 
+
+def format_agent_event_text(event: dict[str, Any]) -> str:
+    """Format structured event into GUI output text."""
+    event_type = event.get("type", "")
+    payload = event.get("payload", {}) or {}
+
+    if event_type == "run_started":
+        return ""
+    if event_type == "task_type":
+        task_type = payload.get("task_type", "")
+        if task_type == "free_chat":
+            return f"📋 任务类型: {task_type}\n"
+        return f"📋 任务类型: {task_type}\n\n{DIVIDER}\n💭 思考过程\n{DIVIDER}\n"
+    if event_type == "thinking_chunk":
+        return payload.get("text", "")
+    if event_type == "thinking_complete":
+        return "\n"
+    if event_type == "action_decoded":
+        action = payload.get("action", {})
+        action_text = _format_action_lines(action)
+        return f"\n{DIVIDER}\n🎯 动作\n{DIVIDER}\n{action_text}\n"
+    if event_type == "action_executed":
+        return ""
+    if event_type == "performance_metric":
+        if payload.get("name") == "label":
+            return f"\n{DIVIDER}\n⏱️  性能指标\n{DIVIDER}\n"
+        label = payload.get("label", payload.get("name", "metric"))
+        value = payload.get("value", "")
+        unit = payload.get("unit", "")
+        return f"{label}: {value}{unit}\n"
+    if event_type == "result":
+        msg = payload.get("message", "")
+        return f"\n🎉 结果：{msg}\n" if msg else ""
+    if event_type == "error":
+        return f"❌ 错误：{payload.get('message', '')}\n"
+    if event_type == "status":
+        return f"{payload.get('message', '')}\n"
+    if event_type == "run_finished":
+        return ""
+    return ""
+
+
 # 项目模块
 from yuntai.core.config import (
     SHORTCUTS, ZHIPU_API_KEY,
     CONVERSATION_HISTORY_FILE, RECORD_LOGS_DIR, FOREVER_MEMORY_FILE,
     CONNECTION_CONFIG_FILE, SCRCPY_PATH, validate_config, print_config_summary,
-    ZHIPU_CHAT_MODEL, ZHIPU_MODEL, ZHIPU_API_BASE_URL
+    ZHIPU_CHAT_MODEL, ZHIPU_MODEL, ZHIPU_API_BASE_URL,
+    FLIGHT_RECORDER_ENABLED, FLIGHT_RECORDER_CAPACITY, FLIGHT_RECORDER_SCREENSHOTS,
+    FLIGHT_RECORDER_DIR, FLIGHT_RECORDER_MAX_DUMPS
 )
 
 # 引用 TaskManager（保留用于连接管理和TTS）
@@ -51,6 +95,11 @@ from yuntai.handlers import ConnectionHandler, TTSHandler, DynamicHandler, Syste
 from yuntai.gui.gui_view import GUIView
 from yuntai.gui.styles import ThemeColors
 from phone_agent.events import get_global_event_emitter
+from phone_agent.flight_recorder import (
+    FlightRecorder,
+    get_flight_recorder,
+    install_flight_recorder,
+)
 
 # LangChain Callbacks
 from yuntai.callbacks import (
@@ -168,6 +217,15 @@ class ControllerCore(QObject):
         self.agent_event_emitter = get_global_event_emitter()
         self.agent_event_emitter.on(self._handle_agent_event)
 
+        # 初始化事件飞行记录器，出错时自动转储最近的事件
+        if FLIGHT_RECORDER_ENABLED and get_flight_recorder() is None:
+            install_flight_recorder(FlightRecorder(
+                capacity=FLIGHT_RECORDER_CAPACITY,
+                max_screenshots=FLIGHT_RECORDER_SCREENSHOTS,
+                dump_dir=FLIGHT_RECORDER_DIR,
+                max_dumps=FLIGHT_RECORDER_MAX_DUMPS,
+            ))
+
         # 消息队列
         self.message_queue = queue.Queue()
 
@@ -537,43 +595,7 @@ class ControllerCore(QObject):
 
     def _format_agent_event_text(self, event: dict[str, Any]) -> str:
         """Format structured event into GUI output text."""
-        event_type = event.get("type", "")
-        payload = event.get("payload", {}) or {}
-
-        if event_type == "run_started":
-            return ""
-        if event_type == "task_type":
-            task_type = payload.get("task_type", "")
-            if task_type == "free_chat":
-                return f"📋 任务类型: {task_type}\n"
-            return f"📋 任务类型: {task_type}\n\n{DIVIDER}\n💭 思考过程\n{DIVIDER}\n"
-        if event_type == "thinking_chunk":
-            return payload.get("text", "")
-        if event_type == "thinking_complete":
-            return "\n"
-        if event_type == "action_decoded":
-            action = payload.get("action", {})
-            action_text = _format_action_lines(action)
-            return f"\n{DIVIDER}\n🎯 动作\n{DIVIDER}\n{action_text}\n"
-        if event_type == "action_executed":
-            return ""
-        if event_type == "performance_metric":
-            if payload.get("name") == "label":
-                return f"\n{DIVIDER}\n⏱️  性能指标\n{DIVIDER}\n"
-            label = payload.get("label", payload.get("name", "metric"))
-            value = payload.get("value", "")
-            unit = payload.get("unit", "")
-            return f"{label}: {value}{unit}\n"
-        if event_type == "result":
-            msg = payload.get("message", "")
-            return f"\n🎉 结果：{msg}\n" if msg else ""
-        if event_type == "error":
-            return f"❌ 错误：{payload.get('message', '')}\n"
-        if event_type == "status":
-            return f"{payload.get('message', '')}\n"
-        if event_type == "run_finished":
-            return ""
-        return ""
+        return format_agent_event_text(event)
 
     def _handle_agent_event(self, event: dict[str, Any]) -> None:
         """Handle agent structured event in GUI thread-safe way."""
@@ -29,6 +29,11 @@ import re
 import subprocess
 from pathlib import Path
 
+from phone_agent.adb.shell import (
+    get_transport,
+    get_wire_client,
+    list_device_serials,
+)
 from yuntai.core.config import (
     CONNECTION_CONFIG_FILE,
     DEFAULT_DEVICE_TYPE,
@@ -231,18 +236,24 @@ class ConnectionManager:
         """
         devices: list[str] = []
         try:
-            cmd = build_safe_command(["adb", "devices"])
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=DEVICE_DETECT_TIMEOUT,
-                encoding="utf-8",
-                errors="ignore"
-            )
+            if get_transport() == "wire":
+                # 直接通过 ADB server 套接字查询，无需启动 adb 进程
+                lines = [
+                    f"{serial}\t{state}" for serial, state in list_device_serials()
+                ]
+            else:
+                cmd = build_safe_command(["adb", "devices"])
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    timeout=DEVICE_DETECT_TIMEOUT,
+                    encoding="utf-8",
+                    errors="ignore"
+                )
+                lines = result.stdout.strip().split("\n")[1:]
 
-            lines = result.stdout.strip().split("\n")
-            for line in lines[1:]:
+            for line in lines:
                 if line.strip() and "device" in line:
                     parts = line.split("\t")
                     if len(parts) >= 1:
@@ -371,17 +382,22 @@ class ConnectionManager:
                 device_addr = f"{safe_ip}:{safe_port}"
 
             try:
-                cmd = build_safe_command(["adb", "connect", device_addr])
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=DEVICE_CONNECT_TIMEOUT,
-                    encoding="utf-8",
-                    errors="ignore"
-                )
-                stdout = result.stdout.strip()
-                if result.returncode == 0 and "connected to" in stdout.lower():
+                if get_transport() == "wire":
+                    stdout = get_wire_client().connect(device_addr).strip()
+                    returncode = 0
+                else:
+                    cmd = build_safe_command(["adb", "connect", device_addr])
+                    result = subprocess.run(
+                        cmd,
+                        capture_output=True,
+                        text=True,
+                        timeout=DEVICE_CONNECT_TIMEOUT,
+                        encoding="utf-8",
+                        errors="ignore"
+                    )
+                    stdout = result.stdout.strip()
+                    returncode = result.returncode
+                if returncode == 0 and "connected to" in stdout.lower():
                     return True, device_addr, f"已连接到无线设备: {device_addr}"
                 elif "already connected" in stdout.lower():
                     return True, device_addr, f"✅ 无线设备已连接: {device_addr}"
@@ -19,6 +19,7 @@
     - is_similar: 判断文本相似性
     - calculate_similarity: 计算相似度
     - prepare_callbacks: 准备回调处理器
+    - IntentMatcher: 直接意图匹配器，识别打开 APP、回到桌面等简单指令
 
 功能特点:
     - 时间信息获取和格式化
@@ -59,6 +60,7 @@ from .callback_utils import (
     prepare_callbacks_with_manager,
     get_global_callbacks,
 )
+from .intent_matcher import IntentMatch, IntentMatcher
 
 __all__ = [
     "TimeTool",
@@ -79,4 +81,6 @@ __all__ = [
     "prepare_callbacks",
     "prepare_callbacks_with_manager",
     "get_global_callbacks",
+    "IntentMatch",
+    "IntentMatcher",
 ]
@@ -0,0 +1,280 @@
+"""
+直接意图匹配模块
+================
+
+将“打开微信”“回到桌面”“返回”这类简单指令确定性地解析为设备操作，
+无需经过 JudgementAgent 和 PhoneAgent 的模型调用。只有在把握足够时
+才给出匹配结果，其余输入一律返回 None，交由完整流程处理。
+
+主要功能:
+    - IntentMatcher.match: 匹配启动 APP、回到桌面、返回上一页等意图
+    - IntentMatcher.explain: 以文本形式说明匹配过程，便于排查
+
+匹配规则:
+    - 去除礼貌用语（请、帮我……）和语气词（吧、一下……）
+    - 启动意图需以动词（打开、启动、open……）开头，其余部分必须整体是一个 APP 名
+    - APP 名依次尝试精确匹配、别名匹配和模糊匹配，模糊匹配有歧义时放弃
+
+使用示例:
+    >>> from yuntai.tools.intent_matcher import IntentMatcher
+    >>> matcher = IntentMatcher()
+    >>> matcher.match("帮我打开微信吧").app_name
+    '微信'
+    >>> matcher.match("打开微信给张三发消息") is None
+    True
+"""
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+
+from phone_agent.config import APP_PACKAGES
+
+logger = logging.getLogger(__name__)
+
+# 意图类型
+INTENT_LAUNCH = "launch"
+INTENT_HOME = "home"
+INTENT_BACK = "back"
+
+# 默认最低置信度，模糊匹配低于此值时不走快速路径
+DEFAULT_MIN_CONFIDENCE: float = 0.85
+
+# 模糊匹配时最优与次优候选的最小差距，差距更小视为有歧义
+AMBIGUITY_MARGIN: float = 0.05
+
+# 超过此长度的输入不可能是简单指令
+MAX_INPUT_LENGTH = 24
+
+# 句首礼貌用语（规范化后，按长度优先匹配）
+POLITE_PREFIXES = ("麻烦你", "麻烦", "请你", "请", "帮我", "帮忙", "给我", "please", "pls")
+
+# 句尾语气词和量词
+TRAILING_PARTICLES = ("一下", "吧", "呀", "啊", "哦", "呢", "嘛")
+
+# 启动动词
+LAUNCH_VERBS = ("打开", "启动", "开启", "点开", "进入", "运行", "open", "launch", "start")
+
+# APP 名后缀
+APP_SUFFIXES = ("客户端", "应用", "软件", "app")
+
+# 回到桌面的说法
+HOME_PHRASES = frozenset({
+    "回到桌面", "返回桌面", "回桌面", "去桌面", "桌面",
+    "回到主屏幕", "返回主屏幕", "回主屏幕", "主屏幕",
+    "回到主页", "返回主页", "回主页", "home", "gohome",
+})
+
+# 返回上一页的说法
+BACK_PHRASES = frozenset({
+    "返回", "后退", "退回", "上一页", "返回上一页", "回到上一页",
+    "返回上一级", "回到上一级", "back", "goback",
+})
+
+# APP 别名 -> APP_PACKAGES 中的名称
+APP_ALIASES: dict[str, tuple[str, ...]] = {
+    "微信": ("weixin", "wx", "威信"),
+    "QQ": ("扣扣", "企鹅"),
+    "bilibili": ("哔哩哔哩", "b站", "哔站", "blbl"),
+    "小红书": ("红书", "xhs"),
+    "网易云音乐": ("网易云",),
+    "高德地图": ("高德",),
+    "百度地图": ("百度导航",),
+    "滴滴出行": ("滴滴", "滴滴打车"),
+    "今日头条": ("头条",),
+    "爱奇艺": ("奇艺", "iqiyi"),
+    "京东": ("jd", "jingdong"),
+    "拼多多": ("pdd",),
+    "淘宝": ("taobao", "手淘"),
+    "抖音": ("douyin",),
+    "快手": ("kuaishou",),
+    "Settings": ("设置", "系统设置", "手机设置"),
+    "Chrome": ("谷歌浏览器",),
+    "Clock": ("时钟", "闹钟"),
+    "Contacts": ("联系人", "通讯录"),
+    "Files": ("文件管理", "文件管理器"),
+}
+
+# 规范化时移除的字符：空白和标点
+_NOISE_RE = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """转小写并移除空白、标点"""
+    return _NOISE_RE.sub("", text).lower()
+
+
+@dataclass
+class IntentMatch:
+    """
+    意图匹配结果
+
+    Attributes:
+        intent: 意图类型，INTENT_LAUNCH / INTENT_HOME / INTENT_BACK
+        app_name: 启动意图对应的 APP 名（APP_PACKAGES 中的键）
+        confidence: 置信度，精确或别名匹配为 1.0
+        trace: 匹配过程说明
+    """
+
+    intent: str
+    app_name: str | None = None
+    confidence: float = 1.0
+    trace: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "intent": self.intent,
+            "app_name": self.app_name,
+            "confidence": round(self.confidence, 3),
+        }
+
+
+class IntentMatcher:
+    """
+    确定性意图匹配器
+
+    Args:
+        apps: APP 名到包名的映射，默认使用 Android 的 APP_PACKAGES
+        aliases: APP 别名表，键为 apps 中的名称，目标不在 apps 中的别名会被忽略
+        min_confidence: 模糊匹配的最低置信度
+    """
+
+    def __init__(
+        self,
+        apps: dict[str, str] | None = None,
+        aliases: dict[str, tuple[str, ...]] | None = None,
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+    ) -> None:
+        apps = APP_PACKAGES if apps is None else apps
+        aliases = APP_ALIASES if aliases is None else aliases
+        self.min_confidence = min_confidence
+        # 规范化名称 -> (APP 名, 包名)，表中靠前的名称优先
+        self._names: dict[str, tuple[str, str]] = {}
+        for app_name, package in apps.items():
+            self._names.setdefault(normalize(app_name), (app_name, package))
+        self._aliases: dict[str, tuple[str, str]] = {}
+        for app_name, names in aliases.items():
+            if app_name not in apps:
+                continue
+            for alias in names:
+                self._aliases.setdefault(normalize(alias), (app_name, apps[app_name]))
+
+    def match(self, text: str) -> IntentMatch | None:
+        """
+        匹配输入文本
+
+        Args:
+            text: 用户输入
+
+        Returns:
+            匹配结果，没有把握时返回 None
+        """
+        trace: list[str] = []
+        result = self._match(text, trace)
+        if result is not None:
+            result.trace = trace
+        return result
+
+    def explain(self, text: str) -> str:
+        """返回匹配过程的逐行说明"""
+        trace: list[str] = []
+        result = self._match(text, trace)
+        if result is None:
+            trace.append("结论: 不走快速路径")
+        else:
+            trace.append(f"结论: {result.to_dict()}")
+        return "\n".join(trace)
+
+    def _match(self, text: str, trace: list[str]) -> IntentMatch | None:
+        normalized = normalize(text)
+        trace.append(f"规范化: {text!r} -> {normalized!r}")
+        if not normalized or len(normalized) > MAX_INPUT_LENGTH:
+            trace.append("输入为空或过长")
+            return None
+
+        core = _strip_affixes(normalized)
+        if core != normalized:
+            trace.append(f"去除礼貌用语和语气词: {core!r}")
+
+        if core in HOME_PHRASES:
+            trace.append(f"命中桌面说法 {core!r}")
+            return IntentMatch(INTENT_HOME)
+        if core in BACK_PHRASES:
+            trace.append(f"命中返回说法 {core!r}")
+            return IntentMatch(INTENT_BACK)
+
+        verb = next((v for v in LAUNCH_VERBS if core.startswith(v)), None)
+        if verb is None:
+            trace.append("没有启动动词")
+            return None
+        query = core[len(verb):]
+        if query.startswith("一下"):
+            query = query[len("一下"):]
+        for suffix in APP_SUFFIXES:
+            if query.endswith(suffix) and len(query) > len(suffix):
+                query = query[: -len(suffix)]
+                break
+        trace.append(f"启动动词 {verb!r}，APP 名 {query!r}")
+        if not query:
+            return None
+
+        app_name, confidence = self._resolve_app(query, trace)
+        if app_name is None:
+            return None
+        return IntentMatch(INTENT_LAUNCH, app_name=app_name, confidence=confidence)
+
+    def _resolve_app(self, query: str, trace: list[str]) -> tuple[str | None, float]:
+        """依次尝试精确、别名和模糊匹配"""
+        if query in self._names:
+            trace.append(f"精确匹配 APP {self._names[query][0]!r}")
+            return self._names[query][0], 1.0
+        if query in self._aliases:
+            trace.append(f"别名匹配 APP {self._aliases[query][0]!r}")
+            return self._aliases[query][0], 1.0
+
+        # 每个包只保留得分最高的候选
+        scores: dict[str, tuple[float, str]] = {}
+        for candidates in (self._names, self._aliases):
+            for name, (app_name, package) in candidates.items():
+                # 长度差距过大时相似度不可能达标，跳过构造 SequenceMatcher
+                shorter, total = min(len(query), len(name)), len(query) + len(name)
+                if 2 * shorter / total < self.min_confidence:
+                    continue
+                matcher = SequenceMatcher(None, query, name)
+                if matcher.quick_ratio() < self.min_confidence:
+                    continue
+                ratio = matcher.ratio()
+                if ratio > scores.get(package, (0.0, ""))[0]:
+                    scores[package] = (ratio, app_name)
+
+        ranked = sorted(scores.values(), reverse=True)
+        if not ranked or ranked[0][0] < self.min_confidence:
+            trace.append(f"模糊匹配置信度低于 {self.min_confidence}")
+            return None, 0.0
+        best_score, best_name = ranked[0]
+        if len(ranked) > 1 and best_score - ranked[1][0] < AMBIGUITY_MARGIN:
+            trace.append(
+                f"模糊匹配有歧义: {best_name!r} ({best_score:.2f}) / "
+                f"{ranked[1][1]!r} ({ranked[1][0]:.2f})"
+            )
+            return None, 0.0
+        trace.append(f"模糊匹配 APP {best_name!r}，置信度 {best_score:.2f}")
+        return best_name, best_score
+
+
+def _strip_affixes(text: str) -> str:
+    """去除句首礼貌用语和句尾语气词"""
+    changed = True
+    while changed:
+        changed = False
+        for prefix in POLITE_PREFIXES:
+            if text.startswith(prefix) and len(text) > len(prefix):
+                text = text[len(prefix):]
+                changed = True
+        for particle in TRAILING_PARTICLES:
+            if text.endswith(particle) and len(text) > len(particle):
+                text = text[: -len(particle)]
+                changed = True
+    return text